@@ -0,0 +1,25 @@
+"""Storage backend benchmarks."""
+
+from dev.bench.harness import (
+    BACKENDS,
+    PROFILES,
+    Profile,
+    Regression,
+    Result,
+    compare,
+    load,
+    run,
+    save,
+)
+
+__all__ = [
+    "BACKENDS",
+    "PROFILES",
+    "Profile",
+    "Regression",
+    "Result",
+    "compare",
+    "load",
+    "run",
+    "save",
+]
@@ -0,0 +1,89 @@
+"""Run the storage benchmarks: python -m dev.bench."""
+
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from dev.bench.harness import (
+    BACKENDS,
+    BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    PROFILES,
+    Regression,
+    check,
+    load,
+    record,
+    run,
+    save,
+)
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    profile: str = typer.Option(
+        "quick", "--profile", "-p", help=f"One of: {', '.join(PROFILES)}."
+    ),
+    backends: Optional[list[str]] = typer.Option(
+        None, "--backend", "-b", help="Backend to run; repeat for several."
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write the results to this JSON file."
+    ),
+    baseline: Path = typer.Option(
+        BASELINE_PATH, "--baseline", help="Baseline JSON file."
+    ),
+    save_baseline: bool = typer.Option(
+        False, "--save-baseline", help="Replace the baseline instead of checking it."
+    ),
+    threshold: float = typer.Option(
+        DEFAULT_THRESHOLD, "--threshold", "-t", help="Allowed slowdown, e.g. 0.5."
+    ),
+) -> None:
+    """Benchmark storage backends and check for regressions."""
+    if profile not in PROFILES:
+        typer.echo(f"Unknown profile: {profile}", err=True)
+        raise typer.Exit(1)
+    unknown = sorted(set(backends or ()) - set(BACKENDS))
+    if unknown:
+        typer.echo(f"Unknown backend: {', '.join(unknown)}", err=True)
+        raise typer.Exit(1)
+
+    measure = record if save_baseline else run
+    results = measure(
+        PROFILES[profile], backends, progress=lambda msg: typer.echo(msg, err=True)
+    )
+    regressions: list[Regression] = []
+    if not save_baseline and baseline.exists():
+        _, base = load(baseline)
+        results, regressions = check(results, base, PROFILES[profile], threshold)
+
+    typer.echo(
+        f"{'backend':<11} {'items':>8} {'size':>8} {'op':<7} "
+        f"{'ops/s':>10} {'p50 us':>9} {'p99 us':>9}"
+    )
+    for r in results:
+        typer.echo(
+            f"{r.backend:<11} {r.items:>8} {r.content_size:>8} {r.op:<7} "
+            f"{r.ops_per_sec:>10.0f} {r.p50_us:>9.1f} {r.p99_us:>9.1f}"
+        )
+    if output is not None:
+        save(output, results, profile)
+    if save_baseline:
+        save(baseline, results, profile)
+        typer.echo(f"Saved baseline to {baseline}")
+
+    for reg in regressions:
+        typer.echo(
+            f"Regression: {' '.join(map(str, reg.key))} {reg.metric} "
+            f"{reg.baseline:.1f} -> {reg.current:.1f}",
+            err=True,
+        )
+    if regressions:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
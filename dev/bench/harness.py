@@ -0,0 +1,437 @@
+"""Throughput and latency benchmarks for the storage backends."""
+
+import json
+import math
+import platform
+import random
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.dedup import DedupStorage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.layout import Layout
+from typ_tmpl.storage.log import LogStorage
+from typ_tmpl.storage.memory import MemoryStorage
+from typ_tmpl.storage.sqlite import SqliteStorage
+
+# Backends under test, each created in an empty directory. New backends
+# register here; tests check that every selectable backend is covered.
+BACKENDS: dict[str, Callable[[Path], Storage]] = {
+    "mock": lambda path: MockStorage(),
+    "fs": lambda path: FilesystemStorage(base_dir=path),
+    "fs-sharded": lambda path: FilesystemStorage(base_dir=path, layout=Layout.SHARDED),
+    "sqlite": lambda path: SqliteStorage(path=path / "items.db"),
+    "log": lambda path: LogStorage(base_dir=path),
+    "dedup": lambda path: DedupStorage(base_dir=path),
+    "memory": lambda path: MemoryStorage(base_dir=path),
+}
+
+# Operations timed against each preloaded store, in the order they run.
+OPERATIONS = ("add", "get", "exists", "list", "delete")
+
+# Items written per add_many() call while preloading a store.
+LOAD_BATCH = 1000
+
+# Largest fraction a metric may worsen by before it counts as a regression.
+DEFAULT_THRESHOLD = 0.5
+
+# Times a regressed scenario is rerun before the regression is reported.
+DEFAULT_RETRIES = 2
+
+# Full runs recorded by `--save-baseline`, keeping the worst of each metric.
+BASELINE_ROUNDS = 3
+
+# Where `--save-baseline` writes and regression checks read by default.
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+@dataclass(frozen=True)
+class Profile:
+    """A matrix of store sizes and content sizes to benchmark.
+
+    Combinations whose preloaded content would exceed max_bytes are
+    skipped, since they would not fit on a developer machine. Each
+    combination runs repeats times and keeps the best of each metric, which
+    evens out some of the noise of a busy machine.
+    """
+
+    items: tuple[int, ...]
+    content_sizes: tuple[int, ...]
+    samples: int
+    repeats: int = 3
+    max_bytes: int = 1 << 30
+
+
+PROFILES = {
+    "smoke": Profile(items=(1_000,), content_sizes=(64, 4096), samples=200),
+    "quick": Profile(
+        items=(1_000, 10_000), content_sizes=(64, 4096, 65536), samples=1000
+    ),
+    "full": Profile(
+        items=(1_000, 10_000, 100_000, 1_000_000),
+        content_sizes=(16, 1024, 65536, 1 << 20),
+        samples=1000,
+        repeats=1,
+        max_bytes=4 << 30,
+    ),
+}
+
+
+class Result(NamedTuple):
+    """Measurements of one operation on one backend and store size.
+
+    Latencies are in microseconds; list() is timed per call, not per item.
+    """
+
+    backend: str
+    items: int
+    content_size: int
+    op: str
+    ops: int
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+
+    @property
+    def key(self) -> tuple[str, int, int, str]:
+        """Identify the measurement across runs."""
+        return (self.backend, self.items, self.content_size, self.op)
+
+
+class Regression(NamedTuple):
+    """A metric that got worse than the baseline allows."""
+
+    key: tuple[str, int, int, str]
+    metric: str
+    baseline: float
+    current: float
+
+
+def scenarios(profile: Profile) -> Iterator[tuple[int, int]]:
+    """List the store and content sizes a profile covers.
+
+    Args:
+        profile: Profile to expand.
+
+    Yields:
+        Item count and content size of each combination within the cap.
+    """
+    for items in profile.items:
+        for size in profile.content_sizes:
+            if items * size <= profile.max_bytes:
+                yield items, size
+
+
+def percentile(values: list[int], pct: float) -> int:
+    """Pick the nearest-rank percentile of some values.
+
+    Args:
+        values: Sorted values.
+        pct: Percentile between 0 and 100.
+
+    Returns:
+        The smallest value at least pct percent of values do not exceed.
+    """
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def content(id: str, size: int) -> str:
+    """Make content of a given size that differs between items.
+
+    Starting with the ID keeps content-addressed backends from storing
+    every item once.
+    """
+    head = f"{id}\n"
+    return head + "x" * max(0, size - len(head))
+
+
+def measure(
+    backend: str,
+    items: int,
+    content_size: int,
+    op: str,
+    calls: Iterable[Callable[[], object]],
+) -> Result:
+    """Time calls one at a time.
+
+    Args:
+        backend: Backend name.
+        items: Number of items in the store.
+        content_size: Size of each item's content.
+        op: Operation name.
+        calls: Calls to time.
+
+    Returns:
+        Throughput and latency percentiles of the calls.
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    for call in calls:
+        start = clock()
+        call()
+        latencies.append(clock() - start)
+    latencies.sort()
+    total = sum(latencies) or 1
+    return Result(
+        backend=backend,
+        items=items,
+        content_size=content_size,
+        op=op,
+        ops=len(latencies),
+        ops_per_sec=len(latencies) * 1e9 / total,
+        p50_us=percentile(latencies, 50) / 1000,
+        p99_us=percentile(latencies, 99) / 1000,
+    )
+
+
+def bench_storage(
+    storage: Storage, backend: str, items: int, content_size: int, samples: int
+) -> list[Result]:
+    """Preload a store and time each operation against it.
+
+    Args:
+        storage: Empty store to benchmark.
+        backend: Backend name.
+        items: Number of items to preload.
+        content_size: Size of each item's content.
+        samples: Number of calls to time per operation.
+
+    Returns:
+        One result per operation.
+    """
+    rng = random.Random(items * 31 + content_size)
+    ids = [f"item{i:07d}" for i in range(items)]
+    for start in range(0, items, LOAD_BATCH):
+        storage.add_many(
+            (id, content(id, content_size)) for id in ids[start : start + LOAD_BATCH]
+        )
+
+    samples = min(samples, items)
+    new = [f"new{i:07d}" for i in range(samples)]
+    missing = [f"missing{i:07d}" for i in range(samples - samples // 2)]
+    probes = rng.sample(ids, samples // 2) + missing
+    rng.shuffle(probes)
+    calls: dict[str, list[Callable[[], object]]] = {
+        "add": [partial(storage.add, id, content(id, content_size)) for id in new],
+        "get": [partial(storage.get, id) for id in rng.sample(ids, samples)],
+        "exists": [partial(storage.exists, id) for id in probes],
+        # Listing is linear in the store size, so it is timed fewer times.
+        "list": [storage.list] * max(3, samples // 100),
+        "delete": [partial(storage.delete, id) for id in rng.sample(ids, samples)],
+    }
+    return [measure(backend, items, content_size, op, calls[op]) for op in OPERATIONS]
+
+
+def best(a: Result, b: Result) -> Result:
+    """Combine two measurements of the same thing, keeping the best metrics."""
+    return a._replace(
+        ops_per_sec=max(a.ops_per_sec, b.ops_per_sec),
+        p50_us=min(a.p50_us, b.p50_us),
+        p99_us=min(a.p99_us, b.p99_us),
+    )
+
+
+def worst(a: Result, b: Result) -> Result:
+    """Combine two measurements of the same thing, keeping the worst metrics."""
+    return a._replace(
+        ops_per_sec=min(a.ops_per_sec, b.ops_per_sec),
+        p50_us=max(a.p50_us, b.p50_us),
+        p99_us=max(a.p99_us, b.p99_us),
+    )
+
+
+def bench_scenario(
+    backend: str, items: int, content_size: int, profile: Profile
+) -> list[Result]:
+    """Benchmark one backend and scenario, repeating as the profile says.
+
+    Each repeat gets a fresh store in a temp directory.
+
+    Args:
+        backend: Name from BACKENDS.
+        items: Number of items to preload.
+        content_size: Size of each item's content.
+        profile: Number of samples and repeats.
+
+    Returns:
+        The best of the repeats for each operation.
+    """
+    merged: dict[str, Result] = {}
+    for _ in range(profile.repeats):
+        with tempfile.TemporaryDirectory(prefix="typ-tmpl-bench-") as tmp:
+            storage = BACKENDS[backend](Path(tmp))
+            try:
+                results = bench_storage(
+                    storage, backend, items, content_size, profile.samples
+                )
+            finally:
+                storage.close()
+        for result in results:
+            old = merged.get(result.op)
+            merged[result.op] = result if old is None else best(old, result)
+    return list(merged.values())
+
+
+def run(
+    profile: Profile,
+    backends: Iterable[str] | None = None,
+    progress: Callable[[str], None] | None = None,
+) -> list[Result]:
+    """Benchmark backends over every scenario of a profile.
+
+    Args:
+        profile: Store and content sizes to cover.
+        backends: Names from BACKENDS to run, or None for all of them.
+        progress: Called with a description of each scenario as it starts.
+
+    Returns:
+        Results of every backend, scenario and operation.
+    """
+    results = []
+    for name in backends or BACKENDS:
+        for items, size in scenarios(profile):
+            if progress is not None:
+                progress(f"{name}: {items} items of {size} bytes")
+            results += bench_scenario(name, items, size, profile)
+    return results
+
+
+def record(
+    profile: Profile,
+    backends: Iterable[str] | None = None,
+    rounds: int = BASELINE_ROUNDS,
+    progress: Callable[[str], None] | None = None,
+) -> list[Result]:
+    """Benchmark a profile several times to make a baseline.
+
+    Each round is a full run(), and the worst of each metric is kept. A
+    check keeps the best of its runs and reruns, so comparing it with a
+    single lucky run would fail on an ordinary one.
+
+    Args:
+        profile: Store and content sizes to cover.
+        backends: Names from BACKENDS to run, or None for all of them.
+        rounds: Number of full runs.
+        progress: Called with a description of each scenario as it starts.
+
+    Returns:
+        The worst measurements of every backend, scenario and operation.
+    """
+    merged: dict[tuple[str, int, int, str], Result] = {}
+    for _ in range(rounds):
+        for result in run(profile, backends, progress):
+            old = merged.get(result.key)
+            merged[result.key] = result if old is None else worst(old, result)
+    return list(merged.values())
+
+
+def compare(
+    results: Iterable[Result],
+    baseline: Iterable[Result],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """Find measurements that are worse than the baseline allows.
+
+    A measurement regresses if its throughput dropped, or its median
+    latency rose, by more than the threshold. The tail latency is reported
+    but not checked, as it is too noisy to gate on. Measurements missing
+    from the baseline are not checked.
+
+    Args:
+        results: Current measurements.
+        baseline: Earlier measurements to compare against.
+        threshold: Largest allowed change as a fraction, e.g. 0.3 for 30%.
+
+    Returns:
+        Every regressed metric.
+    """
+    base = {result.key: result for result in baseline}
+    regressions = []
+    for result in results:
+        old = base.get(result.key)
+        if old is None:
+            continue
+        if result.ops_per_sec < old.ops_per_sec * (1 - threshold):
+            regressions.append(
+                Regression(
+                    result.key, "ops_per_sec", old.ops_per_sec, result.ops_per_sec
+                )
+            )
+        if result.p50_us > old.p50_us * (1 + threshold):
+            regressions.append(
+                Regression(result.key, "p50_us", old.p50_us, result.p50_us)
+            )
+    return regressions
+
+
+def check(
+    results: Iterable[Result],
+    baseline: Iterable[Result],
+    profile: Profile,
+    threshold: float = DEFAULT_THRESHOLD,
+    retries: int = DEFAULT_RETRIES,
+) -> tuple[list[Result], list[Regression]]:
+    """Compare results with a baseline, confirming regressions by rerunning.
+
+    Scenarios with a regression are benchmarked again, up to retries
+    times, keeping the best measurements. Only slowdowns that persist are
+    reported, so a machine busy for a moment does not fail the check.
+
+    Args:
+        results: Current measurements.
+        baseline: Earlier measurements to compare against.
+        profile: Profile the results were measured with.
+        threshold: Largest allowed change as a fraction.
+        retries: Number of times to rerun regressed scenarios.
+
+    Returns:
+        The results with reruns merged in, and the regressions that remain.
+    """
+    baseline = list(baseline)
+    merged = {result.key: result for result in results}
+    regressions = compare(merged.values(), baseline, threshold)
+    for _ in range(retries):
+        if not regressions:
+            break
+        for backend, items, size in sorted({reg.key[:3] for reg in regressions}):
+            for result in bench_scenario(backend, items, size, profile):
+                merged[result.key] = best(merged[result.key], result)
+        regressions = compare(merged.values(), baseline, threshold)
+    return list(merged.values()), regressions
+
+
+def save(path: Path, results: Iterable[Result], profile: str) -> None:
+    """Write results to a JSON file.
+
+    Args:
+        path: File to write.
+        results: Results to save.
+        profile: Name of the profile the results come from.
+    """
+    document: dict[str, Any] = {
+        "profile": profile,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result._asdict() for result in results],
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n")
+
+
+def load(path: Path) -> tuple[str, list[Result]]:
+    """Read results written by save().
+
+    Args:
+        path: File to read.
+
+    Returns:
+        Name of the profile the results come from, and the results.
+    """
+    document = json.loads(path.read_text())
+    return document["profile"], [Result(**row) for row in document["results"]]
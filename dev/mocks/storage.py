@@ -1,9 +1,15 @@
 """Mock storage implementation for testing."""
 
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
 from typing import Any
 
-from typ_tmpl.errors import ItemExistsError, ItemNotFoundError
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError, StorageError
+from typ_tmpl.protocols.storage import ItemMeta, SearchHit
+from typ_tmpl.storage.batch import ensure_absent, ensure_present
+from typ_tmpl.storage.metadata import SORT_COLUMNS
+from typ_tmpl.storage.ranges import id_range
+from typ_tmpl.storage.search import tokenize
 
 
 @dataclass
@@ -12,6 +18,8 @@ class MockStorage:
 
     items: dict[str, str] = field(default_factory=dict)
     calls: list[tuple[str, tuple[Any, ...]]] = field(default_factory=list)
+    # Creation "times" are call counts, so items added later sort later.
+    created: dict[str, float] = field(default_factory=dict)
 
     def add(self, id: str, content: str) -> None:
         """Add a new item."""
@@ -19,12 +27,18 @@ class MockStorage:
         if id in self.items:
             raise ItemExistsError(id)
         self.items[id] = content
+        self.created[id] = float(len(self.calls))
 
     def list(self) -> list[str]:
         """List all item IDs."""
         self.calls.append(("list", ()))
         return sorted(self.items.keys())
 
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order."""
+        self.calls.append(("iter_ids", (prefix, start)))
+        return id_range(sorted(self.items), prefix, start)
+
     def delete(self, id: str) -> None:
         """Delete an item."""
         self.calls.append(("delete", (id,)))
@@ -41,3 +55,77 @@ class MockStorage:
         """Get the content of an item."""
         self.calls.append(("get", (id,)))
         return self.items.get(id)
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once."""
+        batch = list(items)
+        self.calls.append(("add_many", (batch,)))
+        ensure_absent((id for id, _ in batch), self.items)
+        self.items.update(batch)
+        self.created.update((id, float(len(self.calls))) for id, _ in batch)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items."""
+        ids = list(ids)
+        self.calls.append(("get_many", (ids,)))
+        return {id: self.items.get(id) for id in ids}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once."""
+        ids = list(ids)
+        self.calls.append(("delete_many", (ids,)))
+        ensure_present(ids, self.items)
+        for id in ids:
+            del self.items[id]
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist."""
+        ids = list(ids)
+        self.calls.append(("exists_many", (ids,)))
+        return {id: id in self.items for id in ids}
+
+    def close(self) -> None:
+        """Close the storage."""
+        self.calls.append(("close", ()))
+
+    def _meta(self, id: str) -> ItemMeta:
+        created = self.created.get(id, 0.0)
+        return ItemMeta(id, len(self.items[id].encode()), created, created)
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order."""
+        self.calls.append(("iter_metadata", (prefix, start)))
+        return (self._meta(id) for id in id_range(sorted(self.items), prefix, start))
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field."""
+        self.calls.append(("top_metadata", (key, limit, descending, prefix)))
+        if key not in SORT_COLUMNS:
+            raise StorageError(f"Unknown sort key '{key}'")
+        field = SORT_COLUMNS[key]
+        entries = [self._meta(id) for id in self.items if id.startswith(prefix)]
+        entries.sort(key=lambda m: (getattr(m, field), m.id), reverse=descending)
+        return entries[:limit]
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> Sequence[SearchHit]:
+        """Find items by scanning their content, scored by word count."""
+        self.calls.append(("search", (query, limit, match_all)))
+        terms = set(tokenize(query))
+        hits = []
+        for id, content in self.items.items():
+            words = tokenize(content)
+            found = terms.intersection(words)
+            if found and (not match_all or found == terms):
+                hits.append(SearchHit(id, float(sum(w in terms for w in words))))
+        hits.sort(key=lambda hit: (-hit.score, hit.id))
+        return hits[:limit]
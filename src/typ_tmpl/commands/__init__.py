@@ -1,7 +1,36 @@
 """Commands module for typ-tmpl CLI."""
 
 from typ_tmpl.commands.add import add
+from typ_tmpl.commands.bulk import bulk
+from typ_tmpl.commands.cat import cat
+from typ_tmpl.commands.compact import compact
 from typ_tmpl.commands.delete import delete
+from typ_tmpl.commands.filter import filter_stats
+from typ_tmpl.commands.gc import gc
+from typ_tmpl.commands.get import get
+from typ_tmpl.commands.import_items import import_items
 from typ_tmpl.commands.list import list_items
+from typ_tmpl.commands.migrate import migrate
+from typ_tmpl.commands.search import search
+from typ_tmpl.commands.serve import serve
+from typ_tmpl.commands.shell import shell
+from typ_tmpl.commands.snapshot import export, import_snapshot
 
-__all__ = ["add", "delete", "list_items"]
+__all__ = [
+    "add",
+    "bulk",
+    "cat",
+    "compact",
+    "delete",
+    "export",
+    "filter_stats",
+    "gc",
+    "get",
+    "import_items",
+    "import_snapshot",
+    "list_items",
+    "migrate",
+    "search",
+    "serve",
+    "shell",
+]
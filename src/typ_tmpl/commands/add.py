@@ -1,12 +1,10 @@
 """Add command implementation."""
 
 import typer
-from rich.console import Console
 
+from typ_tmpl.console import get_console
 from typ_tmpl.context import AppContext
-from typ_tmpl.errors import ItemExistsError
-
-console = Console()
+from typ_tmpl.errors import ItemExistsError, StorageError
 
 
 def add(
@@ -21,6 +19,7 @@ def add(
         typ-tmpl a note2 --content "Another note"
     """
     app_ctx: AppContext = ctx.obj
+    console = get_console()
 
     try:
         app_ctx.storage.add(id, content)
@@ -28,3 +27,6 @@ def add(
     except ItemExistsError:
         console.print(f"[red]Error: Item '{id}' already exists[/]")
         raise typer.Exit(1)
+    except StorageError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
@@ -0,0 +1,168 @@
+"""Bulk command implementation."""
+
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from enum import StrEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
+import typer
+
+from typ_tmpl.commands.import_items import RecordError, read_ndjson
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import AppError
+from typ_tmpl.protocols.async_storage import AsyncStorage
+from typ_tmpl.protocols.storage import Storage
+
+if TYPE_CHECKING:
+    from typ_tmpl.storage.executor import ExecutorStorage
+
+
+class BulkOperation(StrEnum):
+    """Operations the bulk command can run."""
+
+    ADD = "add"
+    GET = "get"
+    DELETE = "delete"
+
+
+def _read_ids(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the non-blank lines as IDs."""
+    for line in lines:
+        id = line.strip()
+        if id:
+            yield id
+
+
+def _async_storage(storage: Storage, concurrency: int) -> "ExecutorStorage":
+    """Wrap storage for concurrent use.
+
+    Only the filesystem backend is safe to call from several threads; other
+    backends get a single worker and run their calls one at a time.
+    """
+    from typ_tmpl.storage.filesystem import FilesystemStorage
+
+    if isinstance(storage, FilesystemStorage):
+        from typ_tmpl.storage.async_filesystem import AsyncFilesystemStorage
+
+        return AsyncFilesystemStorage(storage, max_workers=concurrency)
+
+    from typ_tmpl.storage.executor import ExecutorStorage
+    from typ_tmpl.storage.instrumented import unwrap
+
+    if isinstance(unwrap(storage), FilesystemStorage):
+        # Instrumented filesystem storage; its metrics are thread-safe.
+        return ExecutorStorage(storage, max_workers=concurrency)
+    return ExecutorStorage(storage)
+
+
+async def _report(
+    results: AsyncIterator[tuple[object, object]], write_items: bool
+) -> tuple[int, int]:
+    """Print the outcome of each operation.
+
+    Returns:
+        Number of succeeded and failed operations.
+    """
+    import json
+
+    errors = get_console(stderr=True)
+    succeeded = failed = 0
+    async for arg, result in results:
+        if isinstance(result, AppError):
+            errors.print(f"[red]Error: {result}[/]")
+            failed += 1
+        elif write_items and result is None:
+            errors.print(f"[red]Error: Item '{arg}' not found[/]")
+            failed += 1
+        else:
+            if write_items:
+                sys.stdout.write(json.dumps({"id": arg, "content": result}) + "\n")
+            succeeded += 1
+    sys.stdout.flush()
+    return succeeded, failed
+
+
+async def _run(
+    storage: AsyncStorage, operation: BulkOperation, stream: TextIO, concurrency: int
+) -> tuple[int, int]:
+    """Run one operation over every record in stream.
+
+    Returns:
+        Number of succeeded and failed operations.
+    """
+    from typ_tmpl.storage.executor import run_bounded
+
+    if operation == BulkOperation.ADD:
+
+        async def add(record: tuple[str, str]) -> None:
+            await storage.add(*record)
+
+        added = run_bounded(add, read_ndjson(stream), concurrency)
+        return await _report(added, write_items=False)
+    if operation == BulkOperation.GET:
+        got = run_bounded(storage.get, _read_ids(stream), concurrency)
+        return await _report(got, write_items=True)
+    deleted = run_bounded(storage.delete, _read_ids(stream), concurrency)
+    return await _report(deleted, write_items=False)
+
+
+def bulk(
+    ctx: typer.Context,
+    operation: BulkOperation = typer.Argument(..., help="Operation to run."),
+    source: Path | None = typer.Argument(
+        None, help="Input file. Reads stdin if omitted or '-'."
+    ),
+    concurrency: int = typer.Option(
+        16, "--concurrency", "-j", min=1, help="Operations in flight at once."
+    ),
+) -> None:
+    """Run many adds, gets or deletes concurrently.
+
+    'add' reads NDJSON records like the import command; 'get' and 'delete'
+    read one ID per line. 'get' writes the items as NDJSON to stdout, and
+    errors and the summary go to stderr. Unlike import, every record is a
+    separate operation: failures are reported and the rest carry on.
+
+    Examples:
+        typ-tmpl bulk add items.ndjson -j 32
+        typ-tmpl list | typ-tmpl bulk get > backup.ndjson
+        typ-tmpl bulk delete stale-ids.txt
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console(stderr=True)
+
+    opened: AbstractContextManager[TextIO]
+    if source is None or str(source) == "-":
+        opened = nullcontext(sys.stdin)
+    else:
+        try:
+            opened = open(source, encoding="utf-8")
+        except OSError as e:
+            console.print(f"[red]Error: Cannot open {source}: {e.strerror}[/]")
+            raise typer.Exit(1)
+
+    import asyncio
+
+    storage = _async_storage(app_ctx.storage, concurrency)
+    started = time.perf_counter()
+    try:
+        with opened as stream:
+            succeeded, failed = asyncio.run(
+                _run(storage, operation, stream, concurrency)
+            )
+    except RecordError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    finally:
+        storage.shutdown()
+    elapsed = time.perf_counter() - started
+
+    rate = (succeeded + failed) / elapsed if elapsed > 0 else 0.0
+    summary = f"{operation.value}: {succeeded} succeeded, {failed} failed"
+    console.print(f"[dim]{summary} in {elapsed:.2f}s ({rate:,.0f} items/s)[/]")
+    if failed:
+        raise typer.Exit(1)
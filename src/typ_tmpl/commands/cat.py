@@ -0,0 +1,47 @@
+"""Cat command implementation."""
+
+import sys
+
+import typer
+
+from typ_tmpl.console import get_console, silence_stdout
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+
+
+def cat(
+    ctx: typer.Context,
+    ids: list[str] = typer.Argument(..., help="Identifiers of the items to print."),
+) -> None:
+    """Write the raw content of items to stdout.
+
+    Content is streamed as stored, without a trailing newline, so items of
+    any size print with constant memory. Plain filesystem items are copied
+    to stdout by the kernel.
+
+    Examples:
+        typ-tmpl cat note1
+        typ-tmpl cat big-export > export.json
+        typ-tmpl cat part1 part2 part3 | sha256sum
+    """
+    from typ_tmpl.storage.streams import copy_stream, open_stream
+
+    app_ctx: AppContext = ctx.obj
+    errors = get_console(stderr=True)
+
+    out = sys.stdout.buffer
+    for id in ids:
+        try:
+            stream = open_stream(app_ctx.storage, id)
+            if stream is None:
+                errors.print(f"[red]Error: Item '{id}' not found[/]")
+                raise typer.Exit(1)
+            with stream:
+                copy_stream(stream, out)
+        except StorageError as e:
+            errors.print(f"[red]Error: {e}[/]")
+            raise typer.Exit(1)
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`); stop quietly.
+            silence_stdout()
+            return
@@ -0,0 +1,32 @@
+"""Compact command implementation."""
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Compactable
+
+
+def compact(
+    ctx: typer.Context,
+) -> None:
+    """Reclaim space held by deleted items.
+
+    Examples:
+        typ-tmpl --backend log compact
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+    storage = app_ctx.storage
+
+    if not isinstance(storage, Compactable):
+        console.print("[red]Error: Storage backend does not support compaction[/]")
+        raise typer.Exit(1)
+
+    try:
+        reclaimed = storage.compact()
+    except StorageError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    console.print(f"[green]Compacted storage ({reclaimed} bytes reclaimed)[/]")
@@ -1,12 +1,10 @@
 """Delete command implementation."""
 
 import typer
-from rich.console import Console
 
+from typ_tmpl.console import get_console
 from typ_tmpl.context import AppContext
-from typ_tmpl.errors import ItemNotFoundError
-
-console = Console()
+from typ_tmpl.errors import ItemNotFoundError, StorageError
 
 
 def delete(
@@ -20,6 +18,7 @@ def delete(
         typ-tmpl rm note2
     """
     app_ctx: AppContext = ctx.obj
+    console = get_console()
 
     try:
         app_ctx.storage.delete(id)
@@ -27,3 +26,6 @@ def delete(
     except ItemNotFoundError:
         console.print(f"[red]Error: Item '{id}' not found[/]")
         raise typer.Exit(1)
+    except StorageError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
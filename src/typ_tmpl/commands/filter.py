@@ -0,0 +1,56 @@
+"""Filter command implementation."""
+
+from typing import Optional
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Filtered
+
+
+def filter_stats(
+    ctx: typer.Context,
+    rebuild: bool = typer.Option(
+        False, "--rebuild", "-r", help="Rebuild the filter from the current items."
+    ),
+    capacity: Optional[int] = typer.Option(
+        None,
+        "--capacity",
+        "-c",
+        min=1,
+        help="Items to size a rebuilt filter for (default: twice the item count).",
+    ),
+) -> None:
+    """Show or rebuild the membership filter that speeds up exists and add.
+
+    Examples:
+        typ-tmpl filter
+        typ-tmpl filter --rebuild --capacity 1000000
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+    storage = app_ctx.storage
+
+    if not isinstance(storage, Filtered):
+        console.print(
+            "[red]Error: Storage backend does not support membership filters[/]"
+        )
+        raise typer.Exit(1)
+    if capacity is not None and not rebuild:
+        console.print("[red]Error: --capacity requires --rebuild[/]")
+        raise typer.Exit(1)
+
+    try:
+        stats = storage.rebuild_filter(capacity) if rebuild else storage.filter_stats()
+    except StorageError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    if rebuild:
+        console.print("[green]Rebuilt membership filter[/]")
+    console.print(f"Size: {stats.size} bytes")
+    console.print(f"Capacity: {stats.capacity} items")
+    console.print(f"Hash functions: {stats.hashes}")
+    console.print(f"Fill: {stats.fill:.2%}")
+    console.print(f"False-positive rate: {stats.false_positive_rate:.4%}")
@@ -0,0 +1,34 @@
+"""Gc command implementation."""
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Collectable
+
+
+def gc(
+    ctx: typer.Context,
+) -> None:
+    """Remove stored data no item refers to, e.g. after a crash.
+
+    Examples:
+        typ-tmpl --backend dedup gc
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+    storage = app_ctx.storage
+
+    if not isinstance(storage, Collectable):
+        console.print(
+            "[red]Error: Storage backend does not support garbage collection[/]"
+        )
+        raise typer.Exit(1)
+
+    try:
+        removed = storage.gc()
+    except StorageError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    console.print(f"[green]Collected garbage ({removed} files removed)[/]")
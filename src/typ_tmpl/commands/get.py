@@ -0,0 +1,25 @@
+"""Get command implementation."""
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+
+
+def get(
+    ctx: typer.Context,
+    id: str = typer.Argument(..., help="Identifier of the item to show."),
+) -> None:
+    """Print the content of an item.
+
+    Examples:
+        typ-tmpl get note1
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+
+    content = app_ctx.storage.get(id)
+    if content is None:
+        console.print(f"[red]Error: Item '{id}' not found[/]")
+        raise typer.Exit(1)
+    console.print(content, markup=False, highlight=False, soft_wrap=True)
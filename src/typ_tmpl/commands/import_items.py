@@ -0,0 +1,171 @@
+"""Import command implementation."""
+
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, nullcontext
+from enum import StrEnum
+from itertools import batched
+from pathlib import Path
+from typing import TextIO
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import AppError, BatchError, StorageError
+
+
+class ImportFormat(StrEnum):
+    """Supported input formats."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class OnConflict(StrEnum):
+    """What to do with records whose ID already exists."""
+
+    FAIL = "fail"
+    SKIP = "skip"
+
+
+class RecordError(AppError):
+    """Raised when an input record cannot be parsed."""
+
+    def __init__(self, line: int, reason: str) -> None:
+        self.line = line
+        super().__init__(f"Line {line}: {reason}")
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse NDJSON lines of {"id": ..., "content": ...} objects.
+
+    Args:
+        lines: Input lines.
+
+    Yields:
+        Pairs of item ID and content.
+
+    Raises:
+        RecordError: If a line is not a valid record.
+    """
+    import json
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            id, content = record["id"], record["content"]
+        except (ValueError, TypeError, KeyError) as e:
+            raise RecordError(number, f"invalid record ({e})") from None
+        if not isinstance(id, str) or not isinstance(content, str):
+            raise RecordError(number, "'id' and 'content' must be strings")
+        yield id, content
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse CSV rows with 'id' and 'content' header columns.
+
+    Args:
+        lines: Input lines.
+
+    Yields:
+        Pairs of item ID and content.
+
+    Raises:
+        RecordError: If the header or a row is invalid.
+    """
+    import csv
+
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or not {"id", "content"} <= set(reader.fieldnames):
+        raise RecordError(1, "header must contain 'id' and 'content' columns")
+    for row in reader:
+        id, content = row["id"], row["content"]
+        if id is None or content is None:
+            raise RecordError(reader.line_num, "missing 'id' or 'content' value")
+        yield id, content
+
+
+def skip_existing(
+    app_ctx: AppContext, batch: tuple[tuple[str, str], ...]
+) -> list[tuple[str, str]]:
+    """Drop records whose ID is stored or already seen in the batch."""
+    existing = app_ctx.storage.exists_many(id for id, _ in batch)
+    fresh = {}
+    for id, content in batch:
+        if not existing[id] and id not in fresh:
+            fresh[id] = content
+    return list(fresh.items())
+
+
+def import_items(
+    ctx: typer.Context,
+    source: Path | None = typer.Argument(
+        None, help="File to import. Reads stdin if omitted or '-'."
+    ),
+    input_format: ImportFormat | None = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="Input format. Inferred from the file extension, ndjson for stdin.",
+    ),
+    batch_size: int = typer.Option(
+        1000, "--batch-size", "-n", min=1, help="Items committed per batch."
+    ),
+    on_conflict: OnConflict = typer.Option(
+        OnConflict.FAIL, "--on-conflict", help="How to handle existing IDs."
+    ),
+) -> None:
+    """Import items from NDJSON or CSV.
+
+    Records are streamed and committed in batches, so memory use does not
+    grow with the input size.
+
+    Examples:
+        typ-tmpl import items.ndjson
+        cat items.csv | typ-tmpl import --format csv --batch-size 5000
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+
+    if input_format is None:
+        is_csv = source is not None and source.suffix.lower() == ".csv"
+        input_format = ImportFormat.CSV if is_csv else ImportFormat.NDJSON
+
+    opened: AbstractContextManager[TextIO]
+    if source is None or str(source) == "-":
+        opened = nullcontext(sys.stdin)
+    else:
+        try:
+            opened = open(source, newline="", encoding="utf-8")
+        except OSError as e:
+            console.print(f"[red]Error: Cannot open {source}: {e.strerror}[/]")
+            raise typer.Exit(1)
+
+    parse = read_csv if input_format == ImportFormat.CSV else read_ndjson
+    imported = skipped = 0
+    started = time.perf_counter()
+    try:
+        with opened as stream:
+            for batch in batched(parse(stream), batch_size):
+                records = list(batch)
+                if on_conflict == OnConflict.SKIP:
+                    records = skip_existing(app_ctx, batch)
+                app_ctx.storage.add_many(records)
+                imported += len(records)
+                skipped += len(batch) - len(records)
+    except (RecordError, BatchError, StorageError) as e:
+        console.print(f"[red]Error: {e}[/]")
+        console.print(f"[dim]{imported} items imported before the error[/]")
+        raise typer.Exit(1)
+    finally:
+        elapsed = time.perf_counter() - started
+
+    rate = imported / elapsed if elapsed > 0 else 0.0
+    summary = f"Imported {imported} items"
+    if skipped:
+        summary += f", skipped {skipped} existing"
+    console.print(f"[green]{summary} in {elapsed:.2f}s ({rate:,.0f} items/s)[/]")
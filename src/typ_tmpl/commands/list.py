@@ -1,28 +1,176 @@
 """List command implementation."""
 
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from enum import StrEnum
+from itertools import batched, chain, islice
+
 import typer
-from rich.console import Console
 
+from typ_tmpl.console import get_console, silence_stdout
 from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import ItemMeta, MetadataIndexed, Storage
+
+# Entries joined into one write to stdout.
+WRITE_BATCH = 4096
+
+
+class ListFormat(StrEnum):
+    """Output formats for listed items."""
+
+    PLAIN = "plain"
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+class SortKey(StrEnum):
+    """Orders the list command can produce."""
+
+    ID = "id"
+    SIZE = "size"
+    MTIME = "mtime"
+    CREATED = "created"
+
+
+def _record(entry: str | ItemMeta) -> dict[str, object]:
+    if isinstance(entry, str):
+        return {"id": entry}
+    return entry._asdict()
+
+
+def _line(entry: str | ItemMeta) -> str:
+    if isinstance(entry, str):
+        return entry
+    modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.modified))
+    return f"{entry.size:>10}  {modified}  {entry.id}"
+
 
-console = Console()
+def format_entries(
+    entries: Iterable[str | ItemMeta], output_format: ListFormat
+) -> Iterator[str]:
+    """Render IDs or item metadata as chunks of output text.
+
+    Each chunk covers up to WRITE_BATCH entries, and a JSON array is emitted
+    incrementally, so rendering never holds more than one chunk.
+
+    Args:
+        entries: IDs, or metadata for a long listing.
+        output_format: Output format.
+
+    Yields:
+        Output text chunks.
+    """
+    import json
+
+    if output_format == ListFormat.JSON:
+        yield "["
+        separator = ""
+        for chunk in batched(entries, WRITE_BATCH):
+            yield separator + ", ".join(json.dumps(_record(e)) for e in chunk)
+            separator = ", "
+        yield "]\n"
+        return
+    for chunk in batched(entries, WRITE_BATCH):
+        if output_format == ListFormat.NDJSON:
+            lines = [json.dumps(_record(e)) for e in chunk]
+        else:
+            lines = [_line(e) for e in chunk]
+        lines.append("")
+        yield "\n".join(lines)
+
+
+def _select(
+    storage: Storage,
+    prefix: str,
+    start: str | None,
+    limit: int | None,
+    long: bool,
+    sort: SortKey,
+    reverse: bool,
+) -> Iterator[str] | Iterator[ItemMeta]:
+    """Pick the cheapest storage query for the requested listing.
+
+    Raises:
+        StorageError: If metadata is needed and the backend has none.
+    """
+    if sort == SortKey.ID and not long:
+        if not reverse:
+            return islice(storage.iter_ids(prefix, start), limit)
+        # IDs only iterate forwards, so descending order needs them all.
+        return islice(reversed(list(storage.iter_ids(prefix))), limit)
+    if not isinstance(storage, MetadataIndexed):
+        raise StorageError("Storage backend does not support metadata")
+    if sort == SortKey.ID and not reverse:
+        return islice(storage.iter_metadata(prefix, start), limit)
+    # Other orders are top-k reads from the backend's metadata index.
+    top = storage.top_metadata(sort.value, limit, reverse, prefix)
+    if long:
+        return iter(top)
+    return (entry.id for entry in top)
 
 
 def list_items(
     ctx: typer.Context,
+    prefix: str = typer.Option("", "--prefix", "-p", help="Only IDs with this prefix."),
+    start: str | None = typer.Option(
+        None, "--start", "-s", help="Only IDs sorting at or after this one."
+    ),
+    limit: int | None = typer.Option(
+        None, "--limit", "-n", min=0, help="Stop after this many items."
+    ),
+    output_format: ListFormat = typer.Option(
+        ListFormat.PLAIN, "--format", "-f", help="Output format."
+    ),
+    long: bool = typer.Option(
+        False, "--long", "-l", help="Show size and modification time."
+    ),
+    sort: SortKey = typer.Option(SortKey.ID, "--sort", "-S", help="Sort order."),
+    reverse: bool = typer.Option(
+        False, "--reverse", "-r", help="Largest, newest or last first."
+    ),
 ) -> None:
-    """List all items.
+    """List items.
+
+    IDs are streamed in sorted order and written to stdout in large
+    chunks, so listing starts immediately and memory use stays flat.
+    Long listings and size or time orders read the backend's metadata
+    index.
 
     Examples:
         typ-tmpl list
-        typ-tmpl ls
+        typ-tmpl ls --prefix note- --limit 20
+        typ-tmpl list --start note-0500 --format ndjson
+        typ-tmpl ls -l --sort size -r -n 10
     """
     app_ctx: AppContext = ctx.obj
+    errors = get_console(stderr=True)
+
+    if start is not None and (sort != SortKey.ID or reverse):
+        errors.print("[red]Error: --start only applies to ascending ID order[/]")
+        raise typer.Exit(1)
 
-    items = app_ctx.storage.list()
-    if not items:
-        console.print("[dim]No items found[/]")
+    try:
+        entries = _select(app_ctx.storage, prefix, start, limit, long, sort, reverse)
+        first = next(entries, None)
+    except StorageError as e:
+        errors.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    if first is None and output_format == ListFormat.PLAIN:
+        errors.print("[dim]No items found[/]")
         return
 
-    for item_id in items:
-        console.print(f"  {item_id}")
+    remaining = entries if first is None else chain([first], entries)
+    out = sys.stdout
+    try:
+        for chunk in format_entries(remaining, output_format):
+            out.write(chunk)
+        out.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly.
+        silence_stdout()
+    except StorageError as e:
+        out.flush()
+        errors.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
@@ -0,0 +1,35 @@
+"""Migrate command implementation."""
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Migratable
+from typ_tmpl.storage.layout import Layout
+
+
+def migrate(
+    ctx: typer.Context,
+    layout: Layout = typer.Option(..., "--layout", "-l", help="Target layout."),
+) -> None:
+    """Re-layout the item store in place.
+
+    Examples:
+        typ-tmpl migrate --layout sharded
+        typ-tmpl migrate -l flat
+    """
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+    storage = app_ctx.storage
+
+    if not isinstance(storage, Migratable):
+        console.print("[red]Error: Storage backend does not support migration[/]")
+        raise typer.Exit(1)
+
+    try:
+        moved = storage.migrate(layout.value)
+    except StorageError as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    console.print(f"[green]Migrated to {layout.value} layout ({moved} items moved)[/]")
@@ -0,0 +1,60 @@
+"""Search command implementation."""
+
+import sys
+
+import typer
+
+from typ_tmpl.commands.list import ListFormat
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Searchable
+
+
+def search(
+    ctx: typer.Context,
+    terms: list[str] = typer.Argument(..., help="Words to search for."),
+    limit: int = typer.Option(
+        20, "--limit", "-n", min=1, help="Show at most this many items."
+    ),
+    match_all: bool = typer.Option(
+        False, "--all", "-a", help="Only items containing every word."
+    ),
+    output_format: ListFormat = typer.Option(
+        ListFormat.PLAIN, "--format", "-f", help="Output format."
+    ),
+) -> None:
+    """Find items by content, most relevant first.
+
+    Queries are answered from the backend's full-text index, which add and
+    delete keep up to date, so no item content is read. Plain output lists
+    the matching IDs; JSON formats include the relevance scores.
+
+    Examples:
+        typ-tmpl search meeting notes
+        typ-tmpl search --all budget 2024 -n 5
+        typ-tmpl search invoice --format ndjson
+    """
+    import json
+
+    app_ctx: AppContext = ctx.obj
+    errors = get_console(stderr=True)
+    storage = app_ctx.storage
+
+    try:
+        if not isinstance(storage, Searchable):
+            raise StorageError("Storage backend does not support search")
+        hits = storage.search(" ".join(terms), limit, match_all)
+    except StorageError as e:
+        errors.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+
+    if output_format == ListFormat.JSON:
+        sys.stdout.write(json.dumps([hit._asdict() for hit in hits]) + "\n")
+    elif not hits:
+        if output_format == ListFormat.PLAIN:
+            errors.print("[dim]No matching items[/]")
+    elif output_format == ListFormat.NDJSON:
+        sys.stdout.write("".join(json.dumps(hit._asdict()) + "\n" for hit in hits))
+    else:
+        sys.stdout.write("".join(hit.id + "\n" for hit in hits))
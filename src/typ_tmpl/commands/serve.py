@@ -0,0 +1,46 @@
+"""Serve command implementation."""
+
+from pathlib import Path
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+
+
+def serve(
+    ctx: typer.Context,
+    socket: Path | None = typer.Option(
+        None, "--socket", "-s", help="Socket path. Defaults to the backend's socket."
+    ),
+) -> None:
+    """Keep the storage open and serve other typ-tmpl calls over a socket.
+
+    While the daemon runs, add/list/delete and the other commands send
+    their requests to it instead of opening the storage themselves.
+
+    Examples:
+        typ-tmpl serve &
+        typ-tmpl --backend sqlite serve --socket /tmp/typ-tmpl.sock
+    """
+    from typ_tmpl.daemon import DaemonServer
+    from typ_tmpl.storage.cached import CachedStorage
+    from typ_tmpl.storage.instrumented import unwrap
+    from typ_tmpl.storage.remote import RemoteStorage
+
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+
+    backend = unwrap(app_ctx.storage)
+    if isinstance(backend, RemoteStorage):
+        console.print(f"[red]Error: Daemon already running on {backend.path}[/]")
+        raise typer.Exit(1)
+    path = socket or app_ctx.socket_path
+    if path is None:
+        console.print("[red]Error: No socket path given[/]")
+        raise typer.Exit(1)
+
+    # Clients re-read the same hot items, so serve them from memory.
+    server = DaemonServer(path, CachedStorage(app_ctx.storage))
+    console.print(f"[green]Serving on {path}[/]")
+    server.serve_until_stopped()
@@ -0,0 +1,103 @@
+"""Shell command implementation."""
+
+import shlex
+import sys
+from collections.abc import Iterator
+
+import typer
+
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+
+PROMPT = "typ-tmpl> "
+
+# Commands that make no sense inside a shell session.
+NOT_NESTABLE = frozenset({"shell", "serve"})
+
+
+def _read_lines(interactive: bool) -> Iterator[str]:
+    """Yield input lines, prompting for each one on a terminal."""
+    if not interactive:
+        yield from sys.stdin
+        return
+    while True:
+        try:
+            yield input(PROMPT)
+        except EOFError:
+            print()
+            return
+
+
+def _run(ctx: typer.Context, args: list[str], app_ctx: AppContext) -> int:
+    """Dispatch one command line through the root command group.
+
+    Returns:
+        Exit status of the command.
+    """
+    root = ctx.find_root()
+    try:
+        with root.command.make_context(root.info_name, args, obj=app_ctx) as sub_ctx:
+            root.command.invoke(sub_ctx)
+    except typer.Exit as e:
+        return e.exit_code
+    except typer.Abort:
+        return 1
+    except typer.TyperException as e:
+        get_console().print(f"[red]Error: {e.format_message()}[/]")
+        return e.exit_code
+    return 0
+
+
+def shell(
+    ctx: typer.Context,
+    stop_on_error: bool = typer.Option(
+        False, "--stop-on-error", help="Stop at the first failing command."
+    ),
+) -> None:
+    """Run many commands in one process.
+
+    Reads one command per line, prompting on a terminal and reading a
+    piped script otherwise. All commands share the same storage, with
+    recently read items cached in memory.
+
+    Examples:
+        typ-tmpl shell
+        printf 'add n1 -c one\\nget n1\\n' | typ-tmpl shell
+    """
+    from typ_tmpl.storage.cached import CachedStorage
+    from typ_tmpl.storage.instrumented import unwrap
+    from typ_tmpl.storage.remote import RemoteStorage
+
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+
+    # The daemon already caches; otherwise keep hot items in memory for the
+    # session. The wrapper is not closed here, main closes the backend.
+    if not isinstance(unwrap(app_ctx.storage), RemoteStorage):
+        app_ctx = AppContext(
+            storage=CachedStorage(app_ctx.storage), socket_path=app_ctx.socket_path
+        )
+
+    failures = 0
+    for line in _read_lines(sys.stdin.isatty()):
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            console.print(f"[red]Error: {e}[/]")
+            args, status = [], 1
+        else:
+            status = 0
+        if args and args[0] in ("exit", "quit"):
+            break
+        if args and args[0] in NOT_NESTABLE:
+            console.print(f"[red]Error: '{args[0]}' is not available in the shell[/]")
+            status = 1
+        elif args:
+            status = _run(ctx, args, app_ctx)
+        if status:
+            failures += 1
+            if stop_on_error:
+                break
+
+    if failures:
+        raise typer.Exit(1)
@@ -0,0 +1,101 @@
+"""Export and import-snapshot command implementations."""
+
+import time
+from itertools import batched
+from pathlib import Path
+
+import typer
+
+from typ_tmpl.commands.import_items import OnConflict, skip_existing
+from typ_tmpl.console import get_console
+from typ_tmpl.context import AppContext
+from typ_tmpl.errors import BatchError, StorageError
+from typ_tmpl.storage.compression import Codec
+
+
+def export(
+    ctx: typer.Context,
+    output: Path = typer.Argument(..., help="Snapshot file to write."),
+    codec: Codec = typer.Option(
+        Codec.ZLIB, "--codec", help="Codec for compressing large items."
+    ),
+) -> None:
+    """Pack every item into a single snapshot file.
+
+    The snapshot holds the content of all items followed by an index sorted
+    by ID, so any item can be read from it without unpacking. An existing
+    file is replaced only once the new snapshot is complete.
+
+    Examples:
+        typ-tmpl export backup.snap
+        typ-tmpl --snapshot backup.snap list
+    """
+    from typ_tmpl.storage.snapshot import write_snapshot
+
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+
+    started = time.perf_counter()
+    try:
+        count = write_snapshot(app_ctx.storage, output, codec)
+    except (StorageError, OSError) as e:
+        console.print(f"[red]Error: {e}[/]")
+        raise typer.Exit(1)
+    elapsed = time.perf_counter() - started
+
+    size = output.stat().st_size
+    console.print(
+        f"[green]Exported {count} items ({size:,} bytes) to {output} "
+        f"in {elapsed:.2f}s[/]"
+    )
+
+
+def import_snapshot(
+    ctx: typer.Context,
+    source: Path = typer.Argument(..., help="Snapshot file to import."),
+    batch_size: int = typer.Option(
+        1000, "--batch-size", "-n", min=1, help="Items committed per batch."
+    ),
+    on_conflict: OnConflict = typer.Option(
+        OnConflict.FAIL, "--on-conflict", help="How to handle existing IDs."
+    ),
+) -> None:
+    """Import every item of a snapshot file.
+
+    Items are read from the snapshot in place and committed in batches.
+
+    Examples:
+        typ-tmpl import-snapshot backup.snap
+        typ-tmpl -b sqlite import-snapshot backup.snap --on-conflict skip
+    """
+    from typ_tmpl.storage.snapshot import SnapshotStorage
+
+    app_ctx: AppContext = ctx.obj
+    console = get_console()
+
+    imported = skipped = 0
+    started = time.perf_counter()
+    try:
+        snapshot = SnapshotStorage(source)
+        try:
+            for batch in batched(snapshot.iter_items(), batch_size):
+                records = list(batch)
+                if on_conflict == OnConflict.SKIP:
+                    records = skip_existing(app_ctx, batch)
+                app_ctx.storage.add_many(records)
+                imported += len(records)
+                skipped += len(batch) - len(records)
+        finally:
+            snapshot.close()
+    except (StorageError, BatchError) as e:
+        console.print(f"[red]Error: {e}[/]")
+        console.print(f"[dim]{imported} items imported before the error[/]")
+        raise typer.Exit(1)
+    finally:
+        elapsed = time.perf_counter() - started
+
+    rate = imported / elapsed if elapsed > 0 else 0.0
+    summary = f"Imported {imported} items"
+    if skipped:
+        summary += f", skipped {skipped} existing"
+    console.print(f"[green]{summary} in {elapsed:.2f}s ({rate:,.0f} items/s)[/]")
@@ -0,0 +1,74 @@
+"""User configuration file."""
+
+import os
+from pathlib import Path
+from typing import Any
+
+from typ_tmpl.errors import AppError
+
+
+class ConfigError(AppError):
+    """Raised when the configuration file cannot be used."""
+
+    def __init__(self, path: Path, reason: str) -> None:
+        self.path = path
+        super().__init__(f"{path}: {reason}")
+
+
+def config_path() -> Path:
+    """Get the location of the configuration file.
+
+    Returns:
+        Value of TYP_TMPL_CONFIG if set, otherwise config.toml in
+        ~/.config/typ-tmpl.
+    """
+    override = os.environ.get("TYP_TMPL_CONFIG")
+    if override:
+        return Path(override)
+    return Path.home() / ".config" / "typ-tmpl" / "config.toml"
+
+
+def load_config(path: Path | None = None) -> dict[str, Any]:
+    """Read the configuration file.
+
+    The TOML parser is only imported when the file exists, so running
+    without a configuration costs a single stat.
+
+    Args:
+        path: File to read. Defaults to config_path().
+
+    Returns:
+        The settings, or an empty dict if there is no file.
+
+    Raises:
+        ConfigError: If the file is not valid TOML.
+    """
+    path = path or config_path()
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return {}
+    import tomllib
+
+    try:
+        return tomllib.loads(data.decode())
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+        raise ConfigError(path, f"invalid TOML ({e})") from None
+
+
+def configured_storage(path: Path | None = None) -> str | None:
+    """Get the storage URL set in the configuration file.
+
+    Args:
+        path: File to read. Defaults to config_path().
+
+    Returns:
+        The value of the storage setting, or None if it is not set.
+
+    Raises:
+        ConfigError: If the file is invalid or the setting not a string.
+    """
+    url = load_config(path).get("storage")
+    if url is not None and not isinstance(url, str):
+        raise ConfigError(path or config_path(), "'storage' must be a URL string")
+    return url
@@ -0,0 +1,42 @@
+"""Shared Rich console, created on first use."""
+
+import os
+import sys
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+@cache
+def get_console(stderr: bool = False) -> "Console":
+    """Return the process-wide console.
+
+    Rich is imported here rather than at module level so that commands
+    which never print through Rich do not pay for importing it.
+
+    Args:
+        stderr: Return the console writing to stderr instead of stdout.
+
+    Returns:
+        Shared Rich console.
+    """
+    from rich.console import Console
+
+    return Console(stderr=stderr)
+
+
+def silence_stdout() -> None:
+    """Point stdout at /dev/null so the interpreter's final flush succeeds.
+
+    Commands call this when the reader of their output went away, e.g.
+    `| head`, to stop quietly instead of failing on exit.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, sys.stdout.fileno())
+    except (OSError, ValueError):
+        pass
+    finally:
+        os.close(devnull)
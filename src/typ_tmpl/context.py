@@ -1,6 +1,7 @@
 """Application context for dependency injection."""
 
 from dataclasses import dataclass
+from pathlib import Path
 
 from typ_tmpl.protocols.storage import Storage
 
@@ -10,3 +11,4 @@ class AppContext:
     """Application context holding dependencies."""
 
     storage: Storage
+    socket_path: Path | None = None
@@ -0,0 +1,236 @@
+"""Daemon serving a storage instance over a Unix domain socket.
+
+Requests and responses are newline-delimited JSON objects. A request names
+a Storage method and its positional arguments::
+
+    {"method": "add", "args": ["note1", "Hello"]}
+
+and is answered with either ``{"result": ...}`` or ``{"error": {...}}``,
+where the error object carries enough detail to re-raise the original
+application error on the client side.
+
+``iter_ids`` and ``iter_metadata`` take a third argument, the page size, and
+return at most that many entries; clients page through larger ranges by
+restarting after the last ID.
+
+``open_stream`` is answered with ``{"result": true}``, or ``null`` if the
+item does not exist, followed by one ``{"chunk": ...}`` per piece of
+content, base64-encoded, and a final ``{"end": true}``. An error while
+reading ends the stream with ``{"error": {...}}`` instead. Clients stream
+over a connection of their own, so the content is sent as it is read.
+"""
+
+import base64
+import json
+import os
+import signal
+import socketserver
+import threading
+from collections.abc import Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from typ_tmpl.errors import (
+    AppError,
+    BatchError,
+    ItemExistsError,
+    ItemNotFoundError,
+    StorageError,
+)
+from typ_tmpl.protocols.storage import Storage
+
+# Storage methods a client may call.
+METHODS = frozenset(
+    {
+        "add",
+        "list",
+        "iter_ids",
+        "iter_metadata",
+        "top_metadata",
+        "search",
+        "delete",
+        "exists",
+        "get",
+        "add_many",
+        "get_many",
+        "delete_many",
+        "exists_many",
+        "compact",
+        "gc",
+        "filter_stats",
+        "rebuild_filter",
+        "migrate",
+    }
+)
+
+# Iterator methods, answered one page at a time.
+PAGED_METHODS = frozenset({"iter_ids", "iter_metadata"})
+
+# Number of entries returned per request to a paged method.
+ID_PAGE_SIZE = 1000
+
+# Methods answered with a series of content chunks.
+STREAM_METHODS = frozenset({"open_stream"})
+
+# Content bytes sent per chunk of a streamed item.
+STREAM_CHUNK = 1 << 20
+
+
+def encode_error(error: AppError) -> dict[str, Any]:
+    """Serialize an application error for the wire."""
+    if isinstance(error, (ItemExistsError, ItemNotFoundError)):
+        return {"type": type(error).__name__, "id": error.id}
+    if isinstance(error, BatchError):
+        failures = {id: encode_error(e) for id, e in error.failures.items()}
+        return {"type": "BatchError", "failures": failures}
+    return {"type": "StorageError", "message": str(error)}
+
+
+def _failure(error: Exception) -> dict[str, Any]:
+    """Build the response to a call that raised."""
+    if not isinstance(error, AppError):
+        error = StorageError(f"{type(error).__name__}: {error}")
+    return {"error": encode_error(error)}
+
+
+def decode_error(data: dict[str, Any]) -> AppError:
+    """Rebuild an application error received from the wire."""
+    if data["type"] == "ItemExistsError":
+        return ItemExistsError(data["id"])
+    if data["type"] == "ItemNotFoundError":
+        return ItemNotFoundError(data["id"])
+    if data["type"] == "BatchError":
+        failures = {id: decode_error(e) for id, e in data["failures"].items()}
+        return BatchError(failures)
+    return StorageError(data["message"])
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serve requests from one client connection until it disconnects."""
+
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            request = json.loads(line)
+            if request.get("method") in STREAM_METHODS:
+                for response in self.server.stream(request):
+                    self._send(response)
+            else:
+                self._send(self.server.dispatch(request))
+
+    def _send(self, response: dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server dispatching requests to one storage instance.
+
+    Each client connection gets its own thread; storage calls are
+    serialized with a lock, so backends need not be thread-safe.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, storage: Storage) -> None:
+        """Bind the server socket.
+
+        Only the owner may connect to the socket.
+
+        Args:
+            path: Socket path. A stale socket file is replaced.
+            storage: Storage instance to serve.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        self.path = path
+        super().__init__(str(path), _Handler)
+        self.storage = storage
+        self._lock = threading.Lock()
+
+    def server_bind(self) -> None:
+        """Bind the socket and restrict it to the owner.
+
+        The mode is set before the socket starts listening, so no other
+        user can connect in between.
+        """
+        super().server_bind()
+        os.chmod(self.path, 0o600)
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Run one request against the storage.
+
+        Args:
+            request: Decoded request with method name and arguments.
+
+        Returns:
+            Response with the result or the encoded error.
+        """
+        method = request.get("method")
+        if method not in METHODS or not hasattr(self.storage, method):
+            message = f"Storage backend does not support '{method}'"
+            return {"error": encode_error(StorageError(message))}
+        args = request.get("args", [])
+        try:
+            with self._lock:
+                if method in PAGED_METHODS:
+                    prefix, start, limit = args
+                    entries = getattr(self.storage, method)(prefix, start)
+                    result = list(islice(entries, limit))
+                else:
+                    result = getattr(self.storage, method)(*args)
+        except Exception as e:
+            return _failure(e)
+        return {"result": result}
+
+    def stream(self, request: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Run an open_stream request, reading the content a chunk at a time.
+
+        The storage lock is only held while a chunk is read, so other
+        clients are served while a large item is being sent.
+
+        Args:
+            request: Decoded request with the item ID as its argument.
+
+        Yields:
+            The responses to send, in order.
+        """
+        from typ_tmpl.storage.streams import open_stream
+
+        try:
+            (id,) = request.get("args", [])
+            with self._lock:
+                source = open_stream(self.storage, id)
+        except Exception as e:
+            yield _failure(e)
+            return
+        if source is None:
+            yield {"result": None}
+            return
+        yield {"result": True}
+        with source:
+            while True:
+                try:
+                    with self._lock:
+                        chunk = source.read(STREAM_CHUNK)
+                except Exception as e:
+                    yield _failure(e)
+                    return
+                if not chunk:
+                    break
+                yield {"chunk": base64.b64encode(chunk).decode()}
+        yield {"end": True}
+
+    def serve_until_stopped(self) -> None:
+        """Serve until SIGINT or SIGTERM, then remove the socket file."""
+        previous = signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            self.server_close()
+            self.path.unlink(missing_ok=True)
@@ -21,3 +21,23 @@ class ItemExistsError(AppError):
     def __init__(self, id: str) -> None:
         self.id = id
         super().__init__(f"Item '{id}' already exists")
+
+
+class BatchError(AppError):
+    """Raised when a batch operation fails for some of its items.
+
+    Batch operations are all-or-nothing, so nothing was changed.
+    """
+
+    def __init__(self, failures: dict[str, AppError]) -> None:
+        self.failures = failures
+        details = "; ".join(str(error) for error in list(failures.values())[:5])
+        if len(failures) > 5:
+            details += f"; and {len(failures) - 5} more"
+        super().__init__(f"{len(failures)} item(s) failed: {details}")
+
+
+class StorageError(AppError):
+    """Raised when the storage backend cannot carry out a request."""
+
+    pass
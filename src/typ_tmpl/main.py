@@ -1,16 +1,43 @@
 """Typer CLI application entry point for typ-tmpl."""
 
-from importlib import metadata
+from pathlib import Path
 from typing import Optional
 
 import typer
-from rich.console import Console
 
-from typ_tmpl.commands import add, delete, list_items
+from typ_tmpl.commands import (
+    add,
+    bulk,
+    cat,
+    compact,
+    delete,
+    export,
+    filter_stats,
+    gc,
+    get,
+    import_items,
+    import_snapshot,
+    list_items,
+    migrate,
+    search,
+    serve,
+    shell,
+)
+from typ_tmpl.config import ConfigError, configured_storage
+from typ_tmpl.console import get_console
 from typ_tmpl.context import AppContext
-from typ_tmpl.storage.filesystem import FilesystemStorage
-
-console = Console()
+from typ_tmpl.errors import StorageError
+from typ_tmpl.profiling import ProfileMode, Profiler
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.compression import Codec
+from typ_tmpl.storage.durability import Durability
+from typ_tmpl.storage.factory import (
+    Backend,
+    create_storage,
+    daemon_socket_path,
+    open_storage,
+    storage_name,
+)
 
 
 def get_safe_version(package_name: str, fallback: str = "0.1.0") -> str:
@@ -23,6 +50,8 @@ def get_safe_version(package_name: str, fallback: str = "0.1.0") -> str:
     Returns:
         Version string.
     """
+    from importlib import metadata
+
     try:
         return metadata.version(package_name)
     except metadata.PackageNotFoundError:
@@ -33,10 +62,40 @@ def version_callback(value: Optional[bool]) -> None:
     """Print version and exit."""
     if value:
         version = get_safe_version("typ-tmpl")
-        console.print(f"typ-tmpl version: {version}")
+        get_console().print(f"typ-tmpl version: {version}")
         raise typer.Exit()
 
 
+def resolve_storage_url(ctx: typer.Context, url: Optional[str]) -> Optional[str]:
+    """Pick the storage URL to open, if the store is chosen by URL.
+
+    A URL given with --storage wins, then --backend, then the
+    TYP_TMPL_STORAGE and TYP_TMPL_BACKEND variables, then the storage
+    setting of the configuration file.
+
+    Args:
+        ctx: Context of the main callback.
+        url: Value of the --storage option.
+
+    Returns:
+        The URL, or None to open the selected --backend.
+
+    Raises:
+        ConfigError: If the configuration file is invalid.
+    """
+    sources = {}
+    for name in ("storage_url", "backend"):
+        source = ctx.get_parameter_source(name)
+        sources[name] = "DEFAULT" if source is None else source.name
+    if url is not None and not (
+        sources["storage_url"] == "ENVIRONMENT" and sources["backend"] == "COMMANDLINE"
+    ):
+        return url
+    if sources["backend"] == "DEFAULT":
+        return configured_storage()
+    return None
+
+
 app = typer.Typer(
     name="typ-tmpl",
     help="A minimal Python CLI template using Typer.",
@@ -55,10 +114,95 @@ def main(
         is_eager=True,
         help="Show version and exit.",
     ),
+    backend: Backend = typer.Option(
+        Backend.FS,
+        "--backend",
+        "-b",
+        envvar="TYP_TMPL_BACKEND",
+        help="Storage backend to use.",
+    ),
+    compress: Codec = typer.Option(
+        Codec.ZLIB,
+        "--compress",
+        envvar="TYP_TMPL_COMPRESS",
+        help="Codec for compressing large items on write.",
+    ),
+    durability: Durability = typer.Option(
+        Durability.BATCH,
+        "--durability",
+        envvar="TYP_TMPL_DURABILITY",
+        help="When writes are synced to disk.",
+    ),
+    storage_url: Optional[str] = typer.Option(
+        None,
+        "--storage",
+        envvar="TYP_TMPL_STORAGE",
+        help="Storage URL, e.g. sqlite:///srv/items.db. Overrides --backend.",
+    ),
+    snapshot: Optional[Path] = typer.Option(
+        None,
+        "--snapshot",
+        envvar="TYP_TMPL_SNAPSHOT",
+        help="Read items from a snapshot file instead of the backend.",
+    ),
+    use_daemon: bool = typer.Option(
+        True,
+        "--daemon/--no-daemon",
+        envvar="TYP_TMPL_DAEMON",
+        help="Send requests to a running daemon if there is one.",
+    ),
+    profile: Optional[ProfileMode] = typer.Option(
+        None,
+        "--profile",
+        envvar="TYP_TMPL_PROFILE",
+        help="Report where the command's time goes when it exits.",
+    ),
+    profile_output: Optional[Path] = typer.Option(
+        None,
+        "--profile-output",
+        envvar="TYP_TMPL_PROFILE_OUTPUT",
+        help="File for the cprofile or collapsed profile, or the summary.",
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        envvar="TYP_TMPL_METRICS_FILE",
+        help="Write storage metrics in Prometheus text format on exit.",
+    ),
 ) -> None:
     """typ-tmpl - A minimal Python CLI template."""
     if ctx.obj is None:
-        ctx.obj = AppContext(storage=FilesystemStorage())
+        profiler = None
+        if profile is not None or metrics_file is not None:
+            profiler = Profiler(
+                profile, ctx.invoked_subcommand, profile_output, metrics_file
+            )
+            # Registered first so it runs last, after storage is closed.
+            ctx.call_on_close(profiler.stop)
+            profiler.start()
+        storage: Storage | None = None
+        try:
+            url = resolve_storage_url(ctx, storage_url)
+            path = daemon_socket_path(backend if url is None else storage_name(url))
+            if snapshot is not None:
+                from typ_tmpl.storage.snapshot import SnapshotStorage
+
+                storage = SnapshotStorage(snapshot)
+            elif use_daemon and path.exists():
+                from typ_tmpl.storage.remote import RemoteStorage
+
+                storage = RemoteStorage.connect(path)
+            if storage is None and url is not None:
+                storage = open_storage(url, compress, durability)
+            elif storage is None:
+                storage = create_storage(backend, compress, durability)
+        except (ConfigError, StorageError) as e:
+            get_console(stderr=True).print(f"[red]Error: {e}[/]")
+            raise typer.Exit(1)
+        if profiler is not None:
+            storage = profiler.instrument(storage)
+        ctx.call_on_close(storage.close)
+        ctx.obj = AppContext(storage=storage, socket_path=path)
 
 
 # Register add command and alias
@@ -73,6 +217,45 @@ app.command(name="ls", hidden=True)(list_items)
 app.command(name="delete", help=r"Delete an item. \[aliases: rm]")(delete)
 app.command(name="rm", hidden=True)(delete)
 
+# Register get command
+app.command(name="get", help="Print the content of an item.")(get)
+
+# Register cat command
+app.command(name="cat", help="Write the raw content of items to stdout.")(cat)
+
+# Register search command
+app.command(name="search", help="Find items by content.")(search)
+
+# Register import command
+app.command(name="import", help="Import items from NDJSON or CSV.")(import_items)
+
+# Register snapshot commands
+app.command(name="export", help="Pack all items into a snapshot file.")(export)
+app.command(name="import-snapshot", help="Import items from a snapshot file.")(
+    import_snapshot
+)
+
+# Register bulk command
+app.command(name="bulk", help="Run many adds, gets or deletes concurrently.")(bulk)
+
+# Register migrate command
+app.command(name="migrate", help="Re-layout the item store in place.")(migrate)
+
+# Register serve command
+app.command(name="serve", help="Serve storage requests from a daemon.")(serve)
+
+# Register shell command
+app.command(name="shell", help="Run many commands in one process.")(shell)
+
+# Register compact command
+app.command(name="compact", help="Reclaim space held by deleted items.")(compact)
+
+# Register gc command
+app.command(name="gc", help="Remove stored data no item refers to.")(gc)
+
+# Register filter command
+app.command(name="filter", help="Show or rebuild the membership filter.")(filter_stats)
+
 
 if __name__ == "__main__":
     app()
@@ -0,0 +1,218 @@
+"""Per-command profiling: storage metrics, cProfile and sampled stacks."""
+
+import sys
+import time
+from collections import Counter
+from enum import StrEnum
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from typ_tmpl.protocols.storage import Storage
+
+
+class ProfileMode(StrEnum):
+    """What --profile records besides the storage metrics."""
+
+    SUMMARY = "summary"
+    CPROFILE = "cprofile"
+    COLLAPSED = "collapsed"
+
+
+# Files written by the modes that produce one, unless told otherwise.
+DEFAULT_OUTPUT = {
+    ProfileMode.CPROFILE: Path("typ-tmpl.prof"),
+    ProfileMode.COLLAPSED: Path("typ-tmpl.collapsed"),
+}
+
+# CPU time between two stack samples, in seconds.
+SAMPLE_INTERVAL = 0.001
+
+
+class StackSampler:
+    """Sampling profiler writing collapsed stacks for flame graphs.
+
+    Every SAMPLE_INTERVAL of CPU time, a SIGPROF handler records the stack
+    of the main thread. Time spent blocked, such as waiting on the disk, is
+    not sampled; the summary's storage latencies cover it instead.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        """Initialize the sampler.
+
+        Args:
+            interval: CPU time between samples, in seconds.
+        """
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._previous: Any = None
+
+    def _sample(self, signum: int, frame: FrameType | None) -> None:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", code.co_filename)
+            names.append(f"{module}:{code.co_qualname}")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        """Start sampling."""
+        import signal
+
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        import signal
+
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+
+    def write(self, path: Path) -> None:
+        """Write the samples in collapsed-stack format.
+
+        Each line holds a semicolon-separated stack, root first, and the
+        number of samples that saw it, as flamegraph.pl and speedscope read.
+
+        Args:
+            path: File to write.
+        """
+        lines = [f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())]
+        path.write_text("".join(lines))
+
+
+class Profiler:
+    """Records where the time of one CLI invocation goes.
+
+    The storage is wrapped in an InstrumentedStorage, so every storage call
+    is counted and timed. When the command exits, a summary splits its time
+    into startup, storage calls and everything else, such as sorting and
+    rendering output. Depending on the mode, a cProfile dump or collapsed
+    stacks are written as well, and the storage metrics can be exported in
+    the Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        mode: ProfileMode | None,
+        command: str | None = None,
+        output: Path | None = None,
+        metrics_file: Path | None = None,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            mode: What to record, or None to only export metrics.
+            command: Name of the command being profiled.
+            output: File for the cProfile dump or collapsed stacks, or for
+                    the summary in summary mode instead of stderr.
+            metrics_file: File to write Prometheus metrics to on exit.
+        """
+        from typ_tmpl.storage.instrumented import Metrics
+
+        self.mode = mode
+        self.command = command
+        self.output = output
+        if output is None and mode is not None:
+            self.output = DEFAULT_OUTPUT.get(mode)
+        self.metrics_file = metrics_file
+        self.metrics = Metrics()
+        self._profile: Any = None
+        self._sampler: StackSampler | None = None
+        self._startup = 0.0
+        self._start = 0.0
+
+    def instrument(self, storage: "Storage") -> "Storage":
+        """Wrap storage so its calls are recorded.
+
+        Args:
+            storage: Storage to wrap.
+
+        Returns:
+            The instrumented storage.
+        """
+        from typ_tmpl.storage.instrumented import instrument
+
+        return instrument(storage, self.metrics)
+
+    def start(self) -> None:
+        """Start timing the command."""
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # CPU spent before the command ran, almost all of it on imports.
+        self._startup = usage.ru_utime + usage.ru_stime
+        self._start = time.perf_counter()
+        if self.mode == ProfileMode.CPROFILE:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == ProfileMode.COLLAPSED:
+            self._sampler = StackSampler()
+            self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop timing and write the summary and any output files."""
+        elapsed = time.perf_counter() - self._start
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        if self.metrics_file is not None:
+            self.metrics.write_prometheus(self.metrics_file)
+        if self.mode is None:
+            return
+        summary = self.summary(elapsed)
+        if self.mode == ProfileMode.SUMMARY and self.output is not None:
+            self.output.write_text(summary)
+            return
+        sys.stderr.write(summary)
+        if self._profile is not None and self.output is not None:
+            self._profile.dump_stats(self.output)
+        elif self._sampler is not None and self.output is not None:
+            self._sampler.write(self.output)
+        else:
+            return
+        sys.stderr.write(f"Wrote profile to {self.output}\n")
+
+    def summary(self, elapsed: float) -> str:
+        """Render where the command's time went.
+
+        Args:
+            elapsed: Wall time of the command in seconds.
+
+        Returns:
+            Phase timings followed by a table of storage methods.
+        """
+        storage = self.metrics.total_seconds()
+        other = max(0.0, elapsed - storage)
+        share = storage / elapsed * 100 if elapsed else 0.0
+        lines = [
+            f"Profile of {self.command or 'typ-tmpl'}:",
+            f"  startup (CPU) {self._startup * 1000:>10.1f} ms",
+            f"  command       {elapsed * 1000:>10.1f} ms",
+            f"    storage     {storage * 1000:>10.1f} ms ({share:.0f}%)",
+            f"    other       {other * 1000:>10.1f} ms",
+            "",
+            f"{'method':<15} {'calls':>7} {'errors':>6} {'bytes':>11} "
+            f"{'total ms':>10} {'p50 ms':>8} {'p99 ms':>8}",
+        ]
+        for method, stats in sorted(self.metrics.ops.items()):
+            lines.append(
+                f"{method:<15} {stats.calls:>7} {stats.errors:>6} {stats.bytes:>11} "
+                f"{stats.seconds * 1000:>10.2f} {_ms(stats.quantile(0.5)):>8} "
+                f"{_ms(stats.quantile(0.99)):>8}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _ms(seconds: float) -> str:
+    """Format a histogram bucket bound as an upper limit in milliseconds."""
+    if seconds == float("inf"):
+        return "slow"
+    return f"<={seconds * 1000:g}"
@@ -1,5 +1,33 @@
 """Protocol definitions for typ-tmpl."""
 
-from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.protocols.async_storage import AsyncStorage
+from typ_tmpl.protocols.storage import (
+    Collectable,
+    Compactable,
+    Filtered,
+    FilterStats,
+    ItemMeta,
+    MetadataIndexed,
+    Migratable,
+    Searchable,
+    SearchHit,
+    Storage,
+    Streamable,
+    Versioned,
+)
 
-__all__ = ["Storage"]
+__all__ = [
+    "AsyncStorage",
+    "Collectable",
+    "Compactable",
+    "FilterStats",
+    "Filtered",
+    "ItemMeta",
+    "MetadataIndexed",
+    "Migratable",
+    "SearchHit",
+    "Searchable",
+    "Storage",
+    "Streamable",
+    "Versioned",
+]
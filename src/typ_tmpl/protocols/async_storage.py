@@ -0,0 +1,113 @@
+"""Asynchronous storage protocol definition."""
+
+from collections.abc import Iterable
+from typing import Protocol
+
+
+class AsyncStorage(Protocol):
+    """Asynchronous counterpart of Storage.
+
+    Methods have the same semantics and errors as their Storage equivalents
+    but may be awaited concurrently.
+    """
+
+    async def add(self, id: str, content: str) -> None:
+        """Add a new item.
+
+        Args:
+            id: Unique identifier for the item.
+            content: Content of the item.
+        """
+        ...
+
+    async def list(self) -> list[str]:
+        """List all item IDs.
+
+        Returns:
+            List of item IDs.
+        """
+        ...
+
+    async def delete(self, id: str) -> None:
+        """Delete an item.
+
+        Args:
+            id: Identifier of the item to delete.
+        """
+        ...
+
+    async def exists(self, id: str) -> bool:
+        """Check if an item exists.
+
+        Args:
+            id: Identifier to check.
+
+        Returns:
+            True if item exists, False otherwise.
+        """
+        ...
+
+    async def get(self, id: str) -> str | None:
+        """Get the content of an item.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Content of the item, or None if not found.
+        """
+        ...
+
+    async def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once.
+
+        Either every item is added or none is.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: With an ItemExistsError for every ID that already
+                        exists or appears more than once in the batch.
+        """
+        ...
+
+    async def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+        """
+        ...
+
+    async def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once.
+
+        Either every item is deleted or none is.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: With an ItemNotFoundError for every ID that does not
+                        exist or appears more than once in the batch.
+        """
+        ...
+
+    async def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        ...
+
+    async def close(self) -> None:
+        """Release any resources held by the storage."""
+        ...
@@ -1,6 +1,37 @@
 """Storage protocol definition."""
 
-from typing import Protocol
+from collections.abc import Iterable, Iterator, Sequence
+from io import BufferedIOBase
+from typing import NamedTuple, Protocol, runtime_checkable
+
+
+class ItemMeta(NamedTuple):
+    """Metadata kept for an item.
+
+    Timestamps are seconds since the epoch.
+    """
+
+    id: str
+    size: int
+    created: float
+    modified: float
+
+
+class SearchHit(NamedTuple):
+    """An item matching a search, with its relevance score."""
+
+    id: str
+    score: float
+
+
+class FilterStats(NamedTuple):
+    """Measurements of a probabilistic membership filter."""
+
+    size: int
+    capacity: int
+    hashes: int
+    fill: float
+    false_positive_rate: float
 
 
 class Storage(Protocol):
@@ -23,6 +54,18 @@ class Storage(Protocol):
         """
         ...
 
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order without building a full list.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        ...
+
     def delete(self, id: str) -> None:
         """Delete an item.
 
@@ -52,3 +95,223 @@ class Storage(Protocol):
             Content of the item, or None if not found.
         """
         ...
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once.
+
+        Either every item is added or none is.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: With an ItemExistsError for every ID that already
+                        exists or appears more than once in the batch.
+        """
+        ...
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+        """
+        ...
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once.
+
+        Either every item is deleted or none is.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: With an ItemNotFoundError for every ID that does not
+                        exist or appears more than once in the batch.
+        """
+        ...
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        ...
+
+    def close(self) -> None:
+        """Release any resources held by the storage."""
+        ...
+
+
+@runtime_checkable
+class Migratable(Protocol):
+    """Storage whose on-disk layout can be changed in place."""
+
+    def migrate(self, layout: str) -> int:
+        """Re-layout all items in place.
+
+        Args:
+            layout: Name of the target layout.
+
+        Returns:
+            Number of items moved.
+        """
+        ...
+
+
+@runtime_checkable
+class Compactable(Protocol):
+    """Storage that can reclaim space held by deleted records."""
+
+    def compact(self) -> int:
+        """Rewrite stored data keeping only live items.
+
+        Returns:
+            Number of bytes reclaimed.
+        """
+        ...
+
+
+@runtime_checkable
+class Collectable(Protocol):
+    """Storage whose leftovers from interrupted writes can be collected."""
+
+    def gc(self) -> int:
+        """Remove data no item refers to, such as files left by a crash.
+
+        Returns:
+            Number of files removed.
+        """
+        ...
+
+
+@runtime_checkable
+class Filtered(Protocol):
+    """Storage that answers membership checks from a Bloom filter first."""
+
+    def filter_stats(self) -> FilterStats:
+        """Measure the membership filter.
+
+        Returns:
+            Size in bytes, capacity, hash count, fraction of slots in use
+            and the estimated false-positive rate.
+        """
+        ...
+
+    def rebuild_filter(self, capacity: int | None = None) -> FilterStats:
+        """Replace the membership filter with one built from the current items.
+
+        Args:
+            capacity: Number of items to size the filter for. Defaults to
+                      twice the current number of items.
+
+        Returns:
+            Measurements of the new filter.
+        """
+        ...
+
+
+@runtime_checkable
+class Versioned(Protocol):
+    """Storage that can cheaply tell whether an item changed."""
+
+    def version(self, id: str) -> int | None:
+        """Get a token that changes whenever the item changes.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Version token, or None if the item does not exist.
+        """
+        ...
+
+
+@runtime_checkable
+class MetadataIndexed(Protocol):
+    """Storage maintaining an index of item sizes and timestamps."""
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order.
+
+        Args:
+            prefix: Only yield items whose ID starts with this prefix.
+            start: Only yield items whose ID sorts at or after this one.
+
+        Yields:
+            Metadata of the matching items.
+        """
+        ...
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field, read from the index.
+
+        Args:
+            key: Field to order by: "id", "size", "created" or "mtime".
+            limit: Maximum number of items to return, or None for all.
+            descending: Return the largest values first.
+            prefix: Only include items whose ID starts with this prefix.
+
+        Returns:
+            Metadata of up to limit items in the requested order.
+
+        Raises:
+            StorageError: If the key is unknown.
+        """
+        ...
+
+
+@runtime_checkable
+class Searchable(Protocol):
+    """Storage maintaining a full-text index of item content."""
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> Sequence[SearchHit]:
+        """Find items containing the words of a query, most relevant first.
+
+        Args:
+            query: Words to look for. Matching ignores case and punctuation.
+            limit: Maximum number of hits to return, or None for all.
+            match_all: Only return items containing every word.
+
+        Returns:
+            Matching items ordered by descending score, ties by ID.
+        """
+        ...
+
+
+@runtime_checkable
+class Streamable(Protocol):
+    """Storage that can read item content without loading it whole."""
+
+    def open_stream(self, id: str) -> BufferedIOBase | None:
+        """Open the content of an item as a binary stream.
+
+        The stream yields the content as UTF-8, decompressed if needed, and
+        must be closed by the caller. Streams over plain files expose the
+        file through fileno() so it can be copied without reading it.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Readable binary stream, or None if the item does not exist.
+        """
+        ...
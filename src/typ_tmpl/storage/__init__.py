@@ -1,5 +1,46 @@
-"""Storage implementations."""
+"""Storage implementations.
 
-from typ_tmpl.storage.filesystem import FilesystemStorage
+Backends are imported on first attribute access so that importing this
+package does not load every backend and its dependencies.
+"""
 
-__all__ = ["FilesystemStorage"]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from typ_tmpl.storage.async_filesystem import AsyncFilesystemStorage
+    from typ_tmpl.storage.cached import CachedStorage
+    from typ_tmpl.storage.dedup import DedupStorage
+    from typ_tmpl.storage.filesystem import FilesystemStorage
+    from typ_tmpl.storage.log import LogStorage
+    from typ_tmpl.storage.memory import MemoryStorage
+    from typ_tmpl.storage.snapshot import SnapshotStorage
+    from typ_tmpl.storage.sqlite import SqliteStorage
+
+_BACKENDS = {
+    "AsyncFilesystemStorage": "typ_tmpl.storage.async_filesystem",
+    "CachedStorage": "typ_tmpl.storage.cached",
+    "DedupStorage": "typ_tmpl.storage.dedup",
+    "FilesystemStorage": "typ_tmpl.storage.filesystem",
+    "LogStorage": "typ_tmpl.storage.log",
+    "MemoryStorage": "typ_tmpl.storage.memory",
+    "SnapshotStorage": "typ_tmpl.storage.snapshot",
+    "SqliteStorage": "typ_tmpl.storage.sqlite",
+}
+
+__all__ = [
+    "AsyncFilesystemStorage",
+    "CachedStorage",
+    "DedupStorage",
+    "FilesystemStorage",
+    "LogStorage",
+    "MemoryStorage",
+    "SnapshotStorage",
+    "SqliteStorage",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _BACKENDS:
+        return getattr(import_module(_BACKENDS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
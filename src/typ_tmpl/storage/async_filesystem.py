@@ -0,0 +1,32 @@
+"""Asynchronous filesystem storage implementation."""
+
+from typ_tmpl.storage.executor import ExecutorStorage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+
+# File I/O mostly waits on the disk or the network, so run many calls at once.
+DEFAULT_MAX_WORKERS = 16
+
+
+class AsyncFilesystemStorage(ExecutorStorage):
+    """AsyncStorage over FilesystemStorage with concurrent file I/O.
+
+    Reads and writes of different items overlap, which hides per-call
+    latency on network-backed home directories. The sync store's manifest
+    is safe to update from several threads at once.
+    """
+
+    storage: FilesystemStorage
+
+    def __init__(
+        self,
+        storage: FilesystemStorage | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """Initialize async filesystem storage.
+
+        Args:
+            storage: Filesystem store to run calls against.
+                     Defaults to FilesystemStorage() in its default location.
+            max_workers: Maximum number of file operations running at once.
+        """
+        super().__init__(storage or FilesystemStorage(), max_workers=max_workers)
@@ -0,0 +1,45 @@
+"""Validation helpers shared by batch storage operations."""
+
+from collections.abc import Container, Iterable
+
+from typ_tmpl.errors import AppError, BatchError, ItemExistsError, ItemNotFoundError
+
+
+def ensure_absent(ids: Iterable[str], existing: Container[str]) -> None:
+    """Check that IDs can all be added.
+
+    Args:
+        ids: IDs about to be added.
+        existing: IDs already stored.
+
+    Raises:
+        BatchError: If any ID is already stored or repeated within the batch.
+    """
+    failures: dict[str, AppError] = {}
+    seen: set[str] = set()
+    for id in ids:
+        if id in existing or id in seen:
+            failures[id] = ItemExistsError(id)
+        seen.add(id)
+    if failures:
+        raise BatchError(failures)
+
+
+def ensure_present(ids: Iterable[str], existing: Container[str]) -> None:
+    """Check that IDs can all be deleted.
+
+    Args:
+        ids: IDs about to be deleted.
+        existing: IDs currently stored.
+
+    Raises:
+        BatchError: If any ID is not stored or repeated within the batch.
+    """
+    failures: dict[str, AppError] = {}
+    seen: set[str] = set()
+    for id in ids:
+        if id not in existing or id in seen:
+            failures[id] = ItemNotFoundError(id)
+        seen.add(id)
+    if failures:
+        raise BatchError(failures)
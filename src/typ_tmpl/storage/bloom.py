@@ -0,0 +1,228 @@
+"""Persistent Bloom filter over item IDs."""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from typ_tmpl.protocols.storage import FilterStats
+
+# Magic, retired flag, hash count, capacity, target error rate.
+_HEADER = struct.Struct("<4sBBxxQd")
+_MAGIC = b"TTBF"
+_RETIRED_OFFSET = 4
+
+# Items the filter is sized for unless told otherwise.
+DEFAULT_CAPACITY = 1 << 18
+# False-positive rate the filter is sized for.
+DEFAULT_ERROR_RATE = 0.01
+
+
+def geometry(capacity: int, error_rate: float) -> tuple[int, int]:
+    """Compute the optimal number of slots and hash functions.
+
+    Args:
+        capacity: Number of keys the filter should hold.
+        error_rate: Target false-positive rate at capacity.
+
+    Returns:
+        Number of slots and number of hash functions.
+    """
+    capacity = max(capacity, 1)
+    slots = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    hashes = max(1, round(slots / capacity * math.log(2)))
+    return slots, hashes
+
+
+class BloomFilter:
+    """Bloom filter kept in a memory-mapped file.
+
+    Each slot is a whole byte rather than a bit, so setting a slot is a
+    single byte store: processes sharing the file can add keys at the same
+    time without losing each other's updates, and no system call is made
+    per key. Keys are never removed, so a filter only ever answers "maybe"
+    for more keys than it holds, never fewer.
+
+    A filter that has been replaced by a rebuild is marked as retired in
+    its header. Retired filters answer "maybe" for every key, and their
+    holders reopen the file to pick up the replacement.
+    """
+
+    def __init__(self, path: Path, fd: int) -> None:
+        """Map an open filter file.
+
+        Args:
+            path: Path of the file.
+            fd: Descriptor of the file, opened for reading and writing.
+
+        Raises:
+            ValueError: If the file is not a valid filter.
+        """
+        self.path = path
+        size = os.fstat(fd).st_size
+        if size <= _HEADER.size:
+            raise ValueError(f"Bloom filter file {path} is truncated")
+        self._map = mmap.mmap(fd, size)
+        magic, _, self.hashes, self.capacity, self.error_rate = _HEADER.unpack_from(
+            self._map
+        )
+        if magic != _MAGIC or self.hashes < 1:
+            self._map.close()
+            raise ValueError(f"{path} is not a Bloom filter")
+        self.slots = size - _HEADER.size
+
+    @classmethod
+    def open(cls, path: Path) -> "BloomFilter | None":
+        """Open an existing filter file.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            The filter, or None if the file is missing or invalid.
+        """
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return None
+        try:
+            return cls(path, fd)
+        except ValueError:
+            return None
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        keys: Iterable[str],
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        replace: bool = False,
+    ) -> "BloomFilter":
+        """Build a filter holding the given keys and install it at path.
+
+        The filter is written to a temporary file first. Without replace,
+        it is linked into place only if no filter exists yet; otherwise the
+        existing filter is kept and the keys are added to it. With replace,
+        the existing filter is retired and the new one takes its place.
+
+        Args:
+            path: Path of the filter file.
+            keys: Keys to add.
+            capacity: Number of keys the filter should hold.
+            error_rate: Target false-positive rate at capacity.
+            replace: Replace an existing filter instead of adding to it.
+
+        Returns:
+            The installed filter.
+        """
+        keys = list(keys)
+        slots, hashes = geometry(capacity, error_rate)
+        data = bytearray(_HEADER.size + slots)
+        _HEADER.pack_into(data, 0, _MAGIC, 0, hashes, capacity, error_rate)
+        for key in keys:
+            for slot in _slots(key, slots, hashes):
+                data[_HEADER.size + slot] = 1
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        try:
+            if replace:
+                old = cls.open(path)
+                if old is not None:
+                    old.retire()
+                    old.close()
+                os.replace(tmp, path)
+            else:
+                try:
+                    os.link(tmp, path)
+                except FileExistsError:
+                    existing = cls.open(path)
+                    if existing is not None:
+                        existing.update(keys)
+                        return existing
+                    os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        built = cls.open(path)
+        if built is None:
+            raise ValueError(f"Failed to install Bloom filter at {path}")
+        return built
+
+    @property
+    def retired(self) -> bool:
+        """Whether a rebuild has replaced this filter."""
+        return bool(self._map[_RETIRED_OFFSET])
+
+    def retire(self) -> None:
+        """Mark the filter as replaced for every process mapping it."""
+        self._map[_RETIRED_OFFSET] = 1
+
+    def add(self, key: str) -> None:
+        """Add a key.
+
+        Args:
+            key: Key to add.
+        """
+        for slot in _slots(key, self.slots, self.hashes):
+            self._map[_HEADER.size + slot] = 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        """Add several keys.
+
+        Args:
+            keys: Keys to add.
+        """
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Check whether a key may have been added.
+
+        Returns:
+            False only if the key was certainly never added.
+        """
+        if not isinstance(key, str) or self.retired:
+            return True
+        m = self._map
+        return all(
+            m[_HEADER.size + slot] for slot in _slots(key, self.slots, self.hashes)
+        )
+
+    def stats(self) -> FilterStats:
+        """Measure the filter.
+
+        Returns:
+            Size, capacity and the false-positive rate estimated from the
+            fraction of slots in use.
+        """
+        used = self.slots - self._map[_HEADER.size :].count(0)
+        fill = used / self.slots
+        return FilterStats(
+            size=len(self._map),
+            capacity=self.capacity,
+            hashes=self.hashes,
+            fill=fill,
+            false_positive_rate=fill**self.hashes,
+        )
+
+    def flush(self) -> None:
+        """Write the filter's changed pages to disk."""
+        self._map.flush()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+
+def _slots(key: str, slots: int, hashes: int) -> list[int]:
+    """Pick the slots of a key by double hashing one 128-bit digest."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % slots for i in range(hashes)]
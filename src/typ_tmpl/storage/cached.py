@@ -0,0 +1,210 @@
+"""Read-through LRU cache around any storage."""
+
+import sys
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from typ_tmpl.protocols.storage import Storage, Versioned
+from typ_tmpl.storage.wrapper import StorageWrapper
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Sentinel for entries whose existence is known but content was not loaded.
+_UNLOADED = object()
+
+
+@dataclass(slots=True)
+class _Entry:
+    """Cached knowledge about one ID."""
+
+    content: str | None | object
+    version: int | None
+    size: int
+
+
+class CachedStorage(StorageWrapper):
+    """Storage wrapper caching get() content and exists() results.
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the total size of cached content exceeds its bound. Writes made
+    through the wrapper invalidate the affected IDs. If the backend is
+    Versioned (like FilesystemStorage), every hit is validated against the
+    item's current version, so changes made by other processes are picked
+    up; otherwise the cache assumes all writes go through this wrapper.
+    Streams, listings and every other capability bypass the cache.
+    """
+
+    def __init__(
+        self,
+        backend: Storage,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            backend: Storage to wrap.
+            max_entries: Maximum number of cached IDs.
+            max_bytes: Maximum total size of cached content in bytes.
+        """
+        super().__init__(backend)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._versioned = backend if isinstance(backend, Versioned) else None
+
+    def _lookup(self, id: str) -> _Entry | None:
+        """Return a valid cache entry for an ID, dropping a stale one."""
+        entry = self._entries.get(id)
+        if entry is None:
+            return None
+        if self._versioned is not None:
+            if self._versioned.version(id) != entry.version:
+                self.invalidate(id)
+                return None
+        self._entries.move_to_end(id)
+        return entry
+
+    def _store(
+        self, id: str, content: str | None | object, version: int | None
+    ) -> None:
+        """Cache what is known about an ID and evict down to the bounds."""
+        self.invalidate(id)
+        size = sys.getsizeof(content) if isinstance(content, str) else 0
+        if size > self.max_bytes:
+            return
+        self._entries[id] = _Entry(content, version, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def _current_version(self, id: str) -> int | None:
+        return None if self._versioned is None else self._versioned.version(id)
+
+    def invalidate(self, id: str) -> None:
+        """Drop any cached entry for an ID.
+
+        Args:
+            id: Identifier to forget.
+        """
+        entry = self._entries.pop(id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item."""
+        self.invalidate(id)
+        self.backend.add(id, content)
+
+    def delete(self, id: str) -> None:
+        """Delete an item."""
+        self.invalidate(id)
+        self.backend.delete(id)
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists, answering from the cache when possible."""
+        if self._versioned is not None:
+            # The version lookup already answers the question.
+            return self._versioned.version(id) is not None
+        entry = self._lookup(id)
+        if entry is not None:
+            self.hits += 1
+            return entry.content is not None
+        self.misses += 1
+        exists = self.backend.exists(id)
+        self._store(id, _UNLOADED if exists else None, None)
+        return exists
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item, answering from the cache when possible."""
+        entry = self._lookup(id)
+        if entry is not None and entry.content is not _UNLOADED:
+            self.hits += 1
+            return entry.content  # type: ignore[return-value]
+        self.misses += 1
+        version = self._current_version(id)
+        content = self.backend.get(id)
+        self._store(id, content, version)
+        return content
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once."""
+        batch = list(items)
+        for id, _ in batch:
+            self.invalidate(id)
+        self.backend.add_many(batch)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get several items, fetching only the cache misses from the backend."""
+        ids = list(ids)
+        contents: dict[str, str | None] = {}
+        missing = []
+        for id in ids:
+            entry = self._lookup(id)
+            if entry is not None and entry.content is not _UNLOADED:
+                self.hits += 1
+                contents[id] = entry.content  # type: ignore[assignment]
+            else:
+                self.misses += 1
+                missing.append(id)
+        if missing:
+            versions = {id: self._current_version(id) for id in missing}
+            fetched = self.backend.get_many(missing)
+            for id, content in fetched.items():
+                self._store(id, content, versions[id])
+            contents.update(fetched)
+        return {id: contents[id] for id in ids}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once."""
+        ids = list(ids)
+        for id in ids:
+            self.invalidate(id)
+        self.backend.delete_many(ids)
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist."""
+        ids = list(ids)
+        if self._versioned is not None:
+            return self.backend.exists_many(ids)
+        result: dict[str, bool] = {}
+        missing = []
+        for id in ids:
+            entry = self._lookup(id)
+            if entry is not None:
+                self.hits += 1
+                result[id] = entry.content is not None
+            else:
+                self.misses += 1
+                missing.append(id)
+        if missing:
+            fetched = self.backend.exists_many(missing)
+            for id, exists in fetched.items():
+                self._store(id, _UNLOADED if exists else None, None)
+            result.update(fetched)
+        return {id: result[id] for id in ids}
+
+    def migrate(self, layout: str) -> int:
+        """Re-layout the backend and drop the cache.
+
+        Raises:
+            StorageError: If the backend does not support migration.
+        """
+        self.clear()
+        return super().migrate(layout)
+
+    def close(self) -> None:
+        """Drop the cache and close the backend."""
+        self.clear()
+        super().close()
@@ -0,0 +1,211 @@
+"""Compression of stored item content."""
+
+import io
+from collections.abc import Buffer
+from enum import StrEnum
+from typing import BinaryIO
+
+from typ_tmpl.errors import StorageError
+
+# Compressed values start with a byte that never begins valid UTF-8, so
+# they cannot be mistaken for plain content written before compression
+# was enabled, followed by one byte naming the codec.
+_MAGIC = b"\xff"
+
+# Content smaller than this many bytes is stored as plain UTF-8.
+DEFAULT_THRESHOLD = 4096
+
+# Bytes of the header naming the codec of compressed content.
+HEADER_SIZE = 2
+
+# Compressed bytes read at a time when decompressing a stream.
+_STREAM_CHUNK = 64 * 1024
+
+
+class Codec(StrEnum):
+    """Compression codecs for item content."""
+
+    NONE = "none"
+    ZLIB = "zlib"
+    LZMA = "lzma"
+
+
+_TAGS = {Codec.ZLIB: b"z", Codec.LZMA: b"x"}
+_CODECS = {tag: codec for codec, tag in _TAGS.items()}
+
+
+def compress(
+    content: str, codec: Codec = Codec.NONE, threshold: int = DEFAULT_THRESHOLD
+) -> bytes | None:
+    """Compress item content if it is large enough to be worth it.
+
+    Args:
+        content: Item content.
+        codec: Codec for content at or above the threshold.
+        threshold: Size in bytes from which content is compressed.
+
+    Returns:
+        Tagged compressed bytes, or None if the content is below the
+        threshold or does not get smaller and should be stored plain.
+    """
+    if codec == Codec.NONE:
+        return None
+    data = content.encode()
+    if len(data) < threshold:
+        return None
+    if codec == Codec.ZLIB:
+        import zlib
+
+        packed = zlib.compress(data)
+    else:
+        import lzma
+
+        packed = lzma.compress(data)
+    if len(packed) + HEADER_SIZE >= len(data):
+        return None
+    return _MAGIC + _TAGS[codec] + packed
+
+
+def encode(
+    content: str, codec: Codec = Codec.NONE, threshold: int = DEFAULT_THRESHOLD
+) -> bytes:
+    """Serialize item content, compressing it if it is large enough.
+
+    Args:
+        content: Item content.
+        codec: Codec for content at or above the threshold.
+        threshold: Size in bytes from which content is compressed.
+
+    Returns:
+        Compressed bytes, or the content as plain UTF-8.
+    """
+    packed = compress(content, codec, threshold)
+    return content.encode() if packed is None else packed
+
+
+def decode(data: bytes) -> str:
+    """Deserialize stored item content, whichever codec wrote it.
+
+    Args:
+        data: Bytes as returned by encode(), or plain UTF-8.
+
+    Returns:
+        Item content.
+
+    Raises:
+        StorageError: If the data names an unknown codec or is corrupt.
+    """
+    if data[:1] != _MAGIC:
+        return data.decode()
+    codec = _CODECS.get(data[1:HEADER_SIZE])
+    try:
+        if codec == Codec.ZLIB:
+            import zlib
+
+            return zlib.decompress(data[HEADER_SIZE:]).decode()
+        if codec == Codec.LZMA:
+            import lzma
+
+            return lzma.decompress(data[HEADER_SIZE:]).decode()
+    except Exception as e:
+        raise StorageError(f"Corrupt {codec} content: {e}") from None
+    raise StorageError(f"Unknown codec tag {data[1:HEADER_SIZE]!r}")
+
+
+def codec_of(header: bytes) -> Codec:
+    """Identify the codec of stored content from its first bytes.
+
+    Args:
+        header: At least the first HEADER_SIZE bytes of the content, or all
+                of it if it is shorter.
+
+    Returns:
+        The codec, or Codec.NONE for plain content.
+
+    Raises:
+        StorageError: If the header names an unknown codec.
+    """
+    if header[:1] != _MAGIC:
+        return Codec.NONE
+    codec = _CODECS.get(header[1:HEADER_SIZE])
+    if codec is None:
+        raise StorageError(f"Unknown codec tag {header[1:HEADER_SIZE]!r}")
+    return codec
+
+
+class DecompressingReader(io.RawIOBase):
+    """Stream decompressing content as it is read.
+
+    Compressed bytes are read from the source a chunk at a time, so memory
+    use does not grow with the size of the content.
+    """
+
+    def __init__(self, source: BinaryIO | io.BufferedIOBase, codec: Codec) -> None:
+        """Initialize the reader.
+
+        Args:
+            source: File positioned after the codec header. It is closed
+                    with the reader.
+            codec: Codec the content was compressed with.
+        """
+        self._source = source
+        self._codec = codec
+        if codec == Codec.ZLIB:
+            import zlib
+
+            self._zlib = zlib.decompressobj()
+        else:
+            import lzma
+
+            self._lzma = lzma.LZMADecompressor()
+        self._pending = b""
+        self._drained = False
+
+    def readable(self) -> bool:
+        """Report that the stream can be read."""
+        return True
+
+    def _decompress(self, size: int) -> bytes:
+        """Decompress up to size bytes from the pending input."""
+        if self._codec == Codec.ZLIB:
+            out = self._zlib.decompress(self._pending, size)
+            self._pending = self._zlib.unconsumed_tail
+            return out
+        out = self._lzma.decompress(self._pending, size)
+        self._pending = b""
+        return out
+
+    def _finished(self) -> bool:
+        if self._codec == Codec.ZLIB:
+            return self._zlib.eof
+        return self._lzma.eof
+
+    def readinto(self, buffer: Buffer) -> int:
+        """Read decompressed bytes into a buffer.
+
+        Returns:
+            Number of bytes read, 0 at the end of the content.
+
+        Raises:
+            StorageError: If the compressed content is corrupt or truncated.
+        """
+        with memoryview(buffer) as view:
+            while not self._finished():
+                if not self._pending and not self._drained:
+                    self._pending = self._source.read(_STREAM_CHUNK)
+                    self._drained = not self._pending
+                try:
+                    out = self._decompress(len(view))
+                except Exception as e:
+                    raise StorageError(f"Corrupt {self._codec} content: {e}") from None
+                if out:
+                    view[: len(out)] = out
+                    return len(out)
+                if self._drained and not self._pending:
+                    raise StorageError(f"Truncated {self._codec} content")
+        return 0
+
+    def close(self) -> None:
+        """Close the reader and its source."""
+        self._source.close()
+        super().close()
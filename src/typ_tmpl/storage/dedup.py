@@ -0,0 +1,412 @@
+"""Content-addressed storage that keeps one copy of each distinct content."""
+
+import hashlib
+import json
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from io import BufferedIOBase
+from pathlib import Path
+
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError, StorageError
+from typ_tmpl.storage.batch import ensure_absent, ensure_present
+from typ_tmpl.storage.compression import DEFAULT_THRESHOLD, Codec, decode, encode
+from typ_tmpl.storage.durability import (
+    SQLITE_SYNCHRONOUS,
+    Durability,
+    Syncer,
+    is_tmp,
+)
+from typ_tmpl.storage.ranges import id_range, lower_bound
+from typ_tmpl.storage.streams import open_content
+
+# Reference counts are kept by triggers, so they change in the same
+# statement as the reference itself and can never drift from it.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS refs (
+    id TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    refs INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS refs_insert AFTER INSERT ON refs BEGIN
+    INSERT INTO blobs (hash, refs) VALUES (new.hash, 1)
+    ON CONFLICT (hash) DO UPDATE SET refs = refs + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS refs_delete AFTER DELETE ON refs BEGIN
+    UPDATE blobs SET refs = refs - 1 WHERE hash = old.hash;
+    DELETE FROM blobs WHERE hash = old.hash AND refs <= 0;
+END;
+"""
+_INSERT = "INSERT INTO refs (id, hash) VALUES (?, ?)"
+_DELETE = "DELETE FROM refs WHERE id = ?"
+_SELECT_HASH = "SELECT hash FROM refs WHERE id = ?"
+_SELECT_IDS = "SELECT id FROM refs ORDER BY id"
+_SELECT_IDS_FROM = "SELECT id FROM refs WHERE id >= ? ORDER BY id"
+_SELECT_MANY = "SELECT id, hash FROM refs WHERE id IN (SELECT value FROM json_each(?))"
+_SELECT_LIVE = "SELECT hash FROM blobs WHERE hash IN (SELECT value FROM json_each(?))"
+_SELECT_BLOBS = "SELECT hash FROM blobs"
+_CLEAR_COUNTS = "DELETE FROM blobs"
+_RECOUNT = (
+    "INSERT INTO blobs (hash, refs) SELECT hash, count(*) FROM refs GROUP BY hash"
+)
+
+
+class DedupStorage:
+    """Storage that stores each distinct content once, keyed by its hash.
+
+    Item IDs map to SHA-256 content hashes in a SQLite database, and each
+    blob is a file named after its hash. Adding an item whose content is
+    already stored only records a reference. A blob is removed when its
+    last reference is deleted.
+
+    Blob files are created and removed only while holding the database
+    write lock, after writing the references that need them or before
+    removing the ones that no longer do. A crash can therefore leave an
+    unreferenced blob behind, but never a reference without its blob;
+    gc() removes the leftovers.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path | None = None,
+        codec: Codec = Codec.NONE,
+        compress_threshold: int = DEFAULT_THRESHOLD,
+        durability: Durability = Durability.BATCH,
+    ) -> None:
+        """Initialize deduplicating storage.
+
+        Args:
+            base_dir: Directory holding the database and blob files.
+                      Defaults to ~/.config/typ-tmpl/dedup
+            codec: Codec for new blobs of at least compress_threshold bytes.
+            compress_threshold: Size in bytes from which blobs are compressed.
+            durability: When blobs and the database are synced to disk.
+                        Blobs are synced before the references to them are
+                        committed in every mode but none.
+        """
+        if base_dir is None:
+            base_dir = Path.home() / ".config" / "typ-tmpl" / "dedup"
+        self.base_dir = base_dir
+        self.blob_dir = base_dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.compress_threshold = compress_threshold
+        self._syncer = Syncer(durability)
+        # Callers such as the daemon serialize access themselves, so the
+        # connection may be used from whichever thread holds their lock.
+        self._conn = sqlite3.connect(
+            base_dir / "refs.db", isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS[durability]}")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _hash(content: str) -> str:
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def _blob_path(self, hash: str) -> Path:
+        return self.blob_dir / hash[:2] / hash[2:]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the body holding the database write lock, rolling back on error."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _write_blobs(self, contents: dict[str, str], batch: bool) -> None:
+        """Write the blobs of the given contents that are not stored yet.
+
+        Must be called inside a write transaction.
+
+        Args:
+            contents: Content by hash.
+            batch: The blobs belong to a batch write, whose directories are
+                   synced right away rather than grouped with later writes.
+        """
+        staged = []
+        for hash, content in contents.items():
+            path = self._blob_path(hash)
+            if path.exists():
+                continue
+            path.parent.mkdir(exist_ok=True)
+            data = encode(content, self.codec, self.compress_threshold)
+            staged.append((self._syncer.stage(path, data, sync=False), path))
+        self._syncer.sync_files(tmp for tmp, _ in staged)
+        for tmp, path in staged:
+            os.replace(tmp, path)
+        self._syncer.changed(*{path.parent for _, path in staged}, batch=batch)
+
+    def _drop_unreferenced(self, hashes: Iterable[str]) -> int:
+        """Remove the blob files of hashes that lost their last reference.
+
+        Returns:
+            Number of blob files removed.
+        """
+        hashes = list(set(hashes))
+        removed = 0
+        with self._transaction() as conn:
+            live = {row[0] for row in conn.execute(_SELECT_LIVE, (json.dumps(hashes),))}
+            for hash in hashes:
+                if hash not in live:
+                    try:
+                        self._blob_path(hash).unlink()
+                    except FileNotFoundError:
+                        continue
+                    removed += 1
+        return removed
+
+    def _read_blob(self, id: str, hash: str) -> str:
+        """Read the content of a blob.
+
+        Raises:
+            StorageError: If the blob file is missing or corrupt.
+        """
+        try:
+            return decode(self._blob_path(hash).read_bytes())
+        except FileNotFoundError:
+            raise StorageError(f"Blob {hash} of item '{id}' is missing") from None
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item, storing its content only if no item has it yet.
+
+        Args:
+            id: Unique identifier for the item.
+            content: Content of the item.
+
+        Raises:
+            ItemExistsError: If an item with the same ID already exists.
+        """
+        hash = self._hash(content)
+        with self._transaction() as conn:
+            try:
+                conn.execute(_INSERT, (id, hash))
+            except sqlite3.IntegrityError:
+                raise ItemExistsError(id) from None
+            self._write_blobs({hash: content}, batch=False)
+
+    def list(self) -> list[str]:
+        """List all item IDs.
+
+        Returns:
+            List of item IDs sorted alphabetically.
+        """
+        return [row[0] for row in self._conn.execute(_SELECT_IDS)]
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        cursor = self._conn.execute(_SELECT_IDS_FROM, (lower_bound(prefix, start),))
+        try:
+            yield from id_range((row[0] for row in cursor), prefix)
+        finally:
+            cursor.close()
+
+    def delete(self, id: str) -> None:
+        """Delete an item, and its blob if no other item references it.
+
+        Args:
+            id: Identifier of the item to delete.
+
+        Raises:
+            ItemNotFoundError: If the item does not exist.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(_SELECT_HASH, (id,)).fetchone()
+            if row is None:
+                raise ItemNotFoundError(id)
+            conn.execute(_DELETE, (id,))
+        self._drop_unreferenced([row[0]])
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists.
+
+        Args:
+            id: Identifier to check.
+
+        Returns:
+            True if item exists, False otherwise.
+        """
+        return self._conn.execute(_SELECT_HASH, (id,)).fetchone() is not None
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Content of the item, or None if not found.
+
+        Raises:
+            StorageError: If the item's blob is missing or corrupt.
+        """
+        row = self._conn.execute(_SELECT_HASH, (id,)).fetchone()
+        return None if row is None else self._read_blob(id, row[0])
+
+    def open_stream(self, id: str) -> BufferedIOBase | None:
+        """Open the content of an item as a binary stream.
+
+        Blobs are never rewritten, so a stream keeps reading its content
+        even if the item is deleted and its blob collected meanwhile.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Readable binary stream, or None if not found.
+
+        Raises:
+            StorageError: If the item's blob is missing or names an unknown
+                          codec.
+        """
+        row = self._conn.execute(_SELECT_HASH, (id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            file = open(self._blob_path(row[0]), "rb")
+        except FileNotFoundError:
+            raise StorageError(f"Blob {row[0]} of item '{id}' is missing") from None
+        return open_content(file)
+
+    def version(self, id: str) -> int | None:
+        """Get a token that changes whenever the item's content changes.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Token derived from the content hash, or None if the item does
+            not exist.
+        """
+        row = self._conn.execute(_SELECT_HASH, (id,)).fetchone()
+        return None if row is None else int(row[0][:16], 16)
+
+    def _hashes(self, ids: Sequence[str]) -> dict[str, str]:
+        """Look up the content hashes of the stored items among ids."""
+        return dict(self._conn.execute(_SELECT_MANY, (json.dumps(ids),)).fetchall())
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items in one transaction.
+
+        Content is hashed before the transaction starts, and each distinct
+        new content is written once however many items share it.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: If any ID already exists or is repeated in the batch.
+        """
+        refs = []
+        contents: dict[str, str] = {}
+        for id, content in items:
+            hash = self._hash(content)
+            refs.append((id, hash))
+            contents.setdefault(hash, content)
+        with self._transaction() as conn:
+            ids = [id for id, _ in refs]
+            ensure_absent(ids, self._hashes(ids))
+            conn.executemany(_INSERT, refs)
+            self._write_blobs(contents, batch=True)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items, reading each blob once.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+
+        Raises:
+            StorageError: If a blob is missing or corrupt.
+        """
+        ids = list(ids)
+        hashes = self._hashes(ids)
+        contents: dict[str, str] = {}
+        result: dict[str, str | None] = {}
+        for id in ids:
+            hash = hashes.get(id)
+            if hash is None:
+                result[id] = None
+                continue
+            if hash not in contents:
+                contents[hash] = self._read_blob(id, hash)
+            result[id] = contents[hash]
+        return result
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items in one transaction.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: If any ID does not exist or is repeated in the batch.
+        """
+        ids = list(ids)
+        with self._transaction() as conn:
+            hashes = self._hashes(ids)
+            ensure_present(ids, hashes)
+            conn.executemany(_DELETE, ((id,) for id in ids))
+        self._drop_unreferenced(hashes.values())
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist with one query.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        ids = list(ids)
+        hashes = self._hashes(ids)
+        return {id: id in hashes for id in ids}
+
+    def gc(self) -> int:
+        """Repair the store after a crash.
+
+        Recounts every reference, then removes blob files that no item
+        references and blob files left half-written.
+
+        Returns:
+            Number of files removed.
+        """
+        removed = 0
+        with self._transaction() as conn:
+            conn.execute(_CLEAR_COUNTS)
+            conn.execute(_RECOUNT)
+            live = {row[0] for row in conn.execute(_SELECT_BLOBS)}
+            with os.scandir(self.blob_dir) as shards:
+                directories = [Path(entry.path) for entry in shards if entry.is_dir()]
+            for directory in directories:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        hash = directory.name + entry.name
+                        if is_tmp(entry.name) or hash not in live:
+                            os.unlink(entry.path)
+                            removed += 1
+        return removed
+
+    def close(self) -> None:
+        """Sync pending blob directories and close the database connection."""
+        self._syncer.commit()
+        self._conn.close()
@@ -0,0 +1,206 @@
+"""Atomic file writes and fsync policies."""
+
+import os
+import threading
+from collections.abc import Callable, Iterable
+from enum import StrEnum
+from pathlib import Path
+
+
+class Durability(StrEnum):
+    """How hard writes try to survive a crash of the machine."""
+
+    NONE = "none"
+    BATCH = "batch"
+    ALWAYS = "always"
+
+
+# SQLite synchronous setting matching each durability mode.
+SQLITE_SYNCHRONOUS = {
+    Durability.NONE: "OFF",
+    Durability.BATCH: "NORMAL",
+    Durability.ALWAYS: "FULL",
+}
+
+# Writes batch mode lets accumulate before syncing them together.
+DEFAULT_GROUP_SIZE = 1000
+
+# Suffix of files being written; they are linked into place once complete,
+# so a crash never leaves a partial file under its final name.
+TMP_SUFFIX = ".tmp"
+
+
+def fsync_path(path: Path) -> None:
+    """Flush a file or directory to disk.
+
+    Args:
+        path: File or directory to flush.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def is_tmp(name: str) -> bool:
+    """Check whether a file name belongs to a write in progress.
+
+    Args:
+        name: File name.
+
+    Returns:
+        True for temporary files created by Syncer.stage().
+    """
+    return name.startswith(".") and name.endswith(TMP_SUFFIX)
+
+
+class Syncer:
+    """Writes files atomically and issues the fsyncs a durability mode needs.
+
+    NONE never syncs, so a crash of the machine may lose recent writes, but
+    a crashed process never leaves a partial file. Otherwise a file's data
+    is always synced before it is published under its final name, so a
+    power loss can lose a write but never leave an empty or truncated file.
+    ALWAYS also syncs the directory right after, so each write is durable
+    once it returns. BATCH defers the directory syncs: directories touched
+    by single writes are synced together every group_size writes and on
+    close(), and batch writes sync their files together before publishing
+    them and each directory once afterwards. Everything written before the
+    last group commit survives a crash.
+
+    Syncers are safe to use from several threads at once.
+    """
+
+    def __init__(
+        self,
+        durability: Durability = Durability.BATCH,
+        group_size: int = DEFAULT_GROUP_SIZE,
+        on_commit: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize a syncer.
+
+        Args:
+            durability: Durability mode.
+            group_size: Number of single writes batch mode groups together.
+            on_commit: Called before each sync of written paths, to flush
+                       state that must reach the disk first.
+        """
+        self.durability = durability
+        self.group_size = group_size
+        self._on_commit = on_commit
+        self._pending: set[Path] = set()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def stage(self, path: Path, data: bytes, sync: bool = True) -> Path:
+        """Write data to a temporary file next to path.
+
+        Args:
+            path: Final path of the file.
+            data: Content to write.
+            sync: Flush the file to disk unless the durability mode is
+                  NONE. Callers staging several files pass False and flush
+                  them together with sync_files() before publishing.
+
+        Returns:
+            Path of the temporary file.
+        """
+        tmp = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}{TMP_SUFFIX}"
+        )
+        with open(tmp, "wb") as f:
+            f.write(data)
+            if sync and self.durability != Durability.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        return tmp
+
+    def sync_files(self, paths: Iterable[Path]) -> None:
+        """Flush staged files to disk together, unless the mode is NONE.
+
+        Args:
+            paths: Temporary files returned by stage(sync=False).
+        """
+        if self.durability != Durability.NONE:
+            for path in paths:
+                fsync_path(path)
+
+    def publish(self, tmp: Path, path: Path) -> os.stat_result:
+        """Move a staged file into place, failing if path exists.
+
+        The temporary file is removed whether or not this succeeds.
+
+        Args:
+            tmp: Temporary file returned by stage().
+            path: Final path of the file.
+
+        Returns:
+            Status of the published file.
+
+        Raises:
+            FileExistsError: If path already exists.
+        """
+        try:
+            st = os.stat(tmp)
+            os.link(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return st
+
+    def create(self, path: Path, data: bytes) -> os.stat_result:
+        """Atomically create a file holding data.
+
+        Args:
+            path: Path of the new file.
+            data: Content to write.
+
+        Returns:
+            Status of the new file.
+
+        Raises:
+            FileExistsError: If path already exists.
+        """
+        st = self.publish(self.stage(path, data), path)
+        # stage() already synced the file itself.
+        self.changed(path.parent)
+        return st
+
+    def changed(self, *paths: Path, batch: bool = False) -> None:
+        """Record that files were written or directories changed.
+
+        Args:
+            paths: Written files and changed directories.
+            batch: The paths end a batch write, so batch mode syncs them
+                   now along with every pending path.
+        """
+        if self.durability == Durability.NONE:
+            return
+        if self.durability == Durability.ALWAYS:
+            self._sync(set(paths))
+            return
+        with self._lock:
+            self._pending.update(paths)
+            self._writes += 1
+            if not batch and self._writes < self.group_size:
+                return
+            pending, self._pending, self._writes = self._pending, set(), 0
+        self._sync(pending)
+
+    def commit(self) -> None:
+        """Sync every path recorded since the last commit."""
+        with self._lock:
+            pending, self._pending, self._writes = self._pending, set(), 0
+        self._sync(pending)
+
+    def _sync(self, paths: set[Path]) -> None:
+        """Flush files before the directories that name them."""
+        if not paths:
+            return
+        if self._on_commit is not None:
+            self._on_commit()
+        for path in sorted(paths, key=lambda path: path.is_dir()):
+            try:
+                fsync_path(path)
+            except FileNotFoundError:
+                continue
@@ -0,0 +1,115 @@
+"""Asynchronous access to synchronous storage through a thread pool."""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from typ_tmpl.errors import AppError
+from typ_tmpl.protocols.storage import Storage
+
+
+class ExecutorStorage:
+    """AsyncStorage running the calls of a synchronous storage on threads.
+
+    At most max_workers calls run at the same time. With a single worker
+    every call runs on the same thread, which suits backends that are not
+    safe to share between threads.
+    """
+
+    def __init__(self, storage: Storage, max_workers: int = 1) -> None:
+        """Initialize the executor.
+
+        Args:
+            storage: Synchronous storage to run calls against.
+            max_workers: Maximum number of calls running at once.
+        """
+        self.storage = storage
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="typ-tmpl-storage"
+        )
+
+    async def _run[T](self, func: Callable[..., T], *args: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def add(self, id: str, content: str) -> None:
+        """Add a new item."""
+        await self._run(self.storage.add, id, content)
+
+    async def list(self) -> list[str]:
+        """List all item IDs."""
+        return await self._run(self.storage.list)
+
+    async def delete(self, id: str) -> None:
+        """Delete an item."""
+        await self._run(self.storage.delete, id)
+
+    async def exists(self, id: str) -> bool:
+        """Check if an item exists."""
+        return await self._run(self.storage.exists, id)
+
+    async def get(self, id: str) -> str | None:
+        """Get the content of an item."""
+        return await self._run(self.storage.get, id)
+
+    async def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once."""
+        await self._run(self.storage.add_many, [*items])
+
+    async def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items."""
+        return await self._run(self.storage.get_many, [*ids])
+
+    async def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once."""
+        await self._run(self.storage.delete_many, [*ids])
+
+    async def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist."""
+        return await self._run(self.storage.exists_many, [*ids])
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, leaving the wrapped storage open."""
+        self._executor.shutdown(wait=True)
+
+    async def close(self) -> None:
+        """Stop the worker threads and close the wrapped storage."""
+        self.shutdown()
+        self.storage.close()
+
+
+async def run_bounded[A, R](
+    func: Callable[[A], Awaitable[R]], args: Iterable[A], limit: int
+) -> AsyncIterator[tuple[A, R | AppError]]:
+    """Run func over args with at most limit calls in flight.
+
+    Args:
+        func: Coroutine function to call for each argument.
+        args: Arguments, consumed lazily as calls complete.
+        limit: Maximum number of concurrent calls.
+
+    Yields:
+        Each argument with its result or AppError, in input order.
+    """
+    pending: deque[tuple[A, asyncio.Task[R]]] = deque()
+
+    async def settle() -> tuple[A, R | AppError]:
+        arg, task = pending.popleft()
+        try:
+            return arg, await task
+        except AppError as e:
+            return arg, e
+
+    try:
+        for arg in args:
+            pending.append((arg, asyncio.ensure_future(func(arg))))
+            if len(pending) >= limit:
+                yield await settle()
+        while pending:
+            yield await settle()
+    finally:
+        for _, task in pending:
+            task.cancel()
@@ -0,0 +1,258 @@
+"""Storage backend selection."""
+
+import os
+from collections.abc import Callable
+from enum import StrEnum
+from pathlib import Path
+from typing import NamedTuple
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.compression import Codec
+from typ_tmpl.storage.durability import Durability
+
+
+class Backend(StrEnum):
+    """Available storage backends."""
+
+    FS = "fs"
+    SQLITE = "sqlite"
+    LOG = "log"
+    DEDUP = "dedup"
+    MEMORY = "memory"
+
+
+# URL scheme mounting a snapshot file read-only.
+SNAPSHOT_SCHEME = "snapshot"
+
+# Entry point group third-party backends register under, one entry point
+# per URL scheme.
+PLUGIN_GROUP = "typ_tmpl.backends"
+
+# Fraction of dead records at which the log backend compacts in the
+# background, unless TYP_TMPL_LOG_COMPACT_RATIO or a URL option overrides it.
+DEFAULT_COMPACT_RATIO = 0.5
+
+
+class StorageURL(NamedTuple):
+    """A parsed storage URL, such as sqlite:///var/lib/typ-tmpl/items.db."""
+
+    scheme: str
+    location: str
+    options: dict[str, str]
+
+    @property
+    def path(self) -> Path | None:
+        """Get the location as a path, or None if the URL has none."""
+        return Path(self.location).expanduser() if self.location else None
+
+
+def parse_storage_url(url: str) -> StorageURL:
+    """Parse a storage URL.
+
+    The location is everything after the scheme, so fs:///srv/items names
+    an absolute directory and fs:items or fs://items a relative one. Query
+    parameters become options.
+
+    Args:
+        url: URL such as fs:///srv/items or sqlite:///tmp/items.db.
+
+    Returns:
+        The scheme, location and options of the URL.
+
+    Raises:
+        StorageError: If the URL has no scheme.
+    """
+    from urllib.parse import parse_qsl, unquote, urlsplit
+
+    parts = urlsplit(url)
+    if not parts.scheme:
+        raise StorageError(f"Storage URL '{url}' has no scheme, e.g. fs:///path")
+    return StorageURL(
+        scheme=parts.scheme,
+        location=unquote(parts.netloc + parts.path),
+        options=dict(parse_qsl(parts.query)),
+    )
+
+
+def log_compact_ratio(value: str | None = None) -> float:
+    """Get the fraction of dead records that starts a log compaction.
+
+    Args:
+        value: Ratio to parse. Defaults to TYP_TMPL_LOG_COMPACT_RATIO if
+               set, otherwise DEFAULT_COMPACT_RATIO.
+
+    Returns:
+        The ratio, where 0 turns background compaction off.
+
+    Raises:
+        StorageError: If the value is not a number from 0 to 1.
+    """
+    if value is None:
+        value = os.environ.get("TYP_TMPL_LOG_COMPACT_RATIO")
+        if not value:
+            return DEFAULT_COMPACT_RATIO
+    try:
+        ratio = float(value)
+    except ValueError:
+        ratio = -1.0
+    if not 0 <= ratio <= 1:
+        raise StorageError(f"Compaction ratio must be between 0 and 1, not '{value}'")
+    return ratio
+
+
+def create_storage(
+    backend: Backend,
+    codec: Codec = Codec.NONE,
+    durability: Durability = Durability.BATCH,
+    path: Path | None = None,
+    compact_ratio: float | None = None,
+) -> Storage:
+    """Create a storage instance for the given backend.
+
+    Backend modules are imported only when selected.
+
+    Args:
+        backend: Backend to create.
+        codec: Codec for compressing large items on write.
+        durability: When writes are synced to disk.
+        path: Directory, or database file for sqlite. Defaults to the
+              backend's location in ~/.config/typ-tmpl.
+        compact_ratio: Fraction of dead records at which the log backend
+                       compacts in the background, or 0 to never do so.
+                       Defaults to log_compact_ratio().
+
+    Returns:
+        Storage instance.
+
+    Raises:
+        StorageError: If TYP_TMPL_LOG_COMPACT_RATIO is invalid.
+    """
+    if backend == Backend.SQLITE:
+        from typ_tmpl.storage.sqlite import SqliteStorage
+
+        return SqliteStorage(path=path, codec=codec, durability=durability)
+    if backend == Backend.LOG:
+        from typ_tmpl.storage.log import LogStorage
+
+        if compact_ratio is None:
+            compact_ratio = log_compact_ratio()
+        return LogStorage(
+            base_dir=path,
+            auto_compact_ratio=compact_ratio or None,
+            codec=codec,
+            durability=durability,
+        )
+    if backend == Backend.DEDUP:
+        from typ_tmpl.storage.dedup import DedupStorage
+
+        return DedupStorage(base_dir=path, codec=codec, durability=durability)
+    if backend == Backend.MEMORY:
+        from typ_tmpl.storage.memory import MemoryStorage
+
+        base_dir = path or Path.home() / ".config" / "typ-tmpl" / "memory"
+        return MemoryStorage(base_dir, codec=codec, durability=durability)
+
+    from typ_tmpl.storage.filesystem import FilesystemStorage
+
+    return FilesystemStorage(base_dir=path, codec=codec, durability=durability)
+
+
+def load_plugin(scheme: str) -> Callable[[StorageURL], Storage]:
+    """Find the factory a third-party backend registered for a scheme.
+
+    Entry points are looked up only here, and only the matching one is
+    imported, so installed plugins cost nothing until they are selected.
+
+    Args:
+        scheme: URL scheme naming the backend.
+
+    Returns:
+        Callable creating the storage from a parsed URL.
+
+    Raises:
+        StorageError: If no backend is registered for the scheme.
+    """
+    from importlib.metadata import entry_points
+
+    found = entry_points(group=PLUGIN_GROUP, name=scheme)
+    if not found:
+        raise StorageError(f"Unknown storage scheme '{scheme}'")
+    factory: Callable[[StorageURL], Storage] = found[scheme].load()
+    return factory
+
+
+def open_storage(
+    url: str,
+    codec: Codec = Codec.NONE,
+    durability: Durability = Durability.BATCH,
+) -> Storage:
+    """Create a storage instance from a URL.
+
+    The scheme is a backend name, "snapshot" to mount a snapshot file
+    read-only, or a scheme registered by a plugin under PLUGIN_GROUP. Log
+    URLs take a compact_ratio option, as in log:///srv/log?compact_ratio=0.3.
+
+    Args:
+        url: URL such as fs:///srv/items or sqlite:///tmp/items.db.
+        codec: Codec for compressing large items on write.
+        durability: When writes are synced to disk.
+
+    Returns:
+        Storage instance.
+
+    Raises:
+        StorageError: If the URL is invalid, its scheme unknown, or the
+                      storage cannot be opened.
+    """
+    spec = parse_storage_url(url)
+    if spec.scheme not in Backend and spec.scheme != SNAPSHOT_SCHEME:
+        return load_plugin(spec.scheme)(spec)
+    options = dict(spec.options)
+    compact_ratio = None
+    if spec.scheme == Backend.LOG and "compact_ratio" in options:
+        compact_ratio = log_compact_ratio(options.pop("compact_ratio"))
+    if options:
+        names = ", ".join(sorted(options))
+        raise StorageError(f"The {spec.scheme} backend takes no options: {names}")
+    if spec.scheme in Backend:
+        return create_storage(
+            Backend(spec.scheme), codec, durability, spec.path, compact_ratio
+        )
+
+    from typ_tmpl.storage.snapshot import SnapshotStorage
+
+    if spec.path is None:
+        raise StorageError("Snapshot URLs need a file, e.g. snapshot:///a.snap")
+    return SnapshotStorage(spec.path)
+
+
+def storage_name(url: str) -> str:
+    """Name the store a URL selects, for per-store files such as sockets.
+
+    Args:
+        url: Storage URL.
+
+    Returns:
+        The scheme followed by a digest of the whole URL.
+    """
+    import hashlib
+
+    digest = hashlib.sha256(url.encode()).hexdigest()[:12]
+    return f"{parse_storage_url(url).scheme}-{digest}"
+
+
+def daemon_socket_path(backend: str) -> Path:
+    """Get the socket path of the daemon serving a backend.
+
+    Args:
+        backend: Backend name, or a store name from storage_name().
+
+    Returns:
+        Value of TYP_TMPL_SOCKET if set, otherwise a per-backend socket in
+        ~/.config/typ-tmpl.
+    """
+    override = os.environ.get("TYP_TMPL_SOCKET")
+    if override:
+        return Path(override)
+    return Path.home() / ".config" / "typ-tmpl" / f"daemon-{backend}.sock"
@@ -1,29 +1,473 @@
 """Filesystem-based storage implementation."""
 
+import contextlib
+import hashlib
+import os
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from io import BufferedIOBase
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
 
-from typ_tmpl.errors import ItemExistsError, ItemNotFoundError
+from typ_tmpl.errors import BatchError, ItemExistsError, ItemNotFoundError, StorageError
+from typ_tmpl.protocols.storage import FilterStats, ItemMeta, SearchHit
+from typ_tmpl.storage.batch import ensure_absent, ensure_present
+from typ_tmpl.storage.compression import (
+    DEFAULT_THRESHOLD,
+    HEADER_SIZE,
+    Codec,
+    codec_of,
+    decode,
+    encode,
+)
+from typ_tmpl.storage.durability import Durability, Syncer, is_tmp
+from typ_tmpl.storage.layout import Layout
+from typ_tmpl.storage.manifest import Manifest
+from typ_tmpl.storage.streams import open_content
+
+if TYPE_CHECKING:
+    from typ_tmpl.storage.bloom import BloomFilter
+    from typ_tmpl.storage.metadata import MetadataIndex
+    from typ_tmpl.storage.search import SearchIndex
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+# Queued index updates after which they are written without waiting for a
+# read or close().
+INDEX_BATCH = 1000
+
+
+def _encoded_size(content: str, data: bytes) -> int:
+    """Size of content in UTF-8, given its stored form."""
+    if codec_of(data[:HEADER_SIZE]) == Codec.NONE:
+        return len(data)
+    return len(content.encode())
+
+
+def _content_size(file: BinaryIO, stored: int) -> int:
+    """Size of the content of an item file in UTF-8.
+
+    Args:
+        file: Item file, positioned at the start.
+        stored: Size of the file.
+    """
+    try:
+        if codec_of(file.read(HEADER_SIZE)) == Codec.NONE:
+            return stored
+        file.seek(0)
+        return len(decode(file.read()).encode())
+    except StorageError:
+        # Unreadable content is measured as stored; get() reports it.
+        return stored
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process with this ID is still running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
 
 class FilesystemStorage:
     """Storage implementation using filesystem."""
 
-    def __init__(self, base_dir: Path | None = None) -> None:
+    def __init__(
+        self,
+        base_dir: Path | None = None,
+        layout: Layout | None = None,
+        codec: Codec = Codec.NONE,
+        compress_threshold: int = DEFAULT_THRESHOLD,
+        durability: Durability = Durability.BATCH,
+    ) -> None:
         """Initialize filesystem storage.
 
         Args:
             base_dir: Base directory for storing items.
                       Defaults to ~/.config/typ-tmpl/items
+            layout: Layout for a new store. Existing stores keep the layout
+                    recorded on disk; use migrate() to change it.
+            codec: Codec for newly written items of at least
+                   compress_threshold bytes. Items are read back whichever
+                   codec wrote them.
+            compress_threshold: Size in bytes from which items are compressed.
+            durability: When item files and directories are synced to disk.
+                        Item files are always written atomically.
+
+        Raises:
+            StorageError: If layout conflicts with the store's recorded layout.
         """
         if base_dir is None:
             base_dir = Path.home() / ".config" / "typ-tmpl" / "items"
         self.base_dir = base_dir
+        self.codec = codec
+        self.compress_threshold = compress_threshold
+        self._syncer = Syncer(durability, on_commit=self._flush_filter)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir = self.base_dir / ".index"
+        self._layout_path = self.index_dir / "layout"
+        self.layout = self._read_layout()
+        if layout is not None and layout != self.layout:
+            if self._layout_path.exists():
+                raise StorageError(
+                    f"Store at '{self.base_dir}' uses the {self.layout} layout, "
+                    f"not {layout}"
+                )
+            self._write_layout(layout)
+        self._manifest = Manifest(
+            self.index_dir,
+            root=self.base_dir,
+            scan=self._scan_ids,
+            watched=self._item_dirs,
+            on_rebuild=self._reindex,
+        )
+        self._metadata: MetadataIndex | None = None
+        self._search: SearchIndex | None = None
+        self._filter: BloomFilter | None = None
+        self._index_lock = threading.Lock()
+        # Index updates not written yet: each changed ID maps to the
+        # metadata of the item added, or None if it was deleted.
+        self._pending: dict[str, ItemMeta | None] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._marker: Path | None = None
+        self._stale = False
+        self._recovered = False
+
+    def _read_layout(self) -> Layout:
+        """Read the layout recorded for this store, defaulting to flat."""
+        try:
+            return Layout(self._layout_path.read_text().strip())
+        except FileNotFoundError:
+            return Layout.FLAT
+
+    def _write_layout(self, layout: Layout) -> None:
+        """Record the layout for this store."""
+        self.index_dir.mkdir(exist_ok=True)
+        self._layout_path.write_text(f"{layout}\n")
+        self.layout = layout
+
+    @staticmethod
+    def _shard(id: str) -> str:
+        """Get the shard directory name for an item."""
+        return hashlib.blake2b(id.encode(), digest_size=1).hexdigest()
 
     def _item_path(self, id: str) -> Path:
         """Get path for an item."""
+        if self.layout == Layout.SHARDED:
+            return self.base_dir / self._shard(id) / f"{id}.txt"
         return self.base_dir / f"{id}.txt"
 
+    def _shard_dirs(self) -> list[Path]:
+        """List the existing shard directories."""
+        with os.scandir(self.base_dir) as entries:
+            return [
+                Path(entry.path)
+                for entry in entries
+                if len(entry.name) == 2
+                and set(entry.name) <= _HEX_DIGITS
+                and entry.is_dir()
+            ]
+
+    def _item_dirs(self) -> list[Path]:
+        """List the directories that hold item files in the current layout."""
+        if self.layout == Layout.SHARDED:
+            return [self.base_dir, *self._shard_dirs()]
+        return [self.base_dir]
+
+    def _encode(self, content: str) -> bytes:
+        """Serialize content for an item file."""
+        return encode(content, self.codec, self.compress_threshold)
+
+    @staticmethod
+    def _scan_dir(directory: Path) -> Iterator[Path]:
+        """Yield the item files directly inside a directory."""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".txt") and entry.is_file():
+                    yield Path(entry.path)
+
+    def _scan_ids(self) -> Iterator[str]:
+        """Yield item IDs by scanning the storage directories."""
+        for directory in self._item_dirs():
+            for path in self._scan_dir(directory):
+                yield path.name[:-4]
+
+    def _snapshot(self, paths: Iterable[Path]) -> set[Path]:
+        """List the item files present in the directories of the given paths.
+
+        Each directory is read once, however many paths fall into it.
+        """
+        present: set[Path] = set()
+        for directory in {path.parent for path in paths}:
+            try:
+                names = os.listdir(directory)
+            except FileNotFoundError:
+                continue
+            present.update(directory / name for name in names if name.endswith(".txt"))
+        return present
+
+    def _metadata_index(self) -> "MetadataIndex":
+        """Open the metadata index, filling it from a scan if it is new."""
+        with self._index_lock:
+            if self._metadata is not None:
+                return self._metadata
+            from typ_tmpl.storage.metadata import MetadataIndex
+
+            self.index_dir.mkdir(exist_ok=True)
+            self._metadata = index = MetadataIndex.open(self.index_dir / "meta.db")
+        if index.is_new:
+            index.reconcile(self._stat_items(self._manifest.ids()))
+        return index
+
+    def _search_index(self) -> "SearchIndex":
+        """Open the search index, indexing every item if it is new."""
+        with self._index_lock:
+            if self._search is not None:
+                return self._search
+            from typ_tmpl.storage.search import SearchIndex
+
+            self.index_dir.mkdir(exist_ok=True)
+            self._search = index = SearchIndex.open(self.index_dir / "search.db")
+        if index.is_new:
+            index.reconcile(self._manifest.ids(), self._read_indexed)
+        return index
+
+    def _open_filter(self) -> "BloomFilter | None":
+        """Open the ID filter if one was built, replacing a retired one."""
+        with self._index_lock:
+            if self._filter is not None and not self._filter.retired:
+                return self._filter
+            from typ_tmpl.storage.bloom import BloomFilter
+
+            # A retired filter may still be in use by another thread, so it
+            # is left for the garbage collector to unmap.
+            first = self._filter is None
+            self._filter = BloomFilter.open(self.index_dir / "ids.bloom")
+            flt = self._filter
+        if first and flt is not None:
+            # Fold in items added behind the store's back since it was built.
+            self._manifest.refresh()
+        return flt
+
+    def _id_filter(self) -> "BloomFilter":
+        """Open the ID filter, building it from the manifest if it is missing.
+
+        The filter holds every ID ever added, so an ID it rules out has no
+        item file and needs no disk check.
+        """
+        flt = self._open_filter()
+        if flt is not None:
+            return flt
+        from typ_tmpl.storage.bloom import DEFAULT_CAPACITY, BloomFilter
+
+        ids = self._manifest.ids()
+        self.index_dir.mkdir(exist_ok=True)
+        flt = BloomFilter.create(
+            self.index_dir / "ids.bloom",
+            ids,
+            capacity=max(DEFAULT_CAPACITY, 2 * len(ids)),
+        )
+        with self._index_lock:
+            if self._filter is None:
+                self._filter = flt
+                return flt
+        flt.close()
+        return self._id_filter()
+
+    def _flush_filter(self) -> None:
+        """Write the ID filter to disk before the items it covers."""
+        with self._index_lock:
+            if self._filter is not None:
+                self._filter.flush()
+
+    def _read_indexed(self, ids: Iterable[str]) -> Iterator[tuple[str, str]]:
+        """Read the searchable start of each item, skipping missing ones.
+
+        At most MAX_INDEXED_CHARS bytes are read, so indexing a huge item
+        costs no more memory than indexing a large one.
+        """
+        from typ_tmpl.storage.search import MAX_INDEXED_CHARS
+
+        for id in ids:
+            stream = self.open_stream(id)
+            if stream is None:
+                continue
+            with stream:
+                data = stream.read(MAX_INDEXED_CHARS)
+            # A character cut in half at the limit is dropped.
+            yield id, data.decode(errors="ignore")
+
+    def _stat_items(self, ids: Iterable[str]) -> Iterator[ItemMeta]:
+        """Read the metadata of the given items from their files.
+
+        Sizes are those of the content, so compressed files are read and
+        decompressed to measure it.
+        """
+        for id in ids:
+            try:
+                with open(self._item_path(id), "rb") as f:
+                    st = os.fstat(f.fileno())
+                    size = _content_size(f, st.st_size)
+            except FileNotFoundError:
+                continue
+            yield ItemMeta(id, size, st.st_mtime, st.st_mtime)
+
+    def _reindex(self, ids: list[str]) -> None:
+        """Resynchronize the indexes after a manifest rebuild."""
+        flt = self._open_filter()
+        if flt is not None:
+            flt.update(ids)
+        self._metadata_index().reconcile(self._stat_items(ids))
+        self._search_index().reconcile(ids, self._read_indexed)
+
+    def _mark_pending(self) -> None:
+        """Record on disk that this instance may have unwritten index updates.
+
+        Called before an item is written, so a process that dies before
+        writing its updates leaves a marker behind and the next process to
+        use the indexes rebuilds them from the items.
+        """
+        if self._marker is not None:
+            return
+        with self._pending_lock:
+            if self._marker is None:
+                marker = self.index_dir / f"pending.{os.getpid()}.{id(self):x}"
+                self.index_dir.mkdir(exist_ok=True)
+                marker.touch()
+                self._marker = marker
+
+    def _queue_index(self, changes: Iterable[tuple[str, ItemMeta | None]]) -> None:
+        """Queue index updates, writing them once INDEX_BATCH have built up.
+
+        Args:
+            changes: Metadata of each added item, or None for a deleted one.
+        """
+        with self._pending_lock:
+            self._pending.update(changes)
+            full = len(self._pending) >= INDEX_BATCH
+        if full:
+            try:
+                self._flush_indexes()
+            except StorageError:
+                # The item itself was stored. The indexes are now marked
+                # stale, and the next read or close() retries and reports.
+                pass
+
+    def _recover_indexes(self) -> None:
+        """Mark the indexes stale if updates were left unwritten.
+
+        That is the case if a dead process left its marker behind, or if an
+        earlier flush failed.
+
+        Must be called with self._flush_lock held.
+        """
+        if self._recovered:
+            return
+        self._recovered = True
+        if (self.index_dir / "stale").exists():
+            self._stale = True
+        for marker in self.index_dir.glob("pending.*"):
+            try:
+                pid = int(marker.name.split(".")[1])
+            except (IndexError, ValueError):
+                continue
+            if pid != os.getpid() and not _process_alive(pid):
+                self._stale = True
+                marker.unlink(missing_ok=True)
+
+    def _flush_indexes(self) -> None:
+        """Write queued index updates, one transaction per index.
+
+        Search entries are read back from the item files, so queued adds
+        hold no content in memory. If writing fails, the indexes are
+        marked stale on disk and rebuilt from the items by the next flush
+        of any instance.
+
+        Raises:
+            StorageError: If the indexes could not be written.
+        """
+        with self._flush_lock:
+            self._recover_indexes()
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if not pending and not self._stale:
+                return
+            import sqlite3
+
+            try:
+                if self._stale:
+                    self._reindex(self._manifest.ids())
+                    self._stale = False
+                    (self.index_dir / "stale").unlink(missing_ok=True)
+                added = [meta for meta in pending.values() if meta is not None]
+                removed = [id for id, meta in pending.items() if meta is None]
+                metadata, search = self._metadata_index(), self._search_index()
+                metadata.remove_many(removed)
+                metadata.put_many(added)
+                search.remove_many(removed)
+                search.add_many(self._read_indexed(meta.id for meta in added))
+            except (sqlite3.Error, OSError, StorageError) as e:
+                self._stale = True
+                with contextlib.suppress(OSError):
+                    (self.index_dir / "stale").touch()
+                if isinstance(e, StorageError):
+                    raise
+                raise StorageError(f"Failed to update the indexes: {e}") from e
+
+    def _current_indexes(self) -> None:
+        """Bring the indexes up to date before serving a read from them.
+
+        Raises:
+            StorageError: If the indexes could not be updated.
+        """
+        self._manifest.refresh()
+        self._flush_indexes()
+
+    def migrate(self, layout: str) -> int:
+        """Move every item into the given layout in place.
+
+        The target layout is recorded before any file is moved, so an
+        interrupted migration is completed by running it again.
+
+        Args:
+            layout: Name of the target layout.
+
+        Returns:
+            Number of item files moved.
+
+        Raises:
+            StorageError: If the layout name is unknown.
+        """
+        try:
+            self._write_layout(Layout(layout))
+        except ValueError:
+            raise StorageError(f"Unknown layout '{layout}'") from None
+        paths = [
+            path
+            for directory in [self.base_dir, *self._shard_dirs()]
+            for path in self._scan_dir(directory)
+        ]
+        moved = 0
+        for path in paths:
+            target = self._item_path(path.name[:-4])
+            if path != target:
+                target.parent.mkdir(exist_ok=True)
+                os.rename(path, target)
+                moved += 1
+        self._syncer.changed(*self._item_dirs(), batch=True)
+        if self.layout == Layout.FLAT:
+            for directory in self._shard_dirs():
+                try:
+                    directory.rmdir()
+                except OSError:
+                    continue
+        self._manifest.rebuild()
+        return moved
+
     def add(self, id: str, content: str) -> None:
         """Add a new item.
 
@@ -35,18 +479,49 @@ class FilesystemStorage:
             ItemExistsError: If an item with the same ID already exists.
         """
         path = self._item_path(id)
-        if path.exists():
+        flt = self._id_filter()
+        if id in flt and path.exists():
             raise ItemExistsError(id)
-        path.write_text(content)
+        # Recorded before the file exists, so no reader can miss the item.
+        flt.add(id)
+        self._mark_pending()
+        with self._manifest.update(self.base_dir, path.parent) as change:
+            path.parent.mkdir(exist_ok=True)
+            # Published with an exclusive link, so a crash never leaves a
+            # partial file and concurrent adds of one ID cannot both win.
+            data = self._encode(content)
+            try:
+                st = self._syncer.create(path, data)
+            except FileExistsError:
+                raise ItemExistsError(id) from None
+            change.added.append(id)
+        meta = ItemMeta(id, _encoded_size(content, data), st.st_mtime, st.st_mtime)
+        self._queue_index([(id, meta)])
 
     def list(self) -> list[str]:
         """List all item IDs.
 
+        Served from the manifest, which is rebuilt from a directory scan
+        only when the directory changed outside this storage.
+
         Returns:
             List of item IDs sorted alphabetically.
         """
-        items = [p.stem for p in self.base_dir.glob("*.txt")]
-        return sorted(items)
+        return self._manifest.ids()
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order.
+
+        Streamed from the manifest, seeking to the first match.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        return self._manifest.iter_ids(prefix, start)
 
     def delete(self, id: str) -> None:
         """Delete an item.
@@ -60,7 +535,15 @@ class FilesystemStorage:
         path = self._item_path(id)
         if not path.exists():
             raise ItemNotFoundError(id)
-        path.unlink()
+        self._mark_pending()
+        with self._manifest.update(path.parent) as change:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                raise ItemNotFoundError(id) from None
+            change.removed.append(id)
+        self._syncer.changed(path.parent)
+        self._queue_index([(id, None)])
 
     def exists(self, id: str) -> bool:
         """Check if an item exists.
@@ -71,7 +554,7 @@ class FilesystemStorage:
         Returns:
             True if item exists, False otherwise.
         """
-        return self._item_path(id).exists()
+        return id in self._id_filter() and self._item_path(id).exists()
 
     def get(self, id: str) -> str | None:
         """Get the content of an item.
@@ -81,8 +564,319 @@ class FilesystemStorage:
 
         Returns:
             Content of the item, or None if not found.
+
+        Raises:
+            StorageError: If the item file holds corrupt compressed content.
         """
-        path = self._item_path(id)
-        if path.exists():
-            return path.read_text()
-        return None
+        try:
+            return decode(self._item_path(id).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def open_stream(self, id: str) -> BufferedIOBase | None:
+        """Open the content of an item as a binary stream.
+
+        Plain item files are memory-mapped and compressed ones decompressed
+        as they are read, so memory use does not grow with the item size.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Readable binary stream, or None if not found.
+
+        Raises:
+            StorageError: If the item file names an unknown codec.
+        """
+        try:
+            file = open(self._item_path(id), "rb")
+        except FileNotFoundError:
+            return None
+        return open_content(file)
+
+    def version(self, id: str) -> int | None:
+        """Get a token that changes whenever the item file changes.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Token derived from the file's inode, mtime and size, or None if
+            the item does not exist.
+        """
+        try:
+            st = os.stat(self._item_path(id))
+        except FileNotFoundError:
+            return None
+        return hash((st.st_ino, st.st_mtime_ns, st.st_size))
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once.
+
+        Only IDs the ID filter cannot rule out are checked on disk, against
+        one listing per directory they fall in. All files are written to
+        temporary files and synced together before any is linked into
+        place, and each directory is synced once at the end. If a write
+        fails, the files already published by this call are removed again.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: If any ID already exists or is repeated in the batch.
+        """
+        batch = [(self._item_path(id), id, content) for id, content in items]
+        flt = self._id_filter()
+        present = self._snapshot(path for path, id, _ in batch if id in flt)
+        ensure_absent((id for _, id, _ in batch), {path.stem for path in present})
+        if not batch:
+            return
+        flt.update(id for _, id, _ in batch)
+        batch.sort(key=lambda entry: entry[0].parent)
+        dirs = {path.parent for path, _, _ in batch}
+        staged: list[Path] = []
+        sizes: list[int] = []
+        written: list[Path] = []
+        self._mark_pending()
+        with self._manifest.update(self.base_dir, *dirs) as change:
+            try:
+                for directory in dirs:
+                    directory.mkdir(exist_ok=True)
+                for path, _, content in batch:
+                    data = self._encode(content)
+                    staged.append(self._syncer.stage(path, data, sync=False))
+                    sizes.append(_encoded_size(content, data))
+                self._syncer.sync_files(staged)
+                for (path, id, _), tmp in zip(batch, staged, strict=True):
+                    # Exclusive link catches items added since the check.
+                    try:
+                        self._syncer.publish(tmp, path)
+                    except FileExistsError:
+                        raise BatchError({id: ItemExistsError(id)}) from None
+                    written.append(path)
+            except BaseException:
+                for path in written:
+                    path.unlink(missing_ok=True)
+                raise
+            finally:
+                for tmp in staged:
+                    tmp.unlink(missing_ok=True)
+            change.added.extend(id for _, id, _ in batch)
+        self._syncer.changed(*dirs, batch=True)
+        changes = []
+        for (path, id, _), size in zip(batch, sizes, strict=True):
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            changes.append((id, ItemMeta(id, size, mtime, mtime)))
+        self._queue_index(changes)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+
+        Raises:
+            StorageError: If an item file holds corrupt compressed content.
+        """
+        contents: dict[str, str | None] = {}
+        for id in ids:
+            try:
+                contents[id] = decode(self._item_path(id).read_bytes())
+            except FileNotFoundError:
+                contents[id] = None
+        return contents
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once.
+
+        Every ID is checked against one listing per directory before any
+        file is removed. An item another process deletes in the meantime
+        counts as deleted, since the batch leaves it gone either way.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: If any ID does not exist or is repeated in the batch.
+        """
+        ids = list(ids)
+        paths = {id: self._item_path(id) for id in ids}
+        present = self._snapshot(paths.values())
+        ensure_present(ids, {path.stem for path in present})
+        if not paths:
+            return
+        ordered = sorted(paths.values(), key=lambda path: path.parent)
+        dirs = {path.parent for path in ordered}
+        self._mark_pending()
+        with self._manifest.update(*dirs) as change:
+            for path in ordered:
+                path.unlink(missing_ok=True)
+            change.removed.extend(paths)
+        self._syncer.changed(*dirs, batch=True)
+        self._queue_index((id, None) for id in paths)
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        flt = self._id_filter()
+        paths = {id: self._item_path(id) for id in ids}
+        present = self._snapshot(path for id, path in paths.items() if id in flt)
+        return {id: path in present for id, path in paths.items()}
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order.
+
+        Served from the metadata index, which is updated by every write and
+        resynchronized whenever the manifest detects outside changes.
+
+        Args:
+            prefix: Only yield items whose ID starts with this prefix.
+            start: Only yield items whose ID sorts at or after this one.
+
+        Returns:
+            Iterator over the metadata of the matching items.
+        """
+        self._current_indexes()
+        return self._metadata_index().iter_metadata(prefix, start)
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field from the metadata index.
+
+        Args:
+            key: Field to order by: "id", "size", "created" or "mtime".
+            limit: Maximum number of items to return, or None for all.
+            descending: Return the largest values first.
+            prefix: Only include items whose ID starts with this prefix.
+
+        Returns:
+            Metadata of up to limit items in the requested order.
+
+        Raises:
+            StorageError: If the key is unknown.
+        """
+        self._current_indexes()
+        return self._metadata_index().top_metadata(key, limit, descending, prefix)
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> Sequence[SearchHit]:
+        """Find items containing the words of a query, most relevant first.
+
+        Served from the search index, which every write updates and which
+        picks up items changed outside this storage when the manifest
+        detects them.
+
+        Args:
+            query: Words to look for. Matching ignores case and punctuation.
+            limit: Maximum number of hits to return, or None for all.
+            match_all: Only return items containing every word.
+
+        Returns:
+            Matching items ordered by descending score, ties by ID.
+        """
+        self._current_indexes()
+        return self._search_index().search(query, limit, match_all)
+
+    def filter_stats(self) -> FilterStats:
+        """Measure the ID filter consulted by add() and exists().
+
+        Returns:
+            Size in bytes, capacity, hash count, fraction of slots in use
+            and the estimated false-positive rate.
+        """
+        return self._id_filter().stats()
+
+    def rebuild_filter(self, capacity: int | None = None) -> FilterStats:
+        """Replace the ID filter with one built from the current items.
+
+        Deleted items stay in the filter until it is rebuilt, and a filter
+        filled past its capacity answers "maybe" more and more often.
+        Other processes switch to the new filter on their next check; run
+        this while no other process is adding items, since items they add
+        during the rebuild may be missing from the new filter.
+
+        Args:
+            capacity: Number of items to size the filter for. Defaults to
+                      twice the current number of items.
+
+        Returns:
+            Measurements of the new filter.
+        """
+        from typ_tmpl.storage.bloom import DEFAULT_CAPACITY, BloomFilter
+
+        ids = self._manifest.ids()
+        if capacity is None:
+            capacity = max(DEFAULT_CAPACITY, 2 * len(ids))
+        self.index_dir.mkdir(exist_ok=True)
+        flt = BloomFilter.create(
+            self.index_dir / "ids.bloom", ids, capacity=capacity, replace=True
+        )
+        with self._index_lock:
+            self._filter = flt
+        return flt.stats()
+
+    def gc(self) -> int:
+        """Remove temporary files left behind by interrupted writes.
+
+        Run this while no other process writes to the store, since their
+        writes in progress would be removed too.
+
+        Returns:
+            Number of files removed.
+        """
+        removed = 0
+        for directory in self._item_dirs():
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if is_tmp(entry.name) and entry.is_file():
+                        os.unlink(entry.path)
+                        removed += 1
+        return removed
+
+    def close(self) -> None:
+        """Sync pending writes and release any resources held by the storage.
+
+        Queued index updates are written first. If that fails, the indexes
+        are marked stale on disk and the next instance rebuilds them.
+
+        Raises:
+            StorageError: If the queued index updates could not be written.
+        """
+        self._syncer.commit()
+        try:
+            self._flush_indexes()
+        finally:
+            if self._marker is not None and not self._stale:
+                self._marker.unlink(missing_ok=True)
+                self._marker = None
+            self._manifest.close()
+            with self._index_lock:
+                if self._filter is not None:
+                    self._filter.close()
+                    self._filter = None
+                if self._metadata is not None:
+                    self._metadata.close()
+                    self._metadata = None
+                if self._search is not None:
+                    self._search.close()
+                    self._search = None
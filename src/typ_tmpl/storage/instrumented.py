@@ -0,0 +1,316 @@
+"""Call counts, byte counts and latency histograms for any storage."""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Storage, Versioned
+from typ_tmpl.storage.wrapper import StorageWrapper
+
+# Upper bounds of the latency histogram buckets, in seconds. A last bucket
+# without a bound catches slower calls.
+BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Prefix of every exported metric name.
+METRIC_PREFIX = "typ_tmpl_storage"
+
+
+@dataclass
+class OpStats:
+    """Counters and latency histogram of one storage method."""
+
+    calls: int = 0
+    errors: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile from the histogram.
+
+        Args:
+            q: Quantile between 0 and 1.
+
+        Returns:
+            Upper bound in seconds of the bucket holding the quantile, or
+            infinity if it falls in the last bucket.
+        """
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Per-method storage metrics, safe to update from several threads."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.ops: dict[str, OpStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, seconds: float, error: bool = False) -> None:
+        """Record one call.
+
+        Args:
+            method: Storage method name.
+            seconds: Time the call took.
+            error: Whether the call raised.
+        """
+        with self._lock:
+            stats = self.ops.get(method)
+            if stats is None:
+                stats = self.ops[method] = OpStats()
+            stats.calls += 1
+            stats.errors += error
+            stats.seconds += seconds
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def count_bytes(self, method: str, size: int) -> None:
+        """Record content bytes read or written by a recorded call.
+
+        Args:
+            method: Storage method name.
+            size: Number of bytes.
+        """
+        with self._lock:
+            self.ops.setdefault(method, OpStats()).bytes += size
+
+    @contextmanager
+    def timed(self, method: str) -> Iterator[None]:
+        """Record the duration of the enclosed block as one call.
+
+        Args:
+            method: Storage method name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(method, time.perf_counter() - start, error=True)
+            raise
+        self.record(method, time.perf_counter() - start)
+
+    def total_seconds(self) -> float:
+        """Sum the time spent in every method."""
+        with self._lock:
+            return sum(stats.seconds for stats in self.ops.values())
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            Counters and a latency histogram, labelled by method.
+        """
+        with self._lock:
+            ops = sorted(self.ops.items())
+        lines = []
+        for name, help, value in (
+            ("calls_total", "Storage calls, by method.", "calls"),
+            ("errors_total", "Storage calls that raised, by method.", "errors"),
+            ("bytes_total", "Content bytes read or written, by method.", "bytes"),
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} counter")
+            for method, stats in ops:
+                count = getattr(stats, value)
+                lines.append(f'{METRIC_PREFIX}_{name}{{method="{method}"}} {count}')
+        histogram = f"{METRIC_PREFIX}_call_duration_seconds"
+        lines.append(f"# HELP {histogram} Latency of storage calls, by method.")
+        lines.append(f"# TYPE {histogram} histogram")
+        for method, stats in ops:
+            seen = 0
+            for bound, count in zip((*BUCKETS, "+Inf"), stats.buckets, strict=True):
+                seen += count
+                lines.append(
+                    f'{histogram}_bucket{{method="{method}",le="{bound}"}} {seen}'
+                )
+            lines.append(f'{histogram}_sum{{method="{method}"}} {stats.seconds!r}')
+            lines.append(f'{histogram}_count{{method="{method}"}} {stats.calls}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write the metrics to a Prometheus text file.
+
+        The file is replaced atomically, so a scraper reading it never sees
+        a partial file.
+
+        Args:
+            path: File to write, conventionally ending in .prom.
+        """
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.prometheus())
+        os.replace(tmp, path)
+
+
+def _size(content: str | None) -> int:
+    """Size of content in bytes, as the backends encode it."""
+    return 0 if content is None else len(content.encode())
+
+
+class InstrumentedStorage(StorageWrapper):
+    """Storage wrapper recording metrics for every call to the backend.
+
+    Iterators are timed while they produce items, so time spent by the
+    caller between items is not counted, and streams are timed only while
+    they are opened. Capabilities the backend lacks raise StorageError. Use
+    instrument() to keep a Versioned backend Versioned.
+    """
+
+    def __init__(self, backend: Storage, metrics: Metrics | None = None) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend: Storage to wrap.
+            metrics: Metrics to record into. Defaults to new, empty metrics.
+        """
+        super().__init__(backend)
+        self.metrics = metrics or Metrics()
+
+    def _call[T](self, method: str, call: Callable[[], T]) -> T:
+        """Time a backend call."""
+        with self.metrics.timed(method):
+            return call()
+
+    def _iterate[T](self, method: str, make: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """Time a backend iterator as one call.
+
+        The backend is called right away, so its errors surface here as
+        they would without the wrapper.
+        """
+        start = time.perf_counter()
+        try:
+            items = make()
+        except BaseException:
+            self.metrics.record(method, time.perf_counter() - start, error=True)
+            raise
+        return self._timed_items(method, items, time.perf_counter() - start)
+
+    def _timed_items[T](
+        self, method: str, items: Iterator[T], elapsed: float
+    ) -> Iterator[T]:
+        """Yield items, adding the time spent producing them to elapsed."""
+        clock = time.perf_counter
+        error = False
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += clock() - start
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.metrics.record(method, elapsed, error)
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item."""
+        super().add(id, content)
+        self.metrics.count_bytes("add", _size(content))
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item."""
+        content = super().get(id)
+        self.metrics.count_bytes("get", _size(content))
+        return content
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once."""
+        batch = list(items)
+        super().add_many(batch)
+        self.metrics.count_bytes("add_many", sum(_size(c) for _, c in batch))
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get several items at once."""
+        contents = super().get_many(ids)
+        self.metrics.count_bytes("get_many", sum(map(_size, contents.values())))
+        return contents
+
+
+class VersionedInstrumentedStorage(InstrumentedStorage):
+    """InstrumentedStorage for a Versioned backend, forwarding version().
+
+    Kept apart from InstrumentedStorage so that only wrappers around
+    Versioned backends pass the isinstance check CachedStorage uses to
+    validate its entries.
+    """
+
+    def version(self, id: str) -> int | None:
+        """Get a token that changes whenever the item changes.
+
+        Raises:
+            StorageError: If the backend is not Versioned.
+        """
+        backend = self.backend
+        if not isinstance(backend, Versioned):
+            raise StorageError("Storage backend does not support versions")
+        return self._call("version", lambda: backend.version(id))
+
+
+def instrument(backend: Storage, metrics: Metrics | None = None) -> InstrumentedStorage:
+    """Wrap storage in the instrumentation wrapper matching its capabilities.
+
+    Args:
+        backend: Storage to wrap.
+        metrics: Metrics to record into. Defaults to new, empty metrics.
+
+    Returns:
+        VersionedInstrumentedStorage if the backend is Versioned, otherwise
+        InstrumentedStorage.
+    """
+    if isinstance(backend, Versioned):
+        return VersionedInstrumentedStorage(backend, metrics)
+    return InstrumentedStorage(backend, metrics)
+
+
+def unwrap(storage: Storage) -> Storage:
+    """Get the storage an InstrumentedStorage wraps.
+
+    Commands that pick a strategy by backend type look through the
+    instrumentation with this.
+
+    Args:
+        storage: Storage, instrumented or not.
+
+    Returns:
+        The wrapped backend, or storage itself if it is not instrumented.
+    """
+    if isinstance(storage, InstrumentedStorage):
+        return storage.backend
+    return storage
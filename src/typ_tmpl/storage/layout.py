@@ -0,0 +1,10 @@
+"""Filesystem storage layouts."""
+
+from enum import StrEnum
+
+
+class Layout(StrEnum):
+    """On-disk arrangement of item files."""
+
+    FLAT = "flat"
+    SHARDED = "sharded"
@@ -0,0 +1,455 @@
+"""Log-structured storage implementation."""
+
+import fcntl
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError, StorageError
+from typ_tmpl.storage.batch import ensure_absent, ensure_present
+from typ_tmpl.storage.compression import DEFAULT_THRESHOLD, Codec, decode, encode
+from typ_tmpl.storage.durability import Durability, Syncer
+from typ_tmpl.storage.ranges import lower_bound
+from typ_tmpl.storage.records import (
+    HEADER,
+    OP_DELETE,
+    OP_PUT,
+    Record,
+    checksum_ok,
+    encode_record,
+    scan,
+)
+
+DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+class _Location(NamedTuple):
+    """Where the value of a live record is stored."""
+
+    segment: int
+    offset: int
+    length: int
+
+
+class LogStorage:
+    """Append-only, Bitcask-style storage implementation.
+
+    Every add and delete is appended as a record to the active segment file.
+    An in-memory hash index maps each live ID to the segment, offset and
+    length of its value, so reads take a single positioned read. Deleted and
+    overwritten records stay on disk until compact() rewrites the sealed
+    segments with only the live records.
+
+    The directory is locked for the lifetime of the instance, so only one
+    process writes to a store at a time.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path | None = None,
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        auto_compact_ratio: float | None = None,
+        codec: Codec = Codec.NONE,
+        compress_threshold: int = DEFAULT_THRESHOLD,
+        durability: Durability = Durability.BATCH,
+    ) -> None:
+        """Initialize log-structured storage.
+
+        Args:
+            base_dir: Directory holding the segment files.
+                      Defaults to ~/.config/typ-tmpl/log
+            max_segment_bytes: Size after which a new segment is started.
+            auto_compact_ratio: If set, start a background compaction once
+                                this fraction of the log is dead records.
+            codec: Codec for newly written values of at least
+                   compress_threshold bytes.
+            compress_threshold: Size in bytes from which values are compressed.
+            durability: When appended records are synced to disk. Records
+                        torn by a crash fail their checksum and are dropped
+                        on the next open.
+
+        Raises:
+            StorageError: If another process has the directory open.
+        """
+        if base_dir is None:
+            base_dir = Path.home() / ".config" / "typ-tmpl" / "log"
+        base_dir.mkdir(parents=True, exist_ok=True)
+        self.base_dir = base_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.auto_compact_ratio = auto_compact_ratio
+        self.codec = codec
+        self.compress_threshold = compress_threshold
+        self._syncer = Syncer(durability)
+
+        self._lock_fd = os.open(base_dir / "LOCK", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            raise StorageError(
+                f"Log store {base_dir} is in use by another process"
+            ) from None
+
+        self._lock = threading.RLock()
+        self._compaction: threading.Thread | None = None
+        self._closed = False
+        self._index: dict[str, _Location] = {}
+        self._readers: dict[int, int] = {}
+        self._total_bytes = 0
+        self._live_bytes = 0
+
+        self._recover()
+        segments = self._segments()
+        for segment in segments:
+            self._load_segment(segment, last=segment == segments[-1])
+        self._active = segments[-1] if segments else 1
+        self._active_fd = self._open_for_append(self._active)
+        self._active_size = os.fstat(self._active_fd).st_size
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.base_dir / f"{segment:08d}.seg"
+
+    def _segments(self) -> list[int]:
+        return sorted(int(p.stem) for p in self.base_dir.glob("*.seg"))
+
+    def _open_for_append(self, segment: int) -> int:
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        return os.open(self._segment_path(segment), flags, 0o644)
+
+    def _recover(self) -> None:
+        """Finish or discard a compaction interrupted by a crash."""
+        for tmp in self.base_dir.glob("*.merge.tmp"):
+            tmp.unlink()
+        for merged in self.base_dir.glob("*.merge"):
+            last = int(merged.name.split(".")[0])
+            for segment in self._segments():
+                if segment <= last:
+                    self._segment_path(segment).unlink()
+            os.rename(merged, self._segment_path(last))
+
+    def _record_size(self, id: str, location: _Location) -> int:
+        return HEADER.size + len(id.encode()) + location.length
+
+    def _load_segment(self, segment: int, last: bool) -> None:
+        """Replay a segment into the index, truncating a torn tail.
+
+        Raises:
+            StorageError: If a sealed segment contains a corrupt record.
+        """
+
+        def apply(record: Record) -> None:
+            previous = self._index.pop(record.key, None)
+            if previous is not None:
+                self._live_bytes -= self._record_size(record.key, previous)
+            if record.op == OP_PUT:
+                length = record.end - record.value_offset
+                self._index[record.key] = _Location(
+                    segment, record.value_offset, length
+                )
+                self._live_bytes += record.end - record.offset
+
+        path = self._segment_path(segment)
+        self._total_bytes += scan(path, apply, truncate=last)
+
+    def _append(self, op: int, id: str, content: str = "") -> _Location:
+        """Append a record to the active segment and return its value location."""
+        return self._append_many([(op, id, content)])[0]
+
+    def _append_many(
+        self, records: list[tuple[int, str, str]], batch: bool = False
+    ) -> list[_Location]:
+        """Append records with a single write and return their value locations.
+
+        Args:
+            records: Operation, ID and content of each record.
+            batch: The records come from a batch call, which batch
+                   durability syncs right away.
+        """
+        chunks = []
+        locations = []
+        offset = 0
+        for op, id, content in records:
+            key = id.encode()
+            value = encode(content, self.codec, self.compress_threshold)
+            chunks.append(encode_record(op, key, value))
+            locations.append((offset + HEADER.size + len(key), len(value)))
+            offset += len(chunks[-1])
+        if self._active_size and self._active_size + offset > self.max_segment_bytes:
+            self._rotate()
+        data = memoryview(b"".join(chunks))
+        while data:
+            data = data[os.write(self._active_fd, data) :]
+        self._syncer.changed(self._segment_path(self._active), batch=batch)
+        base = self._active_size
+        self._active_size += offset
+        self._total_bytes += offset
+        return [
+            _Location(self._active, base + value_offset, length)
+            for value_offset, length in locations
+        ]
+
+    def _rotate(self) -> None:
+        """Seal the active segment and start a new one."""
+        os.close(self._active_fd)
+        self._active += 1
+        self._active_fd = self._open_for_append(self._active)
+        self._active_size = 0
+        self._syncer.changed(self.base_dir)
+
+    def _read(self, id: str, location: _Location) -> bytes:
+        """Read and verify the record holding a value with one positioned read.
+
+        Raises:
+            StorageError: If the record fails its checksum.
+        """
+        fd = self._readers.get(location.segment)
+        if fd is None:
+            fd = os.open(self._segment_path(location.segment), os.O_RDONLY)
+            self._readers[location.segment] = fd
+        start = location.offset - HEADER.size - len(id.encode())
+        record = os.pread(fd, location.offset + location.length - start, start)
+        if not checksum_ok(record, 0, len(record)):
+            raise StorageError(f"Corrupt record for item '{id}'")
+        return record[-location.length :] if location.length else b""
+
+    def _maybe_compact(self) -> None:
+        ratio = self.auto_compact_ratio
+        if ratio is None or self._total_bytes == 0:
+            return
+        dead = self._total_bytes - self._live_bytes
+        if dead / self._total_bytes >= ratio:
+            self.compact_in_background()
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item.
+
+        Args:
+            id: Unique identifier for the item.
+            content: Content of the item.
+
+        Raises:
+            ItemExistsError: If an item with the same ID already exists.
+        """
+        with self._lock:
+            if id in self._index:
+                raise ItemExistsError(id)
+            location = self._append(OP_PUT, id, content)
+            self._index[id] = location
+            self._live_bytes += self._record_size(id, location)
+
+    def list(self) -> list[str]:
+        """List all item IDs.
+
+        Returns:
+            List of item IDs sorted alphabetically.
+        """
+        with self._lock:
+            return sorted(self._index)
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order.
+
+        The index lives in memory, so only the matching IDs are sorted.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Returns:
+            Iterator over the matching item IDs in ascending order.
+        """
+        lower = lower_bound(prefix, start)
+        with self._lock:
+            ids = sorted(
+                id for id in self._index if id >= lower and id.startswith(prefix)
+            )
+        return iter(ids)
+
+    def delete(self, id: str) -> None:
+        """Delete an item.
+
+        Args:
+            id: Identifier of the item to delete.
+
+        Raises:
+            ItemNotFoundError: If the item does not exist.
+        """
+        with self._lock:
+            location = self._index.pop(id, None)
+            if location is None:
+                raise ItemNotFoundError(id)
+            self._append(OP_DELETE, id)
+            self._live_bytes -= self._record_size(id, location)
+        self._maybe_compact()
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists.
+
+        Args:
+            id: Identifier to check.
+
+        Returns:
+            True if item exists, False otherwise.
+        """
+        return id in self._index
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Content of the item, or None if not found.
+
+        Raises:
+            StorageError: If the stored record is corrupt.
+        """
+        with self._lock:
+            location = self._index.get(id)
+            if location is None:
+                return None
+            return decode(self._read(id, location))
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items with a single append.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: If any ID already exists or is repeated in the batch.
+        """
+        batch = list(items)
+        with self._lock:
+            ensure_absent((id for id, _ in batch), self._index)
+            if not batch:
+                return
+            records = [(OP_PUT, id, content) for id, content in batch]
+            for (id, _), location in zip(batch, self._append_many(records, batch=True)):
+                self._index[id] = location
+                self._live_bytes += self._record_size(id, location)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+
+        Raises:
+            StorageError: If a stored record is corrupt.
+        """
+        return {id: self.get(id) for id in ids}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items with a single append of tombstones.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: If any ID does not exist or is repeated in the batch.
+        """
+        ids = list(ids)
+        with self._lock:
+            ensure_present(ids, self._index)
+            if not ids:
+                return
+            self._append_many([(OP_DELETE, id, "") for id in ids], batch=True)
+            for id in ids:
+                self._live_bytes -= self._record_size(id, self._index.pop(id))
+        self._maybe_compact()
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        return {id: id in self._index for id in ids}
+
+    def compact(self) -> int:
+        """Rewrite the sealed segments keeping only live records.
+
+        The active segment is sealed first so that all existing records are
+        covered. Writes made while the merge runs go to the new active
+        segment and are left untouched.
+
+        Returns:
+            Number of bytes reclaimed.
+        """
+        with self._lock:
+            if self._active_size:
+                self._rotate()
+            last = self._active - 1
+            live = {id: loc for id, loc in self._index.items() if loc.segment <= last}
+            sealed = [s for s in self._segments() if s <= last]
+        if not sealed:
+            return 0
+
+        sealed_bytes = sum(self._segment_path(s).stat().st_size for s in sealed)
+        tmp_path = self.base_dir / f"{last:08d}.merge.tmp"
+        moved: dict[str, _Location] = {}
+        offset = 0
+        with open(tmp_path, "wb") as out:
+            for id, location in sorted(live.items(), key=lambda kv: kv[1]):
+                with self._lock:
+                    value = self._read(id, location)
+                key = id.encode()
+                out.write(encode_record(OP_PUT, key, value))
+                moved[id] = _Location(last, offset + HEADER.size + len(key), len(value))
+                offset += HEADER.size + len(key) + len(value)
+            out.flush()
+            os.fsync(out.fileno())
+        merged = self.base_dir / f"{last:08d}.merge"
+        os.rename(tmp_path, merged)
+
+        with self._lock:
+            for segment in sealed:
+                fd = self._readers.pop(segment, None)
+                if fd is not None:
+                    os.close(fd)
+                self._segment_path(segment).unlink()
+            os.rename(merged, self._segment_path(last))
+            for id, location in moved.items():
+                if self._index.get(id) == live[id]:
+                    self._index[id] = location
+            self._total_bytes -= sealed_bytes - offset
+        return sealed_bytes - offset
+
+    def compact_in_background(self) -> threading.Thread:
+        """Run compact() on a background thread unless one is running.
+
+        Returns:
+            The thread running the compaction.
+        """
+        with self._lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(
+                    target=self.compact, name="typ-tmpl-compact", daemon=True
+                )
+                self._compaction.start()
+            return self._compaction
+
+    def close(self) -> None:
+        """Wait for background compaction, sync and release file handles."""
+        if self._compaction is not None:
+            self._compaction.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._syncer.commit()
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+            os.close(self._active_fd)
+            os.close(self._lock_fd)
@@ -0,0 +1,413 @@
+"""Persistent manifest of item IDs for filesystem storage."""
+
+import fcntl
+import heapq
+import json
+import os
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from typ_tmpl.storage.ranges import id_range, lower_bound
+
+# Journal size after which it is folded back into the sorted base file.
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Below this span, seeking in the base file switches to a linear scan.
+_SEEK_LINEAR_BYTES = 8 * 1024
+
+
+@dataclass
+class ManifestChange:
+    """IDs added or removed by a single storage operation."""
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _State:
+    """Replayed manifest contents.
+
+    The base file is held open so its IDs can be streamed from the version
+    that was current when the journal was replayed.
+    """
+
+    base: BinaryIO
+    body_offset: int
+    added: set[str]
+    removed: set[str]
+    mtimes: dict[str, int]
+
+    def merged(self, lower: str = "") -> Iterator[str]:
+        """Yield the current IDs from lower onwards in sorted order."""
+        _seek(self.base, self.body_offset, lower.encode())
+        base: Iterator[str] = (line[:-1].decode() for line in self.base)
+        if not self.added and not self.removed:
+            return base
+        changed = self.added | self.removed
+        base = (i for i in base if i not in changed)
+        added = sorted(i for i in self.added if i >= lower)
+        return heapq.merge(base, added)
+
+
+def _seek(f: BinaryIO, begin: int, key: bytes) -> None:
+    """Position f at a line boundary shortly before the first line >= key.
+
+    The lines from begin onwards must be sorted. Binary search narrows the
+    range down to a few kilobytes, which the caller then scans linearly.
+    """
+    lo, hi = begin, f.seek(0, os.SEEK_END)
+    while hi - lo > _SEEK_LINEAR_BYTES:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()
+        line = f.readline()
+        if line and line[:-1] < key:
+            lo = mid
+        else:
+            hi = mid
+    f.seek(lo)
+    if lo > begin:
+        f.readline()
+
+
+class Manifest:
+    """Sorted on-disk list of item IDs, updated incrementally.
+
+    The base file holds the sorted IDs written by the last rebuild or
+    compaction, headed by the mtimes of the watched directories. The journal
+    records every add and delete since then together with the directory
+    mtimes before and after the operation. If the recorded mtimes do not chain
+    up to the current ones, something changed the directories behind our back
+    and the manifest is rebuilt from a fresh scan.
+
+    Updates may run concurrently from several threads. Overlapping updates
+    form a group whose directory mtimes are captured before the first one
+    starts and after the last one ends, so the chain stays intact.
+
+    Across processes, writers hold an exclusive lock on the lock file for
+    the whole of a group, a rebuild or a compaction, so each group's mtimes
+    are not disturbed by another process. Readers take no lock: the base
+    file is replaced atomically and a torn journal line is ignored, and a
+    reader that finds the manifest stale waits for the lock and loads it
+    again before deciding to rebuild.
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        root: Path,
+        scan: Callable[[], Iterable[str]],
+        watched: Callable[[], Iterable[Path]],
+        on_rebuild: Callable[[list[str]], None] | None = None,
+    ) -> None:
+        """Initialize the manifest.
+
+        Args:
+            index_dir: Directory holding the manifest files.
+            root: Directory the watched paths are recorded relative to.
+            scan: Returns every item ID by scanning the storage directories.
+            watched: Returns the directories whose mtimes guard the manifest.
+            on_rebuild: Called with the scanned IDs after every rebuild, so
+                        derived indexes can resynchronize.
+        """
+        self.root = root
+        self.base_path = index_dir / "manifest"
+        self.journal_path = index_dir / "manifest.log"
+        self.lock_path = index_dir / "manifest.lock"
+        self._scan = scan
+        self._watched = watched
+        self._on_rebuild = on_rebuild
+        self._lock = threading.RLock()
+        self._active = 0
+        self._group: set[Path] = set()
+        self._before: dict[str, int] = {}
+        self._failed = False
+        self._lock_fd: int | None = None
+        self._lock_depth = 0
+        self._journal_fd: int | None = None
+
+    def _acquire(self) -> None:
+        """Take the inter-process write lock, or nest in this process's hold.
+
+        Must be called with self._lock held.
+        """
+        if self._lock_depth == 0:
+            if self._lock_fd is None:
+                self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+                self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self._lock_depth += 1
+
+    def _release(self) -> None:
+        """Drop one hold of the inter-process write lock.
+
+        Must be called with self._lock held.
+        """
+        self._lock_depth -= 1
+        if self._lock_depth == 0 and self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Hold both the thread lock and the inter-process write lock."""
+        with self._lock:
+            self._acquire()
+            try:
+                yield
+            finally:
+                self._release()
+
+    def _key(self, directory: Path) -> str:
+        return os.path.relpath(directory, self.root)
+
+    def _mtimes(self, dirs: Iterable[Path]) -> dict[str, int]:
+        mtimes = {}
+        for directory in dirs:
+            try:
+                mtimes[self._key(directory)] = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return mtimes
+
+    def _load(self) -> _State | None:
+        """Replay base file and journal, or None if they are missing or stale.
+
+        The returned state holds the base file open; the caller closes it.
+        """
+        try:
+            base = open(self.base_path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            header = base.readline()
+            mtimes = json.loads(header)
+        except ValueError:
+            base.close()
+            return None
+        state = _State(
+            base=base,
+            body_offset=len(header),
+            added=set(),
+            removed=set(),
+            mtimes=mtimes,
+        )
+        try:
+            journal = self.journal_path.read_text().split("\n")
+        except FileNotFoundError:
+            journal = [""]
+        # The last element is empty unless a writer is midway through
+        # appending; its unfinished line is not part of the manifest yet.
+        journal.pop()
+        valid = all(self._replay(state, line) for line in journal)
+        if not valid or state.mtimes != self._mtimes(self._watched()):
+            base.close()
+            return None
+        return state
+
+    @staticmethod
+    def _replay(state: _State, line: str) -> bool:
+        """Apply one journal line, returning False if the chain is broken."""
+        op, _, rest = line.partition("\t")
+        if op == "+":
+            state.removed.discard(rest)
+            state.added.add(rest)
+        elif op == "-":
+            state.added.discard(rest)
+            state.removed.add(rest)
+        elif op == "=":
+            try:
+                key, before, after = rest.rsplit("\t", 2)
+                if state.mtimes.get(key, -1) != int(before):
+                    return False
+                state.mtimes[key] = int(after)
+            except ValueError:
+                return False
+        else:
+            return False
+        return True
+
+    def _write_base(self, ids: Iterable[str], mtimes: dict[str, int]) -> None:
+        tmp_path = self.base_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(mtimes))
+            f.write("\n")
+            for item_id in ids:
+                f.write(item_id)
+                f.write("\n")
+        # The old journal goes first, so no reader pairs it with the new base.
+        self.journal_path.unlink(missing_ok=True)
+        os.replace(tmp_path, self.base_path)
+
+    def rebuild(self) -> list[str]:
+        """Rebuild the manifest from a full directory scan.
+
+        Returns:
+            Sorted list of item IDs.
+        """
+        with self._writing():
+            self.base_path.parent.mkdir(parents=True, exist_ok=True)
+            mtimes = self._mtimes(self._watched())
+            ids = sorted(self._scan())
+            self._write_base(ids, mtimes)
+            if self._on_rebuild is not None:
+                self._on_rebuild(ids)
+            return ids
+
+    def _load_or_rebuild(self) -> tuple[_State | None, list[str]]:
+        """Load the manifest, rebuilding it if it is still stale under the lock.
+
+        Returns:
+            The loaded state, or None and the IDs of a rebuild.
+        """
+        state = self._load()
+        if state is not None:
+            return state, []
+        with self._writing():
+            # Another process may have been midway through an update.
+            state = self._load()
+            if state is not None:
+                return state, []
+            return None, self.rebuild()
+
+    def refresh(self) -> None:
+        """Rebuild the manifest if the directories changed behind its back."""
+        state, _ = self._load_or_rebuild()
+        if state is not None:
+            state.base.close()
+
+    def ids(self) -> list[str]:
+        """Return all item IDs in sorted order.
+
+        Returns:
+            Sorted list of item IDs.
+        """
+        return list(self.iter_ids())
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Stream item IDs in sorted order.
+
+        The base file is searched for the lower bound and read line by line,
+        so memory use does not grow with the number of IDs unless the
+        manifest has to be rebuilt.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        state, rebuilt = self._load_or_rebuild()
+        if state is None:
+            yield from id_range(rebuilt, prefix, start)
+            return
+        with state.base:
+            yield from id_range(state.merged(lower_bound(prefix, start)), prefix, start)
+
+    @contextmanager
+    def update(self, *dirs: Path) -> Iterator[ManifestChange]:
+        """Record the IDs changed by an operation on the given directories.
+
+        The directory mtimes are captured around the body so the journal
+        entry only vouches for changes made inside it. If the body raises,
+        the mtimes of its group are not recorded and the next read rebuilds
+        from a scan.
+
+        Args:
+            dirs: Directories the operation creates or removes files in.
+
+        Yields:
+            Change object the caller fills in with added and removed IDs.
+        """
+        with self._lock:
+            if not self._active:
+                self._acquire()
+                self._group.clear()
+                self._before.clear()
+                self._failed = False
+            joined = [d for d in dirs if d not in self._group]
+            self._before.update(self._mtimes(joined))
+            self._group.update(joined)
+            self._active += 1
+        change = ManifestChange()
+        try:
+            yield change
+        except BaseException:
+            with self._lock:
+                self._active -= 1
+                self._failed = True
+                if not self._active:
+                    self._release()
+            raise
+        with self._lock:
+            try:
+                self._active -= 1
+                self._append(change)
+            finally:
+                if not self._active:
+                    self._release()
+
+    def _append(self, change: ManifestChange) -> None:
+        """Journal a finished update, closing its group if it was the last.
+
+        Must be called with self._lock and the write lock held.
+        """
+        lines = [f"+\t{item_id}\n" for item_id in change.added]
+        lines += [f"-\t{item_id}\n" for item_id in change.removed]
+        if not self._active and not self._failed:
+            for key, mtime in self._mtimes(self._group).items():
+                before = self._before.get(key, -1)
+                lines.append(f"=\t{key}\t{before}\t{mtime}\n")
+        if not self.base_path.exists():
+            return
+        fd = self._journal()
+        # One write of whole lines, so readers see all of it or a torn tail.
+        data = memoryview("".join(lines).encode())
+        while data:
+            data = data[os.write(fd, data) :]
+        size = os.fstat(fd).st_size
+        if not self._active and size > JOURNAL_COMPACT_BYTES:
+            self.compact()
+
+    def _journal(self) -> int:
+        """Get a descriptor appending to the current journal.
+
+        The descriptor is kept between updates. Rebuilds and compactions
+        unlink the journal they fold in, so one whose file is gone is
+        reopened. Must be called with the write lock held, which every
+        process replacing the journal also holds.
+        """
+        fd = self._journal_fd
+        if fd is not None:
+            if os.fstat(fd).st_nlink:
+                return fd
+            os.close(fd)
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        fd = self._journal_fd = os.open(self.journal_path, flags, 0o644)
+        return fd
+
+    def close(self) -> None:
+        """Release the lock file and the journal."""
+        with self._lock:
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+                self._journal_fd = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+                self._lock_depth = 0
+
+    def compact(self) -> None:
+        """Fold the journal into the sorted base file."""
+        with self._writing():
+            state = self._load()
+            if state is None:
+                self.rebuild()
+                return
+            with state.base:
+                self._write_base(state.merged(), state.mtimes)
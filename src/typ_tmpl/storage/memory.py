@@ -0,0 +1,311 @@
+"""In-memory storage implementation."""
+
+import fcntl
+import os
+import threading
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError, StorageError
+from typ_tmpl.storage.batch import ensure_absent, ensure_present
+from typ_tmpl.storage.compression import Codec
+from typ_tmpl.storage.durability import Durability, Syncer
+from typ_tmpl.storage.ranges import lower_bound
+from typ_tmpl.storage.records import OP_DELETE, OP_PUT, Record, encode_record, scan
+
+WAL_NAME = "wal.log"
+SNAPSHOT_NAME = "items.snap"
+
+# Log size after which the items are snapshotted and the log emptied.
+DEFAULT_CHECKPOINT_BYTES = 16 * 1024 * 1024
+
+
+def _record(op: int, id: str, content: str = "") -> bytes:
+    return encode_record(op, id.encode(), content.encode())
+
+
+class MemoryStorage:
+    """Storage keeping every item in a dict.
+
+    Operations are dict lookups and updates, with no system calls on the
+    read path. Without a directory the items live only as long as the
+    instance. With one, every change is appended to a write-ahead log
+    before it is applied, and once the log grows past checkpoint_bytes the
+    items are written to a snapshot file and the log is emptied. Opening
+    the directory loads the snapshot and replays the log after it.
+
+    The directory is locked for the lifetime of the instance, so only one
+    process uses a store at a time.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path | None = None,
+        checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES,
+        codec: Codec = Codec.NONE,
+        durability: Durability = Durability.BATCH,
+    ) -> None:
+        """Initialize in-memory storage.
+
+        Args:
+            base_dir: Directory for the log and snapshot, or None to keep
+                      items only in memory.
+            checkpoint_bytes: Log size after which a snapshot is written.
+            codec: Codec for large items in the snapshot file.
+            durability: When log records are synced to disk. Records torn
+                        by a crash fail their checksum and are dropped on
+                        the next open.
+
+        Raises:
+            StorageError: If the snapshot file is corrupt, or another
+                          process has the directory open.
+        """
+        self.base_dir = base_dir
+        self.checkpoint_bytes = checkpoint_bytes
+        self.codec = codec
+        self._syncer = Syncer(durability)
+        self._items: dict[str, str] = {}
+        # Sorted IDs, rebuilt on the first listing after a change.
+        self._sorted: list[str] | None = None
+        self._lock = threading.RLock()
+        self._wal_fd = -1
+        self._wal_size = 0
+        if base_dir is None:
+            return
+
+        base_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(base_dir / "LOCK", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            raise StorageError(
+                f"Memory store {base_dir} is in use by another process"
+            ) from None
+        self._load_snapshot(base_dir / SNAPSHOT_NAME)
+        self._replay(base_dir / WAL_NAME)
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        self._wal_fd = os.open(base_dir / WAL_NAME, flags, 0o644)
+
+    def _load_snapshot(self, path: Path) -> None:
+        """Load the items of the last checkpoint."""
+        from typ_tmpl.storage.snapshot import SnapshotStorage
+
+        if not path.exists():
+            return
+        snapshot = SnapshotStorage(path)
+        try:
+            self._items = dict(snapshot.iter_items())
+        finally:
+            snapshot.close()
+
+    def _replay(self, path: Path) -> None:
+        """Apply the log to the loaded items, truncating a torn tail."""
+        if not path.exists():
+            return
+
+        def apply(record: Record) -> None:
+            # Records already in the snapshot of an interrupted checkpoint
+            # replay to the same state.
+            if record.op == OP_PUT:
+                self._items[record.key] = record.value.decode()
+            else:
+                self._items.pop(record.key, None)
+
+        self._wal_size = scan(path, apply)
+
+    def _log(self, records: list[bytes], batch: bool = False) -> None:
+        """Append records to the log with a single write.
+
+        Args:
+            records: Encoded records.
+            batch: The records come from a batch call, which batch
+                   durability syncs right away.
+        """
+        if self.base_dir is None:
+            return
+        data = b"".join(records)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._wal_fd, view) :]
+        self._wal_size += len(data)
+        self._syncer.changed(self.base_dir / WAL_NAME, batch=batch)
+
+    def _changed(self) -> None:
+        """Invalidate the sorted IDs and checkpoint if the log is large."""
+        self._sorted = None
+        if self._wal_size >= self.checkpoint_bytes:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write every item to the snapshot file and empty the log.
+
+        Does nothing for storage without a directory.
+        """
+        from typ_tmpl.storage.snapshot import write_snapshot
+
+        if self.base_dir is None:
+            return
+        with self._lock:
+            write_snapshot(self, self.base_dir / SNAPSHOT_NAME, self.codec)
+            os.ftruncate(self._wal_fd, 0)
+            os.fsync(self._wal_fd)
+            self._wal_size = 0
+
+    def _sorted_ids(self) -> list[str]:
+        ids = self._sorted
+        if ids is None:
+            ids = self._sorted = sorted(self._items)
+        return ids
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item.
+
+        Args:
+            id: Unique identifier for the item.
+            content: Content of the item.
+
+        Raises:
+            ItemExistsError: If an item with this ID already exists.
+        """
+        with self._lock:
+            if id in self._items:
+                raise ItemExistsError(id)
+            self._log([_record(OP_PUT, id, content)])
+            self._items[id] = content
+            self._changed()
+
+    def list(self) -> list[str]:
+        """List all item IDs.
+
+        Returns:
+            List of item IDs sorted alphabetically.
+        """
+        return list(self._sorted_ids())
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order.
+
+        The sorted IDs are kept between changes, so the range is found by
+        binary search.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        ids = self._sorted_ids()
+        for i in range(bisect_left(ids, lower_bound(prefix, start)), len(ids)):
+            if not ids[i].startswith(prefix):
+                return
+            yield ids[i]
+
+    def delete(self, id: str) -> None:
+        """Delete an item.
+
+        Args:
+            id: Identifier of the item to delete.
+
+        Raises:
+            ItemNotFoundError: If the item does not exist.
+        """
+        with self._lock:
+            if id not in self._items:
+                raise ItemNotFoundError(id)
+            self._log([_record(OP_DELETE, id)])
+            del self._items[id]
+            self._changed()
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists.
+
+        Args:
+            id: Identifier to check.
+
+        Returns:
+            True if item exists, False otherwise.
+        """
+        return id in self._items
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Content of the item, or None if not found.
+        """
+        return self._items.get(id)
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items with a single log write.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: If any ID already exists or is repeated; nothing is
+                        added.
+        """
+        batch = list(items)
+        with self._lock:
+            ensure_absent((id for id, _ in batch), self._items)
+            self._log([_record(OP_PUT, id, content) for id, content in batch], True)
+            self._items.update(batch)
+            self._changed()
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+        """
+        items = self._items
+        return {id: items.get(id) for id in ids}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items with a single log write.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: If any ID does not exist or is repeated; nothing is
+                        deleted.
+        """
+        ids = list(ids)
+        with self._lock:
+            ensure_present(ids, self._items)
+            self._log([_record(OP_DELETE, id) for id in ids], True)
+            for id in ids:
+                del self._items[id]
+            self._changed()
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        items = self._items
+        return {id: id in items for id in ids}
+
+    def close(self) -> None:
+        """Sync the log and release the directory."""
+        with self._lock:
+            if self._wal_fd < 0:
+                return
+            self._syncer.commit()
+            os.close(self._wal_fd)
+            self._wal_fd = -1
+            os.close(self._lock_fd)
@@ -0,0 +1,252 @@
+"""SQLite index of item sizes and timestamps."""
+
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import ItemMeta
+from typ_tmpl.storage.ranges import lower_bound
+
+# One index per sort key, each ending in the ID so that ties are ordered
+# and top-k queries are answered by walking the first k index entries.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    modified REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS meta_size ON meta (size, id);
+CREATE INDEX IF NOT EXISTS meta_created ON meta (created, id);
+CREATE INDEX IF NOT EXISTS meta_modified ON meta (modified, id);
+"""
+_HAS_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meta'"
+_UPSERT = (
+    "INSERT OR REPLACE INTO meta (id, size, created, modified) VALUES (?, ?, ?, ?)"
+)
+_DELETE = "DELETE FROM meta WHERE id = ?"
+_SELECT_PAGE = (
+    "SELECT id, size, created, modified FROM meta WHERE id >= ? ORDER BY id LIMIT ?"
+)
+# Rescans keep the creation time of items the index already knows.
+_SCAN_TABLE = (
+    "CREATE TEMP TABLE scan ("
+    "id TEXT PRIMARY KEY, size INTEGER, created REAL, modified REAL) WITHOUT ROWID"
+)
+_SCAN_INSERT = "INSERT OR REPLACE INTO scan VALUES (?, ?, ?, ?)"
+_SCAN_DROP_MISSING = "DELETE FROM meta WHERE id NOT IN (SELECT id FROM scan)"
+_SCAN_MERGE = """
+INSERT INTO meta (id, size, created, modified)
+SELECT id, size, created, modified FROM scan WHERE true
+ON CONFLICT (id) DO UPDATE SET size = excluded.size, modified = excluded.modified
+"""
+
+# Rows fetched per query when iterating in ID order.
+PAGE_SIZE = 1000
+
+# Sort keys accepted by top_metadata() and the columns they order by.
+SORT_COLUMNS = {
+    "id": "id",
+    "size": "size",
+    "created": "created",
+    "mtime": "modified",
+}
+
+
+def top_query(table: str, key: str, descending: bool, prefix: bool) -> str:
+    """Build the statement for a top-k metadata query.
+
+    Args:
+        table: Table holding id, size, created and modified columns.
+        key: Sort key from SORT_COLUMNS.
+        descending: Order from the largest value.
+        prefix: Whether the statement filters on an ID prefix. The statement
+                then takes the prefix length and the prefix, followed by the
+                limit; otherwise only the limit.
+
+    Returns:
+        SQL text.
+
+    Raises:
+        StorageError: If the key is unknown.
+    """
+    try:
+        column = SORT_COLUMNS[key]
+    except KeyError:
+        raise StorageError(f"Unknown sort key '{key}'") from None
+    direction = "DESC" if descending else "ASC"
+    where = "WHERE substr(id, 1, ?) = ? " if prefix else ""
+    order = f"{column} {direction}" + (f", id {direction}" if column != "id" else "")
+    return (
+        f"SELECT id, size, created, modified FROM {table} {where}"
+        f"ORDER BY {order} LIMIT ?"
+    )
+
+
+class MetadataIndex:
+    """Index of item metadata in a SQLite table.
+
+    Each sort key has its own B-tree index, so "largest N" or "oldest N"
+    reads N index entries instead of looking at every item.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """Create the index tables on a connection if they are missing.
+
+        Args:
+            conn: Connection in autocommit mode.
+        """
+        self._conn = conn
+        self._lock = threading.Lock()
+        with self._lock:
+            self.is_new = conn.execute(_HAS_TABLE).fetchone() is None
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path) -> "MetadataIndex":
+        """Open a standalone index database.
+
+        Args:
+            path: Database file path.
+
+        Returns:
+            Index backed by its own connection.
+        """
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return cls(conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the body in one write transaction, rolling back on error."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def put_many(self, entries: Iterable[ItemMeta]) -> None:
+        """Insert or replace the metadata of several items.
+
+        Args:
+            entries: Metadata to store.
+        """
+        with self._transaction() as conn:
+            conn.executemany(_UPSERT, entries)
+
+    def remove_many(self, ids: Iterable[str]) -> None:
+        """Forget the metadata of several items.
+
+        Args:
+            ids: Identifiers of the items.
+        """
+        with self._transaction() as conn:
+            conn.executemany(_DELETE, ((id,) for id in ids))
+
+    def reconcile(self, entries: Iterable[ItemMeta]) -> None:
+        """Replace the index contents with the result of a full scan.
+
+        Items the index already knows keep their recorded creation time.
+
+        Args:
+            entries: Metadata of every item currently stored.
+        """
+        with self._transaction() as conn:
+            conn.execute(_SCAN_TABLE)
+            try:
+                conn.executemany(_SCAN_INSERT, entries)
+                conn.execute(_SCAN_DROP_MISSING)
+                conn.execute(_SCAN_MERGE)
+            finally:
+                conn.execute("DROP TABLE temp.scan")
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order.
+
+        Args:
+            prefix: Only yield items whose ID starts with this prefix.
+            start: Only yield items whose ID sorts at or after this one.
+
+        Yields:
+            Metadata of the matching items.
+        """
+        lower = lower_bound(prefix, start)
+        while True:
+            # Fetch in pages so that no cursor stays open across yields.
+            with self._lock:
+                rows = self._conn.execute(_SELECT_PAGE, (lower, PAGE_SIZE)).fetchall()
+            for row in rows:
+                if not row[0].startswith(prefix):
+                    return
+                yield ItemMeta(*row)
+            if len(rows) < PAGE_SIZE:
+                return
+            lower = rows[-1][0] + "\0"
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field.
+
+        Args:
+            key: Field to order by: "id", "size", "created" or "mtime".
+            limit: Maximum number of items to return, or None for all.
+            descending: Return the largest values first.
+            prefix: Only include items whose ID starts with this prefix.
+
+        Returns:
+            Metadata of up to limit items in the requested order.
+
+        Raises:
+            StorageError: If the key is unknown.
+        """
+        with self._lock:
+            return top_metadata(self._conn, "meta", key, limit, descending, prefix)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._conn.close()
+
+
+def top_metadata(
+    conn: sqlite3.Connection,
+    table: str,
+    key: str,
+    limit: int | None,
+    descending: bool,
+    prefix: str,
+) -> Sequence[ItemMeta]:
+    """Run a top-k metadata query against a table.
+
+    Args:
+        conn: Connection holding the table.
+        table: Table holding id, size, created and modified columns.
+        key: Sort key from SORT_COLUMNS.
+        limit: Maximum number of rows, or None for all.
+        descending: Order from the largest value.
+        prefix: Only include IDs starting with this prefix.
+
+    Returns:
+        Metadata rows in the requested order.
+
+    Raises:
+        StorageError: If the key is unknown.
+    """
+    sql = top_query(table, key, descending, bool(prefix))
+    params: tuple[object, ...] = (-1 if limit is None else limit,)
+    if prefix:
+        params = (len(prefix), prefix, *params)
+    return [ItemMeta(*row) for row in conn.execute(sql, params)]
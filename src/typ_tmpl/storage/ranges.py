@@ -0,0 +1,41 @@
+"""Helpers for prefix and range queries over sorted item IDs."""
+
+from collections.abc import Iterable, Iterator
+
+
+def lower_bound(prefix: str, start: str | None) -> str:
+    """Get the smallest ID a query with the given filters can match.
+
+    Args:
+        prefix: Required ID prefix.
+        start: Inclusive lower bound, if any.
+
+    Returns:
+        The larger of the prefix and the start ID.
+    """
+    return max(prefix, start or "")
+
+
+def id_range(
+    ids: Iterable[str], prefix: str = "", start: str | None = None
+) -> Iterator[str]:
+    """Filter sorted IDs by prefix and lower bound.
+
+    IDs sharing a prefix are contiguous in sorted order, so iteration stops
+    at the first ID past the matching range.
+
+    Args:
+        ids: IDs in ascending order.
+        prefix: Only yield IDs starting with this prefix.
+        start: Only yield IDs greater than or equal to this one.
+
+    Yields:
+        Matching IDs in ascending order.
+    """
+    lower = lower_bound(prefix, start)
+    for id in ids:
+        if id < lower:
+            continue
+        if not id.startswith(prefix):
+            return
+        yield id
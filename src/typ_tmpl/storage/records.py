@@ -0,0 +1,92 @@
+"""Checksummed record format of the append-only log files."""
+
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from typ_tmpl.errors import StorageError
+
+# Record header: crc32 of the rest of the record, op, key length, value length.
+HEADER = struct.Struct("<IBII")
+OP_PUT = 1
+OP_DELETE = 2
+
+
+class Record(NamedTuple):
+    """A record found by scan(), valid only while its callback runs."""
+
+    op: int
+    key: str
+    offset: int
+    value_offset: int
+    end: int
+    data: mmap.mmap
+
+    @property
+    def value(self) -> bytes:
+        """Copy the value out of the mapped file."""
+        return self.data[self.value_offset : self.end]
+
+
+def encode_record(op: int, key: bytes, value: bytes) -> bytes:
+    """Encode one record.
+
+    Args:
+        op: OP_PUT or OP_DELETE.
+        key: Encoded item ID.
+        value: Encoded content, empty for deletes.
+
+    Returns:
+        The header followed by the key and value.
+    """
+    body = HEADER.pack(0, op, len(key), len(value))[4:] + key + value
+    return struct.pack("<I", zlib.crc32(body)) + body
+
+
+def checksum_ok(record: bytes | mmap.mmap, start: int, end: int) -> bool:
+    """Check the crc32 of the record spanning start to end."""
+    (crc,) = struct.unpack_from("<I", record, start)
+    return bool(crc == zlib.crc32(memoryview(record)[start + 4 : end]))
+
+
+def scan(path: Path, apply: Callable[[Record], None], truncate: bool = True) -> int:
+    """Pass every intact record of a log file to apply, in order.
+
+    A crash midway through an append leaves a torn record at the end of
+    the file, which fails its checksum. Scanning stops there.
+
+    Args:
+        path: Log file to read.
+        apply: Called with each record.
+        truncate: Cut the file after the last intact record. Otherwise a
+                  damaged record is an error.
+
+    Returns:
+        Size of the intact records, which is the file size afterwards.
+
+    Raises:
+        StorageError: If a record is damaged and truncate is False.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return 0
+    offset = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as m:
+        while offset + HEADER.size <= size:
+            _, op, key_len, value_len = HEADER.unpack_from(m, offset)
+            end = offset + HEADER.size + key_len + value_len
+            if end > size or not checksum_ok(m, offset, end):
+                break
+            key_start = offset + HEADER.size
+            key = m[key_start : key_start + key_len].decode()
+            apply(Record(op, key, offset, key_start + key_len, end, m))
+            offset = end
+    if offset < size:
+        if not truncate:
+            raise StorageError(f"Corrupt record in {path} at offset {offset}")
+        os.truncate(path, offset)
+    return offset
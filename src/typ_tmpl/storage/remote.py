@@ -0,0 +1,269 @@
+"""Storage client talking to a typ-tmpl daemon."""
+
+import base64
+import io
+import json
+import socket
+from collections.abc import Buffer, Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from typ_tmpl.daemon import ID_PAGE_SIZE, STREAM_CHUNK, decode_error
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import FilterStats, ItemMeta, SearchHit
+
+
+class RemoteStorage:
+    """Storage implementation forwarding every call to a running daemon.
+
+    version() is not forwarded: the daemon validates its own cache against
+    item versions, and clients do not cache.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Connect to a daemon.
+
+        Args:
+            path: Socket path of the daemon.
+
+        Raises:
+            OSError: If no daemon is listening on the socket.
+        """
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(str(path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+
+    @classmethod
+    def connect(cls, path: Path) -> "RemoteStorage | None":
+        """Connect to a daemon if one is running.
+
+        Args:
+            path: Socket path of the daemon.
+
+        Returns:
+            Connected storage, or None if no daemon is listening.
+        """
+        if not path.exists():
+            return None
+        try:
+            return cls(path)
+        except OSError:
+            return None
+
+    def _call(self, method: str, *args: Any) -> Any:
+        """Send one request and wait for its response.
+
+        Raises:
+            AppError: The error raised by the daemon's storage.
+            StorageError: If the daemon went away.
+        """
+        request = json.dumps({"method": method, "args": args})
+        try:
+            self._file.write(request.encode() + b"\n")
+            self._file.flush()
+        except OSError as e:
+            raise StorageError(f"Lost connection to daemon: {e}") from None
+        return self._receive()["result"]
+
+    def _receive(self) -> dict[str, Any]:
+        """Wait for the next response.
+
+        Raises:
+            AppError: The error raised by the daemon's storage.
+            StorageError: If the daemon went away.
+        """
+        try:
+            line = self._file.readline()
+        except OSError as e:
+            raise StorageError(f"Lost connection to daemon: {e}") from None
+        if not line:
+            raise StorageError("Daemon closed the connection")
+        response: dict[str, Any] = json.loads(line)
+        if "error" in response:
+            raise decode_error(response["error"])
+        return response
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item."""
+        self._call("add", id, content)
+
+    def list(self) -> list[str]:
+        """List all item IDs."""
+        result: list[str] = self._call("list")
+        return result
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order, fetching them in pages."""
+        while True:
+            page: list[str] = self._call("iter_ids", prefix, start, ID_PAGE_SIZE)
+            yield from page
+            if len(page) < ID_PAGE_SIZE:
+                return
+            # The smallest string greater than the last ID.
+            start = page[-1] + "\0"
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order, fetching it in pages."""
+        while True:
+            page = self._call("iter_metadata", prefix, start, ID_PAGE_SIZE)
+            for row in page:
+                yield ItemMeta(*row)
+            if len(page) < ID_PAGE_SIZE:
+                return
+            start = page[-1][0] + "\0"
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field."""
+        rows = self._call("top_metadata", key, limit, descending, prefix)
+        return [ItemMeta(*row) for row in rows]
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> Sequence[SearchHit]:
+        """Search the daemon's full-text index."""
+        rows = self._call("search", query, limit, match_all)
+        return [SearchHit(*row) for row in rows]
+
+    def delete(self, id: str) -> None:
+        """Delete an item."""
+        self._call("delete", id)
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists."""
+        return bool(self._call("exists", id))
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item."""
+        result: str | None = self._call("get", id)
+        return result
+
+    def open_stream(self, id: str) -> io.BufferedIOBase | None:
+        """Open the content of an item as a binary stream.
+
+        The content is sent over a connection of its own, a chunk at a
+        time as it is read, so other calls can be made while the stream is
+        open and memory use does not grow with the item size.
+
+        Raises:
+            StorageError: If the daemon cannot be reached.
+        """
+        try:
+            client = RemoteStorage(self.path)
+        except OSError as e:
+            raise StorageError(f"Cannot connect to daemon: {e}") from None
+        try:
+            if client._call("open_stream", id) is None:
+                client.close()
+                return None
+        except BaseException:
+            client.close()
+            raise
+        return io.BufferedReader(_ChunkReader(client), STREAM_CHUNK)
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once."""
+        self._call("add_many", list(items))
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items."""
+        result: dict[str, str | None] = self._call("get_many", list(ids))
+        return result
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once."""
+        self._call("delete_many", list(ids))
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist."""
+        result: dict[str, bool] = self._call("exists_many", list(ids))
+        return result
+
+    def compact(self) -> int:
+        """Compact the daemon's storage."""
+        return int(self._call("compact"))
+
+    def gc(self) -> int:
+        """Collect the daemon's unreferenced storage data."""
+        return int(self._call("gc"))
+
+    def filter_stats(self) -> FilterStats:
+        """Measure the daemon's membership filter."""
+        return FilterStats(*self._call("filter_stats"))
+
+    def rebuild_filter(self, capacity: int | None = None) -> FilterStats:
+        """Rebuild the daemon's membership filter."""
+        return FilterStats(*self._call("rebuild_filter", capacity))
+
+    def migrate(self, layout: str) -> int:
+        """Re-layout the daemon's storage."""
+        return int(self._call("migrate", layout))
+
+    def close(self) -> None:
+        """Disconnect from the daemon."""
+        self._file.close()
+        self._sock.close()
+
+
+class _ChunkReader(io.RawIOBase):
+    """Content of an item streamed by the daemon, received chunk by chunk."""
+
+    def __init__(self, client: RemoteStorage) -> None:
+        """Read from a connection whose open_stream request succeeded.
+
+        Args:
+            client: Connection used only for this stream. It is closed with
+                    the reader.
+        """
+        self._client = client
+        self._chunk = b""
+        self._pos = 0
+        self._done = False
+
+    def readable(self) -> bool:
+        """Whether the stream can be read."""
+        return True
+
+    def readinto(self, buffer: Buffer) -> int:
+        """Read into a buffer, receiving the next chunk when needed.
+
+        Returns:
+            Number of bytes read, 0 at the end of the content.
+
+        Raises:
+            AppError: If the daemon failed to read the content.
+        """
+        while self._pos == len(self._chunk) and not self._done:
+            try:
+                response = self._client._receive()
+            except BaseException:
+                # Nothing follows an error, so do not wait for more.
+                self._done = True
+                raise
+            if "chunk" in response:
+                self._chunk, self._pos = base64.b64decode(response["chunk"]), 0
+            else:
+                self._done = True
+        with memoryview(buffer) as out:
+            n = min(len(out), len(self._chunk) - self._pos)
+            out[:n] = self._chunk[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        """Close the connection to the daemon."""
+        if not self.closed:
+            self._client.close()
+        super().close()
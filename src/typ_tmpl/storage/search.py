@@ -0,0 +1,247 @@
+"""SQLite inverted index for ranked full-text search over item content."""
+
+import heapq
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from typ_tmpl.protocols.storage import SearchHit
+
+# Items are numbered so that each posting stores a small integer instead of
+# repeating the item ID for every distinct word it contains. Postings are
+# clustered on the term, so looking up a word reads one contiguous range.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_docs (
+    doc INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_postings (
+    term TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS search_postings_doc ON search_postings (doc);
+CREATE TABLE IF NOT EXISTS search_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO search_stats VALUES ('docs', 0), ('tokens', 0);
+"""
+_HAS_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_docs'"
+_SELECT_DOC = "SELECT doc, length FROM search_docs WHERE id = ?"
+_SELECT_IDS = "SELECT id FROM search_docs"
+_INSERT_DOC = "INSERT INTO search_docs (id, length) VALUES (?, ?)"
+_INSERT_POSTING = "INSERT INTO search_postings (term, doc, tf) VALUES (?, ?, ?)"
+_DELETE_DOC = "DELETE FROM search_docs WHERE doc = ?"
+_DELETE_POSTINGS = "DELETE FROM search_postings WHERE doc = ?"
+_UPDATE_STAT = "UPDATE search_stats SET value = value + ? WHERE name = ?"
+_SELECT_STATS = "SELECT name, value FROM search_stats"
+_SELECT_POSTINGS = """
+SELECT d.id, p.tf, d.length
+FROM search_postings p JOIN search_docs d ON d.doc = p.doc
+WHERE p.term = ?
+"""
+
+# Okapi BM25 parameters: term frequency saturation and length normalization.
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+# Only the start of each item is indexed, so tokenizing a huge item costs no
+# more time or memory than a large one.
+MAX_INDEXED_CHARS = 1 << 20
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase words.
+
+    Args:
+        text: Text to split.
+
+    Returns:
+        Words in order of appearance, case-folded, without punctuation.
+    """
+    return _WORD.findall(text.casefold())
+
+
+class SearchIndex:
+    """Inverted index mapping words to the items containing them.
+
+    Adding or removing an item touches only that item's postings, and a
+    query reads the postings of its own words, never the item contents.
+    Hits are ranked with BM25.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        """Create the index tables on a connection if they are missing.
+
+        Args:
+            conn: Connection in autocommit mode. Writes join a transaction
+                  the connection already has open.
+        """
+        self._conn = conn
+        self._lock = threading.RLock()
+        with self._lock:
+            self.is_new = conn.execute(_HAS_TABLE).fetchone() is None
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path) -> "SearchIndex":
+        """Open a standalone index database.
+
+        Args:
+            path: Database file path.
+
+        Returns:
+            Index backed by its own connection.
+        """
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return cls(conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the body in one write transaction, rolling back on error."""
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, id: str) -> tuple[int, int]:
+        """Drop one item's postings.
+
+        Returns:
+            Number of items and words removed.
+        """
+        row = conn.execute(_SELECT_DOC, (id,)).fetchone()
+        if row is None:
+            return 0, 0
+        doc, length = row
+        conn.execute(_DELETE_POSTINGS, (doc,))
+        conn.execute(_DELETE_DOC, (doc,))
+        return 1, length
+
+    @staticmethod
+    def _update_stats(conn: sqlite3.Connection, docs: int, tokens: int) -> None:
+        conn.execute(_UPDATE_STAT, (docs, "docs"))
+        conn.execute(_UPDATE_STAT, (tokens, "tokens"))
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Index the content of several items, replacing earlier entries.
+
+        Only the first MAX_INDEXED_CHARS characters of each item are indexed.
+
+        Args:
+            items: Pairs of item ID and content.
+        """
+        docs = tokens = 0
+        with self._transaction() as conn:
+            for id, content in items:
+                removed, length = self._remove(conn, id)
+                counts = Counter(tokenize(content[:MAX_INDEXED_CHARS]))
+                total = counts.total()
+                doc = conn.execute(_INSERT_DOC, (id, total)).lastrowid
+                conn.executemany(
+                    _INSERT_POSTING, ((term, doc, tf) for term, tf in counts.items())
+                )
+                docs += 1 - removed
+                tokens += total - length
+            self._update_stats(conn, docs, tokens)
+
+    def remove_many(self, ids: Iterable[str]) -> None:
+        """Forget several items.
+
+        Args:
+            ids: Identifiers of the items. Unknown IDs are ignored.
+        """
+        docs = tokens = 0
+        with self._transaction() as conn:
+            for id in ids:
+                removed, length = self._remove(conn, id)
+                docs -= removed
+                tokens -= length
+            self._update_stats(conn, docs, tokens)
+
+    def reconcile(
+        self, ids: Iterable[str], load: Callable[[list[str]], Iterable[tuple[str, str]]]
+    ) -> None:
+        """Bring the index in line with the items currently stored.
+
+        Items no longer stored are dropped and unknown items are loaded and
+        indexed. Items already indexed are not read again.
+
+        Args:
+            ids: IDs of every item currently stored.
+            load: Called with the IDs missing from the index; returns their
+                  ID and content pairs.
+        """
+        current = set(ids)
+        with self._lock:
+            indexed = {row[0] for row in self._conn.execute(_SELECT_IDS)}
+            self.remove_many(indexed - current)
+            self.add_many(load(sorted(current - indexed)))
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> list[SearchHit]:
+        """Find items containing the words of a query, most relevant first.
+
+        Args:
+            query: Words to look for.
+            limit: Maximum number of hits to return, or None for all.
+            match_all: Only return items containing every word.
+
+        Returns:
+            Matching items ordered by descending score, ties by ID.
+        """
+        terms = set(tokenize(query))
+        scores: dict[str, float] = {}
+        matched: Counter[str] = Counter()
+        with self._lock:
+            stats = dict(self._conn.execute(_SELECT_STATS).fetchall())
+            if not terms or not stats["docs"]:
+                return []
+            docs = stats["docs"]
+            average = stats["tokens"] / docs or 1.0
+            for term in terms:
+                rows = self._conn.execute(_SELECT_POSTINGS, (term,)).fetchall()
+                if not rows and match_all:
+                    return []
+                idf = math.log(1 + (docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                for id, tf, length in rows:
+                    norm = tf + K1 * (1 - B + B * length / average)
+                    scores[id] = scores.get(id, 0.0) + idf * tf * (K1 + 1) / norm
+                    matched[id] += 1
+        hits = (
+            SearchHit(id, score)
+            for id, score in scores.items()
+            if not match_all or matched[id] == len(terms)
+        )
+        if limit is None:
+            return sorted(hits, key=_rank)
+        return heapq.nsmallest(limit, hits, key=_rank)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._conn.close()
+
+
+def _rank(hit: SearchHit) -> tuple[float, str]:
+    return -hit.score, hit.id
@@ -0,0 +1,449 @@
+"""Single-file, read-only snapshots of a store."""
+
+import heapq
+import mmap
+import os
+import struct
+import time
+import zlib
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
+from io import BufferedIOBase
+from itertools import batched
+from pathlib import Path
+from typing import NamedTuple
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import ItemMeta, MetadataIndexed, Storage
+from typ_tmpl.storage.compression import DEFAULT_THRESHOLD, Codec, decode, encode
+from typ_tmpl.storage.durability import TMP_SUFFIX, fsync_path
+from typ_tmpl.storage.ranges import lower_bound
+from typ_tmpl.storage.streams import open_content
+
+# A snapshot file holds, in order: the header, the content of every item as
+# written by encode(), the UTF-8 IDs, one index entry per item in ID order,
+# and the footer locating the IDs and the index.
+MAGIC = b"TYPSNAP1"
+_HEADER = struct.Struct("<8s")
+# Content offset, content length, ID offset within the IDs, ID length,
+# crc32 of the content, created and modified timestamps.
+_ENTRY = struct.Struct("<QQQIIdd")
+# The ID offset and length fields of an entry.
+_ID_REF = struct.Struct("<QI")
+_ID_REF_OFFSET = 16
+# Number of items, offset of the IDs, offset of the index, magic.
+_FOOTER = struct.Struct("<QQQ8s")
+
+# Items read from the source store per get_many() call while exporting.
+EXPORT_BATCH = 1000
+
+# Fields of ItemMeta each top_metadata() sort key orders by.
+_SORT_FIELDS = {"id": 0, "size": 1, "created": 2, "mtime": 3}
+
+
+class _Entry(NamedTuple):
+    """Index entry of one item."""
+
+    offset: int
+    length: int
+    id_offset: int
+    id_length: int
+    crc: int
+    created: float
+    modified: float
+
+
+def write_snapshot(
+    storage: Storage,
+    path: Path,
+    codec: Codec = Codec.ZLIB,
+    compress_threshold: int = DEFAULT_THRESHOLD,
+    batch_size: int = EXPORT_BATCH,
+) -> int:
+    """Pack every item of a store into a snapshot file.
+
+    Items are read in ID order a batch at a time and their content written
+    as it is read, so only the index is held in memory. The file is written
+    under a temporary name and renamed into place once synced, so a crash
+    never leaves a partial snapshot behind.
+
+    Args:
+        storage: Store to export.
+        path: Snapshot file to write. An existing file is replaced.
+        codec: Codec for content of at least compress_threshold bytes.
+        compress_threshold: Size in bytes from which content is compressed.
+        batch_size: Items read per get_many() call.
+
+    Returns:
+        Number of items written.
+
+    Raises:
+        StorageError: If the store does not list its IDs in ascending order.
+    """
+    metas: Iterable[ItemMeta]
+    if isinstance(storage, MetadataIndexed):
+        metas = storage.iter_metadata()
+    else:
+        now = time.time()
+        metas = (ItemMeta(id, 0, now, now) for id in storage.iter_ids())
+
+    tmp = path.with_name(f".{path.name}{TMP_SUFFIX}")
+    # The index and IDs are kept packed until the content is written.
+    index = bytearray()
+    ids = bytearray()
+    count = 0
+    try:
+        with open(tmp, "wb") as out:
+            offset = out.write(_HEADER.pack(MAGIC))
+            previous = None
+            for batch in batched(metas, batch_size):
+                contents = storage.get_many(meta.id for meta in batch)
+                for meta in batch:
+                    content = contents[meta.id]
+                    if content is None:
+                        # Deleted while the export was running.
+                        continue
+                    if previous is not None and meta.id <= previous:
+                        raise StorageError(
+                            f"Store listed '{meta.id}' after '{previous}'"
+                        )
+                    previous = meta.id
+                    data = encode(content, codec, compress_threshold)
+                    id = meta.id.encode()
+                    index += _ENTRY.pack(
+                        offset,
+                        len(data),
+                        len(ids),
+                        len(id),
+                        zlib.crc32(data),
+                        meta.created,
+                        meta.modified,
+                    )
+                    ids += id
+                    offset += out.write(data)
+                    count += 1
+            out.write(ids)
+            out.write(index)
+            out.write(_FOOTER.pack(count, offset, offset + len(ids), MAGIC))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    fsync_path(path.parent)
+    return count
+
+
+class SnapshotStorage:
+    """Read-only storage backed by a snapshot file.
+
+    The file is memory-mapped and never unpacked. IDs are found by binary
+    search over the index at the end of the file, after which the content
+    of an item is read from the mapping in a single span. Every change is
+    refused with a StorageError.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open a snapshot.
+
+        Args:
+            path: Snapshot file written by write_snapshot().
+
+        Raises:
+            StorageError: If the file is missing or not a valid snapshot.
+        """
+        self.path = path
+        try:
+            self._file = open(path, "rb")
+        except OSError as e:
+            raise StorageError(f"Cannot open snapshot {path}: {e}") from None
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size + _FOOTER.size:
+            self._file.close()
+            raise StorageError(f"{path} is not a snapshot")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count: int
+        self._ids_offset: int
+        self._index_offset: int
+        self._count, self._ids_offset, self._index_offset, magic = _FOOTER.unpack_from(
+            self._map, size - _FOOTER.size
+        )
+        index_end = self._index_offset + self._count * _ENTRY.size
+        if (
+            _HEADER.unpack_from(self._map)[0] != MAGIC
+            or magic != MAGIC
+            or not _HEADER.size <= self._ids_offset <= self._index_offset
+            or index_end != size - _FOOTER.size
+        ):
+            self.close()
+            raise StorageError(f"{path} is not a snapshot")
+
+    def _entry(self, i: int) -> _Entry:
+        return _Entry._make(
+            _ENTRY.unpack_from(self._map, self._index_offset + i * _ENTRY.size)
+        )
+
+    def _id_bytes(self, i: int) -> bytes:
+        offset, length = _ID_REF.unpack_from(
+            self._map, self._index_offset + i * _ENTRY.size + _ID_REF_OFFSET
+        )
+        start = self._ids_offset + offset
+        return self._map[start : start + length]
+
+    def _search(self, key: bytes) -> int:
+        """Get the index position of the first ID not below key."""
+        return bisect_left(range(self._count), key, key=self._id_bytes)
+
+    def _find(self, id: str) -> int | None:
+        """Get the index position of an item, if it exists."""
+        key = id.encode()
+        i = self._search(key)
+        if i < self._count and self._id_bytes(i) == key:
+            return i
+        return None
+
+    def _read(self, i: int) -> bytes:
+        """Read the stored bytes of an item and check them.
+
+        Raises:
+            StorageError: If the content fails its checksum.
+        """
+        entry = self._entry(i)
+        data = self._map[entry.offset : entry.offset + entry.length]
+        if zlib.crc32(data) != entry.crc:
+            raise StorageError(f"Corrupt snapshot content at offset {entry.offset}")
+        return data
+
+    def _range(self, prefix: str, start: str | None) -> Iterator[tuple[int, str]]:
+        """Iterate over index positions and IDs matching a range query."""
+        encoded = prefix.encode()
+        for i in range(self._search(lower_bound(prefix, start).encode()), self._count):
+            key = self._id_bytes(i)
+            if not key.startswith(encoded):
+                return
+            yield i, key.decode()
+
+    def _read_only(self) -> StorageError:
+        return StorageError(f"Snapshot {self.path} is read-only")
+
+    def add(self, id: str, content: str) -> None:
+        """Refuse to add an item.
+
+        Raises:
+            StorageError: Always; snapshots are read-only.
+        """
+        raise self._read_only()
+
+    def list(self) -> list[str]:
+        """List all item IDs.
+
+        Returns:
+            List of item IDs sorted alphabetically.
+        """
+        return [id for _, id in self._range("", None)]
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order.
+
+        The index is sorted by ID, so the range is found by binary search
+        and read in place.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        for _, id in self._range(prefix, start):
+            yield id
+
+    def delete(self, id: str) -> None:
+        """Refuse to delete an item.
+
+        Raises:
+            StorageError: Always; snapshots are read-only.
+        """
+        raise self._read_only()
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists.
+
+        Args:
+            id: Identifier to check.
+
+        Returns:
+            True if item exists, False otherwise.
+        """
+        return self._find(id) is not None
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Content of the item, or None if not found.
+
+        Raises:
+            StorageError: If the content is corrupt.
+        """
+        i = self._find(id)
+        return None if i is None else decode(self._read(i))
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Refuse to add items.
+
+        Raises:
+            StorageError: Always; snapshots are read-only.
+        """
+        raise self._read_only()
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+
+        Raises:
+            StorageError: If the content of an item is corrupt.
+        """
+        return {id: self.get(id) for id in ids}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Refuse to delete items.
+
+        Raises:
+            StorageError: Always; snapshots are read-only.
+        """
+        raise self._read_only()
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        return {id: self.exists(id) for id in ids}
+
+    def open_stream(self, id: str) -> BufferedIOBase | None:
+        """Open the content of an item as a binary stream.
+
+        The stream maps only the span of the item, so memory use does not
+        grow with the item size. Streamed content is not checksummed.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Readable binary stream, or None if not found.
+
+        Raises:
+            StorageError: If the content names an unknown codec.
+        """
+        i = self._find(id)
+        if i is None:
+            return None
+        entry = self._entry(i)
+        return open_content(open(self.path, "rb"), entry.offset, entry.length)
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order.
+
+        Sizes are those of the stored, possibly compressed, content.
+
+        Args:
+            prefix: Only yield items whose ID starts with this prefix.
+            start: Only yield items whose ID sorts at or after this one.
+
+        Yields:
+            Metadata of the matching items.
+        """
+        for i, id in self._range(prefix, start):
+            entry = self._entry(i)
+            yield ItemMeta(id, entry.length, entry.created, entry.modified)
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field.
+
+        Args:
+            key: Field to order by: "id", "size", "created" or "mtime".
+            limit: Maximum number of items to return, or None for all.
+            descending: Return the largest values first.
+            prefix: Only include items whose ID starts with this prefix.
+
+        Returns:
+            Metadata of up to limit items in the requested order.
+
+        Raises:
+            StorageError: If the key is unknown.
+        """
+        try:
+            field = _SORT_FIELDS[key]
+        except KeyError:
+            raise StorageError(f"Unknown sort key '{key}'") from None
+
+        def order(meta: ItemMeta) -> tuple[object, str]:
+            return meta[field], meta.id
+
+        metas = self.iter_metadata(prefix)
+        if limit is None:
+            return sorted(metas, key=order, reverse=descending)
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(limit, metas, key=order)
+
+    def iter_items(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Iterate over items in ID order, reading the file front to back.
+
+        Args:
+            prefix: Only yield items whose ID starts with this prefix.
+            start: Only yield items whose ID sorts at or after this one.
+
+        Yields:
+            Pairs of item ID and content.
+
+        Raises:
+            StorageError: If the content of an item is corrupt.
+        """
+        for i, id in self._range(prefix, start):
+            yield id, decode(self._read(i))
+
+    def verify(self) -> int:
+        """Check the content of every item against its checksum.
+
+        Returns:
+            Number of items checked.
+
+        Raises:
+            StorageError: If the content of an item is corrupt.
+        """
+        for i in range(self._count):
+            self._read(i)
+        return self._count
+
+    def __len__(self) -> int:
+        """Get the number of items in the snapshot."""
+        return self._count
+
+    def close(self) -> None:
+        """Unmap and close the snapshot file."""
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,366 @@
+"""SQLite-based storage implementation."""
+
+import json
+import sqlite3
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError
+from typ_tmpl.protocols.storage import ItemMeta, SearchHit
+from typ_tmpl.storage.batch import ensure_absent, ensure_present
+from typ_tmpl.storage.compression import DEFAULT_THRESHOLD, Codec, compress, decode
+from typ_tmpl.storage.durability import SQLITE_SYNCHRONOUS, Durability
+from typ_tmpl.storage.metadata import MetadataIndex
+from typ_tmpl.storage.ranges import id_range, lower_bound
+from typ_tmpl.storage.search import SearchIndex
+
+# Statements are kept as module constants: sqlite3 caches the prepared
+# statement per connection keyed by SQL text, so every call reuses it.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+) WITHOUT ROWID
+"""
+# The metadata table is kept in step with the items table by triggers.
+_NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+_META_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS items_meta_insert AFTER INSERT ON items BEGIN
+    INSERT OR REPLACE INTO meta (id, size, created, modified)
+    VALUES (new.id, length(CAST(new.content AS BLOB)), {_NOW}, {_NOW});
+END;
+CREATE TRIGGER IF NOT EXISTS items_meta_delete AFTER DELETE ON items BEGIN
+    DELETE FROM meta WHERE id = old.id;
+END;
+"""
+_META_BACKFILL = f"""
+INSERT OR IGNORE INTO meta (id, size, created, modified)
+SELECT id, length(CAST(content AS BLOB)), {_NOW}, {_NOW} FROM items
+"""
+# The triggers measure stored values, so compressed items get their content
+# size set afterwards.
+_SET_SIZE = "UPDATE meta SET size = ? WHERE id = ?"
+_SELECT_COMPRESSED = "SELECT id, content FROM items WHERE typeof(content) = 'blob'"
+_SELECT_ALL = "SELECT id, content FROM items"
+_INSERT = "INSERT INTO items (id, content) VALUES (?, ?)"
+_SELECT_IDS = "SELECT id FROM items ORDER BY id"
+_SELECT_IDS_FROM = "SELECT id FROM items WHERE id >= ? ORDER BY id"
+_DELETE = "DELETE FROM items WHERE id = ?"
+_EXISTS = "SELECT 1 FROM items WHERE id = ?"
+_SELECT_CONTENT = "SELECT content FROM items WHERE id = ?"
+# Batch lookups bind the IDs as one JSON array so a single statement serves
+# batches of any size.
+_SELECT_EXISTING = "SELECT id FROM items WHERE id IN (SELECT value FROM json_each(?))"
+_SELECT_MANY = (
+    "SELECT id, content FROM items WHERE id IN (SELECT value FROM json_each(?))"
+)
+
+
+class SqliteStorage:
+    """Storage implementation using a single SQLite database.
+
+    Items live in a WITHOUT ROWID table clustered on the ID, so lookups are
+    B-tree searches and listing is an ordered scan of the primary key.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        codec: Codec = Codec.NONE,
+        compress_threshold: int = DEFAULT_THRESHOLD,
+        durability: Durability = Durability.BATCH,
+    ) -> None:
+        """Initialize SQLite storage.
+
+        Args:
+            path: Database file path.
+                  Defaults to ~/.config/typ-tmpl/items.db
+            codec: Codec for newly written items of at least
+                   compress_threshold bytes. Compressed content is stored
+                   as a BLOB; plain content stays TEXT.
+            compress_threshold: Size in bytes from which items are compressed.
+            durability: SQLite synchronous level: OFF for none, NORMAL for
+                        batch (commits since the last checkpoint may be
+                        lost) and FULL for always.
+        """
+        if path is None:
+            path = Path.home() / ".config" / "typ-tmpl" / "items.db"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.codec = codec
+        self.compress_threshold = compress_threshold
+        # Callers such as the daemon serialize access themselves, so the
+        # connection may be used from whichever thread holds their lock.
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS[durability]}")
+        self._conn.execute(_SCHEMA)
+        self._meta = MetadataIndex(self._conn)
+        self._conn.executescript(_META_TRIGGERS)
+        if self._meta.is_new:
+            # Databases created before the metadata table existed.
+            self._conn.execute(_META_BACKFILL)
+            compressed = self._conn.execute(_SELECT_COMPRESSED).fetchall()
+            self._conn.executemany(
+                _SET_SIZE,
+                ((len(_load(value).encode()), id) for id, value in compressed),
+            )
+        self._in_transaction = False
+        # The search index shares the connection, so its updates commit or
+        # roll back together with the items they describe.
+        self._search = SearchIndex(self._conn)
+        if self._search.is_new:
+            with self.transaction():
+                rows = self._conn.execute(_SELECT_ALL)
+                self._search.add_many((id, _load(value)) for id, value in rows)
+
+    def _store(self, content: str) -> str | bytes:
+        """Get the value to store for content, compressed if worthwhile."""
+        packed = compress(content, self.codec, self.compress_threshold)
+        return content if packed is None else packed
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group the enclosed operations into a single transaction.
+
+        Nested uses join the outermost transaction. If the body raises, every
+        change made inside it is rolled back.
+        """
+        if self._in_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._in_transaction = True
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._in_transaction = False
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item.
+
+        Args:
+            id: Unique identifier for the item.
+            content: Content of the item.
+
+        Raises:
+            ItemExistsError: If an item with the same ID already exists.
+        """
+        value = self._store(content)
+        with self.transaction():
+            try:
+                self._conn.execute(_INSERT, (id, value))
+            except sqlite3.IntegrityError:
+                raise ItemExistsError(id) from None
+            if isinstance(value, bytes):
+                self._conn.execute(_SET_SIZE, (len(content.encode()), id))
+            self._search.add_many([(id, content)])
+
+    def list(self) -> list[str]:
+        """List all item IDs.
+
+        Returns:
+            List of item IDs sorted alphabetically.
+        """
+        return [row[0] for row in self._conn.execute(_SELECT_IDS)]
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order.
+
+        Rows are streamed from a primary key range scan.
+
+        Args:
+            prefix: Only yield IDs starting with this prefix.
+            start: Only yield IDs greater than or equal to this one.
+
+        Yields:
+            Matching item IDs in ascending order.
+        """
+        cursor = self._conn.execute(_SELECT_IDS_FROM, (lower_bound(prefix, start),))
+        try:
+            yield from id_range((row[0] for row in cursor), prefix)
+        finally:
+            cursor.close()
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order.
+
+        Args:
+            prefix: Only yield items whose ID starts with this prefix.
+            start: Only yield items whose ID sorts at or after this one.
+
+        Returns:
+            Iterator over the metadata of the matching items.
+        """
+        return self._meta.iter_metadata(prefix, start)
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field from the metadata indexes.
+
+        Args:
+            key: Field to order by: "id", "size", "created" or "mtime".
+            limit: Maximum number of items to return, or None for all.
+            descending: Return the largest values first.
+            prefix: Only include items whose ID starts with this prefix.
+
+        Returns:
+            Metadata of up to limit items in the requested order.
+
+        Raises:
+            StorageError: If the key is unknown.
+        """
+        return self._meta.top_metadata(key, limit, descending, prefix)
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> Sequence[SearchHit]:
+        """Find items containing the words of a query, most relevant first.
+
+        Args:
+            query: Words to look for. Matching ignores case and punctuation.
+            limit: Maximum number of hits to return, or None for all.
+            match_all: Only return items containing every word.
+
+        Returns:
+            Matching items ordered by descending score, ties by ID.
+        """
+        return self._search.search(query, limit, match_all)
+
+    def delete(self, id: str) -> None:
+        """Delete an item.
+
+        Args:
+            id: Identifier of the item to delete.
+
+        Raises:
+            ItemNotFoundError: If the item does not exist.
+        """
+        with self.transaction():
+            if self._conn.execute(_DELETE, (id,)).rowcount == 0:
+                raise ItemNotFoundError(id)
+            self._search.remove_many([id])
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists.
+
+        Args:
+            id: Identifier to check.
+
+        Returns:
+            True if item exists, False otherwise.
+        """
+        return self._conn.execute(_EXISTS, (id,)).fetchone() is not None
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item.
+
+        Args:
+            id: Identifier of the item.
+
+        Returns:
+            Content of the item, or None if not found.
+
+        Raises:
+            StorageError: If compressed content is corrupt.
+        """
+        row = self._conn.execute(_SELECT_CONTENT, (id,)).fetchone()
+        return None if row is None else _load(row[0])
+
+    def _existing(self, ids: Sequence[str]) -> set[str]:
+        """Return the subset of IDs that are stored."""
+        rows = self._conn.execute(_SELECT_EXISTING, (json.dumps(ids),))
+        return {row[0] for row in rows}
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items in one transaction.
+
+        Args:
+            items: Pairs of item ID and content.
+
+        Raises:
+            BatchError: If any ID already exists or is repeated in the batch.
+        """
+        batch = list(items)
+        with self.transaction():
+            ids = [id for id, _ in batch]
+            ensure_absent(ids, self._existing(ids))
+            values = [self._store(content) for _, content in batch]
+            self._conn.executemany(_INSERT, zip(ids, values, strict=True))
+            self._conn.executemany(
+                _SET_SIZE,
+                (
+                    (len(content.encode()), id)
+                    for (id, content), value in zip(batch, values, strict=True)
+                    if isinstance(value, bytes)
+                ),
+            )
+            self._search.add_many(batch)
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get the content of several items with one query.
+
+        Args:
+            ids: Identifiers of the items.
+
+        Returns:
+            Mapping of each ID to its content, or None if not found.
+
+        Raises:
+            StorageError: If compressed content is corrupt.
+        """
+        ids = list(ids)
+        rows = dict(self._conn.execute(_SELECT_MANY, (json.dumps(ids),)).fetchall())
+        return {id: None if id not in rows else _load(rows[id]) for id in ids}
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items in one transaction.
+
+        Args:
+            ids: Identifiers of the items to delete.
+
+        Raises:
+            BatchError: If any ID does not exist or is repeated in the batch.
+        """
+        ids = list(ids)
+        with self.transaction():
+            ensure_present(ids, self._existing(ids))
+            self._conn.executemany(_DELETE, ((id,) for id in ids))
+            self._search.remove_many(ids)
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist with one query.
+
+        Args:
+            ids: Identifiers to check.
+
+        Returns:
+            Mapping of each ID to whether it exists.
+        """
+        ids = list(ids)
+        existing = self._existing(ids)
+        return {id: id in existing for id in ids}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def _load(value: str | bytes) -> str:
+    """Get item content from a stored value."""
+    return value if isinstance(value, str) else decode(value)
@@ -0,0 +1,245 @@
+"""Streaming reads of item content without loading it whole."""
+
+import errno
+import io
+import mmap
+import os
+from collections.abc import Buffer
+from typing import BinaryIO
+
+from typ_tmpl.protocols.storage import Storage, Streamable
+from typ_tmpl.storage.compression import (
+    HEADER_SIZE,
+    Codec,
+    DecompressingReader,
+    codec_of,
+)
+
+# Bytes copied per system call when streaming content.
+COPY_CHUNK = 1 << 20
+
+# sendfile() errors meaning the files do not support it, so a plain copy
+# should be used instead.
+_SENDFILE_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.EBADF}
+
+
+class MappedStream(io.BufferedIOBase):
+    """Read-only stream over a memory-mapped file.
+
+    Reads copy straight out of the page cache, and view() exposes the
+    content without any copy. The file must not be truncated while mapped;
+    stored item files are only ever replaced or unlinked, never rewritten,
+    so an open stream keeps reading the content it was opened on.
+    """
+
+    def __init__(
+        self, file: BinaryIO, offset: int = 0, size: int | None = None
+    ) -> None:
+        """Map a file, or a span of it.
+
+        Args:
+            file: File opened for binary reading. It is closed with the
+                  stream.
+            offset: Position in the file where the content starts.
+            size: Length of the content, or None for the rest of the file.
+        """
+        self._file = file
+        if size is None:
+            size = os.fstat(file.fileno()).st_size - offset
+        self.offset = offset
+        self.size = size
+        # Empty files cannot be mapped. Mappings must start on a multiple
+        # of the allocation granularity, so the span may start inside it.
+        self._map: mmap.mmap | None = None
+        self._base = offset % mmap.ALLOCATIONGRANULARITY
+        if self.size:
+            self._map = mmap.mmap(
+                file.fileno(),
+                self._base + self.size,
+                access=mmap.ACCESS_READ,
+                offset=offset - self._base,
+            )
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                self._map.madvise(mmap.MADV_SEQUENTIAL)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        """Report that the stream can be read."""
+        return True
+
+    def seekable(self) -> bool:
+        """Report that the stream can seek."""
+        return True
+
+    def fileno(self) -> int:
+        """Get the descriptor of the mapped file.
+
+        The content starts at offset in the file.
+        """
+        return self._file.fileno()
+
+    def tell(self) -> int:
+        """Get the current position."""
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Move to a position.
+
+        Returns:
+            The new position.
+        """
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: self.size}
+        self._pos = max(0, base[whence] + offset)
+        return self._pos
+
+    def view(self) -> memoryview:
+        """Get the whole content without copying it.
+
+        The view must be released before the stream is closed.
+        """
+        if self._map is None:
+            return memoryview(b"")
+        return memoryview(self._map)[self._base : self._base + self.size]
+
+    def read(self, size: int | None = -1) -> bytes:
+        """Read up to size bytes, or the rest of the content."""
+        end = (
+            self.size if size is None or size < 0 else min(self._pos + size, self.size)
+        )
+        if self._map is None or end <= self._pos:
+            return b""
+        data = self._map[self._base + self._pos : self._base + end]
+        self._pos += len(data)
+        return data
+
+    def read1(self, size: int = -1) -> bytes:
+        """Read up to size bytes."""
+        return self.read(size)
+
+    def readinto(self, buffer: Buffer) -> int:
+        """Read into a buffer.
+
+        Returns:
+            Number of bytes read, 0 at the end of the content.
+        """
+        if self._map is None:
+            return 0
+        with memoryview(buffer) as out, memoryview(self._map) as content:
+            n = max(0, min(len(out), self.size - self._pos))
+            start = self._base + self._pos
+            out[:n] = content[start : start + n]
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+        super().close()
+
+
+def open_content(
+    file: BinaryIO, offset: int = 0, size: int | None = None
+) -> io.BufferedIOBase:
+    """Open stored content as a stream of its plain content.
+
+    The content is memory-mapped; compressed content is decompressed as it
+    is read.
+
+    Args:
+        file: File holding content as written by encode(), opened for
+              binary reading. It is closed with the stream.
+        offset: Position in the file where the content starts.
+        size: Length of the content, or None for the rest of the file.
+
+    Returns:
+        Readable binary stream.
+
+    Raises:
+        StorageError: If the content names an unknown codec.
+    """
+    try:
+        stream = MappedStream(file, offset, size)
+    except BaseException:
+        file.close()
+        raise
+    try:
+        codec = codec_of(stream.read(HEADER_SIZE))
+        if codec == Codec.NONE:
+            stream.seek(0)
+            return stream
+        return io.BufferedReader(DecompressingReader(stream, codec), COPY_CHUNK)
+    except BaseException:
+        stream.close()
+        raise
+
+
+def open_stream(storage: Storage, id: str) -> io.BufferedIOBase | None:
+    """Open the content of an item as a binary stream, whatever the backend.
+
+    Backends that cannot stream load the content with get().
+
+    Args:
+        storage: Storage holding the item.
+        id: Identifier of the item.
+
+    Returns:
+        Readable binary stream, or None if the item does not exist.
+    """
+    if isinstance(storage, Streamable):
+        return storage.open_stream(id)
+    content = storage.get(id)
+    return None if content is None else io.BytesIO(content.encode())
+
+
+def copy_stream(source: io.BufferedIOBase, out: BinaryIO) -> int:
+    """Copy the rest of a stream to a file.
+
+    Streams over plain files are copied by the kernel with sendfile(), so
+    the content never passes through Python. Otherwise mapped content is
+    written straight from the mapping, and other streams a chunk at a time.
+
+    Args:
+        source: Stream to copy.
+        out: File to copy to, such as sys.stdout.buffer.
+
+    Returns:
+        Number of bytes copied.
+    """
+    out.flush()
+    copied = 0
+    try:
+        in_fd, out_fd = source.fileno(), out.fileno()
+    except (OSError, ValueError):
+        in_fd = out_fd = -1
+    if in_fd >= 0:
+        start = source.tell()
+        # Mapped streams may cover only a span of their file.
+        offset, end = start, None
+        if isinstance(source, MappedStream):
+            offset, end = source.offset + start, source.size - start
+        try:
+            while end is None or copied < end:
+                count = COPY_CHUNK if end is None else min(COPY_CHUNK, end - copied)
+                sent = os.sendfile(out_fd, in_fd, offset + copied, count)
+                if not sent:
+                    break
+                copied += sent
+        except OSError as e:
+            if copied or e.errno not in _SENDFILE_UNSUPPORTED:
+                raise
+        else:
+            source.seek(start + copied)
+            return copied
+    if isinstance(source, MappedStream):
+        start = source.tell()
+        with source.view() as content:
+            for pos in range(start, source.size, COPY_CHUNK):
+                copied += out.write(content[pos : pos + COPY_CHUNK])
+        source.seek(start + copied)
+    else:
+        while chunk := source.read(COPY_CHUNK):
+            copied += out.write(chunk)
+    out.flush()
+    return copied
@@ -0,0 +1,209 @@
+"""Base class of storage wrappers that forward calls to a backend."""
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from io import BufferedIOBase
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import (
+    Collectable,
+    Compactable,
+    Filtered,
+    FilterStats,
+    ItemMeta,
+    MetadataIndexed,
+    Migratable,
+    Searchable,
+    SearchHit,
+    Storage,
+)
+from typ_tmpl.storage.streams import open_stream
+
+
+class StorageWrapper:
+    """Storage that forwards every call to a backend, capabilities included.
+
+    Subclasses override the methods whose behaviour they change, and
+    _call() and _iterate() to act on every forwarded call. Capabilities the
+    backend lacks raise StorageError. version() is not forwarded, so a
+    wrapper does not claim to be Versioned unless a subclass opts in.
+    """
+
+    def __init__(self, backend: Storage) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            backend: Storage to wrap.
+        """
+        self.backend = backend
+
+    def _call[T](self, method: str, call: Callable[[], T]) -> T:
+        """Make one forwarded call.
+
+        Args:
+            method: Name of the storage method being called.
+            call: Calls the backend.
+        """
+        return call()
+
+    def _iterate[T](self, method: str, make: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """Make one forwarded call that returns an iterator.
+
+        Args:
+            method: Name of the storage method being called.
+            make: Calls the backend.
+        """
+        return make()
+
+    def add(self, id: str, content: str) -> None:
+        """Add a new item."""
+        self._call("add", lambda: self.backend.add(id, content))
+
+    def list(self) -> list[str]:
+        """List all item IDs."""
+        return self._call("list", self.backend.list)
+
+    def iter_ids(self, prefix: str = "", start: str | None = None) -> Iterator[str]:
+        """Iterate over item IDs in sorted order."""
+        return self._iterate("iter_ids", lambda: self.backend.iter_ids(prefix, start))
+
+    def delete(self, id: str) -> None:
+        """Delete an item."""
+        self._call("delete", lambda: self.backend.delete(id))
+
+    def exists(self, id: str) -> bool:
+        """Check if an item exists."""
+        return self._call("exists", lambda: self.backend.exists(id))
+
+    def get(self, id: str) -> str | None:
+        """Get the content of an item."""
+        return self._call("get", lambda: self.backend.get(id))
+
+    def add_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Add several items at once."""
+        self._call("add_many", lambda: self.backend.add_many(items))
+
+    def get_many(self, ids: Iterable[str]) -> dict[str, str | None]:
+        """Get several items at once."""
+        return self._call("get_many", lambda: self.backend.get_many(ids))
+
+    def delete_many(self, ids: Iterable[str]) -> None:
+        """Delete several items at once."""
+        self._call("delete_many", lambda: self.backend.delete_many(ids))
+
+    def exists_many(self, ids: Iterable[str]) -> dict[str, bool]:
+        """Check which of several items exist."""
+        return self._call("exists_many", lambda: self.backend.exists_many(ids))
+
+    def open_stream(self, id: str) -> BufferedIOBase | None:
+        """Open the content of an item as a binary stream.
+
+        Backends that cannot stream fall back to get().
+        """
+        return self._call("open_stream", lambda: open_stream(self.backend, id))
+
+    def _indexed(self) -> MetadataIndexed:
+        if not isinstance(self.backend, MetadataIndexed):
+            raise StorageError("Storage backend does not support metadata")
+        return self.backend
+
+    def iter_metadata(
+        self, prefix: str = "", start: str | None = None
+    ) -> Iterator[ItemMeta]:
+        """Iterate over item metadata in ID order.
+
+        Raises:
+            StorageError: If the backend does not keep metadata.
+        """
+        indexed = self._indexed()
+        return self._iterate(
+            "iter_metadata", lambda: indexed.iter_metadata(prefix, start)
+        )
+
+    def top_metadata(
+        self,
+        key: str,
+        limit: int | None = None,
+        descending: bool = False,
+        prefix: str = "",
+    ) -> Sequence[ItemMeta]:
+        """Get item metadata ordered by one field.
+
+        Raises:
+            StorageError: If the backend does not keep metadata.
+        """
+        indexed = self._indexed()
+        return self._call(
+            "top_metadata", lambda: indexed.top_metadata(key, limit, descending, prefix)
+        )
+
+    def search(
+        self, query: str, limit: int | None = None, match_all: bool = False
+    ) -> Sequence[SearchHit]:
+        """Search the backend's full-text index.
+
+        Raises:
+            StorageError: If the backend does not support search.
+        """
+        backend = self.backend
+        if not isinstance(backend, Searchable):
+            raise StorageError("Storage backend does not support search")
+        return self._call("search", lambda: backend.search(query, limit, match_all))
+
+    def compact(self) -> int:
+        """Compact the backend.
+
+        Raises:
+            StorageError: If the backend does not support compaction.
+        """
+        backend = self.backend
+        if not isinstance(backend, Compactable):
+            raise StorageError("Storage backend does not support compaction")
+        return self._call("compact", backend.compact)
+
+    def gc(self) -> int:
+        """Collect the backend's unreferenced data.
+
+        Raises:
+            StorageError: If the backend does not support garbage collection.
+        """
+        backend = self.backend
+        if not isinstance(backend, Collectable):
+            raise StorageError("Storage backend does not support garbage collection")
+        return self._call("gc", backend.gc)
+
+    def _filtered(self) -> Filtered:
+        if not isinstance(self.backend, Filtered):
+            raise StorageError("Storage backend does not support membership filters")
+        return self.backend
+
+    def filter_stats(self) -> FilterStats:
+        """Measure the backend's membership filter.
+
+        Raises:
+            StorageError: If the backend has no membership filter.
+        """
+        return self._call("filter_stats", self._filtered().filter_stats)
+
+    def rebuild_filter(self, capacity: int | None = None) -> FilterStats:
+        """Rebuild the backend's membership filter.
+
+        Raises:
+            StorageError: If the backend has no membership filter.
+        """
+        filtered = self._filtered()
+        return self._call("rebuild_filter", lambda: filtered.rebuild_filter(capacity))
+
+    def migrate(self, layout: str) -> int:
+        """Re-layout the backend.
+
+        Raises:
+            StorageError: If the backend does not support migration.
+        """
+        backend = self.backend
+        if not isinstance(backend, Migratable):
+            raise StorageError("Storage backend does not support migration")
+        return self._call("migrate", lambda: backend.migrate(layout))
+
+    def close(self) -> None:
+        """Close the backend."""
+        self._call("close", self.backend.close)
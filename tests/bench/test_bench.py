@@ -0,0 +1,131 @@
+"""Tests for the storage benchmarks and the performance baseline."""
+
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dev.bench.harness import (
+    BACKENDS,
+    BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    OPERATIONS,
+    PROFILES,
+    Profile,
+    Result,
+    check,
+    compare,
+    load,
+    percentile,
+    record,
+    run,
+    save,
+    scenarios,
+)
+from typ_tmpl.storage.factory import Backend
+
+
+def result(
+    op: str = "get", ops_per_sec: float = 1000.0, p50_us: float = 10.0
+) -> Result:
+    """Make a result with the given metrics."""
+    return Result("fs", 1000, 64, op, 100, ops_per_sec, p50_us, p50_us * 2)
+
+
+class TestHarness:
+    """Tests for running benchmarks and comparing their results."""
+
+    def test_every_backend_benchmarked(self) -> None:
+        """Test that each selectable backend has a benchmark."""
+        assert {backend.value for backend in Backend} <= set(BACKENDS)
+
+    def test_run_measures_every_operation(self, tmp_path: Path) -> None:
+        """Test that a small run times each operation of each backend."""
+        profile = Profile(items=(50,), content_sizes=(16, 1000), samples=10)
+
+        results = run(profile)
+
+        assert len(results) == len(BACKENDS) * 2 * len(OPERATIONS)
+        for r in results:
+            assert r.ops > 0 and r.ops_per_sec > 0
+            assert 0 < r.p50_us <= r.p99_us
+        save(tmp_path / "results.json", results, "test")
+        assert load(tmp_path / "results.json") == ("test", results)
+
+    def test_scenarios_capped_by_size(self) -> None:
+        """Test that combinations too large to store are skipped."""
+        profile = Profile(
+            items=(10, 1000), content_sizes=(1, 100), samples=1, max_bytes=10_000
+        )
+
+        assert list(scenarios(profile)) == [(10, 1), (10, 100), (1000, 1)]
+        assert (1_000_000, 1 << 20) not in scenarios(PROFILES["full"])
+
+    def test_percentile(self) -> None:
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 99) == 7
+
+    def test_compare(self) -> None:
+        """Test that only slowdowns beyond the threshold are reported."""
+        baseline = [result("get"), result("add"), result("list")]
+        current = [
+            result("get", ops_per_sec=800.0, p50_us=12.0),
+            result("add", ops_per_sec=500.0),
+            result("list", p50_us=20.0),
+            result("delete", ops_per_sec=1.0),
+        ]
+
+        regressions = compare(current, baseline, threshold=0.3)
+
+        assert [(r.key[3], r.metric) for r in regressions] == [
+            ("add", "ops_per_sec"),
+            ("list", "p50_us"),
+        ]
+        assert compare(current, baseline, threshold=1.0) == []
+
+    def test_check_reruns_regressed_scenarios(self) -> None:
+        """Test that regressions are rerun and only persistent ones kept."""
+        profile = Profile(items=(20,), content_sizes=(16,), samples=5, repeats=1)
+        results = run(profile, ["mock"])
+        slow = [r._replace(ops_per_sec=1.0, p50_us=1e9) for r in results]
+        fast = [r._replace(ops_per_sec=1e12, p50_us=1e-9) for r in results]
+
+        merged, regressions = check(results, slow, profile, retries=1)
+        assert regressions == [] and len(merged) == len(results)
+
+        merged, regressions = check(results, fast, profile, retries=1)
+        assert {r.key for r in regressions} == {r.key for r in results}
+        assert all(
+            m.ops_per_sec >= r.ops_per_sec for m, r in zip(merged, results, strict=True)
+        )
+
+    def test_record_keeps_worst_of_rounds(self, mocker: MockerFixture) -> None:
+        """Test that a baseline keeps the slowest metrics of its rounds."""
+        fast, slow = result(ops_per_sec=2000.0, p50_us=5.0), result(p50_us=20.0)
+        mocker.patch("dev.bench.harness.run", side_effect=[[fast], [slow], [fast]])
+
+        (recorded,) = record(PROFILES["smoke"], ["fs"])
+
+        assert (recorded.ops_per_sec, recorded.p50_us) == (1000.0, 20.0)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TYP_TMPL_BENCH"), reason="set TYP_TMPL_BENCH=1 to run"
+)
+class TestBaseline:
+    """Tests comparing this machine's performance with the saved baseline."""
+
+    def test_no_regressions(self) -> None:
+        """Test that no backend got slower than the baseline allows."""
+        name, baseline = load(BASELINE_PATH)
+        profile = PROFILES[name]
+        threshold = float(os.environ.get("TYP_TMPL_BENCH_THRESHOLD", DEFAULT_THRESHOLD))
+
+        _, regressions = check(run(profile), baseline, profile, threshold)
+
+        assert regressions == []
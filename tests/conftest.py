@@ -1,11 +1,22 @@
 """Shared pytest fixtures for typ-tmpl."""
 
+from collections.abc import Iterator
+from pathlib import Path
+
 import pytest
 from typer import Typer
 from typer.testing import CliRunner
 
 from dev.mocks.storage import MockStorage
 from typ_tmpl.main import app
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.cached import CachedStorage
+from typ_tmpl.storage.dedup import DedupStorage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.layout import Layout
+from typ_tmpl.storage.log import LogStorage
+from typ_tmpl.storage.memory import MemoryStorage
+from typ_tmpl.storage.sqlite import SqliteStorage
 
 
 @pytest.fixture()
@@ -56,3 +67,29 @@ def app_with_mock(mock_storage: MockStorage) -> Typer:
             )(command_info.callback)
 
     return test_app
+
+
+@pytest.fixture(
+    params=["mock", "fs", "fs-sharded", "sqlite", "log", "dedup", "memory", "cached"]
+)
+def storage(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[Storage]:
+    """Create each storage backend in a temp directory."""
+    storage: Storage
+    if request.param == "mock":
+        storage = MockStorage()
+    elif request.param == "fs":
+        storage = FilesystemStorage(base_dir=tmp_path)
+    elif request.param == "fs-sharded":
+        storage = FilesystemStorage(base_dir=tmp_path, layout=Layout.SHARDED)
+    elif request.param == "sqlite":
+        storage = SqliteStorage(path=tmp_path / "items.db")
+    elif request.param == "log":
+        storage = LogStorage(base_dir=tmp_path)
+    elif request.param == "dedup":
+        storage = DedupStorage(base_dir=tmp_path)
+    elif request.param == "memory":
+        storage = MemoryStorage(base_dir=tmp_path)
+    else:
+        storage = CachedStorage(FilesystemStorage(base_dir=tmp_path))
+    yield storage
+    storage.close()
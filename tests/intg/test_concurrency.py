@@ -0,0 +1,120 @@
+"""Multi-process stress tests for filesystem storage."""
+
+import multiprocessing
+import os
+from pathlib import Path
+
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.layout import Layout
+
+WORKERS = 4
+OWN_ITEMS = 150
+CONTESTED_ITEMS = 60
+
+
+def content(id: str) -> str:
+    """Content written for an item, long enough to reveal torn writes."""
+    return f"{id}:" + "x" * 2000
+
+
+def add_items(base_dir: Path, worker: int) -> list[str]:
+    """Add this worker's own items and race the others for contested ones.
+
+    Returns:
+        The contested IDs this worker added.
+    """
+    storage = FilesystemStorage(base_dir=base_dir)
+    won = []
+    for i in range(OWN_ITEMS):
+        id = f"w{worker}-{i:03d}"
+        if i % 10 == 0:
+            storage.add_many([(id, content(id))])
+        else:
+            storage.add(id, content(id))
+        contested = f"c{(i + worker * 7) % CONTESTED_ITEMS:03d}"
+        try:
+            storage.add(contested, content(contested))
+        except ItemExistsError:
+            continue
+        won.append(contested)
+    storage.close()
+    return won
+
+
+def delete_items(base_dir: Path, worker: int) -> list[str]:
+    """Race the other workers to delete every contested item.
+
+    Returns:
+        The contested IDs this worker deleted.
+    """
+    storage = FilesystemStorage(base_dir=base_dir)
+    won = []
+    for i in range(CONTESTED_ITEMS):
+        id = f"c{(i + worker * 13) % CONTESTED_ITEMS:03d}"
+        try:
+            storage.delete(id)
+        except ItemNotFoundError:
+            continue
+        won.append(id)
+    storage.close()
+    return won
+
+
+def read_items(base_dir: Path, rounds: int) -> list[str]:
+    """List and read items while writers run, collecting any bad reads.
+
+    Returns:
+        Descriptions of reads that returned incomplete content.
+    """
+    storage = FilesystemStorage(base_dir=base_dir)
+    bad = []
+    for _ in range(rounds):
+        for id in storage.list():
+            value = storage.get(id)
+            if value is not None and value != content(id):
+                bad.append(f"{id}: {len(value)} chars")
+    storage.close()
+    return bad
+
+
+class TestMultiProcessAccess:
+    """Tests for several processes sharing one item directory."""
+
+    def run(self, target: object, args: list[tuple[object, ...]]) -> list[list[str]]:
+        """Run target in one forked process per argument tuple."""
+        with multiprocessing.get_context("fork").Pool(len(args)) as pool:
+            return pool.starmap(target, args)  # type: ignore[arg-type]
+
+    def test_no_lost_or_duplicate_updates(self, tmp_path: Path) -> None:
+        """Test that parallel adds, deletes and reads stay consistent."""
+        FilesystemStorage(base_dir=tmp_path, layout=Layout.SHARDED).close()
+        pool = multiprocessing.get_context("fork").Pool(WORKERS + 1)
+        with pool:
+            reader = pool.apply_async(read_items, (tmp_path, 5))
+            added = pool.starmap(add_items, [(tmp_path, w) for w in range(WORKERS)])
+            torn = reader.get()
+
+        assert torn == []
+        contested = sorted(id for won in added for id in won)
+        assert contested == [f"c{i:03d}" for i in range(CONTESTED_ITEMS)]
+
+        deleted = self.run(delete_items, [(tmp_path, w) for w in range(WORKERS)])
+        assert sorted(id for won in deleted for id in won) == contested
+
+        storage = FilesystemStorage(base_dir=tmp_path)
+        expected = sorted(
+            f"w{w}-{i:03d}" for w in range(WORKERS) for i in range(OWN_ITEMS)
+        )
+        on_disk = sorted(
+            name[:-4]
+            for _, _, names in os.walk(tmp_path)
+            for name in names
+            if name.endswith(".txt")
+        )
+        assert on_disk == expected
+        assert storage.list() == expected
+        assert [meta.id for meta in storage.iter_metadata()] == expected
+        assert all(storage.exists_many(expected).values())
+        assert storage.gc() == 0
+        storage.close()
@@ -0,0 +1,231 @@
+"""Integration tests for the daemon and its socket client."""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.daemon import DaemonServer
+from typ_tmpl.errors import BatchError, ItemExistsError, ItemNotFoundError, StorageError
+from typ_tmpl.main import app
+from typ_tmpl.storage.remote import RemoteStorage
+
+
+@pytest.fixture
+def served(tmp_path: Path) -> Iterator[tuple[Path, MockStorage]]:
+    """Serve a mock storage on a socket from a background thread."""
+    storage = MockStorage()
+    server = DaemonServer(tmp_path / "daemon.sock", storage)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.path, storage
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def remote(served: tuple[Path, MockStorage]) -> Iterator[RemoteStorage]:
+    """Connect a client to the served storage."""
+    client = RemoteStorage(served[0])
+    yield client
+    client.close()
+
+
+class TestRemoteStorage:
+    """Tests for RemoteStorage against a running daemon."""
+
+    def test_round_trip(
+        self, remote: RemoteStorage, served: tuple[Path, MockStorage]
+    ) -> None:
+        """Test that calls reach the daemon's storage."""
+        remote.add("a", "A")
+        remote.add_many([("b", "B"), ("c", "C")])
+        remote.delete("c")
+
+        assert served[1].items == {"a": "A", "b": "B"}
+        assert remote.list() == ["a", "b"]
+        assert remote.get("a") == "A"
+        assert remote.get("missing") is None
+        assert remote.exists("b") is True
+        assert remote.get_many(["a", "x"]) == {"a": "A", "x": None}
+        assert remote.exists_many(["a", "x"]) == {"a": True, "x": False}
+
+    def test_errors_are_reraised(self, remote: RemoteStorage) -> None:
+        """Test that storage errors cross the socket with their details."""
+        remote.add("a", "A")
+
+        with pytest.raises(ItemExistsError) as exists_info:
+            remote.add("a", "A")
+        with pytest.raises(ItemNotFoundError) as missing_info:
+            remote.delete("missing")
+        with pytest.raises(BatchError) as batch_info:
+            remote.delete_many(["a", "missing"])
+
+        assert exists_info.value.id == "a"
+        assert missing_info.value.id == "missing"
+        assert list(batch_info.value.failures) == ["missing"]
+
+    def test_unsupported_method_raises_storage_error(
+        self, remote: RemoteStorage
+    ) -> None:
+        """Test that a capability the served backend lacks is reported."""
+        with pytest.raises(StorageError, match="does not support 'compact'"):
+            remote.compact()
+
+    def test_socket_only_open_to_owner(self, tmp_path: Path) -> None:
+        """Test that the socket is private even under a permissive umask."""
+        umask = os.umask(0)
+        try:
+            server = DaemonServer(tmp_path / "daemon.sock", MockStorage())
+        finally:
+            os.umask(umask)
+
+        assert (server.path.stat().st_mode & 0o777) == 0o600
+        server.server_close()
+
+    def test_connect_without_daemon(self, tmp_path: Path) -> None:
+        """Test that connect returns None when nothing is listening."""
+        assert RemoteStorage.connect(tmp_path / "missing.sock") is None
+
+        (tmp_path / "stale.sock").touch()
+        assert RemoteStorage.connect(tmp_path / "stale.sock") is None
+
+    def test_iter_ids_pages(
+        self,
+        remote: RemoteStorage,
+        served: tuple[Path, MockStorage],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that iter_ids pages through a range larger than one page."""
+        monkeypatch.setattr("typ_tmpl.storage.remote.ID_PAGE_SIZE", 2)
+        served[1].items.update({id: id for id in ["a", "b1", "b2", "b3", "b4", "c"]})
+
+        assert list(remote.iter_ids("b")) == ["b1", "b2", "b3", "b4"]
+        pages = [args for name, args in served[1].calls if name == "iter_ids"]
+        assert pages == [("b", None), ("b", "b2\0"), ("b", "b4\0")]
+
+    def test_search(
+        self, remote: RemoteStorage, served: tuple[Path, MockStorage]
+    ) -> None:
+        """Test that search hits come back with their scores."""
+        served[1].items.update({"a": "red fox", "b": "red red hen"})
+
+        hits = remote.search("red", limit=1)
+
+        assert [(hit.id, hit.score) for hit in hits] == [("b", 2.0)]
+
+    def test_open_stream_in_chunks(
+        self,
+        remote: RemoteStorage,
+        served: tuple[Path, MockStorage],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that content is streamed in chunks over its own connection."""
+        monkeypatch.setattr("typ_tmpl.daemon.STREAM_CHUNK", 4)
+        served[1].items.update({"a": "héllo wörld", "b": "B"})
+
+        stream = remote.open_stream("a")
+        assert stream is not None
+        with stream:
+            head = stream.read(3)
+            # The main connection stays usable while the stream is open.
+            assert remote.get("b") == "B"
+            rest = stream.read()
+
+        assert (head + rest).decode() == "héllo wörld"
+        assert remote.open_stream("missing") is None
+
+
+class TestDaemonDetection:
+    """Tests for CLI commands routing through a running daemon."""
+
+    def test_commands_use_daemon(
+        self,
+        cli_runner: CliRunner,
+        served: tuple[Path, MockStorage],
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        """Test that commands talk to the daemon instead of the filesystem."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TYP_TMPL_SOCKET", str(served[0]))
+
+        result = cli_runner.invoke(app, ["add", "note1", "-c", "Hello"])
+
+        assert result.exit_code == 0
+        assert served[1].items == {"note1": "Hello"}
+        assert not (tmp_path / ".config" / "typ-tmpl" / "items").exists()
+
+    def test_no_daemon_flag_bypasses_daemon(
+        self,
+        cli_runner: CliRunner,
+        served: tuple[Path, MockStorage],
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        """Test that --no-daemon opens the storage directly."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TYP_TMPL_SOCKET", str(served[0]))
+
+        result = cli_runner.invoke(app, ["--no-daemon", "add", "note1", "-c", "Hi"])
+
+        assert result.exit_code == 0
+        assert served[1].items == {}
+        assert (tmp_path / ".config" / "typ-tmpl" / "items" / "note1.txt").exists()
+
+    def test_cat_streams_through_daemon(
+        self,
+        cli_runner: CliRunner,
+        served: tuple[Path, MockStorage],
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        """Test that cat prints an item served by the daemon."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TYP_TMPL_SOCKET", str(served[0]))
+        served[1].items["a"] = "streamed"
+
+        result = cli_runner.invoke(app, ["cat", "a"])
+
+        assert result.exit_code == 0
+        assert result.stdout == "streamed"
+
+
+class TestServeCommand:
+    """Tests for the serve command."""
+
+    def test_serve_until_terminated(self, tmp_path: Path) -> None:
+        """Test serving from a subprocess and shutting down on SIGTERM."""
+        env = {**os.environ, "HOME": str(tmp_path)}
+        env.pop("TYP_TMPL_SOCKET", None)
+        socket_path = tmp_path / ".config" / "typ-tmpl" / "daemon-fs.sock"
+        process = subprocess.Popen(
+            [sys.executable, "-m", "typ_tmpl", "serve"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 10
+            client = None
+            while client is None and time.monotonic() < deadline:
+                client = RemoteStorage.connect(socket_path)
+                time.sleep(0.05)
+            assert client is not None
+            client.add("note1", "Hello")
+            client.close()
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=10)
+
+        assert process.returncode == 0
+        assert not socket_path.exists()
+        items_dir = tmp_path / ".config" / "typ-tmpl" / "items"
+        assert (items_dir / "note1.txt").read_text() == "Hello"
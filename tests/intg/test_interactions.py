@@ -1,9 +1,17 @@
 """Integration tests for CLI commands."""
 
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
 from typer import Typer
 from typer.testing import CliRunner
 
 from dev.mocks.storage import MockStorage
+from typ_tmpl import main as main_module
+from typ_tmpl.errors import StorageError
 from typ_tmpl.main import app
 
 
@@ -115,6 +123,118 @@ class TestListCommand:
         assert result.exit_code == 0
         assert "item1" in result.output
 
+    def test_list_filters_and_limit(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test --prefix, --start and --limit together."""
+        for id in ["a1", "b1", "b2", "b3", "c1"]:
+            mock_storage.items[id] = id
+
+        result = cli_runner.invoke(
+            app_with_mock, ["list", "-p", "b", "--start", "b2", "--limit", "1"]
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout == "b2\n"
+
+    def test_list_machine_readable_formats(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test JSON and NDJSON output."""
+        mock_storage.items.update({"a": "A", "b": "B"})
+
+        result = cli_runner.invoke(app_with_mock, ["list", "--format", "json"])
+        assert json.loads(result.stdout) == [{"id": "a"}, {"id": "b"}]
+
+        result = cli_runner.invoke(app_with_mock, ["list", "-f", "ndjson"])
+        assert result.stdout.splitlines() == ['{"id": "a"}', '{"id": "b"}']
+
+        mock_storage.items.clear()
+        result = cli_runner.invoke(app_with_mock, ["list", "-f", "json"])
+        assert json.loads(result.stdout) == []
+
+    def test_list_long_sorted_by_size(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test a largest-first long listing served by a top-k query."""
+        mock_storage.items.update({"a": "x", "b": "x" * 300, "c": "x" * 20})
+
+        result = cli_runner.invoke(
+            app_with_mock, ["ls", "-l", "--sort", "size", "-r", "-n", "2"]
+        )
+
+        assert result.exit_code == 0
+        lines = result.stdout.splitlines()
+        assert [line.split()[0] for line in lines] == ["300", "20"]
+        assert [line.split()[-1] for line in lines] == ["b", "c"]
+        assert ("top_metadata", ("size", 2, True, "")) in mock_storage.calls
+
+    def test_list_long_ndjson(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that long NDJSON records carry every metadata field."""
+        mock_storage.add("a", "abc")
+
+        result = cli_runner.invoke(app_with_mock, ["list", "-l", "-f", "ndjson"])
+
+        record = json.loads(result.stdout)
+        assert record["id"] == "a" and record["size"] == 3
+        assert set(record) == {"id", "size", "created", "modified"}
+
+    def test_list_start_needs_id_order(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that --start is refused for other sort orders."""
+        result = cli_runner.invoke(app_with_mock, ["list", "-S", "mtime", "-s", "a"])
+
+        assert result.exit_code == 1
+        assert "--start only applies" in result.output
+
+    def test_list_long_unsupported_backend(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a backend without metadata reports it."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        cli_runner.invoke(app, ["-b", "log", "add", "a", "-c", "A"])
+
+        result = cli_runner.invoke(app, ["-b", "log", "list", "--long"])
+
+        assert result.exit_code == 1
+        assert "does not support metadata" in result.output
+
+    def test_list_reverse_without_metadata(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that descending ID order works on a backend without metadata."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        for id in ["b", "a", "c"]:
+            cli_runner.invoke(app, ["-b", "log", "add", id, "-c", id])
+
+        result = cli_runner.invoke(app, ["-b", "log", "ls", "-r", "-n", "2"])
+
+        assert result.exit_code == 0
+        assert result.stdout == "c\nb\n"
+
+    def test_list_error_while_streaming(
+        self,
+        cli_runner: CliRunner,
+        app_with_mock: Typer,
+        mock_storage: MockStorage,
+        mocker: MockerFixture,
+    ) -> None:
+        """Test that a storage error after the first entry is reported."""
+
+        def failing(prefix: str = "", start: str | None = None) -> Iterator[str]:
+            yield "a"
+            raise StorageError("disk went away")
+
+        mocker.patch.object(mock_storage, "iter_ids", failing)
+
+        result = cli_runner.invoke(app_with_mock, ["list"])
+
+        assert result.exit_code == 1
+        assert "disk went away" in result.stderr
+
 
 class TestDeleteCommand:
     """Tests for the delete command."""
@@ -150,3 +270,804 @@ class TestDeleteCommand:
 
         assert result.exit_code == 1
         assert "not found" in result.output
+
+
+class TestMigrateCommand:
+    """Tests for the migrate command."""
+
+    def test_migrate_unsupported_backend_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that migrate fails on a backend without layouts."""
+        result = cli_runner.invoke(app_with_mock, ["migrate", "--layout", "sharded"])
+
+        assert result.exit_code == 1
+        assert "does not support migration" in result.output
+
+
+class TestBackendSelection:
+    """Tests for choosing the storage backend."""
+
+    @pytest.fixture(autouse=True)
+    def home(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        """Point the default storage locations at a temp directory."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        for name in ("TYP_TMPL_BACKEND", "TYP_TMPL_STORAGE", "TYP_TMPL_CONFIG"):
+            monkeypatch.delenv(name, raising=False)
+        return tmp_path
+
+    def test_sqlite_backend_option(self, cli_runner: CliRunner, home: Path) -> None:
+        """Test that --backend sqlite stores items in the database."""
+        result = cli_runner.invoke(app, ["--backend", "sqlite", "add", "n1", "-c", "x"])
+        assert result.exit_code == 0
+
+        result = cli_runner.invoke(app, ["--backend", "sqlite", "list"])
+
+        assert "n1" in result.output
+        assert (home / ".config" / "typ-tmpl" / "items.db").exists()
+        assert not (home / ".config" / "typ-tmpl" / "items" / "n1.txt").exists()
+
+    def test_backend_from_environment(
+        self, cli_runner: CliRunner, monkeypatch: pytest.MonkeyPatch, home: Path
+    ) -> None:
+        """Test that TYP_TMPL_BACKEND selects the backend."""
+        monkeypatch.setenv("TYP_TMPL_BACKEND", "sqlite")
+
+        result = cli_runner.invoke(app, ["add", "n1", "-c", "x"])
+
+        assert result.exit_code == 0
+        assert (home / ".config" / "typ-tmpl" / "items.db").exists()
+
+    def test_storage_url(
+        self, cli_runner: CliRunner, monkeypatch: pytest.MonkeyPatch, home: Path
+    ) -> None:
+        """Test that --storage and TYP_TMPL_STORAGE open the store at a URL."""
+        db = home / "data" / "items.db"
+        result = cli_runner.invoke(
+            app, ["--storage", f"sqlite://{db}", "add", "n1", "-c", "x"]
+        )
+        assert result.exit_code == 0
+        assert db.exists()
+
+        monkeypatch.setenv("TYP_TMPL_STORAGE", f"sqlite://{db}")
+        assert "n1" in cli_runner.invoke(app, ["list"]).output
+        # --backend on the command line beats the environment.
+        assert "n1" not in cli_runner.invoke(app, ["-b", "fs", "list"]).output
+
+    def test_storage_from_config_file(
+        self, cli_runner: CliRunner, monkeypatch: pytest.MonkeyPatch, home: Path
+    ) -> None:
+        """Test that the config file chooses the store unless overridden."""
+        config = home / ".config" / "typ-tmpl" / "config.toml"
+        config.parent.mkdir(parents=True)
+        config.write_text(f'storage = "fs://{home}/configured"\n')
+
+        cli_runner.invoke(app, ["add", "n1", "-c", "x"])
+        cli_runner.invoke(app, ["-b", "fs", "add", "n2", "-c", "x"])
+
+        assert (home / "configured" / "n1.txt").exists()
+        assert (home / ".config" / "typ-tmpl" / "items" / "n2.txt").exists()
+
+        monkeypatch.setenv("TYP_TMPL_CONFIG", str(home / "other.toml"))
+        (home / "other.toml").write_text("storage = [")
+        result = cli_runner.invoke(app, ["list"])
+        assert result.exit_code == 1
+        assert "invalid TOML" in result.output
+
+    def test_unknown_storage_scheme(self, cli_runner: CliRunner) -> None:
+        """Test that an unknown scheme is reported."""
+        result = cli_runner.invoke(app, ["--storage", "nope:///x", "list"])
+
+        assert result.exit_code == 1
+        assert "Unknown storage scheme 'nope'" in result.output
+
+
+class TestCompactCommand:
+    """Tests for the compact command."""
+
+    def test_compact_unsupported_backend_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that compact fails on a backend without compaction."""
+        result = cli_runner.invoke(app_with_mock, ["compact"])
+
+        assert result.exit_code == 1
+        assert "does not support compaction" in result.output
+
+    def test_compact_log_backend(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test compacting the log backend end to end."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        cli_runner.invoke(app, ["-b", "log", "add", "a", "-c", "A"])
+        cli_runner.invoke(app, ["-b", "log", "add", "b", "-c", "B"])
+        cli_runner.invoke(app, ["-b", "log", "delete", "a"])
+
+        result = cli_runner.invoke(app, ["-b", "log", "compact"])
+        assert result.exit_code == 0
+        assert "Compacted" in result.output
+
+        result = cli_runner.invoke(app, ["-b", "log", "list"])
+        assert "b" in result.output and "a" not in result.output.split()
+
+    @pytest.mark.parametrize(
+        ("options", "env", "compacted"),
+        [
+            ("", None, True),
+            ("?compact_ratio=0.9", None, False),
+            ("", "0", False),
+            ("?compact_ratio=0.5", "0", True),
+        ],
+    )
+    def test_log_backend_compacts_in_background(
+        self,
+        cli_runner: CliRunner,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        options: str,
+        env: str | None,
+        compacted: bool,
+    ) -> None:
+        """Test that deletes compact the log unless the ratio says otherwise."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.delenv("TYP_TMPL_LOG_COMPACT_RATIO", raising=False)
+        if env is not None:
+            monkeypatch.setenv("TYP_TMPL_LOG_COMPACT_RATIO", env)
+        storage = ["--storage", f"log://{tmp_path}/log{options}"]
+        cli_runner.invoke(app, [*storage, "add", "a", "-c", "deleted content"])
+        cli_runner.invoke(app, [*storage, "add", "b", "-c", "B"])
+
+        result = cli_runner.invoke(app, [*storage, "delete", "a"])
+
+        assert result.exit_code == 0
+        data = b"".join(p.read_bytes() for p in (tmp_path / "log").glob("*.seg"))
+        assert (b"deleted content" not in data) == compacted
+        result = cli_runner.invoke(app, [*storage, "get", "b"])
+        assert "B" in result.output
+
+
+class TestGcCommand:
+    """Tests for the gc command."""
+
+    def test_gc_unsupported_backend_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that gc fails on a backend without garbage collection."""
+        result = cli_runner.invoke(app_with_mock, ["gc"])
+
+        assert result.exit_code == 1
+        assert "does not support garbage collection" in result.output
+
+    def test_gc_dedup_backend(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test duplicate items and gc on the dedup backend end to end."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        blobs = tmp_path / ".config" / "typ-tmpl" / "dedup" / "blobs"
+        source = "".join(f'{{"id": "n{i}", "content": "same"}}\n' for i in range(5))
+        result = cli_runner.invoke(app, ["-b", "dedup", "import"], input=source)
+        assert result.exit_code == 0
+        (blobs / "00").mkdir()
+        (blobs / "00" / "stray").write_text("x")
+
+        result = cli_runner.invoke(app, ["-b", "dedup", "gc"])
+
+        assert result.exit_code == 0
+        assert "1 files removed" in result.output
+        assert len([p for p in blobs.rglob("*") if p.is_file()]) == 1
+        result = cli_runner.invoke(app, ["-b", "dedup", "get", "n3"])
+        assert result.stdout.strip() == "same"
+
+
+class TestFilterCommand:
+    """Tests for the filter command."""
+
+    def test_filter_unsupported_backend_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that filter fails on a backend without a membership filter."""
+        result = cli_runner.invoke(app_with_mock, ["filter"])
+
+        assert result.exit_code == 1
+        assert "does not support membership filters" in result.output
+
+    def test_filter_stats_and_rebuild(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test showing and rebuilding the filesystem backend's filter."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        cli_runner.invoke(app, ["add", "a", "A"])
+
+        result = cli_runner.invoke(app, ["filter"])
+        assert result.exit_code == 0
+        assert "Capacity: 262144 items" in result.output
+        assert "False-positive rate:" in result.output
+
+        result = cli_runner.invoke(app, ["filter", "--rebuild", "-c", "1000"])
+        assert result.exit_code == 0
+        assert "Rebuilt membership filter" in result.output
+        assert "Capacity: 1000 items" in result.output
+        assert "Hash functions: 7" in result.output
+
+    def test_capacity_requires_rebuild(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that --capacity alone is rejected."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        result = cli_runner.invoke(app, ["filter", "-c", "10"])
+
+        assert result.exit_code == 1
+        assert "--capacity requires --rebuild" in result.output
+
+
+class TestImportCommand:
+    """Tests for the import command."""
+
+    def test_import_ndjson_from_stdin(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test importing NDJSON records piped on stdin."""
+        data = '{"id": "a", "content": "A"}\n\n{"id": "b", "content": "B"}\n'
+
+        result = cli_runner.invoke(app_with_mock, ["import"], input=data)
+
+        assert result.exit_code == 0
+        assert "Imported 2 items" in result.output
+        assert mock_storage.items == {"a": "A", "b": "B"}
+
+    def test_import_csv_file_in_batches(
+        self,
+        cli_runner: CliRunner,
+        app_with_mock: Typer,
+        mock_storage: MockStorage,
+        tmp_path: Path,
+    ) -> None:
+        """Test importing a CSV file commits one add_many per batch."""
+        source = tmp_path / "items.csv"
+        rows = "".join(f'item{i},"line, {i}"\n' for i in range(5))
+        source.write_text("id,content\n" + rows)
+
+        result = cli_runner.invoke(
+            app_with_mock, ["import", str(source), "--batch-size", "2"]
+        )
+
+        assert result.exit_code == 0
+        assert mock_storage.items["item3"] == "line, 3"
+        batches = [args for name, args in mock_storage.calls if name == "add_many"]
+        assert [len(args[0]) for args in batches] == [2, 2, 1]
+
+    def test_import_conflict_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that an existing ID aborts the import by default."""
+        mock_storage.items["b"] = "Old"
+        data = '{"id": "a", "content": "A"}\n{"id": "b", "content": "B"}\n'
+
+        result = cli_runner.invoke(app_with_mock, ["import"], input=data)
+
+        assert result.exit_code == 1
+        assert "already exists" in result.output
+        assert mock_storage.items == {"b": "Old"}
+
+    def test_import_conflict_skip(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that --on-conflict skip keeps going past existing IDs."""
+        mock_storage.items["b"] = "Old"
+        data = "".join(
+            f'{{"id": "{id}", "content": "New"}}\n' for id in ["a", "b", "a", "c"]
+        )
+
+        result = cli_runner.invoke(
+            app_with_mock, ["import", "--on-conflict", "skip"], input=data
+        )
+
+        assert result.exit_code == 0
+        assert "skipped 2 existing" in result.output
+        assert mock_storage.items == {"a": "New", "b": "Old", "c": "New"}
+
+    def test_import_malformed_record_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that a malformed line reports its line number."""
+        data = '{"id": "a", "content": "A"}\n{"id": "b"}\n'
+
+        result = cli_runner.invoke(app_with_mock, ["import"], input=data)
+
+        assert result.exit_code == 1
+        assert "Line 2" in result.output
+
+    def test_import_missing_file_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer, tmp_path: Path
+    ) -> None:
+        """Test that an unreadable source is reported without a traceback."""
+        source = tmp_path / "missing.ndjson"
+
+        result = cli_runner.invoke(app_with_mock, ["import", str(source)])
+
+        assert result.exit_code == 1
+        assert "Cannot open" in result.output
+        assert "No such file" in result.output
+
+
+class TestGetCommand:
+    """Tests for the get command."""
+
+    def test_get_prints_content(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that get prints the item content verbatim."""
+        mock_storage.items["note1"] = "[bold]not markup[/bold]"
+
+        result = cli_runner.invoke(app_with_mock, ["get", "note1"])
+
+        assert result.exit_code == 0
+        assert result.output == "[bold]not markup[/bold]\n"
+
+    def test_get_nonexistent_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that getting a nonexistent item fails."""
+        result = cli_runner.invoke(app_with_mock, ["get", "missing"])
+
+        assert result.exit_code == 1
+        assert "not found" in result.output
+
+
+class TestShellCommand:
+    """Tests for the shell command."""
+
+    def test_shell_runs_script(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that a piped script runs every command on one storage."""
+        script = (
+            "# comment line\n"
+            'add note1 -c "First note"\n'
+            "\n"
+            "a note2 --content Second\n"
+            "get note1\n"
+            "delete note2\n"
+            "list\n"
+        )
+
+        result = cli_runner.invoke(app_with_mock, ["shell"], input=script)
+
+        assert result.exit_code == 0
+        assert "First note" in result.output
+        assert mock_storage.items == {"note1": "First note"}
+
+    def test_shell_continues_after_error(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that failures are reported and the exit status reflects them."""
+        script = "delete missing\nbogus\nadd note1 -c x\n"
+
+        result = cli_runner.invoke(app_with_mock, ["shell"], input=script)
+
+        assert result.exit_code == 1
+        assert "not found" in result.output
+        assert "No such command" in result.output
+        assert mock_storage.items == {"note1": "x"}
+
+    def test_shell_stop_on_error(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that --stop-on-error ends the session at the first failure."""
+        script = "delete missing\nadd note1 -c x\n"
+
+        result = cli_runner.invoke(
+            app_with_mock, ["shell", "--stop-on-error"], input=script
+        )
+
+        assert result.exit_code == 1
+        assert mock_storage.items == {}
+
+    def test_shell_exit_and_nesting(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that nested shells are refused and exit ends the session."""
+        script = "shell\nexit\nadd note1 -c x\n"
+
+        result = cli_runner.invoke(app_with_mock, ["shell"], input=script)
+
+        assert "not available in the shell" in result.output
+        assert mock_storage.items == {}
+
+    def test_shell_shares_one_storage(
+        self,
+        cli_runner: CliRunner,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        mocker: MockerFixture,
+    ) -> None:
+        """Test that the real app opens the storage once per session."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        create = mocker.spy(main_module, "create_storage")
+
+        result = cli_runner.invoke(
+            app, ["shell"], input="add a -c A\nadd b -c B\nlist\n"
+        )
+
+        assert result.exit_code == 0
+        assert "a" in result.output and "b" in result.output
+        assert create.call_count == 1
+
+
+class TestBulkCommand:
+    """Tests for the bulk command."""
+
+    def test_bulk_add_get_delete(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test each operation on a backend run through a single worker."""
+        data = '{"id": "a", "content": "A"}\n{"id": "b", "content": "B"}\n'
+
+        result = cli_runner.invoke(app_with_mock, ["bulk", "add"], input=data)
+        assert result.exit_code == 0
+        assert mock_storage.items == {"a": "A", "b": "B"}
+
+        result = cli_runner.invoke(app_with_mock, ["bulk", "get"], input="b\n\na\n")
+        assert result.exit_code == 0
+        assert result.stdout.splitlines() == [
+            '{"id": "b", "content": "B"}',
+            '{"id": "a", "content": "A"}',
+        ]
+
+        result = cli_runner.invoke(app_with_mock, ["bulk", "delete"], input="a\n")
+        assert result.exit_code == 0
+        assert mock_storage.items == {"b": "B"}
+
+    def test_bulk_reports_failures_and_continues(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that failed operations are reported without stopping the rest."""
+        mock_storage.items.update({"a": "A", "c": "C"})
+
+        result = cli_runner.invoke(
+            app_with_mock, ["bulk", "delete", "-j", "2"], input="a\nmissing\nc\n"
+        )
+
+        assert result.exit_code == 1
+        assert "Item 'missing' not found" in result.stderr
+        assert "2 succeeded, 1 failed" in result.stderr
+        assert mock_storage.items == {}
+
+    def test_bulk_missing_file_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer, tmp_path: Path
+    ) -> None:
+        """Test that an unreadable source is reported without a traceback."""
+        source = tmp_path / "missing.ndjson"
+
+        result = cli_runner.invoke(app_with_mock, ["bulk", "add", str(source)])
+
+        assert result.exit_code == 1
+        assert "Cannot open" in result.stderr
+        assert "such file" in result.stderr
+
+    def test_bulk_filesystem_concurrently(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test bulk operations against the filesystem backend."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        source = tmp_path / "items.ndjson"
+        source.write_text(
+            "".join(f'{{"id": "n{i}", "content": "{i}"}}\n' for i in range(50))
+        )
+
+        result = cli_runner.invoke(app, ["bulk", "add", str(source), "-j", "8"])
+        assert result.exit_code == 0
+
+        result = cli_runner.invoke(app, ["list"])
+        assert len(result.stdout.split()) == 50
+
+        ids = "".join(f"n{i}\n" for i in range(50))
+        result = cli_runner.invoke(app, ["bulk", "get", "-j", "8"], input=ids)
+        assert result.exit_code == 0
+        assert result.stdout.splitlines()[7] == '{"id": "n7", "content": "7"}'
+
+
+class TestSearchCommand:
+    """Tests for the search command."""
+
+    def test_search_prints_ids_by_relevance(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that matching IDs are printed best first."""
+        mock_storage.items.update(
+            {"a": "apple pie", "b": "apple apple tart", "c": "cherry"}
+        )
+
+        result = cli_runner.invoke(app_with_mock, ["search", "Apple", "-n", "5"])
+
+        assert result.exit_code == 0
+        assert result.stdout == "b\na\n"
+        assert ("search", ("Apple", 5, False)) in mock_storage.calls
+
+    def test_search_all_words_as_ndjson(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test --all and the NDJSON output with scores."""
+        mock_storage.items.update({"a": "apple pie", "b": "apple tart"})
+
+        result = cli_runner.invoke(
+            app_with_mock, ["search", "apple", "pie", "--all", "-f", "ndjson"]
+        )
+
+        assert result.exit_code == 0
+        assert [json.loads(line) for line in result.stdout.splitlines()] == [
+            {"id": "a", "score": 2.0}
+        ]
+
+    def test_search_no_matches(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that an empty result is reported on stderr."""
+        result = cli_runner.invoke(app_with_mock, ["search", "nothing"])
+
+        assert result.exit_code == 0
+        assert result.stdout == ""
+        assert "No matching items" in result.stderr
+
+    def test_search_filesystem_backend(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that adds and deletes are reflected in search results."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        cli_runner.invoke(app, ["add", "n1", "-c", "quarterly budget review"])
+        cli_runner.invoke(app, ["add", "n2", "-c", "budget"])
+        cli_runner.invoke(app, ["delete", "n2"])
+
+        result = cli_runner.invoke(app, ["search", "budget", "-f", "json"])
+
+        assert result.exit_code == 0
+        assert [hit["id"] for hit in json.loads(result.stdout)] == ["n1"]
+
+    def test_search_unsupported_backend_fails(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that backends without a search index are rejected."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+
+        result = cli_runner.invoke(app, ["-b", "log", "search", "anything"])
+
+        assert result.exit_code == 1
+        assert "does not support search" in result.stderr
+
+
+class TestCompression:
+    """Tests for the --compress option."""
+
+    def test_large_items_compressed_by_default(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that large items are written compressed and read back plain."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        items = tmp_path / ".config" / "typ-tmpl" / "items"
+        content = "compressible text " * 1000
+
+        cli_runner.invoke(app, ["add", "big", "-c", content])
+        cli_runner.invoke(app, ["--compress", "none", "add", "plain", "-c", content])
+        result = cli_runner.invoke(app, ["get", "big"])
+
+        assert result.stdout.rstrip("\n") == content
+        assert (items / "big.txt").read_bytes().startswith(b"\xffz")
+        assert (items / "plain.txt").read_text() == content
+
+
+class TestDurability:
+    """Tests for the --durability option."""
+
+    @pytest.mark.parametrize("durability", ["none", "batch", "always"])
+    def test_every_mode_round_trips(
+        self,
+        cli_runner: CliRunner,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        durability: str,
+    ) -> None:
+        """Test that items written in each mode are stored completely."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TYP_TMPL_DURABILITY", durability)
+        items = tmp_path / ".config" / "typ-tmpl" / "items"
+
+        result = cli_runner.invoke(app, ["add", "a", "-c", "A"])
+        assert result.exit_code == 0
+        result = cli_runner.invoke(app, ["import"], input='{"id": "b", "content": "B"}')
+        assert result.exit_code == 0
+
+        assert sorted(path.name for path in items.iterdir()) == [
+            ".index",
+            "a.txt",
+            "b.txt",
+        ]
+
+    def test_gc_removes_interrupted_writes(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that gc cleans up temp files on the filesystem backend."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        cli_runner.invoke(app, ["add", "a", "-c", "A"])
+        items = tmp_path / ".config" / "typ-tmpl" / "items"
+        (items / ".b.txt.1.2.tmp").write_text("partial")
+
+        result = cli_runner.invoke(app, ["gc"])
+
+        assert result.exit_code == 0
+        assert "1 files removed" in result.output
+        assert not (items / ".b.txt.1.2.tmp").exists()
+
+
+class TestProfiling:
+    """Tests for the --profile and --metrics-file options."""
+
+    def test_summary_reports_storage_calls(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the summary splits time and lists each storage method."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        cli_runner.invoke(app, ["add", "a", "-c", "A"])
+        summary = tmp_path / "summary.txt"
+
+        result = cli_runner.invoke(
+            app, ["--profile", "summary", "--profile-output", str(summary), "list"]
+        )
+
+        assert result.exit_code == 0
+        assert result.output == "a\n"
+        text = summary.read_text()
+        assert text.startswith("Profile of list:")
+        assert "storage" in text and "iter_ids " in text and "close " in text
+
+    @pytest.mark.parametrize(
+        ("mode", "marker"), [("cprofile", b""), ("collapsed", b";")]
+    )
+    def test_profile_files(
+        self,
+        cli_runner: CliRunner,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        mode: str,
+        marker: bytes,
+    ) -> None:
+        """Test that the cProfile and collapsed-stack modes write their file."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("TYP_TMPL_PROFILE", mode)
+        output = tmp_path / "profile.out"
+        monkeypatch.setenv("TYP_TMPL_PROFILE_OUTPUT", str(output))
+
+        result = cli_runner.invoke(
+            app,
+            ["import"],
+            input="".join(f'{{"id": "n{i}", "content": "x"}}\n' for i in range(200)),
+        )
+
+        assert result.exit_code == 0
+        assert f"Wrote profile to {output}" in result.output
+        assert output.stat().st_size > 0 and marker in output.read_bytes()
+
+    def test_metrics_file(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that metrics are exported in Prometheus text format."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        metrics = tmp_path / "typ-tmpl.prom"
+        cli_runner.invoke(app, ["add", "a", "-c", "hello"])
+
+        result = cli_runner.invoke(app, ["--metrics-file", str(metrics), "get", "a"])
+
+        assert result.exit_code == 0
+        assert result.output == "hello\n"
+        lines = metrics.read_text().splitlines()
+        assert 'typ_tmpl_storage_calls_total{method="get"} 1' in lines
+        assert 'typ_tmpl_storage_bytes_total{method="get"} 5' in lines
+        assert (
+            'typ_tmpl_storage_call_duration_seconds_bucket{method="get",le="+Inf"} 1'
+            in lines
+        )
+
+
+class TestCatCommand:
+    """Tests for the cat command."""
+
+    def test_cat_writes_raw_content(
+        self, cli_runner: CliRunner, app_with_mock: Typer, mock_storage: MockStorage
+    ) -> None:
+        """Test that items are written as stored, one after another."""
+        mock_storage.add("a", "first\n")
+        mock_storage.add("b", "[red]second[/]")
+
+        result = cli_runner.invoke(app_with_mock, ["cat", "a", "b"])
+
+        assert result.exit_code == 0
+        assert result.output == "first\n[red]second[/]"
+
+    def test_cat_nonexistent_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer
+    ) -> None:
+        """Test that a missing item is an error."""
+        result = cli_runner.invoke(app_with_mock, ["cat", "missing"])
+
+        assert result.exit_code == 1
+        assert "not found" in result.output
+
+    def test_cat_large_compressed_item(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a compressed filesystem item streams back intact."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        content = "".join(f"{i:08d}\n" for i in range(100_000))
+        cli_runner.invoke(
+            app, ["import"], input=json.dumps({"id": "big", "content": content})
+        )
+
+        result = cli_runner.invoke(app, ["cat", "big"])
+
+        assert result.exit_code == 0
+        assert result.output == content
+
+
+class TestSnapshotCommands:
+    """Tests for the export and import-snapshot commands."""
+
+    def test_export_and_import(
+        self,
+        cli_runner: CliRunner,
+        app_with_mock: Typer,
+        mock_storage: MockStorage,
+        tmp_path: Path,
+    ) -> None:
+        """Test that an exported store imports back into another one."""
+        mock_storage.add_many([("a", "A"), ("b", "B"), ("c", "C")])
+        path = tmp_path / "items.snap"
+
+        result = cli_runner.invoke(app_with_mock, ["export", str(path)])
+        assert result.exit_code == 0
+        assert "Exported 3 items" in result.output
+
+        mock_storage.items.clear()
+        mock_storage.add("a", "kept")
+        result = cli_runner.invoke(
+            app_with_mock,
+            ["import-snapshot", str(path), "--on-conflict", "skip", "-n", "2"],
+        )
+        assert result.exit_code == 0
+        assert "Imported 2 items, skipped 1 existing" in result.output
+        assert mock_storage.items == {"a": "kept", "b": "B", "c": "C"}
+
+        result = cli_runner.invoke(app_with_mock, ["import-snapshot", str(path)])
+        assert result.exit_code == 1
+        assert "already exists" in result.output
+
+    def test_import_invalid_snapshot_fails(
+        self, cli_runner: CliRunner, app_with_mock: Typer, tmp_path: Path
+    ) -> None:
+        """Test that a file that is not a snapshot is an error."""
+        path = tmp_path / "items.snap"
+        path.write_text("not a snapshot")
+
+        result = cli_runner.invoke(app_with_mock, ["import-snapshot", str(path)])
+
+        assert result.exit_code == 1
+        assert "not a snapshot" in result.output
+
+    def test_mount_snapshot(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that --snapshot serves reads and refuses writes."""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        path = tmp_path / "items.snap"
+        cli_runner.invoke(app, ["add", "note", "-c", "hello"])
+        cli_runner.invoke(app, ["export", str(path)])
+        cli_runner.invoke(app, ["delete", "note"])
+
+        listed = cli_runner.invoke(app, ["--snapshot", str(path), "list"])
+        got = cli_runner.invoke(app, ["--snapshot", str(path), "cat", "note"])
+        added = cli_runner.invoke(app, ["--snapshot", str(path), "add", "x", "-c", "y"])
+        missing = cli_runner.invoke(app, ["--snapshot", str(tmp_path / "nope"), "list"])
+
+        assert listed.exit_code == 0 and "note" in listed.output
+        assert got.output == "hello"
+        assert added.exit_code == 1 and "read-only" in added.output
+        assert missing.exit_code == 1
@@ -0,0 +1,121 @@
+"""Startup cost regression tests."""
+
+import os
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import time typ_tmpl.main may add on top of typer itself, in milliseconds.
+STARTUP_BUDGET_MS = 50
+
+# CPU time a whole command may take on top of starting Python and importing
+# typer, in milliseconds. A command currently needs 100-150 ms; the margin
+# leaves room for slower machines while still catching an eager import of a
+# heavy dependency or a scan of the whole store.
+COMMAND_BUDGET_MS = 300
+
+# Modules that must only be imported by the commands that need them.
+LAZY_MODULES = [
+    "importlib.metadata",
+    "rich",
+    "sqlite3",
+    "tomllib",
+    "typ_tmpl.storage.bloom",
+    "typ_tmpl.storage.cached",
+    "typ_tmpl.storage.dedup",
+    "typ_tmpl.storage.filesystem",
+    "typ_tmpl.storage.instrumented",
+    "typ_tmpl.storage.log",
+    "typ_tmpl.storage.memory",
+    "typ_tmpl.storage.metadata",
+    "typ_tmpl.storage.records",
+    "typ_tmpl.storage.search",
+    "typ_tmpl.storage.snapshot",
+    "typ_tmpl.storage.streams",
+    "typ_tmpl.storage.sqlite",
+    "typ_tmpl.storage.wrapper",
+]
+
+
+def import_times(modules: str) -> dict[str, int]:
+    """Import modules in a fresh interpreter and parse -X importtime output.
+
+    Args:
+        modules: Comma-separated modules, imported in order.
+
+    Returns:
+        Cumulative import time in microseconds per module name.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def cpu_time(args: list[str], env: dict[str, str] | None = None) -> float:
+    """Run a command to completion and return its CPU time in milliseconds.
+
+    User and system time of the child are counted, so time spent waiting
+    for the scheduler or the disk does not count against the budget.
+    """
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(args, env=env, capture_output=True, check=True)
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    seconds = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return seconds * 1000
+
+
+class TestStartup:
+    """Tests guarding CLI startup cost."""
+
+    def test_heavy_modules_are_not_imported(self) -> None:
+        """Test that importing the app leaves Rich, metadata and backends alone."""
+        code = "import sys, typ_tmpl.main; print(' '.join(sorted(sys.modules)))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        loaded = set(result.stdout.split())
+
+        assert [m for m in LAZY_MODULES if m in loaded] == []
+
+    def test_import_time_within_budget(self) -> None:
+        """Test that the app adds at most STARTUP_BUDGET_MS on top of typer."""
+        overheads = []
+        for _ in range(3):
+            # Importing typer first charges everything it loads to typer,
+            # even modules typ_tmpl.main happens to import before it.
+            times = import_times("typer, typ_tmpl.main")
+            overheads.append(times["typ_tmpl.main"] / 1000)
+
+        assert min(overheads) < STARTUP_BUDGET_MS
+
+    @pytest.mark.parametrize(
+        "command", [["add", "note{i}", "-c", "Hello"], ["list"], ["get", "seed"]]
+    )
+    def test_command_time_within_budget(
+        self, tmp_path: Path, command: list[str]
+    ) -> None:
+        """Test that a real command costs at most COMMAND_BUDGET_MS over typer."""
+        env = {k: v for k, v in os.environ.items() if not k.startswith("TYP_TMPL_")}
+        env["HOME"] = str(tmp_path)
+        app = [sys.executable, "-m", "typ_tmpl"]
+        cpu_time([*app, "add", "seed", "-c", "Hello"], env)
+        overheads = []
+        for i in range(3):
+            args = [*app, *(arg.format(i=i) for arg in command)]
+            baseline = cpu_time([sys.executable, "-c", "import typer"])
+            overheads.append(cpu_time(args, env) - baseline)
+
+        assert min(overheads) < COMMAND_BUDGET_MS
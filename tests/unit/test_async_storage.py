@@ -0,0 +1,135 @@
+"""Unit tests for asynchronous storage."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.errors import AppError, ItemExistsError, ItemNotFoundError
+from typ_tmpl.protocols.async_storage import AsyncStorage
+from typ_tmpl.storage.async_filesystem import AsyncFilesystemStorage
+from typ_tmpl.storage.executor import ExecutorStorage, run_bounded
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.layout import Layout
+
+
+class TestAsyncFilesystemStorage:
+    """Tests for AsyncFilesystemStorage."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that every protocol method reaches the filesystem store."""
+
+        async def scenario() -> None:
+            storage: AsyncStorage = AsyncFilesystemStorage(
+                FilesystemStorage(base_dir=tmp_path)
+            )
+            await storage.add("a", "A")
+            await storage.add_many([("b", "B"), ("c", "C")])
+            await storage.delete("c")
+            with pytest.raises(ItemNotFoundError):
+                await storage.delete("c")
+
+            assert await storage.list() == ["a", "b"]
+            assert await storage.get("a") == "A"
+            assert await storage.exists("c") is False
+            assert await storage.get_many(["b", "x"]) == {"b": "B", "x": None}
+            assert await storage.exists_many(["a", "x"]) == {"a": True, "x": False}
+            await storage.delete_many(["a", "b"])
+            assert await storage.list() == []
+            await storage.close()
+
+        asyncio.run(scenario())
+
+    @pytest.mark.parametrize("layout", [Layout.FLAT, Layout.SHARDED])
+    def test_concurrent_writes_keep_manifest(
+        self, tmp_path: Path, mocker: MockerFixture, layout: Layout
+    ) -> None:
+        """Test that overlapping adds and deletes keep the manifest valid."""
+        sync = FilesystemStorage(base_dir=tmp_path, layout=layout)
+        sync.list()
+        ids = [f"item{i:03}" for i in range(200)]
+
+        async def scenario() -> None:
+            storage = AsyncFilesystemStorage(sync, max_workers=16)
+            await asyncio.gather(*(storage.add(id, id) for id in ids))
+            await asyncio.gather(*(storage.delete(id) for id in ids[::2]))
+            storage.shutdown()
+
+        asyncio.run(scenario())
+        scan = mocker.spy(sync, "_scan_ids")
+
+        assert sync.list() == ids[1::2]
+        assert scan.call_count == 0
+
+    def test_concurrent_add_of_one_id(self, tmp_path: Path) -> None:
+        """Test that only one of several concurrent adds of an ID succeeds."""
+
+        async def scenario() -> list[BaseException | None]:
+            storage = AsyncFilesystemStorage(FilesystemStorage(base_dir=tmp_path))
+            results = await asyncio.gather(
+                *(storage.add("a", str(i)) for i in range(20)),
+                return_exceptions=True,
+            )
+            storage.shutdown()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert results.count(None) == 1
+        assert all(isinstance(r, ItemExistsError) for r in results if r is not None)
+
+
+class TestExecutorStorage:
+    """Tests for ExecutorStorage over a non-thread-safe backend."""
+
+    def test_single_worker_uses_one_thread(self, mocker: MockerFixture) -> None:
+        """Test that calls run on one thread by default."""
+        mock = MockStorage(items={"a": "A"})
+        threads = set()
+
+        def get(id: str) -> str | None:
+            threads.add(threading.get_ident())
+            return mock.items.get(id)
+
+        mocker.patch.object(mock, "get", side_effect=get)
+
+        async def scenario() -> list[str | None]:
+            storage = ExecutorStorage(mock)
+            results = await asyncio.gather(*(storage.get("a") for _ in range(5)))
+            storage.shutdown()
+            return results
+
+        assert asyncio.run(scenario()) == ["A"] * 5
+        assert len(threads) == 1
+        assert threading.get_ident() not in threads
+
+
+class TestRunBounded:
+    """Tests for run_bounded."""
+
+    def test_limits_concurrency_and_keeps_order(self) -> None:
+        """Test that results come back in order with bounded concurrency."""
+        running = peak = 0
+
+        async def work(n: int) -> int:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001 * (n % 3))
+            running -= 1
+            if n == 5:
+                raise ItemNotFoundError(str(n))
+            return n * 2
+
+        async def scenario() -> list[tuple[int, int | AppError]]:
+            return [r async for r in run_bounded(work, range(10), limit=3)]
+
+        results = asyncio.run(scenario())
+
+        assert [n for n, _ in results] == list(range(10))
+        assert isinstance(results[5][1], ItemNotFoundError)
+        assert [r for n, r in results if n != 5] == [n * 2 for n in range(10) if n != 5]
+        assert peak == 3
@@ -0,0 +1,123 @@
+"""Unit tests for batch storage operations."""
+
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.errors import BatchError, ItemExistsError, ItemNotFoundError
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+
+
+class TestBatchOperations:
+    """Tests for add_many, get_many, delete_many and exists_many."""
+
+    def test_add_many_adds_all(self, storage: Storage) -> None:
+        """Test that add_many stores every item."""
+        storage.add_many([("b", "B"), ("a", "A"), ("c", "C")])
+
+        assert storage.list() == ["a", "b", "c"]
+        assert storage.get("b") == "B"
+
+    def test_add_many_is_all_or_nothing(self, storage: Storage) -> None:
+        """Test that one conflict leaves the store unchanged."""
+        storage.add("b", "Old")
+
+        with pytest.raises(BatchError) as exc_info:
+            storage.add_many([("a", "A"), ("b", "B"), ("c", "C")])
+
+        assert storage.list() == ["b"]
+        assert storage.get("b") == "Old"
+        assert list(exc_info.value.failures) == ["b"]
+        assert isinstance(exc_info.value.failures["b"], ItemExistsError)
+
+    def test_add_many_reports_every_conflict(self, storage: Storage) -> None:
+        """Test that all conflicts are reported, including in-batch repeats."""
+        storage.add_many([("a", "A"), ("b", "B")])
+
+        with pytest.raises(BatchError) as exc_info:
+            storage.add_many([("a", "A"), ("x", "X"), ("b", "B"), ("x", "Y")])
+
+        assert sorted(exc_info.value.failures) == ["a", "b", "x"]
+        assert storage.list() == ["a", "b"]
+
+    def test_add_many_empty(self, storage: Storage) -> None:
+        """Test that an empty batch is a no-op."""
+        storage.add_many([])
+
+        assert storage.list() == []
+
+    def test_get_many(self, storage: Storage) -> None:
+        """Test that get_many returns content or None per ID."""
+        storage.add_many([("a", "A"), ("b", "B")])
+
+        assert storage.get_many(["b", "missing", "a"]) == {
+            "b": "B",
+            "missing": None,
+            "a": "A",
+        }
+
+    def test_exists_many(self, storage: Storage) -> None:
+        """Test that exists_many reports each ID."""
+        storage.add("a", "A")
+
+        assert storage.exists_many(["a", "b"]) == {"a": True, "b": False}
+
+    def test_delete_many_deletes_all(self, storage: Storage) -> None:
+        """Test that delete_many removes every item."""
+        storage.add_many([("a", "A"), ("b", "B"), ("c", "C")])
+
+        storage.delete_many(["a", "c"])
+
+        assert storage.list() == ["b"]
+
+    def test_delete_many_is_all_or_nothing(self, storage: Storage) -> None:
+        """Test that one missing ID leaves the store unchanged."""
+        storage.add_many([("a", "A"), ("b", "B")])
+
+        with pytest.raises(BatchError) as exc_info:
+            storage.delete_many(["a", "missing", "b", "b"])
+
+        assert sorted(exc_info.value.failures) == ["b", "missing"]
+        assert isinstance(exc_info.value.failures["missing"], ItemNotFoundError)
+        assert storage.list() == ["a", "b"]
+
+
+class TestFilesystemBatch:
+    """Tests for FilesystemStorage batch internals."""
+
+    def test_add_many_lists_each_directory_once(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that existence checks use one listing per directory."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        items = [(f"item{i}", "x") for i in range(50)]
+        # Deleted IDs stay in the ID filter, so they are checked on disk.
+        storage.add_many(items)
+        storage.delete_many(id for id, _ in items)
+        listdir = mocker.spy(os, "listdir")
+
+        storage.add_many(items)
+
+        assert listdir.call_count == 1
+
+    def test_failed_write_rolls_back(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that files written before a failure are removed."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        encode = FilesystemStorage._encode
+
+        def failing_encode(self: FilesystemStorage, content: str) -> bytes:
+            if content == "C":
+                raise OSError("disk full")
+            return encode(self, content)
+
+        mocker.patch.object(FilesystemStorage, "_encode", failing_encode)
+
+        with pytest.raises(OSError):
+            storage.add_many([("a", "A"), ("b", "B"), ("c", "C")])
+
+        assert storage.list() == []
@@ -0,0 +1,206 @@
+"""Unit tests for the Bloom filter over item IDs."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.errors import BatchError, ItemExistsError
+from typ_tmpl.storage.bloom import BloomFilter, geometry
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.manifest import Manifest
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> Iterator[FilesystemStorage]:
+    """Create a FilesystemStorage in a temp directory."""
+    storage = FilesystemStorage(base_dir=tmp_path)
+    yield storage
+    storage.close()
+
+
+class TestBloomFilter:
+    """Tests for the filter file itself."""
+
+    def test_geometry(self) -> None:
+        """Test slot and hash counts against the textbook formulas."""
+        assert geometry(1000, 0.01) == (9586, 7)
+        assert geometry(0, 0.01)[0] >= 8
+
+    def test_no_false_negatives(self, tmp_path: Path) -> None:
+        """Test that every added key is reported as present."""
+        keys = [f"key{i}" for i in range(2000)]
+        flt = BloomFilter.create(tmp_path / "f.bloom", keys[:1000], capacity=2000)
+        flt.update(keys[1000:])
+
+        assert all(key in flt for key in keys)
+        flt.close()
+
+    def test_false_positive_rate_near_target(self, tmp_path: Path) -> None:
+        """Test that the measured and estimated rates stay near the target."""
+        flt = BloomFilter.create(
+            tmp_path / "f.bloom", (f"in{i}" for i in range(5000)), capacity=5000
+        )
+
+        false_positives = sum(f"out{i}" in flt for i in range(20000))
+        stats = flt.stats()
+
+        assert false_positives / 20000 < 0.02
+        assert 0.005 < stats.false_positive_rate < 0.02
+        assert 0.4 < stats.fill < 0.6
+        assert (stats.capacity, stats.hashes) == (5000, 7)
+        flt.close()
+
+    def test_persisted_and_shared(self, tmp_path: Path) -> None:
+        """Test that keys added through one mapping are seen by another."""
+        path = tmp_path / "f.bloom"
+        first = BloomFilter.create(path, ["a"], capacity=100)
+        second = BloomFilter.open(path)
+        assert second is not None
+
+        first.add("b")
+
+        assert "b" in second
+        first.close()
+        second.close()
+        reopened = BloomFilter.open(path)
+        assert reopened is not None
+        assert "a" in reopened and "b" in reopened
+        reopened.close()
+
+    def test_create_merges_into_existing(self, tmp_path: Path) -> None:
+        """Test that a concurrent build adds to the filter already installed."""
+        path = tmp_path / "f.bloom"
+        first = BloomFilter.create(path, ["a"], capacity=100)
+        second = BloomFilter.create(path, ["b"], capacity=5000)
+
+        assert second.capacity == 100
+        assert "a" in second and "b" in first
+        assert [p.name for p in tmp_path.iterdir()] == ["f.bloom"]
+        first.close()
+        second.close()
+
+    def test_replace_retires_old_filter(self, tmp_path: Path) -> None:
+        """Test that a replaced filter answers yes to everything."""
+        path = tmp_path / "f.bloom"
+        old = BloomFilter.create(path, ["a"], capacity=100)
+        assert "missing" not in old
+
+        new = BloomFilter.create(path, ["b"], capacity=100, replace=True)
+
+        assert old.retired and not new.retired
+        assert "missing" in old
+        assert "a" not in new and "b" in new
+        old.close()
+        new.close()
+
+    def test_invalid_file(self, tmp_path: Path) -> None:
+        """Test that missing and foreign files are not opened."""
+        path = tmp_path / "f.bloom"
+        assert BloomFilter.open(path) is None
+        path.write_bytes(b"not a filter at all, just some text")
+        assert BloomFilter.open(path) is None
+
+
+class TestFilteredStorage:
+    """Tests for FilesystemStorage consulting the ID filter."""
+
+    def test_new_ids_skip_disk_checks(
+        self, storage: FilesystemStorage, mocker: MockerFixture
+    ) -> None:
+        """Test that IDs the filter rules out are never stat'ed."""
+        storage.add("warmup", "x")
+        exists = mocker.spy(Path, "exists")
+
+        for i in range(100):
+            storage.add(f"item{i}", "x")
+        assert not storage.exists("missing")
+
+        checked = [call.args[0] for call in exists.call_args_list]
+        assert [path for path in checked if path.suffix == ".txt"] == []
+
+    def test_duplicates_still_detected(self, storage: FilesystemStorage) -> None:
+        """Test that filter hits fall back to the real check."""
+        storage.add("a", "x")
+        storage.add_many([("b", "y")])
+
+        with pytest.raises(ItemExistsError):
+            storage.add("a", "z")
+        with pytest.raises(BatchError):
+            storage.add_many([("c", "z"), ("b", "z")])
+        assert storage.exists("a") and storage.exists_many(["b", "c"]) == {
+            "b": True,
+            "c": False,
+        }
+
+    def test_deleted_items_fall_back(self, storage: FilesystemStorage) -> None:
+        """Test that deleted IDs stay in the filter but are not reported."""
+        storage.add("a", "x")
+        storage.delete("a")
+
+        assert not storage.exists("a")
+        storage.add("a", "y")
+        assert storage.get("a") == "y"
+
+    def test_shared_between_instances(self, tmp_path: Path) -> None:
+        """Test that items added by one instance are seen by another."""
+        first = FilesystemStorage(base_dir=tmp_path)
+        second = FilesystemStorage(base_dir=tmp_path)
+        assert not second.exists("a")
+
+        first.add("a", "x")
+
+        assert second.exists("a")
+        with pytest.raises(ItemExistsError):
+            second.add("a", "y")
+        first.close()
+        second.close()
+
+    def test_outside_files_picked_up(self, tmp_path: Path) -> None:
+        """Test that files added behind the store's back are found on reopen."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "x")
+        storage.close()
+        (tmp_path / "outside.txt").write_text("y")
+
+        storage = FilesystemStorage(base_dir=tmp_path)
+        assert storage.exists("outside")
+        storage.close()
+
+    def test_outside_files_picked_up_while_open(
+        self, storage: FilesystemStorage, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that misses skip the manifest until it notices outside files."""
+        storage.add("a", "x")
+        (tmp_path / "x.txt").write_text("hi")
+        refresh = mocker.spy(Manifest, "refresh")
+
+        assert not storage.exists("x")
+        assert refresh.call_count == 0
+
+        assert "x" in storage.list()
+        assert storage.exists("x")
+        assert storage.exists_many(["x", "y"]) == {"x": True, "y": False}
+        with pytest.raises(BatchError):
+            storage.add_many([("x", "z")])
+        with pytest.raises(ItemExistsError):
+            storage.add("x", "z")
+
+    def test_rebuild_filter(self, tmp_path: Path) -> None:
+        """Test that a rebuild drops deleted IDs and reaches other instances."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        other = FilesystemStorage(base_dir=tmp_path)
+        storage.add_many([(f"item{i}", "x") for i in range(10)])
+        storage.delete_many(f"item{i}" for i in range(5))
+        assert other.exists("item9")
+
+        stats = storage.rebuild_filter(capacity=50)
+
+        assert stats.capacity == 50
+        assert other.filter_stats() == stats
+        assert other.exists("item9") and not other.exists("item0")
+        other.add("new", "x")
+        assert storage.exists("new")
+        storage.close()
+        other.close()
@@ -0,0 +1,176 @@
+"""Unit tests for the read-through storage cache."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.errors import ItemNotFoundError, StorageError
+from typ_tmpl.protocols.storage import Compactable, Migratable, Versioned
+from typ_tmpl.storage.cached import CachedStorage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+
+
+def reads(mock: MockStorage) -> list[str]:
+    """Return the names of the read calls that reached the mock."""
+    return [name for name, _ in mock.calls if name in ("get", "exists", "get_many")]
+
+
+class TestCachedStorage:
+    """Tests for CachedStorage over a non-versioned backend."""
+
+    def test_is_storage(self) -> None:
+        """Test that the wrapper satisfies the storage protocols."""
+        cache = CachedStorage(MockStorage())
+
+        assert isinstance(cache, Compactable)
+        assert isinstance(cache, Migratable)
+
+    def test_get_hits_cache(self) -> None:
+        """Test that repeated gets reach the backend once."""
+        mock = MockStorage(items={"a": "A"})
+        cache = CachedStorage(mock)
+
+        assert cache.get("a") == "A"
+        assert cache.get("a") == "A"
+        assert cache.get("missing") is None
+        assert cache.get("missing") is None
+
+        assert reads(mock) == ["get", "get"]
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_exists_then_get(self) -> None:
+        """Test that a cached exists answer does not stand in for content."""
+        mock = MockStorage(items={"a": "A"})
+        cache = CachedStorage(mock)
+
+        assert cache.exists("a") is True
+        assert cache.exists("a") is True
+        assert cache.get("a") == "A"
+        assert cache.exists("a") is True
+
+        assert reads(mock) == ["exists", "get"]
+
+    def test_writes_invalidate(self) -> None:
+        """Test that add and delete drop the cached entries."""
+        mock = MockStorage()
+        cache = CachedStorage(mock)
+
+        assert cache.get("a") is None
+        cache.add("a", "A")
+        assert cache.get("a") == "A"
+        cache.delete("a")
+        assert cache.exists("a") is False
+        cache.add_many([("a", "A2")])
+        assert cache.get_many(["a"]) == {"a": "A2"}
+        cache.delete_many(["a"])
+        assert cache.exists_many(["a"]) == {"a": False}
+
+    def test_failed_delete_raises(self) -> None:
+        """Test that backend errors pass through the cache."""
+        cache = CachedStorage(MockStorage())
+
+        with pytest.raises(ItemNotFoundError):
+            cache.delete("missing")
+
+    def test_evicts_by_entry_count(self) -> None:
+        """Test that the least recently used entry is evicted first."""
+        mock = MockStorage(items={"a": "A", "b": "B", "c": "C"})
+        cache = CachedStorage(mock, max_entries=2)
+
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        mock.calls.clear()
+        cache.get("a")
+        cache.get("b")
+
+        assert reads(mock) == ["get"]
+
+    def test_evicts_by_size(self) -> None:
+        """Test that total cached bytes stay within the bound."""
+        items = {"a": "x" * 1000, "b": "y" * 1000, "c": "z" * 1000, "big": "!" * 5000}
+        mock = MockStorage(items=items)
+        cache = CachedStorage(mock, max_bytes=2500)
+
+        cache.get("a")
+        cache.get("b")
+        cache.get("c")
+        cache.get("big")
+        mock.calls.clear()
+        cache.get("c")
+        cache.get("b")
+        cache.get("a")
+        cache.get("big")
+
+        assert mock.calls == [("get", ("a",)), ("get", ("big",))]
+
+    def test_get_many_fetches_misses_only(self) -> None:
+        """Test that get_many asks the backend only for uncached IDs."""
+        mock = MockStorage(items={"a": "A", "b": "B"})
+        cache = CachedStorage(mock)
+        cache.get("a")
+        mock.calls.clear()
+
+        assert cache.get_many(["b", "a", "x"]) == {"b": "B", "a": "A", "x": None}
+        assert mock.calls == [("get_many", (["b", "x"],))]
+
+    def test_unsupported_capability(self) -> None:
+        """Test that compact reports a backend without support."""
+        cache = CachedStorage(MockStorage())
+
+        with pytest.raises(StorageError, match="compaction"):
+            cache.compact()
+
+
+class TestCachedFilesystemStorage:
+    """Tests for CachedStorage over FilesystemStorage."""
+
+    def test_filesystem_is_versioned(self, tmp_path: Path) -> None:
+        """Test that FilesystemStorage versions change with the file."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+
+        assert isinstance(storage, Versioned)
+        assert storage.version("a") is None
+        storage.add("a", "A")
+        assert storage.version("a") is not None
+
+    def test_hit_skips_read(self, tmp_path: Path) -> None:
+        """Test that a valid entry is served without reading the file."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "A")
+        cache = CachedStorage(storage)
+
+        assert cache.get("a") == "A"
+        assert cache.get("a") == "A"
+        assert cache.hits == 1
+
+    def test_out_of_band_change_is_seen(self, tmp_path: Path) -> None:
+        """Test that changes made by another process invalidate the entry."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "A")
+        cache = CachedStorage(storage)
+        assert cache.get("a") == "A"
+
+        path = storage._item_path("a")
+        path.write_text("Changed elsewhere")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert cache.get("a") == "Changed elsewhere"
+
+        path.unlink()
+
+        assert cache.get("a") is None
+        assert cache.exists("a") is False
+
+    def test_migrate_clears_cache(self, tmp_path: Path) -> None:
+        """Test that migrating through the cache keeps reads correct."""
+        cache = CachedStorage(FilesystemStorage(base_dir=tmp_path))
+        cache.add("a", "A")
+        cache.get("a")
+
+        assert cache.migrate("sharded") == 1
+        assert cache.get("a") == "A"
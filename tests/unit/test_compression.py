@@ -0,0 +1,104 @@
+"""Unit tests for item content compression."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.compression import Codec, compress, decode, encode
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.log import LogStorage
+from typ_tmpl.storage.sqlite import SqliteStorage
+
+LARGE = "the quick brown fox jumps over the lazy dog\n" * 200
+
+
+class TestCodecs:
+    """Tests for encoding and decoding stored content."""
+
+    @pytest.mark.parametrize("codec", [Codec.ZLIB, Codec.LZMA])
+    def test_round_trip(self, codec: Codec) -> None:
+        """Test that large content is compressed and decoded back."""
+        data = encode(LARGE, codec, threshold=1024)
+
+        assert len(data) < len(LARGE) // 10
+        assert decode(data) == LARGE
+
+    def test_small_content_stays_plain(self) -> None:
+        """Test that content below the threshold is stored as UTF-8."""
+        assert encode("héllo", Codec.ZLIB, threshold=1024) == "héllo".encode()
+        assert compress("héllo", Codec.ZLIB, threshold=1024) is None
+        assert compress(LARGE, Codec.NONE, threshold=0) is None
+
+    def test_incompressible_content_stays_plain(self) -> None:
+        """Test that content which does not shrink is not compressed."""
+        assert encode("abc", Codec.LZMA, threshold=0) == b"abc"
+        assert encode("abc", Codec.ZLIB, threshold=0) == b"abc"
+
+    def test_invalid_data(self) -> None:
+        """Test that unknown codecs and corrupt data raise StorageError."""
+        with pytest.raises(StorageError, match="Unknown codec"):
+            decode(b"\xffq...")
+        with pytest.raises(StorageError, match="Corrupt zlib"):
+            decode(b"\xffznot zlib")
+
+
+@pytest.fixture(params=["fs", "sqlite", "log"])
+def compressed(request: pytest.FixtureRequest, tmp_path: Path) -> Storage:
+    """Each persistent backend writing zlib-compressed items."""
+    if request.param == "fs":
+        return FilesystemStorage(tmp_path, codec=Codec.ZLIB, compress_threshold=1024)
+    if request.param == "sqlite":
+        return SqliteStorage(
+            tmp_path / "items.db", codec=Codec.ZLIB, compress_threshold=1024
+        )
+    return LogStorage(tmp_path, codec=Codec.ZLIB, compress_threshold=1024)
+
+
+class TestCompressedStorage:
+    """Tests for backends writing compressed items."""
+
+    def test_reads_are_transparent(self, compressed: Storage) -> None:
+        """Test that compressed and plain items read back unchanged."""
+        compressed.add("big", LARGE)
+        compressed.add_many([("small", "tiny"), ("big2", LARGE.upper())])
+
+        assert compressed.get("big") == LARGE
+        assert compressed.get_many(["small", "big2", "missing"]) == {
+            "small": "tiny",
+            "big2": LARGE.upper(),
+            "missing": None,
+        }
+        compressed.close()
+
+    def test_filesystem_files_are_compressed(self, tmp_path: Path) -> None:
+        """Test that large item files shrink and carry a codec header."""
+        storage = FilesystemStorage(tmp_path, codec=Codec.LZMA)
+        storage.add("big", LARGE)
+
+        data = (tmp_path / "big.txt").read_bytes()
+        assert data.startswith(b"\xffx")
+        assert len(data) < len(LARGE) // 10
+        storage.close()
+
+    def test_plain_items_remain_readable(self, tmp_path: Path) -> None:
+        """Test that items written without compression still read correctly."""
+        FilesystemStorage(tmp_path).add("old", LARGE)
+        storage = FilesystemStorage(tmp_path, codec=Codec.ZLIB)
+
+        assert (tmp_path / "old.txt").read_text() == LARGE
+        assert storage.get("old") == LARGE
+        storage.close()
+
+    def test_sqlite_stores_compressed_blob(self, tmp_path: Path) -> None:
+        """Test that SQLite keeps small items as text and large ones as BLOBs."""
+        storage = SqliteStorage(tmp_path / "items.db", codec=Codec.ZLIB)
+        storage.add_many([("big", LARGE), ("small", "tiny")])
+        storage.close()
+
+        conn = sqlite3.connect(tmp_path / "items.db")
+        types = dict(conn.execute("SELECT id, typeof(content) FROM items"))
+        conn.close()
+        assert types == {"big": "blob", "small": "text"}
@@ -0,0 +1,132 @@
+"""Unit tests for the deduplicating blob store."""
+
+import os
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.storage.compression import Codec
+from typ_tmpl.storage.dedup import DedupStorage
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> Iterator[DedupStorage]:
+    """Create a DedupStorage in a temp directory."""
+    storage = DedupStorage(base_dir=tmp_path)
+    yield storage
+    storage.close()
+
+
+def blob_files(storage: DedupStorage) -> list[Path]:
+    """List every file in the blob directory."""
+    return sorted(path for path in storage.blob_dir.rglob("*") if path.is_file())
+
+
+def ref_counts(storage: DedupStorage) -> dict[str, int]:
+    """Read the reference count of every blob from the database."""
+    conn = sqlite3.connect(storage.base_dir / "refs.db")
+    try:
+        return dict(conn.execute("SELECT hash, refs FROM blobs"))
+    finally:
+        conn.close()
+
+
+class TestDedupStorage:
+    """Tests for content sharing and reference counting."""
+
+    def test_identical_content_is_stored_once(self, storage: DedupStorage) -> None:
+        """Test that items with equal content share one blob."""
+        storage.add("a", "same")
+        storage.add_many([("b", "same"), ("c", "same"), ("d", "other")])
+
+        assert len(blob_files(storage)) == 2
+        assert sorted(ref_counts(storage).values()) == [1, 3]
+        assert storage.get_many(["a", "c", "d"]) == {
+            "a": "same",
+            "c": "same",
+            "d": "other",
+        }
+
+    def test_blob_removed_with_last_reference(self, storage: DedupStorage) -> None:
+        """Test that a blob outlives all but its last reference."""
+        storage.add_many([("a", "same"), ("b", "same")])
+
+        storage.delete("a")
+        assert len(blob_files(storage)) == 1
+        assert storage.get("b") == "same"
+
+        storage.delete_many(["b"])
+        assert blob_files(storage) == []
+        assert ref_counts(storage) == {}
+
+    def test_version_follows_content(self, storage: DedupStorage) -> None:
+        """Test that the version token is the same for equal content."""
+        storage.add_many([("a", "same"), ("b", "same"), ("c", "other")])
+
+        assert storage.version("a") == storage.version("b") != storage.version("c")
+        assert storage.version("missing") is None
+
+    def test_compressed_blobs(self, tmp_path: Path) -> None:
+        """Test that large blobs are compressed with the configured codec."""
+        storage = DedupStorage(base_dir=tmp_path, codec=Codec.ZLIB)
+        content = "repeated text " * 1000
+        storage.add("a", content)
+
+        [blob] = blob_files(storage)
+        assert blob.read_bytes().startswith(b"\xffz")
+        assert storage.get("a") == content
+        storage.close()
+
+    def test_missing_blob_raises(self, storage: DedupStorage) -> None:
+        """Test that a reference whose blob is gone is reported."""
+        storage.add("a", "content")
+        blob_files(storage)[0].unlink()
+
+        with pytest.raises(StorageError, match="of item 'a' is missing"):
+            storage.get("a")
+
+    def test_single_adds_group_directory_syncs(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that an add syncs its blob but leaves the directory to close."""
+        storage = DedupStorage(base_dir=tmp_path)
+        fsync = mocker.spy(os, "fsync")
+
+        storage.add("a", "content")
+        assert fsync.call_count == 1
+
+        storage.close()
+        assert fsync.call_count == 2
+
+
+class TestGarbageCollection:
+    """Tests for crash recovery with gc()."""
+
+    def test_removes_orphans_and_partial_writes(self, storage: DedupStorage) -> None:
+        """Test that unreferenced and half-written blobs are removed."""
+        storage.add("a", "kept")
+        [kept] = blob_files(storage)
+        orphan = storage.blob_dir / "ff" / ("0" * 62)
+        orphan.parent.mkdir()
+        orphan.write_bytes(b"left by a crash")
+        (kept.parent / f".tmp-{kept.name}").write_bytes(b"partial")
+
+        assert storage.gc() == 2
+        assert blob_files(storage) == [kept]
+        assert storage.get("a") == "kept"
+
+    def test_recounts_references(self, storage: DedupStorage) -> None:
+        """Test that reference counts are rebuilt from the references."""
+        storage.add_many([("a", "same"), ("b", "same")])
+        conn = sqlite3.connect(storage.base_dir / "refs.db")
+        conn.execute("UPDATE blobs SET refs = 1")
+        conn.commit()
+        conn.close()
+
+        assert storage.gc() == 0
+        storage.delete("a")
+        assert storage.get("b") == "same"
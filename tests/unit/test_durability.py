@@ -0,0 +1,227 @@
+"""Unit tests for atomic writes and durability modes."""
+
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.errors import BatchError
+from typ_tmpl.storage.durability import Durability, Syncer, is_tmp
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.layout import Layout
+from typ_tmpl.storage.log import LogStorage
+from typ_tmpl.storage.sqlite import SqliteStorage
+
+
+class TestSyncer:
+    """Tests for the fsync policy of each durability mode."""
+
+    def test_create_is_atomic_and_exclusive(self, tmp_path: Path) -> None:
+        """Test that files appear complete and never overwrite each other."""
+        syncer = Syncer(Durability.NONE)
+        syncer.create(tmp_path / "a.txt", b"first")
+
+        with pytest.raises(FileExistsError):
+            syncer.create(tmp_path / "a.txt", b"second")
+
+        assert (tmp_path / "a.txt").read_bytes() == b"first"
+        assert [path.name for path in tmp_path.iterdir()] == ["a.txt"]
+
+    def test_none_never_syncs(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that no fsync is issued in none mode."""
+        fsync = mocker.spy(os, "fsync")
+        syncer = Syncer(Durability.NONE)
+
+        syncer.create(tmp_path / "a.txt", b"x")
+        syncer.commit()
+
+        assert fsync.call_count == 0
+
+    def test_always_syncs_each_write(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that always mode syncs the file and then its directory."""
+        fsync = mocker.spy(os, "fsync")
+        syncer = Syncer(Durability.ALWAYS)
+
+        syncer.create(tmp_path / "a.txt", b"x")
+
+        assert fsync.call_count == 2
+
+    def test_batch_groups_writes(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that batch mode syncs once per group, directory included."""
+        fsync = mocker.patch("os.fsync")
+        syncer = Syncer(Durability.BATCH, group_size=3)
+
+        syncer.create(tmp_path / "a.txt", b"x")
+        syncer.create(tmp_path / "b.txt", b"x")
+        # Each file's data, but not yet the directory.
+        assert fsync.call_count == 2
+
+        syncer.create(tmp_path / "c.txt", b"x")
+        # The third file, then the directory once for the group.
+        assert fsync.call_count == 4
+
+        syncer.create(tmp_path / "d.txt", b"x")
+        syncer.commit()
+        assert fsync.call_count == 6
+        syncer.commit()
+        assert fsync.call_count == 6
+
+    def test_batch_defers_directories(self, tmp_path: Path) -> None:
+        """Test that batch mode syncs directories at the group commit."""
+        order: list[Path] = []
+        syncer = Syncer(Durability.BATCH, on_commit=lambda: order.append(tmp_path))
+        syncer.create(tmp_path / "a.txt", b"x")
+
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(
+                "typ_tmpl.storage.durability.fsync_path",
+                lambda path: order.append(path),
+            )
+            syncer.commit()
+
+        assert order == [tmp_path, tmp_path]
+
+    def test_is_tmp(self, tmp_path: Path) -> None:
+        """Test that staged files are recognized as temporary."""
+        tmp = Syncer(Durability.NONE).stage(tmp_path / "a.txt", b"x")
+
+        assert is_tmp(tmp.name)
+        assert not is_tmp("a.txt") and not is_tmp(".hidden")
+
+
+class TestFilesystemDurability:
+    """Tests for atomic item files in FilesystemStorage."""
+
+    def test_failed_write_leaves_no_item(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that a write failing midway leaves no partial item behind."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        mocker.patch("os.link", side_effect=OSError("disk full"))
+
+        with pytest.raises(OSError):
+            storage.add("a", "content")
+
+        assert not (tmp_path / "a.txt").exists()
+        assert storage.gc() == 0
+        storage.close()
+
+    def test_add_many_syncs_each_directory_once(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that a batch syncs its files and then each directory once."""
+        storage = FilesystemStorage(base_dir=tmp_path, layout=Layout.SHARDED)
+        items = [(f"item{i}", "x") for i in range(20)]
+        dirs = {storage._item_path(id).parent for id, _ in items}
+        fsync = mocker.spy(os, "fsync")
+
+        storage.add_many(items)
+
+        assert fsync.call_count == len(items) + len(dirs)
+        assert storage.get_many(["item0", "item19"]) == {"item0": "x", "item19": "x"}
+        storage.close()
+
+    def test_conflicting_batch_removes_staged_files(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that a batch losing a race leaves neither items nor temp files."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        other = FilesystemStorage(base_dir=tmp_path)
+        other.add("b", "first")
+        # The other store's item is unknown to this store's snapshot.
+        mocker.patch.object(storage, "_snapshot", return_value=set())
+
+        with pytest.raises(BatchError):
+            storage.add_many([("a", "A"), ("b", "B"), ("c", "C")])
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [".index", "b.txt"]
+        assert storage.get("b") == "first"
+        storage.close()
+        other.close()
+
+    @pytest.mark.parametrize("durability", [Durability.BATCH, Durability.ALWAYS])
+    def test_data_synced_before_publish(
+        self, tmp_path: Path, mocker: MockerFixture, durability: Durability
+    ) -> None:
+        """Test that no item is published before its data reaches the disk."""
+        synced: set[int] = set()
+        published: list[str] = []
+        fsync, link = os.fsync, os.link
+
+        def record_fsync(fd: int) -> None:
+            synced.add(os.fstat(fd).st_ino)
+            fsync(fd)
+
+        def checked_link(src: Path, dst: Path) -> None:
+            if Path(dst).suffix == ".txt":
+                assert os.stat(src).st_ino in synced, f"{dst} published unsynced"
+                published.append(Path(dst).name)
+            link(src, dst)
+
+        mocker.patch("os.fsync", side_effect=record_fsync)
+        mocker.patch("os.link", side_effect=checked_link)
+        storage = FilesystemStorage(base_dir=tmp_path, durability=durability)
+
+        storage.add("a", "content")
+        storage.add_many([("b", "content"), ("c", "content")])
+
+        assert sorted(published) == ["a.txt", "b.txt", "c.txt"]
+        storage.close()
+
+    def test_gc_removes_leftover_temp_files(self, tmp_path: Path) -> None:
+        """Test that gc removes temp files of crashed writes but not items."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "x")
+        (tmp_path / ".b.txt.123.456.tmp").write_text("partial")
+
+        assert storage.list() == ["a"]
+        assert storage.gc() == 1
+        assert sorted(path.name for path in tmp_path.iterdir()) == [".index", "a.txt"]
+        storage.close()
+
+
+class TestBackendDurability:
+    """Tests for durability modes of the other backends."""
+
+    @pytest.mark.parametrize(
+        ("durability", "level"),
+        [(Durability.NONE, 0), (Durability.BATCH, 1), (Durability.ALWAYS, 2)],
+    )
+    def test_sqlite_synchronous(
+        self, tmp_path: Path, durability: Durability, level: int
+    ) -> None:
+        """Test that each mode selects the matching SQLite synchronous level."""
+        storage = SqliteStorage(tmp_path / "items.db", durability=durability)
+
+        assert storage._conn.execute("PRAGMA synchronous").fetchone() == (level,)
+        storage.close()
+
+    def test_log_always_syncs_each_append(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that always mode syncs the segment after every record."""
+        storage = LogStorage(tmp_path, durability=Durability.ALWAYS)
+        fsync = mocker.spy(os, "fsync")
+
+        storage.add("a", "x")
+        storage.delete("a")
+
+        assert fsync.call_count == 2
+        storage.close()
+
+    def test_log_batch_syncs_on_close(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that batch mode defers single appends until close."""
+        storage = LogStorage(tmp_path, durability=Durability.BATCH)
+        fsync = mocker.spy(os, "fsync")
+
+        storage.add("a", "x")
+        storage.add("b", "x")
+        assert fsync.call_count == 0
+
+        storage.close()
+        assert fsync.call_count == 1
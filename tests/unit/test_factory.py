@@ -0,0 +1,148 @@
+"""Unit tests for backend selection by URL and plugins."""
+
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.errors import StorageError
+from typ_tmpl.storage.factory import (
+    DEFAULT_COMPACT_RATIO,
+    PLUGIN_GROUP,
+    StorageURL,
+    load_plugin,
+    log_compact_ratio,
+    open_storage,
+    parse_storage_url,
+    storage_name,
+)
+from typ_tmpl.storage.log import LogStorage
+from typ_tmpl.storage.memory import MemoryStorage
+from typ_tmpl.storage.snapshot import SnapshotStorage, write_snapshot
+from typ_tmpl.storage.sqlite import SqliteStorage
+
+PLUGIN = """
+from dev.mocks.storage import MockStorage
+
+def create(url):
+    storage = MockStorage()
+    storage.add("url", f"{url.location} {url.options}")
+    return storage
+"""
+
+
+@pytest.fixture
+def plugin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Install a plugin registering the demo scheme."""
+    site = tmp_path / "site"
+    dist = site / "typ_tmpl_demo-1.0.dist-info"
+    dist.mkdir(parents=True)
+    (dist / "METADATA").write_text("Name: typ-tmpl-demo\nVersion: 1.0\n")
+    (dist / "entry_points.txt").write_text(
+        f"[{PLUGIN_GROUP}]\ndemo = typ_tmpl_demo:create\n"
+    )
+    (site / "typ_tmpl_demo.py").write_text(PLUGIN)
+    monkeypatch.syspath_prepend(str(site))
+    yield "typ_tmpl_demo"
+    sys.modules.pop("typ_tmpl_demo", None)
+
+
+class TestStorageURLs:
+    """Tests for opening storage from URLs."""
+
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            ("fs:///srv/items", StorageURL("fs", "/srv/items", {})),
+            ("fs:items", StorageURL("fs", "items", {})),
+            ("sqlite://data/items.db", StorageURL("sqlite", "data/items.db", {})),
+            ("memory:", StorageURL("memory", "", {})),
+            (
+                "demo://host:1/x?a=1&b=%20",
+                StorageURL("demo", "host:1/x", {"a": "1", "b": " "}),
+            ),
+        ],
+    )
+    def test_parse(self, url: str, expected: StorageURL) -> None:
+        """Test that URLs split into scheme, location and options."""
+        assert parse_storage_url(url) == expected
+
+    def test_parse_without_scheme(self) -> None:
+        """Test that a bare path is rejected."""
+        with pytest.raises(StorageError, match="no scheme"):
+            parse_storage_url("/srv/items")
+
+    def test_open_builtin_backends(self, tmp_path: Path) -> None:
+        """Test that backend schemes open the backend at the URL's path."""
+        sqlite = open_storage(f"sqlite://{tmp_path}/items.db")
+        memory = open_storage(f"memory://{tmp_path}/memory")
+
+        assert isinstance(sqlite, SqliteStorage) and isinstance(memory, MemoryStorage)
+        assert (tmp_path / "items.db").exists()
+        assert (tmp_path / "memory").is_dir()
+        sqlite.close()
+        memory.close()
+        with pytest.raises(StorageError, match="takes no options: x"):
+            open_storage(f"fs://{tmp_path}?x=1")
+
+    def test_log_compact_ratio(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that log URLs take a compaction ratio, checked like the env."""
+        monkeypatch.delenv("TYP_TMPL_LOG_COMPACT_RATIO", raising=False)
+        assert log_compact_ratio() == DEFAULT_COMPACT_RATIO
+        monkeypatch.setenv("TYP_TMPL_LOG_COMPACT_RATIO", "0.25")
+        assert log_compact_ratio() == 0.25
+
+        storage = open_storage(f"log://{tmp_path}/log?compact_ratio=0.75")
+
+        assert isinstance(storage, LogStorage) and storage.auto_compact_ratio == 0.75
+        storage.close()
+        storage = open_storage(f"log://{tmp_path}/log?compact_ratio=0")
+        assert isinstance(storage, LogStorage) and storage.auto_compact_ratio is None
+        storage.close()
+        for bad in ("2", "-0.1", "half"):
+            with pytest.raises(StorageError, match="between 0 and 1"):
+                open_storage(f"log://{tmp_path}/log?compact_ratio={bad}")
+        with pytest.raises(StorageError, match="takes no options: compact_ratio"):
+            open_storage(f"fs://{tmp_path}?compact_ratio=0.5")
+
+    def test_open_snapshot(self, tmp_path: Path) -> None:
+        """Test that snapshot URLs mount a snapshot file."""
+        source = MockStorage()
+        source.add("a", "A")
+        write_snapshot(source, tmp_path / "a.snap")
+
+        storage = open_storage(f"snapshot://{tmp_path}/a.snap")
+
+        assert isinstance(storage, SnapshotStorage) and storage.get("a") == "A"
+        storage.close()
+        with pytest.raises(StorageError, match="need a file"):
+            open_storage("snapshot:")
+
+    def test_storage_name(self) -> None:
+        """Test that different URLs name different stores."""
+        a, b = storage_name("fs:///a"), storage_name("fs:///b")
+
+        assert a.startswith("fs-") and b.startswith("fs-") and a != b
+
+
+class TestPlugins:
+    """Tests for third-party backends registered as entry points."""
+
+    def test_plugin_loaded_when_selected(self, plugin: str) -> None:
+        """Test that a plugin is imported only once its scheme is used."""
+        assert plugin not in sys.modules
+
+        storage = open_storage("demo://host/db?mode=fast")
+
+        assert plugin in sys.modules
+        assert storage.get("url") == "host/db {'mode': 'fast'}"
+
+    def test_unknown_scheme(self, plugin: str) -> None:
+        """Test that an unregistered scheme is an error."""
+        with pytest.raises(StorageError, match="Unknown storage scheme 'nope'"):
+            load_plugin("nope")
+        assert plugin not in sys.modules
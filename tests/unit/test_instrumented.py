@@ -0,0 +1,116 @@
+"""Unit tests for storage instrumentation."""
+
+from pathlib import Path
+
+import pytest
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.errors import ItemExistsError, StorageError
+from typ_tmpl.protocols.storage import Versioned
+from typ_tmpl.storage.cached import CachedStorage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.instrumented import (
+    BUCKETS,
+    InstrumentedStorage,
+    Metrics,
+    OpStats,
+    instrument,
+    unwrap,
+)
+
+
+class TestMetrics:
+    """Tests for recording and exporting metrics."""
+
+    def test_histogram_buckets(self) -> None:
+        """Test that calls land in the bucket of their upper bound."""
+        metrics = Metrics()
+        for seconds in (0.000001, 0.001, 0.001, 0.003, 60.0):
+            metrics.record("get", seconds)
+
+        stats = metrics.ops["get"]
+        assert stats.calls == 5
+        assert stats.buckets[0] == 1
+        assert stats.buckets[BUCKETS.index(0.001)] == 2
+        assert stats.buckets[BUCKETS.index(0.005)] == 1
+        assert stats.buckets[-1] == 1
+        assert stats.quantile(0.5) == 0.001
+        assert stats.quantile(0.99) == float("inf")
+        assert OpStats().quantile(0.5) == BUCKETS[0]
+
+    def test_prometheus_format(self) -> None:
+        """Test the exposition format of counters and histograms."""
+        metrics = Metrics()
+        metrics.record("add", 0.002)
+        metrics.record("add", 0.2, error=True)
+        metrics.count_bytes("add", 42)
+
+        lines = metrics.prometheus().splitlines()
+
+        assert "# TYPE typ_tmpl_storage_calls_total counter" in lines
+        assert 'typ_tmpl_storage_calls_total{method="add"} 2' in lines
+        assert 'typ_tmpl_storage_errors_total{method="add"} 1' in lines
+        assert 'typ_tmpl_storage_bytes_total{method="add"} 42' in lines
+        assert "# TYPE typ_tmpl_storage_call_duration_seconds histogram" in lines
+        buckets = [line for line in lines if "_bucket{" in line]
+        assert buckets[0].endswith('le="1e-05"} 0')
+        assert 'method="add",le="0.0025"} 1' in buckets[BUCKETS.index(0.0025)]
+        assert buckets[-1].endswith('le="+Inf"} 2')
+        assert 'typ_tmpl_storage_call_duration_seconds_count{method="add"} 2' in lines
+
+
+class TestInstrumentedStorage:
+    """Tests for the instrumentation wrapper."""
+
+    def test_calls_bytes_and_errors(self) -> None:
+        """Test that calls, content bytes and failures are recorded."""
+        storage = InstrumentedStorage(MockStorage())
+        storage.add("a", "héllo")
+        storage.add_many([("b", "xy"), ("c", "z")])
+        assert storage.get("a") == "héllo"
+        assert storage.get_many(["b", "missing"]) == {"b": "xy", "missing": None}
+        with pytest.raises(ItemExistsError):
+            storage.add("a", "again")
+
+        ops = storage.metrics.ops
+        assert (ops["add"].calls, ops["add"].errors, ops["add"].bytes) == (2, 1, 6)
+        assert ops["add_many"].bytes == 3
+        assert ops["get"].bytes == 6 and ops["get_many"].bytes == 2
+
+    def test_iterators_timed_as_one_call(self) -> None:
+        """Test that an iterator counts once, when it is finished or dropped."""
+        storage = InstrumentedStorage(MockStorage())
+        storage.add_many([("a", "1"), ("b", "2"), ("c", "3")])
+
+        assert list(storage.iter_ids()) == ["a", "b", "c"]
+        partial = storage.iter_metadata()
+        next(partial)
+        del partial
+
+        ops = storage.metrics.ops
+        assert ops["iter_ids"].calls == 1
+        assert (ops["iter_metadata"].calls, ops["iter_metadata"].errors) == (1, 0)
+
+    def test_missing_capability_raises(self) -> None:
+        """Test that capabilities the backend lacks raise StorageError."""
+        storage = InstrumentedStorage(MockStorage())
+
+        with pytest.raises(StorageError, match="compaction"):
+            storage.compact()
+        assert unwrap(storage) is storage.backend
+        assert unwrap(storage.backend) is storage.backend
+
+    def test_versions_forwarded_to_cache(self, tmp_path: Path) -> None:
+        """Test that a cache over instrumented storage still sees outside edits."""
+        backend = FilesystemStorage(base_dir=tmp_path)
+        instrumented = instrument(backend)
+        cached = CachedStorage(instrumented)
+        cached.add("a", "old")
+        assert cached.get("a") == "old"
+
+        (tmp_path / "a.txt").write_text("edited outside the cache")
+
+        assert cached.get("a") == "edited outside the cache"
+        assert instrumented.metrics.ops["version"].calls > 0
+        assert not isinstance(instrument(MockStorage()), Versioned)
+        backend.close()
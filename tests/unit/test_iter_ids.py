@@ -0,0 +1,92 @@
+"""Unit tests for streaming ID iteration."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.protocols.storage import Storage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.ranges import id_range
+
+IDS = ["a", "ab", "abc", "abd", "b", "ba", "c"]
+
+
+class TestIterIds:
+    """Tests for iter_ids on every backend."""
+
+    @pytest.fixture(autouse=True)
+    def populate(self, storage: Storage) -> None:
+        """Store the sample IDs."""
+        storage.add_many((id, id.upper()) for id in reversed(IDS))
+
+    def test_all_ids_sorted(self, storage: Storage) -> None:
+        """Test that without filters every ID is yielded in order."""
+        assert list(storage.iter_ids()) == IDS
+
+    @pytest.mark.parametrize(
+        ("prefix", "start", "expected"),
+        [
+            ("ab", None, ["ab", "abc", "abd"]),
+            ("", "abd", ["abd", "b", "ba", "c"]),
+            ("ab", "abc", ["abc", "abd"]),
+            ("a", "b", []),
+            ("zz", None, []),
+            ("b", "a", ["b", "ba"]),
+        ],
+    )
+    def test_filters(
+        self, storage: Storage, prefix: str, start: str | None, expected: list[str]
+    ) -> None:
+        """Test prefix and start filters."""
+        assert list(storage.iter_ids(prefix, start)) == expected
+
+    def test_sees_later_writes(self, storage: Storage) -> None:
+        """Test that a new iteration reflects adds and deletes."""
+        storage.delete("abc")
+        storage.add("abb", "X")
+
+        assert list(storage.iter_ids("ab")) == ["ab", "abb", "abd"]
+
+
+class TestIdRange:
+    """Tests for the id_range helper."""
+
+    def test_stops_after_prefix(self) -> None:
+        """Test that iteration stops at the first ID past the prefix."""
+        consumed = []
+
+        def tracked() -> Iterator[str]:
+            for id in IDS:
+                consumed.append(id)
+                yield id
+
+        assert list(id_range(tracked(), "ab")) == ["ab", "abc", "abd"]
+        assert consumed == ["a", "ab", "abc", "abd", "b"]
+
+
+class TestManifestStreaming:
+    """Tests for streaming IDs from a large filesystem manifest."""
+
+    def test_seeks_in_large_manifest(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test range queries over a base file much larger than a seek block."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        ids = [f"item{i:05}" for i in range(5000)]
+        storage.add_many((id, "") for id in ids)
+        storage.list()
+        storage.delete("item02500")
+        storage.add("item02500x", "")
+        scan = mocker.spy(storage, "_scan_ids")
+
+        assert list(storage.iter_ids("item0250")) == [
+            "item02500x",
+            *[f"item0250{i}" for i in range(1, 10)],
+        ]
+        assert list(storage.iter_ids(start="item04998")) == ["item04998", "item04999"]
+        assert list(storage.iter_ids("item0")) == sorted(
+            [*ids[:2500], "item02500x", *ids[2501:]]
+        )
+        assert scan.call_count == 0
@@ -0,0 +1,190 @@
+"""Unit tests for the item metadata index."""
+
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.protocols.storage import MetadataIndexed, Storage
+from typ_tmpl.storage.compression import Codec, encode
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.sqlite import SqliteStorage
+
+
+@pytest.fixture
+def indexed(storage: Storage) -> MetadataIndexed:
+    """Every backend that keeps metadata, filled with sample items."""
+    if not isinstance(storage, MetadataIndexed):
+        pytest.skip(f"{type(storage).__name__} keeps no metadata")
+    storage.add("small", "x")
+    storage.add_many([("big", "x" * 100), ("medium", "x" * 10)])
+    storage.add("unicode", "é" * 3)
+    return storage
+
+
+class TestMetadataIndex:
+    """Tests for iter_metadata and top_metadata on every backend."""
+
+    def test_iter_metadata_in_id_order(self, indexed: MetadataIndexed) -> None:
+        """Test that metadata is listed by ID with byte sizes."""
+        entries = list(indexed.iter_metadata())
+
+        assert [(m.id, m.size) for m in entries] == [
+            ("big", 100),
+            ("medium", 10),
+            ("small", 1),
+            ("unicode", 6),
+        ]
+        assert all(m.created <= m.modified for m in entries)
+
+    def test_iter_metadata_filters(self, indexed: MetadataIndexed) -> None:
+        """Test prefix and start filters."""
+        assert [m.id for m in indexed.iter_metadata("m")] == ["medium"]
+        assert [m.id for m in indexed.iter_metadata(start="n")] == [
+            "small",
+            "unicode",
+        ]
+
+    def test_top_by_size(self, indexed: MetadataIndexed) -> None:
+        """Test largest-first and smallest-first top-k queries."""
+        largest = indexed.top_metadata("size", limit=2, descending=True)
+        smallest = indexed.top_metadata("size", limit=1)
+
+        assert [m.id for m in largest] == ["big", "medium"]
+        assert [m.id for m in smallest] == ["small"]
+
+    def test_top_with_prefix_and_no_limit(self, indexed: MetadataIndexed) -> None:
+        """Test that the prefix filter applies to top-k queries."""
+        entries = indexed.top_metadata("id", prefix="s", descending=True)
+
+        assert [m.id for m in entries] == ["small"]
+
+    def test_deletes_leave_the_index(
+        self, indexed: MetadataIndexed, storage: Storage
+    ) -> None:
+        """Test that deleted items disappear from the index."""
+        storage.delete("big")
+        storage.delete_many(["small"])
+
+        assert [m.id for m in indexed.top_metadata("size")] == ["unicode", "medium"]
+
+    def test_unknown_key(self, indexed: MetadataIndexed) -> None:
+        """Test that an unknown sort key is rejected."""
+        with pytest.raises(StorageError, match="Unknown sort key"):
+            indexed.top_metadata("colour")
+
+
+class TestFilesystemMetadata:
+    """Tests for keeping the filesystem metadata index in sync."""
+
+    def test_outside_changes_are_reindexed(self, tmp_path: Path) -> None:
+        """Test that files changed behind the store's back are picked up."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "A")
+        storage.add("b", "B")
+        created = {m.id: m.created for m in storage.iter_metadata()}
+
+        (tmp_path / "c.txt").write_text("C" * 50)
+        (tmp_path / "b.txt").unlink()
+
+        entries = {m.id: m for m in storage.iter_metadata()}
+        assert sorted(entries) == ["a", "c"]
+        assert entries["c"].size == 50
+        assert entries["a"].created == created["a"]
+
+    def test_existing_store_is_backfilled(self, tmp_path: Path) -> None:
+        """Test that a store written before the index existed is indexed."""
+        (tmp_path / "old.txt").write_text("Old content")
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.list()
+        (tmp_path / ".index" / "meta.db").unlink()
+        storage = FilesystemStorage(base_dir=tmp_path)
+
+        assert [(m.id, m.size) for m in storage.iter_metadata()] == [("old", 11)]
+
+    def test_compressed_items_report_content_size(self, tmp_path: Path) -> None:
+        """Test that sizes are of the content, not of the compressed file."""
+        storage = FilesystemStorage(base_dir=tmp_path, codec=Codec.ZLIB)
+        storage.add("one", "x" * 10000)
+        storage.add_many([("many", "é" * 5000)])
+        expected = [("many", 10000), ("one", 10000)]
+
+        assert [(m.id, m.size) for m in storage.iter_metadata()] == expected
+        assert (tmp_path / "one.txt").stat().st_size < 100
+        storage.close()
+        (tmp_path / ".index" / "meta.db").unlink()
+        reopened = FilesystemStorage(base_dir=tmp_path)
+        assert [(m.id, m.size) for m in reopened.iter_metadata()] == expected
+        reopened.close()
+
+    def test_queries_do_not_stat_items(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that top-k queries are answered without touching item files."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add_many((f"item{i}", "x" * i) for i in range(50))
+        storage.list()
+        stat = mocker.spy(os, "stat")
+
+        top = storage.top_metadata("size", limit=3, descending=True)
+
+        assert [m.id for m in top] == ["item49", "item48", "item47"]
+        assert not any(
+            str(call.args[0]).endswith(".txt") for call in stat.call_args_list
+        )
+
+
+class TestSqliteMetadata:
+    """Tests for the SQLite metadata table."""
+
+    def test_existing_database_is_backfilled(self, tmp_path: Path) -> None:
+        """Test that a database created before the metadata table is indexed."""
+        path = tmp_path / "items.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE items (id TEXT PRIMARY KEY, content TEXT NOT NULL)"
+            " WITHOUT ROWID"
+        )
+        conn.execute("INSERT INTO items VALUES ('old', 'Old content')")
+        conn.commit()
+        conn.close()
+
+        storage = SqliteStorage(path=path)
+
+        assert [(m.id, m.size) for m in storage.iter_metadata()] == [("old", 11)]
+        storage.close()
+
+    def test_compressed_items_report_content_size(self, tmp_path: Path) -> None:
+        """Test that sizes are of the content, not of the compressed value."""
+        path = tmp_path / "items.db"
+        storage = SqliteStorage(path=path, codec=Codec.ZLIB)
+        storage.add("one", "x" * 10000)
+        storage.add_many([("many", "é" * 5000), ("small", "tiny")])
+
+        assert [(m.id, m.size) for m in storage.iter_metadata()] == [
+            ("many", 10000),
+            ("one", 10000),
+            ("small", 4),
+        ]
+        storage.close()
+
+    def test_backfill_measures_compressed_content(self, tmp_path: Path) -> None:
+        """Test that backfilled compressed items get their content size."""
+        path = tmp_path / "items.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE items (id TEXT PRIMARY KEY, content TEXT NOT NULL)"
+            " WITHOUT ROWID"
+        )
+        packed = encode("x" * 10000, Codec.ZLIB)
+        conn.execute("INSERT INTO items VALUES ('old', ?)", (packed,))
+        conn.commit()
+        conn.close()
+
+        storage = SqliteStorage(path=path)
+
+        assert [(m.id, m.size) for m in storage.iter_metadata()] == [("old", 10000)]
+        storage.close()
@@ -0,0 +1,65 @@
+"""Unit tests for the log record format."""
+
+from pathlib import Path
+
+import pytest
+
+from typ_tmpl.errors import StorageError
+from typ_tmpl.storage.records import OP_DELETE, OP_PUT, Record, encode_record, scan
+
+
+def _scan(
+    path: Path, truncate: bool = True
+) -> tuple[list[tuple[int, str, bytes]], int]:
+    """Scan a log file, collecting each record's op, key and value."""
+    found: list[tuple[int, str, bytes]] = []
+
+    def apply(record: Record) -> None:
+        found.append((record.op, record.key, record.value))
+
+    return found, scan(path, apply, truncate)
+
+
+class TestScan:
+    """Tests for reading log files back."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that records are read back in order."""
+        path = tmp_path / "a.log"
+        path.write_bytes(
+            encode_record(OP_PUT, b"a", b"A") + encode_record(OP_DELETE, b"a", b"")
+        )
+
+        found, size = _scan(path)
+
+        assert found == [(OP_PUT, "a", b"A"), (OP_DELETE, "a", b"")]
+        assert size == path.stat().st_size
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty file has no records."""
+        path = tmp_path / "a.log"
+        path.touch()
+
+        assert _scan(path) == ([], 0)
+
+    def test_torn_tail_truncated(self, tmp_path: Path) -> None:
+        """Test that a torn last record is cut off."""
+        path = tmp_path / "a.log"
+        good = encode_record(OP_PUT, b"a", b"A")
+        path.write_bytes(good + encode_record(OP_PUT, b"b", b"B")[:-1])
+
+        found, size = _scan(path)
+
+        assert found == [(OP_PUT, "a", b"A")]
+        assert size == len(good) == path.stat().st_size
+
+    def test_damaged_record_raises_without_truncate(self, tmp_path: Path) -> None:
+        """Test that damage is an error when the tail must not be cut."""
+        path = tmp_path / "a.log"
+        record = bytearray(encode_record(OP_PUT, b"a", b"A"))
+        record[-1] ^= 0xFF
+        path.write_bytes(bytes(record))
+
+        with pytest.raises(StorageError, match="offset 0"):
+            _scan(path, truncate=False)
+        assert path.stat().st_size == len(record)
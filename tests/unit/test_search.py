@@ -0,0 +1,218 @@
+"""Unit tests for full-text search."""
+
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from typ_tmpl.errors import BatchError, StorageError
+from typ_tmpl.protocols.storage import Searchable, Storage
+from typ_tmpl.storage import search
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.search import SearchIndex, tokenize
+from typ_tmpl.storage.sqlite import SqliteStorage
+
+
+@pytest.fixture
+def searchable(storage: Storage) -> Searchable:
+    """Every backend that supports search, filled with sample items."""
+    if not isinstance(storage, Searchable):
+        pytest.skip(f"{type(storage).__name__} has no search index")
+    storage.add("cats", "Cats purr. Cats sleep all day.")
+    storage.add_many(
+        [
+            ("dogs", "Dogs bark and dogs fetch."),
+            ("pets", "Cats and dogs are popular pets."),
+        ]
+    )
+    storage.add("fish", "Fish swim.")
+    return storage
+
+
+class TestTokenize:
+    """Tests for splitting content into words."""
+
+    def test_folds_case_and_drops_punctuation(self) -> None:
+        """Test that words are lowercased and separated by non-word chars."""
+        assert tokenize("Hello, WORLD! it's Straße") == [
+            "hello",
+            "world",
+            "it",
+            "s",
+            "strasse",
+        ]
+
+
+class TestSearch:
+    """Tests for search on every backend that supports it."""
+
+    def test_ranks_by_relevance(self, searchable: Searchable) -> None:
+        """Test that items mentioning a word more often rank higher."""
+        hits = searchable.search("cats")
+
+        assert [hit.id for hit in hits] == ["cats", "pets"]
+        assert hits[0].score > hits[1].score > 0
+
+    def test_any_and_all_words(self, searchable: Searchable) -> None:
+        """Test that match_all keeps only items containing every word."""
+        assert {hit.id for hit in searchable.search("cats DOGS")} == {
+            "cats",
+            "dogs",
+            "pets",
+        }
+        assert [hit.id for hit in searchable.search("cats dogs", match_all=True)] == [
+            "pets"
+        ]
+
+    def test_limit_and_no_match(self, searchable: Searchable) -> None:
+        """Test the hit limit and queries matching nothing."""
+        assert len(searchable.search("cats dogs fish", limit=2)) == 2
+        assert searchable.search("giraffe") == []
+        assert searchable.search("fish giraffe", match_all=True) == []
+        assert searchable.search("...") == []
+
+    def test_updates_on_delete(self, searchable: Searchable, storage: Storage) -> None:
+        """Test that deleted items no longer match."""
+        storage.delete("cats")
+        storage.delete_many(["fish"])
+
+        assert [hit.id for hit in searchable.search("cats fish")] == ["pets"]
+
+
+class TestSearchIndex:
+    """Tests for the SQLite inverted index."""
+
+    def test_re_adding_replaces_postings(self, tmp_path: Path) -> None:
+        """Test that indexing an item again replaces its old words."""
+        index = SearchIndex.open(tmp_path / "search.db")
+        index.add_many([("a", "old words"), ("b", "other words")])
+        index.add_many([("a", "new text")])
+
+        assert [hit.id for hit in index.search("old")] == []
+        assert [hit.id for hit in index.search("new")] == ["a"]
+        assert [hit.id for hit in index.search("words")] == ["b"]
+        index.close()
+
+    def test_reconcile_reads_only_unknown_items(self, tmp_path: Path) -> None:
+        """Test that reconcile drops stale items and loads only new ones."""
+        index = SearchIndex.open(tmp_path / "search.db")
+        index.add_many([("a", "alpha"), ("b", "beta")])
+        loaded: list[list[str]] = []
+
+        def load(ids: list[str]) -> list[tuple[str, str]]:
+            loaded.append(ids)
+            return [(id, "gamma") for id in ids]
+
+        index.reconcile(["a", "c"], load)
+
+        assert loaded == [["c"]]
+        assert index.search("beta") == []
+        assert [hit.id for hit in index.search("alpha gamma")] == ["a", "c"]
+        index.close()
+
+
+class TestPersistentIndex:
+    """Tests for indexes built from existing stores."""
+
+    def test_filesystem_indexes_existing_and_outside_files(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that the index is built on first use and follows new files."""
+        (tmp_path / "old.txt").write_text("existing note")
+        storage = FilesystemStorage(base_dir=tmp_path)
+
+        assert [hit.id for hit in storage.search("note")] == ["old"]
+
+        (tmp_path / "new.txt").write_text("another note")
+        assert {hit.id for hit in storage.search("note")} == {"old", "new"}
+        storage.close()
+
+        reopened = FilesystemStorage(base_dir=tmp_path)
+        assert [hit.id for hit in reopened.search("another")] == ["new"]
+        reopened.close()
+
+    def test_sqlite_rolls_back_index_with_items(self, tmp_path: Path) -> None:
+        """Test that a failed add leaves no trace in the search index."""
+        storage = SqliteStorage(path=tmp_path / "items.db")
+        storage.add("a", "first")
+
+        with pytest.raises(BatchError):
+            storage.add_many([("b", "second"), ("a", "again")])
+
+        assert storage.search("second again") == []
+        assert [hit.id for hit in storage.search("first")] == ["a"]
+        storage.close()
+
+    def test_filesystem_writes_index_once_per_command(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that queued adds reach the index in a single transaction."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.search("note")
+        add_many = mocker.spy(SearchIndex, "add_many")
+
+        for i in range(50):
+            storage.add(f"item{i}", f"note number {i}")
+        storage.delete("item0")
+        assert add_many.call_count == 0
+
+        assert len(storage.search("note")) == 49
+        assert add_many.call_count == 1
+        storage.close()
+
+    def test_filesystem_failed_index_write_is_rebuilt(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that an index left stale by a failed write is rebuilt."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "lost note")
+        mocker.patch.object(
+            SearchIndex, "add_many", side_effect=sqlite3.OperationalError("full")
+        )
+
+        with pytest.raises(StorageError, match="full"):
+            storage.close()
+        mocker.stopall()
+
+        assert storage.get("a") == "lost note"
+        reopened = FilesystemStorage(base_dir=tmp_path)
+        assert [hit.id for hit in reopened.search("lost")] == ["a"]
+        assert not (tmp_path / ".index" / "stale").exists()
+        reopened.close()
+
+    def test_filesystem_dead_writer_is_recovered(self, tmp_path: Path) -> None:
+        """Test that updates a killed process never wrote are rebuilt."""
+        script = (
+            "import os, sys\n"
+            "from pathlib import Path\n"
+            "from typ_tmpl.storage.filesystem import FilesystemStorage\n"
+            "storage = FilesystemStorage(base_dir=Path(sys.argv[1]))\n"
+            "storage.add('a', 'orphaned note')\n"
+            "os._exit(0)\n"
+        )
+        storage = FilesystemStorage(base_dir=tmp_path)
+        assert storage.search("orphaned") == []
+
+        subprocess.run([sys.executable, "-c", script, str(tmp_path)], check=True)
+
+        assert [hit.id for hit in storage.search("orphaned")] == []
+        reopened = FilesystemStorage(base_dir=tmp_path)
+        assert [hit.id for hit in reopened.search("orphaned")] == ["a"]
+        assert list((tmp_path / ".index").glob("pending.*")) == []
+        reopened.close()
+        storage.close()
+
+    def test_only_start_of_item_indexed(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that words past the indexing limit are not searchable."""
+        monkeypatch.setattr(search, "MAX_INDEXED_CHARS", 20)
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", "early words " + "padding " * 10 + "late words")
+
+        assert [hit.id for hit in storage.search("early")] == ["a"]
+        assert storage.search("late") == []
+        storage.close()
@@ -0,0 +1,132 @@
+"""Unit tests for snapshot files and the snapshot storage."""
+
+from pathlib import Path
+
+import pytest
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.errors import StorageError
+from typ_tmpl.storage.compression import Codec
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.snapshot import SnapshotStorage, write_snapshot
+
+ITEMS = {
+    "a": "first",
+    "a-b": "nested",
+    "b": "",
+    "big": "x" * 100_000,
+    "héllo": "unicode id",
+}
+
+
+@pytest.fixture
+def snapshot(tmp_path: Path) -> SnapshotStorage:
+    """Snapshot of a filesystem store holding ITEMS."""
+    source = FilesystemStorage(base_dir=tmp_path / "items")
+    source.add_many(ITEMS.items())
+    path = tmp_path / "items.snap"
+    assert write_snapshot(source, path) == len(ITEMS)
+    source.close()
+    return SnapshotStorage(path)
+
+
+class TestSnapshot:
+    """Tests for writing and reading snapshots."""
+
+    def test_round_trip(self, snapshot: SnapshotStorage) -> None:
+        """Test that every item reads back from the snapshot."""
+        assert len(snapshot) == len(ITEMS)
+        assert snapshot.list() == sorted(ITEMS)
+        assert snapshot.get_many(ITEMS) == ITEMS
+        assert snapshot.get("missing") is None
+        assert snapshot.exists_many(["a", "a-", "zz"]) == {
+            "a": True,
+            "a-": False,
+            "zz": False,
+        }
+        assert snapshot.verify() == len(ITEMS)
+
+    def test_range_queries(self, snapshot: SnapshotStorage) -> None:
+        """Test prefix and start filters over the sorted index."""
+        assert list(snapshot.iter_ids(prefix="a")) == ["a", "a-b"]
+        assert list(snapshot.iter_ids(start="b")) == ["b", "big", "héllo"]
+        assert list(snapshot.iter_ids(prefix="b", start="bi")) == ["big"]
+        assert list(snapshot.iter_ids(prefix="zz")) == []
+
+    def test_metadata(self, snapshot: SnapshotStorage) -> None:
+        """Test that sizes and timestamps are kept from the source store."""
+        metas = {meta.id: meta for meta in snapshot.iter_metadata()}
+
+        assert metas["a"].size == 5
+        # Large content is stored compressed.
+        assert metas["big"].size < 1000
+        largest = snapshot.top_metadata("size", limit=2, descending=True)
+        assert [meta.id for meta in largest] == ["big", "héllo"]
+        with pytest.raises(StorageError, match="Unknown sort key"):
+            snapshot.top_metadata("colour")
+
+    @pytest.mark.parametrize("id", ["a", "big"])
+    def test_open_stream(self, snapshot: SnapshotStorage, id: str) -> None:
+        """Test that plain and compressed items stream back."""
+        stream = snapshot.open_stream(id)
+        assert stream is not None
+        with stream:
+            assert stream.read() == ITEMS[id].encode()
+        assert snapshot.open_stream("missing") is None
+
+    def test_read_only(self, snapshot: SnapshotStorage) -> None:
+        """Test that every change is refused."""
+        with pytest.raises(StorageError, match="read-only"):
+            snapshot.add("new", "content")
+        with pytest.raises(StorageError, match="read-only"):
+            snapshot.delete_many(["a"])
+        assert snapshot.get("a") == "first"
+
+    def test_any_storage_exports(self, tmp_path: Path) -> None:
+        """Test exporting a store without a metadata index."""
+        source = MockStorage()
+        source.add_many([("y", "2"), ("x", "1")])
+        path = tmp_path / "mock.snap"
+
+        write_snapshot(source, path, Codec.NONE)
+
+        snapshot = SnapshotStorage(path)
+        assert snapshot.get_many(["x", "y"]) == {"x": "1", "y": "2"}
+        snapshot.close()
+
+    def test_export_replaces_atomically(self, tmp_path: Path) -> None:
+        """Test that a failed export leaves the previous snapshot intact."""
+        path = tmp_path / "items.snap"
+        source = MockStorage()
+        source.add("a", "old")
+        write_snapshot(source, path)
+        source.get_many = lambda ids: {}  # type: ignore[method-assign]
+
+        with pytest.raises(KeyError):
+            write_snapshot(source, path)
+
+        assert [p.name for p in tmp_path.iterdir()] == ["items.snap"]
+        snapshot = SnapshotStorage(path)
+        assert snapshot.get("a") == "old"
+        snapshot.close()
+
+    def test_corruption_detected(self, tmp_path: Path) -> None:
+        """Test that damaged files and content raise StorageError."""
+        source = MockStorage()
+        source.add("a", "content")
+        path = tmp_path / "items.snap"
+        write_snapshot(source, path)
+        data = bytearray(path.read_bytes())
+        data[8] ^= 0xFF
+        damaged = tmp_path / "damaged.snap"
+        damaged.write_bytes(data)
+        garbage = tmp_path / "garbage.snap"
+        garbage.write_bytes(b"not a snapshot" * 10)
+
+        snapshot = SnapshotStorage(damaged)
+        with pytest.raises(StorageError, match="Corrupt"):
+            snapshot.get("a")
+        snapshot.close()
+        for bad in (garbage, tmp_path / "missing.snap"):
+            with pytest.raises(StorageError):
+                SnapshotStorage(bad)
@@ -1,11 +1,20 @@
 """Unit tests for storage implementations."""
 
+import fcntl
+import os
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
 import pytest
+from pytest_mock import MockerFixture
 
-from typ_tmpl.errors import ItemExistsError, ItemNotFoundError
+from typ_tmpl.errors import ItemExistsError, ItemNotFoundError, StorageError
 from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.layout import Layout
+from typ_tmpl.storage.log import LogStorage
+from typ_tmpl.storage.memory import SNAPSHOT_NAME, WAL_NAME, MemoryStorage
+from typ_tmpl.storage.sqlite import SqliteStorage
 
 
 class TestFilesystemStorage:
@@ -86,3 +95,543 @@ class TestFilesystemStorage:
         content = storage.get("nonexistent")
 
         assert content is None
+
+    def test_list_sees_out_of_band_add(self, storage: FilesystemStorage) -> None:
+        """Test that files created behind the storage's back are listed."""
+        storage.add("item1", "Content 1")
+        assert storage.list() == ["item1"]
+
+        storage._item_path("item0").parent.mkdir(exist_ok=True)
+        storage._item_path("item0").write_text("Manual")
+
+        assert storage.list() == ["item0", "item1"]
+
+    def test_list_sees_out_of_band_delete(self, storage: FilesystemStorage) -> None:
+        """Test that files removed behind the storage's back are dropped."""
+        storage.add("item1", "Content 1")
+        storage.add("item2", "Content 2")
+        assert storage.list() == ["item1", "item2"]
+
+        storage._item_path("item1").unlink()
+
+        assert storage.list() == ["item2"]
+
+
+class TestShardedFilesystemStorage(TestFilesystemStorage):
+    """Tests for FilesystemStorage with the sharded layout."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> FilesystemStorage:
+        """Create a sharded FilesystemStorage with a temp directory."""
+        return FilesystemStorage(base_dir=tmp_path, layout=Layout.SHARDED)
+
+    def test_add_creates_file(self, storage: FilesystemStorage) -> None:
+        """Test that add creates a file inside a shard directory."""
+        storage.add("test-item", "Test content")
+
+        path = storage.base_dir / storage._shard("test-item") / "test-item.txt"
+        assert path.read_text() == "Test content"
+        assert not (storage.base_dir / "test-item.txt").exists()
+
+
+class TestLayoutMigration:
+    """Tests for migrating FilesystemStorage between layouts."""
+
+    def test_migrate_round_trip(self, tmp_path: Path) -> None:
+        """Test that items survive migrating to sharded and back."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        for i in range(20):
+            storage.add(f"item{i:02d}", f"Content {i}")
+        expected = storage.list()
+
+        assert storage.migrate("sharded") == 20
+        assert storage.list() == expected
+        assert storage.get("item07") == "Content 7"
+        assert not list(tmp_path.glob("*.txt"))
+
+        assert storage.migrate("flat") == 20
+        assert storage.list() == expected
+        assert len(list(tmp_path.glob("*.txt"))) == 20
+        assert storage._shard_dirs() == []
+
+    def test_layout_is_persisted(self, tmp_path: Path) -> None:
+        """Test that reopening a migrated store uses its recorded layout."""
+        FilesystemStorage(base_dir=tmp_path).migrate("sharded")
+
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("item", "Content")
+
+        assert storage.layout == Layout.SHARDED
+        assert (tmp_path / storage._shard("item") / "item.txt").exists()
+
+    def test_conflicting_layout_raises_error(self, tmp_path: Path) -> None:
+        """Test that opening a store with a different layout fails."""
+        FilesystemStorage(base_dir=tmp_path, layout=Layout.SHARDED)
+
+        with pytest.raises(StorageError):
+            FilesystemStorage(base_dir=tmp_path, layout=Layout.FLAT)
+
+    def test_interrupted_migration_is_resumed(self, tmp_path: Path) -> None:
+        """Test that rerunning migrate picks up files left in the old layout."""
+        storage = FilesystemStorage(base_dir=tmp_path, layout=Layout.SHARDED)
+        storage.add("moved", "A")
+        (tmp_path / "left-behind.txt").write_text("B")
+
+        assert storage.migrate("sharded") == 1
+        assert storage.list() == ["left-behind", "moved"]
+        assert storage.get("left-behind") == "B"
+
+    def test_unknown_layout_raises_error(self, tmp_path: Path) -> None:
+        """Test that migrating to an unknown layout fails."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+
+        with pytest.raises(StorageError):
+            storage.migrate("nested")
+
+
+class TestManifest:
+    """Tests for the FilesystemStorage manifest."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> FilesystemStorage:
+        """Create a FilesystemStorage with a temp directory."""
+        return FilesystemStorage(base_dir=tmp_path)
+
+    def test_list_does_not_rescan_after_changes(
+        self, storage: FilesystemStorage, mocker: MockerFixture
+    ) -> None:
+        """Test that adds and deletes are applied without a directory scan."""
+        storage.add("b", "B")
+        storage.list()
+        scan = mocker.spy(storage, "_scan_ids")
+        storage._manifest._scan = scan
+
+        storage.add("a", "A")
+        storage.add("c", "C")
+        storage.delete("b")
+
+        assert storage.list() == ["a", "c"]
+        scan.assert_not_called()
+
+    def test_compact_folds_journal(self, storage: FilesystemStorage) -> None:
+        """Test that compaction empties the journal and keeps the IDs."""
+        storage.list()
+        storage.add("b", "B")
+        storage.add("a", "A")
+        assert storage._manifest.journal_path.exists()
+
+        storage._manifest.compact()
+
+        assert not storage._manifest.journal_path.exists()
+        assert storage.list() == ["a", "b"]
+
+    def test_corrupt_manifest_is_rebuilt(self, storage: FilesystemStorage) -> None:
+        """Test that an unreadable manifest falls back to a rescan."""
+        storage.add("item", "Content")
+        storage.list()
+        storage._manifest.base_path.write_text("not json\nbogus\n")
+
+        assert storage.list() == ["item"]
+
+    def test_torn_journal_line_is_ignored(
+        self, storage: FilesystemStorage, mocker: MockerFixture
+    ) -> None:
+        """Test that a half-appended journal line is not read as an ID."""
+        storage.list()
+        storage.add("a", "A")
+        with open(storage._manifest.journal_path, "a") as f:
+            f.write("+\tpart")
+        scan = mocker.spy(storage._manifest, "_scan")
+
+        assert storage.list() == ["a"]
+        scan.assert_not_called()
+
+    def test_stale_reader_waits_for_writer(
+        self, storage: FilesystemStorage, mocker: MockerFixture
+    ) -> None:
+        """Test that a stale read loads again under the lock before rebuilding."""
+        storage.list()
+        storage.add("a", "A")
+        manifest = storage._manifest
+        load = manifest._load
+        # The first, lock-free load sees a writer midway through an update.
+        mocker.patch.object(manifest, "_load", side_effect=[None, load(), load()])
+        rebuild = mocker.spy(manifest, "rebuild")
+
+        assert storage.list() == ["a"]
+        rebuild.assert_not_called()
+
+    def test_writers_hold_lock_file(self, storage: FilesystemStorage) -> None:
+        """Test that another process cannot take the lock during an update."""
+        storage.list()
+        path = storage._manifest.lock_path
+        with storage._manifest.update(storage.base_dir):
+            fd = os.open(path, os.O_RDWR)
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.close(fd)
+
+
+class TestSqliteStorage:
+    """Tests for SqliteStorage."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> Iterator[SqliteStorage]:
+        """Create a SqliteStorage in a temp directory."""
+        storage = SqliteStorage(path=tmp_path / "items.db")
+        yield storage
+        storage.close()
+
+    def test_add_and_get(self, storage: SqliteStorage) -> None:
+        """Test that added content can be read back."""
+        storage.add("item", "Test content")
+
+        assert storage.get("item") == "Test content"
+
+    def test_add_duplicate_raises_error(self, storage: SqliteStorage) -> None:
+        """Test that adding duplicate item raises ItemExistsError."""
+        storage.add("item", "Content")
+
+        with pytest.raises(ItemExistsError) as exc_info:
+            storage.add("item", "New content")
+
+        assert exc_info.value.id == "item"
+
+    def test_list_returns_sorted_ids(self, storage: SqliteStorage) -> None:
+        """Test that list returns item IDs in sorted order."""
+        storage.add("item2", "Content 2")
+        storage.add("item1", "Content 1")
+
+        assert storage.list() == ["item1", "item2"]
+
+    def test_list_empty(self, storage: SqliteStorage) -> None:
+        """Test that list returns empty list when no items."""
+        assert storage.list() == []
+
+    def test_delete_removes_item(self, storage: SqliteStorage) -> None:
+        """Test that delete removes the item."""
+        storage.add("to-delete", "Content")
+
+        storage.delete("to-delete")
+
+        assert not storage.exists("to-delete")
+
+    def test_delete_nonexistent_raises_error(self, storage: SqliteStorage) -> None:
+        """Test that deleting nonexistent item raises ItemNotFoundError."""
+        with pytest.raises(ItemNotFoundError) as exc_info:
+            storage.delete("nonexistent")
+
+        assert exc_info.value.id == "nonexistent"
+
+    def test_exists(self, storage: SqliteStorage) -> None:
+        """Test that exists reflects stored items."""
+        storage.add("existing", "Content")
+
+        assert storage.exists("existing") is True
+        assert storage.exists("nonexistent") is False
+
+    def test_get_nonexistent_returns_none(self, storage: SqliteStorage) -> None:
+        """Test that get returns None for nonexistent item."""
+        assert storage.get("nonexistent") is None
+
+    def test_uses_wal_mode(self, storage: SqliteStorage) -> None:
+        """Test that the database runs in WAL journal mode."""
+        mode = storage._conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert mode == "wal"
+
+    def test_transaction_rolls_back_on_error(self, storage: SqliteStorage) -> None:
+        """Test that a failing transaction leaves no partial writes."""
+        storage.add("existing", "Content")
+
+        with pytest.raises(ItemExistsError):
+            with storage.transaction():
+                storage.add("new", "Content")
+                storage.add("existing", "Content")
+
+        assert storage.list() == ["existing"]
+
+    def test_persists_across_connections(self, tmp_path: Path) -> None:
+        """Test that items are visible after reopening the database."""
+        first = SqliteStorage(path=tmp_path / "items.db")
+        first.add("item", "Content")
+        first.close()
+
+        second = SqliteStorage(path=tmp_path / "items.db")
+
+        assert second.get("item") == "Content"
+        second.close()
+
+
+class TestLogStorage:
+    """Tests for LogStorage."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> Iterator[LogStorage]:
+        """Create a LogStorage in a temp directory."""
+        storage = LogStorage(base_dir=tmp_path)
+        yield storage
+        storage.close()
+
+    def reopen(self, storage: LogStorage, **kwargs: Any) -> LogStorage:
+        """Close a storage and open a new instance on the same directory."""
+        storage.close()
+        return LogStorage(base_dir=storage.base_dir, **kwargs)
+
+    def test_add_and_get(self, storage: LogStorage) -> None:
+        """Test that added content can be read back."""
+        storage.add("item", "Test content")
+
+        assert storage.get("item") == "Test content"
+
+    def test_add_duplicate_raises_error(self, storage: LogStorage) -> None:
+        """Test that adding duplicate item raises ItemExistsError."""
+        storage.add("item", "Content")
+
+        with pytest.raises(ItemExistsError) as exc_info:
+            storage.add("item", "New content")
+
+        assert exc_info.value.id == "item"
+
+    def test_list_returns_sorted_ids(self, storage: LogStorage) -> None:
+        """Test that list returns item IDs in sorted order."""
+        storage.add("item2", "Content 2")
+        storage.add("item1", "Content 1")
+
+        assert storage.list() == ["item1", "item2"]
+
+    def test_delete_removes_item(self, storage: LogStorage) -> None:
+        """Test that delete removes the item."""
+        storage.add("to-delete", "Content")
+
+        storage.delete("to-delete")
+
+        assert not storage.exists("to-delete")
+        assert storage.get("to-delete") is None
+
+    def test_delete_nonexistent_raises_error(self, storage: LogStorage) -> None:
+        """Test that deleting nonexistent item raises ItemNotFoundError."""
+        with pytest.raises(ItemNotFoundError) as exc_info:
+            storage.delete("nonexistent")
+
+        assert exc_info.value.id == "nonexistent"
+
+    def test_index_is_rebuilt_on_open(self, storage: LogStorage) -> None:
+        """Test that reopening replays adds and tombstones."""
+        storage.add("kept", "Kept")
+        storage.add("gone", "Gone")
+        storage.delete("gone")
+        storage.add("empty", "")
+
+        reopened = self.reopen(storage)
+
+        assert reopened.list() == ["empty", "kept"]
+        assert reopened.get("kept") == "Kept"
+        assert reopened.get("empty") == ""
+        reopened.close()
+
+    def test_second_opener_fails(self, storage: LogStorage) -> None:
+        """Test that a locked directory is an error rather than a hang."""
+        with pytest.raises(StorageError, match="in use by another process"):
+            LogStorage(base_dir=storage.base_dir)
+
+        storage.add("item", "still usable")
+        assert storage.get("item") == "still usable"
+
+    def test_segments_rotate(self, tmp_path: Path) -> None:
+        """Test that writes roll over to new segments past the size limit."""
+        storage = LogStorage(base_dir=tmp_path, max_segment_bytes=64)
+        for i in range(5):
+            storage.add(f"item{i}", "x" * 40)
+
+        assert len(storage._segments()) == 5
+        assert storage.get("item3") == "x" * 40
+        storage.close()
+
+    def test_torn_tail_is_truncated(self, storage: LogStorage) -> None:
+        """Test that a partial record at the end of the log is discarded."""
+        storage.add("item", "Content")
+        path = storage._segment_path(storage._active)
+        with open(path, "ab") as f:
+            f.write(b"\x00\x01\x02")
+
+        reopened = self.reopen(storage)
+
+        assert reopened.list() == ["item"]
+        assert path.stat().st_size == reopened._active_size
+        reopened.close()
+
+    def test_corrupt_record_raises_error(self, storage: LogStorage) -> None:
+        """Test that a record failing its checksum is reported on read."""
+        storage.add("item", "Content")
+        path = storage._segment_path(storage._active)
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with pytest.raises(StorageError):
+            storage.get("item")
+
+    def test_compact_drops_dead_records(self, storage: LogStorage) -> None:
+        """Test that compaction keeps live items and shrinks the log."""
+        for i in range(10):
+            storage.add(f"item{i}", f"Content {i}")
+        for i in range(0, 10, 2):
+            storage.delete(f"item{i}")
+
+        reclaimed = storage.compact()
+
+        assert reclaimed > 0
+        assert storage.list() == ["item1", "item3", "item5", "item7", "item9"]
+        assert storage.get("item7") == "Content 7"
+        reopened = self.reopen(storage)
+        assert reopened.list() == ["item1", "item3", "item5", "item7", "item9"]
+        assert reopened.get("item9") == "Content 9"
+        reopened.close()
+
+    def test_writes_after_compaction(self, storage: LogStorage) -> None:
+        """Test that the store keeps working after a compaction."""
+        storage.add("a", "A")
+        storage.delete("a")
+        storage.compact()
+
+        storage.add("a", "A2")
+        storage.add("b", "B")
+
+        reopened = self.reopen(storage)
+        assert reopened.list() == ["a", "b"]
+        assert reopened.get("a") == "A2"
+        reopened.close()
+
+    def test_interrupted_compaction_is_finished(self, storage: LogStorage) -> None:
+        """Test that a committed merge file is installed on the next open."""
+        storage.add("a", "A")
+        storage.add("b", "B")
+        storage.delete("a")
+        base_dir = storage.base_dir
+        storage.close()
+        merged = LogStorage(base_dir=base_dir / "scratch")
+        merged.add("b", "B")
+        merged.close()
+        (base_dir / "scratch" / "00000001.seg").rename(base_dir / "00000001.merge")
+
+        reopened = LogStorage(base_dir=base_dir)
+
+        assert reopened.list() == ["b"]
+        assert not list(base_dir.glob("*.merge"))
+        reopened.close()
+
+    def test_background_compaction(self, tmp_path: Path) -> None:
+        """Test that a high dead ratio triggers compaction in the background."""
+        storage = LogStorage(base_dir=tmp_path, auto_compact_ratio=0.5)
+        storage.add("a", "A" * 100)
+        storage.add("b", "B")
+        storage.delete("a")
+
+        assert storage._compaction is not None
+        storage._compaction.join()
+        assert storage.list() == ["b"]
+        assert storage._total_bytes == storage._live_bytes
+        storage.close()
+
+
+class TestMemoryStorage:
+    """Tests for MemoryStorage."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> Iterator[MemoryStorage]:
+        """Create a MemoryStorage logging to a temp directory."""
+        storage = MemoryStorage(base_dir=tmp_path)
+        yield storage
+        storage.close()
+
+    def reopen(self, storage: MemoryStorage, **kwargs: Any) -> MemoryStorage:
+        """Close a storage and open a new instance on the same directory."""
+        storage.close()
+        return MemoryStorage(base_dir=storage.base_dir, **kwargs)
+
+    def test_without_directory(self) -> None:
+        """Test that items can be kept in memory only."""
+        storage = MemoryStorage()
+        storage.add_many([("b", "B"), ("a", "A")])
+        storage.delete("b")
+
+        assert storage.list() == ["a"]
+        storage.checkpoint()
+        storage.close()
+
+    def test_log_is_replayed_on_open(self, storage: MemoryStorage) -> None:
+        """Test that reopening restores every change."""
+        storage.add("kept", "Kept")
+        storage.add_many([("gone", "Gone"), ("empty", "")])
+        storage.delete("gone")
+
+        reopened = self.reopen(storage)
+
+        assert reopened.list() == ["empty", "kept"]
+        assert reopened.get_many(["kept", "empty"]) == {"kept": "Kept", "empty": ""}
+        reopened.close()
+
+    def test_second_opener_fails(self, storage: MemoryStorage) -> None:
+        """Test that a locked directory is an error rather than a hang."""
+        with pytest.raises(StorageError, match="in use by another process"):
+            MemoryStorage(base_dir=storage.base_dir)
+
+        storage.add("item", "still usable")
+        assert storage.get("item") == "still usable"
+
+    def test_checkpoint_empties_the_log(self, tmp_path: Path) -> None:
+        """Test that a large log is folded into a snapshot."""
+        storage = MemoryStorage(base_dir=tmp_path, checkpoint_bytes=200)
+        for i in range(10):
+            storage.add(f"item{i}", "x" * 40)
+        storage.delete("item0")
+
+        assert (tmp_path / SNAPSHOT_NAME).exists()
+        assert (tmp_path / WAL_NAME).stat().st_size < 200
+        reopened = self.reopen(storage)
+        assert reopened.list() == [f"item{i}" for i in range(1, 10)]
+        reopened.close()
+
+    def test_interrupted_checkpoint_replays_cleanly(
+        self, storage: MemoryStorage
+    ) -> None:
+        """Test that a log already covered by the snapshot is harmless."""
+        storage.add("a", "A")
+        storage.add("b", "B")
+        wal = (storage.base_dir or Path()) / WAL_NAME
+        log = wal.read_bytes()
+        storage.checkpoint()
+        storage.delete("b")
+        # As if the process died before emptying the log.
+        wal.write_bytes(log + wal.read_bytes())
+
+        reopened = self.reopen(storage)
+
+        assert reopened.list() == ["a"]
+        reopened.close()
+
+    def test_torn_tail_is_truncated(self, storage: MemoryStorage) -> None:
+        """Test that a partial record at the end of the log is discarded."""
+        storage.add("item", "Content")
+        wal = (storage.base_dir or Path()) / WAL_NAME
+        size = wal.stat().st_size
+        with open(wal, "ab") as f:
+            f.write(b"\x00\x01\x02")
+
+        reopened = self.reopen(storage)
+
+        assert reopened.list() == ["item"]
+        assert wal.stat().st_size == size
+        reopened.close()
+
+    def test_sorted_ids_follow_changes(self, storage: MemoryStorage) -> None:
+        """Test that listings see items added after an earlier listing."""
+        storage.add("b", "B")
+        assert list(storage.iter_ids()) == ["b"]
+
+        storage.add_many([("a", "A"), ("ab", "AB"), ("c", "C")])
+
+        assert list(storage.iter_ids(prefix="a")) == ["a", "ab"]
+        assert list(storage.iter_ids(start="ab")) == ["ab", "b", "c"]
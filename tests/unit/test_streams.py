@@ -0,0 +1,181 @@
+"""Unit tests for streaming item content."""
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from dev.mocks.storage import MockStorage
+from typ_tmpl.errors import StorageError
+from typ_tmpl.storage.compression import Codec, DecompressingReader, encode
+from typ_tmpl.storage.dedup import DedupStorage
+from typ_tmpl.storage.filesystem import FilesystemStorage
+from typ_tmpl.storage.streams import (
+    MappedStream,
+    copy_stream,
+    open_content,
+    open_stream,
+)
+
+CONTENT = "".join(f"line {i} héllo\n" for i in range(20000))
+
+
+def stored(tmp_path: Path, codec: Codec) -> Path:
+    """Write CONTENT to a file as a backend would store it."""
+    path = tmp_path / f"item.{codec}"
+    path.write_bytes(encode(CONTENT, codec))
+    return path
+
+
+class TestStreams:
+    """Tests for reading stored content as streams."""
+
+    @pytest.mark.parametrize("codec", list(Codec))
+    def test_open_content_round_trips(self, tmp_path: Path, codec: Codec) -> None:
+        """Test that each codec streams back the original bytes."""
+        with open_content(open(stored(tmp_path, codec), "rb")) as stream:
+            chunks = iter(lambda: stream.read(1000), b"")
+            assert b"".join(chunks) == CONTENT.encode()
+
+    def test_plain_content_is_mapped(self, tmp_path: Path) -> None:
+        """Test that plain files are served from a memory map."""
+        stream = open_content(open(stored(tmp_path, Codec.NONE), "rb"))
+        assert isinstance(stream, MappedStream)
+
+        with stream.view() as view:
+            assert bytes(view[:6]) == b"line 0"
+        buffer = bytearray(4)
+        assert stream.readinto(buffer) == 4 and buffer == b"line"
+        assert stream.seek(-3, os.SEEK_END) == stream.size - 3
+        assert stream.read() == b"lo\n"
+        assert stream.read(10) == b""
+        stream.close()
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Test that empty content streams as empty."""
+        path = tmp_path / "empty"
+        path.write_bytes(b"")
+
+        with open_content(open(path, "rb")) as stream:
+            assert stream.read() == b""
+
+    def test_corrupt_and_truncated_content(self, tmp_path: Path) -> None:
+        """Test that damaged compressed content raises StorageError."""
+        data = stored(tmp_path, Codec.ZLIB).read_bytes()
+        corrupt, truncated = tmp_path / "corrupt", tmp_path / "truncated"
+        corrupt.write_bytes(data[:2] + b"garbage" + data[9:])
+        truncated.write_bytes(data[: len(data) // 2])
+        unknown = tmp_path / "unknown"
+        unknown.write_bytes(b"\xffqdata")
+
+        for path in (corrupt, truncated):
+            with open_content(open(path, "rb")) as stream:
+                with pytest.raises(StorageError):
+                    stream.read()
+        with pytest.raises(StorageError, match="Unknown codec"):
+            open_content(open(unknown, "rb"))
+
+    def test_partial_reads_and_close(self, tmp_path: Path) -> None:
+        """Test that small reads work and closing closes the source file."""
+        source = open(stored(tmp_path, Codec.LZMA), "rb")
+        source.seek(2)
+        reader = DecompressingReader(source, Codec.LZMA)
+
+        buffer = bytearray(100)
+        assert reader.readinto(buffer) == 100
+        assert buffer == CONTENT.encode()[:100]
+        reader.close()
+        assert source.closed
+
+    def test_copy_uses_sendfile(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that plain files are copied by the kernel."""
+        sendfile = mocker.spy(os, "sendfile")
+        out_path = tmp_path / "out"
+
+        with (
+            open_content(open(stored(tmp_path, Codec.NONE), "rb")) as stream,
+            open(out_path, "wb") as out,
+        ):
+            stream.read(5)
+            copied = copy_stream(stream, out)
+
+        assert sendfile.call_count >= 1
+        assert copied == len(CONTENT.encode()) - 5
+        assert out_path.read_bytes() == CONTENT.encode()[5:]
+
+    @pytest.mark.parametrize("codec", list(Codec))
+    def test_content_within_a_file(self, tmp_path: Path, codec: Codec) -> None:
+        """Test streaming and copying content stored inside a larger file."""
+        data = encode(CONTENT, codec)
+        # Past the allocation granularity, so the mapping cannot start at
+        # the content.
+        head = b"h" * 70000
+        path = tmp_path / "pack"
+        path.write_bytes(head + data + b"trailer")
+        out_path = tmp_path / "out"
+
+        with open_content(open(path, "rb"), len(head), len(data)) as stream:
+            assert stream.read(4) == b"line"
+            with open(out_path, "wb") as out:
+                copy_stream(stream, out)
+
+        assert out_path.read_bytes() == CONTENT.encode()[4:]
+
+    @pytest.mark.parametrize("codec", [Codec.NONE, Codec.ZLIB])
+    def test_copy_without_file_descriptors(self, tmp_path: Path, codec: Codec) -> None:
+        """Test the fallback copy for outputs that are not files."""
+        out = io.BytesIO()
+
+        with open_content(open(stored(tmp_path, codec), "rb")) as stream:
+            copied = copy_stream(stream, out)
+
+        assert copied == len(CONTENT.encode())
+        assert out.getvalue() == CONTENT.encode()
+
+
+class TestStreamingBackends:
+    """Tests for open_stream() on the backends."""
+
+    @pytest.mark.parametrize("backend", ["fs", "dedup"])
+    def test_open_stream(self, tmp_path: Path, backend: str) -> None:
+        """Test that items stream back and missing items give None."""
+        storage = (
+            FilesystemStorage(base_dir=tmp_path, codec=Codec.ZLIB)
+            if backend == "fs"
+            else DedupStorage(base_dir=tmp_path, codec=Codec.ZLIB)
+        )
+        storage.add("big", CONTENT)
+        storage.add("small", "x")
+
+        for id, content in (("big", CONTENT), ("small", "x")):
+            stream = storage.open_stream(id)
+            assert stream is not None
+            with stream:
+                assert stream.read() == content.encode()
+        assert storage.open_stream("missing") is None
+        storage.close()
+
+    def test_stream_outlives_delete(self, tmp_path: Path) -> None:
+        """Test that an open stream keeps reading a deleted item."""
+        storage = FilesystemStorage(base_dir=tmp_path)
+        storage.add("a", CONTENT)
+        stream = storage.open_stream("a")
+        assert stream is not None
+
+        storage.delete("a")
+
+        with stream:
+            assert stream.read() == CONTENT.encode()
+        storage.close()
+
+    def test_fallback_for_other_backends(self) -> None:
+        """Test that backends without streams are read with get()."""
+        storage = MockStorage()
+        storage.add("a", "héllo")
+
+        stream = open_stream(storage, "a")
+
+        assert stream is not None and stream.read() == "héllo".encode()
+        assert open_stream(storage, "missing") is None